@@ -4,9 +4,17 @@ import logging
 from datetime import datetime
 
 # Local import (placeholder for actual local module)
-from app.utils import config
-from app.utils.data_loader import get_data, get_multiple_tickers, get_fundamentals
+from app.utils import config, profiling
+from app.utils.data_loader import get_data, get_multiple_tickers, get_fundamentals, clear_series_cache, prefetch
+from app.utils.compact import with_indicators
+from app.utils.calendars import align_panel
+from app.utils.quality import quality_report
+from app.utils import fx
 from app.components import charts, alerts
+from app.components.screener import SnapshotIndex
+from app.components import optimizer
+from app.components.factors import exposures_from_data, latest_exposures
+from app.components.pairs import scan_pairs
 from app.components import metrics as metrics_module
 
 # Set up logging
@@ -20,17 +28,58 @@ st.set_page_config(page_title=config.PAGE_TITLE,
                    initial_sidebar_state="expanded"
                     )
 
+# Main layout header (rendered before anything heavy runs)
+
+st.title("📈 Real-Time Global & Kenyan Market Dashboard")
+st.markdown(
+    "Live Price monitoring, technical indicator, and local (NSE) vs global comparisons."
+    "This is a research / prototype dashboard - not a financial advice."
+)
+
+# Optional whole-run profiler capture (armed from the Developer Panel)
+profile_run = None
+if st.session_state.get("profile_next_run"):
+    profile_run = profiling.start_capture(st.session_state.get("profile_engine", "cprofile"))
+
 # Helper / UI utility funcs
 
 @st.cache_data(ttl=int(config.CACHE_TTL.total_seconds()))
 def load_ticker_data(symbol: str, period: str = config.DEFAULT_PERIOD, interval: str = config.DEFAULT_INTERVAL):
-    # Load single ticker data (with indicators). Cached for performance.
-    return get_data(symbol, period=period, interval=interval, include_indicators=True)
+    # Load single ticker data with only the displayed indicators. Cached for performance.
+    profiling.mark_cache_miss()
+    data = get_data(symbol, period=period, interval=interval, include_indicators=True, lazy_indicators=True)
+    return with_indicators(data, config.DASHBOARD_INDICATORS)
 
 @st.cache_data(ttl=int(config.CACHE_TTL.total_seconds()))
 def load_multiple_watchlist(tickers_dict, period: str = config.DEFAULT_PERIOD, interval: str = config.DEFAULT_INTERVAL):
-    # Load multiple tickers (dictionary)
-    return get_multiple_tickers(tickers_dict, period=period, interval=interval, include_indicators=True)
+    # Load multiple tickers (dictionary). Only cumulative returns are plotted, so skip indicators.
+    profiling.mark_cache_miss()
+    return get_multiple_tickers(tickers_dict, period=period, interval=interval, include_indicators=False)
+
+@st.cache_resource
+def get_screener_index():
+    # One snapshot index shared across sessions; rows refresh only when data changes
+    return SnapshotIndex()
+
+@st.cache_data(ttl=int(config.CACHE_TTL.total_seconds()))
+def load_screener_universe(period: str = config.SCREENER_PERIOD):
+    # Daily bars for every configured ticker; the index computes its own indicators
+    profiling.mark_cache_miss()
+    return get_multiple_tickers(config.TICKERS, period=period, interval="1d", include_indicators=False)
+
+@st.cache_data(ttl=int(config.CACHE_TTL.total_seconds()))
+def load_fundamentals(symbol: str):
+    profiling.mark_cache_miss()
+    return get_fundamentals(symbol)
+
+def watchlist_symbols():
+    # Friendly name -> symbol for the session watchlist
+    return {name: config.TICKERS[name] for name in st.session_state.watchlist if name in config.TICKERS}
+
+def render_chart(fig):
+    # Render a Plotly figure, timing the serialization + send
+    with profiling.stage_timer("charts.render"):
+        st.plotly_chart(fig, use_container_width=True)
 
 # Sidebar controls
 st.sidebar.title("⚙️ Settings")
@@ -46,42 +95,71 @@ selected_symbol = config.TICKERS[selected_name]
 period = st.sidebar.selectbox("Period", options=["1mo", "3mo", "6mo", "1y", "2y"], index=3)
 interval = st.sidebar.selectbox("Interval", options=["1d", "1wk", "1mo"], index=0)
 
-# NSE comparison toggle
-compare_nse = st.sidebar.checkbox("Compare with NSE Index", value=True)
+# Display currency ("Native" keeps each asset in its quote currency)
+display_currency = st.sidebar.selectbox("Display currency", config.DISPLAY_CURRENCIES, index=0)
 
-# Quick watchlist selection and refresh
-st.sidebar.markdown("### 📋 Watchlist")
+# Watchlist (edited in the comparison panel, so changes rerun only that panel)
 if "watchlist" not in st.session_state:
     st.session_state.watchlist = ["Apple", "S&P 500", "Kenya Market Index (NSE20)"]
-    
-if st.sidebar.button("Add selected to Watchlist"):
-    if selected_name not in st.session_state.watchlist:
-        st.session_state.watchlist.append(selected_name)
-        
+
 if st.sidebar.button("Refresh data"):
-    # Simple force-refresh by clearing cache
+    # Simple force-refresh by clearing cache (incl. the series periods/intervals are derived from)
     st.cache_data.clear()
-    st.experimental_rerun()
-    
-st.sidebar.markdown("**Current Watchlist:**")
-st.sidebar.write(", ".join(st.session_state.watchlist))
+    clear_series_cache()
+    fx.clear_fx_cache()
+    st.rerun()
 
-# Main layour header
+# Universe screener (latest-snapshot index over all configured tickers)
+@st.fragment
+def screener_panel():
+    # Runs inside the sidebar; editing the screen reruns only this fragment
+    st.markdown("### 🔎 Screener")
+    if not st.checkbox("Enable screener", value=False):
+        return
+    screen_text = st.text_input("Screen", value=config.SCREENER_DEFAULT_FILTER)
+    screener_index = get_screener_index()
+    with profiling.cache_probe("app.load_screener_universe"):
+        universe_data = load_screener_universe()
+    screener_index.update_many(universe_data)
+    screen_sort = st.selectbox("Sort by", screener_index.fields, index=screener_index.fields.index("RSI"))
+    try:
+        matches = screener_index.query(screen_text, sort_by=screen_sort,
+                                       columns=["Close", "Daily_Return", "RSI", "MA_50", "MA_200"])
+        st.caption(f"{len(matches)} of {len(screener_index)} tickers match")
+        st.dataframe(matches.drop(columns="Last_Date").round(2))
+    except (KeyError, ValueError) as e:
+        st.error(f"Invalid screen: {e}")
 
-st.title("📈 Real-Time Global & Kenyan Market Dashboard")
-st.markdown(
-    "Live Price monitoring, technical indicator, and local (NSE) vs global comparisons."
-    "This is a research / prototype dashboard - not a financial advice."
+with st.sidebar:
+    screener_panel()
+
+# Layout skeleton: every section of the main view is placed (with a loading
+# note) before any data is fetched, then filled in as its data arrives
+kpi_slot = st.empty()
+kpi_slot.caption(config.MESSAGES['loading'])
+fundamentals_slot = st.expander("Fundamentals (Yahoo)").empty()
+fundamentals_slot.caption(config.MESSAGES['loading'])
+chart_slot = st.empty()
+chart_slot.caption(config.MESSAGES['loading'])
+volume_slot = st.empty()
+alerts_slot = st.empty()
+
+# Panels further down download in the background while the main ticker renders
+prefetch(
+    [*watchlist_symbols().values(),
+     *(config.TICKERS[name] for name in config.FACTOR_BENCHMARKS if name in config.TICKERS)],
+    period=period, interval=interval
 )
 
 # Load data
 
 with st.spinner(config.MESSAGES['loading']):
-    df = load_ticker_data(selected_symbol, period=period, interval=interval)
+    with profiling.cache_probe("app.load_ticker_data"):
+        df = load_ticker_data(selected_symbol, period=period, interval=interval)
 
 # validate data
 if df is None or df.empty:
-    st.error(f"{config.MESSAGES['no_data']} for {selected_name} ({selected_symbol})")
+    kpi_slot.error(f"{config.MESSAGES['no_data']} for {selected_name} ({selected_symbol})")
     st.stop()
     
 # Ensure datetime index for plotting
@@ -93,9 +171,19 @@ elif not isinstance(df.index, pd.DatetimeIndex):
     except Exception:
         pass
 
-# KPIs / Summary cards
+# Convert to the display currency (memoized per universe and currency)
+price_currency = fx.currency_for(selected_symbol)
+fx_warning = None
+if display_currency not in ("Native", price_currency):
+    with profiling.stage_timer("fx.convert"):
+        converted = fx.convert_universe({selected_symbol: df}, display_currency, period=period, interval=interval)
+    if converted[selected_symbol] is not df:
+        df = converted[selected_symbol]
+        price_currency = display_currency
+    else:
+        fx_warning = f"No {price_currency}/{display_currency} rate available, showing prices in {price_currency}."
 
-st.subheader(f"📊 Key Performance Indicators for {selected_name} ({selected_symbol})")
+# KPIs / Summary cards
 
 try:
     # Use metrics module (user provided). If their module name is different adjust import.
@@ -109,113 +197,234 @@ except Exception as e:
         "Total_Return": float(((df['Close'].iloc[-1] / df['Close'].iloc[0]) - 1) * 100)
     }
 
-col1, col2, col3, col4= st.columns(4)
-col1.metric("Price", f"{summary.get('Current_Price'):.2f}", delta=f"{summary.get('Change_Percent'):.2f}%")
-col2.metric("24h Change %", f"{summary.get('Change_Percent'):.2f}%", delta=None)
-col3.metric("Total Return (period)", f"{summary.get('Total_Return'):.2f}%")
-col4.metric("Volatility (ann.)", f"{summary.get('Volatility'):.2f}" if summary.get('Volatility') is not None else "N/A")
-
-# Fundamentals
-with st.expander("Fundamentals (Yahoo)"):
-    fundamentals = get_fundamentals(selected_symbol)
-    if fundamentals:
-        st.json(fundamentals)
-    else:
-        st.write("No fundamentals available.")
+with kpi_slot.container():
+    if fx_warning:
+        st.warning(fx_warning)
+    st.subheader(f"📊 Key Performance Indicators for {selected_name} ({selected_symbol})")
+    col1, col2, col3, col4= st.columns(4)
+    col1.metric("Price", f"{summary.get('Current_Price'):.2f}", delta=f"{summary.get('Change_Percent'):.2f}%")
+    col2.metric("24h Change %", f"{summary.get('Change_Percent'):.2f}%", delta=None)
+    col3.metric("Total Return (period)", f"{summary.get('Total_Return'):.2f}%")
+    col4.metric("Volatility (ann.)", f"{summary.get('Volatility'):.2f}" if summary.get('Volatility') is not None else "N/A")
 
 # Charts (price + indicators)
 
-st.subheader("Price Chart & Technical Indicators")
-fig_price = charts.plot_price_chart(df, f"{selected_name} ({selected_symbol})") # compare_nse=compare_nse)
-st.plotly_chart(fig_price, use_container_width=True)
+with chart_slot.container():
+    st.subheader("Price Chart & Technical Indicators")
+    fig_price = charts.plot_price_chart(df, f"{selected_name} ({selected_symbol})", currency=price_currency)
+    render_chart(fig_price)
 
-st.subheader("Volume")
-fig_vol = charts.plot_volume_chart(df, f"{selected_name} ({selected_symbol})")
-st.plotly_chart(fig_vol, use_container_width=True)
+with volume_slot.container():
+    st.subheader("Volume")
+    fig_vol = charts.plot_volume_chart(df, f"{selected_name} ({selected_symbol})")
+    render_chart(fig_vol)
 
 # Alerts
-st.subheader("🚨 Alerts")
-alert_list = alerts.generate_all_alerts(df, selected_name)
-if alert_list:
-    for a in alert_list:
-         # choose severity visualization
-        if a.startswith("🚀") or a.startswith("📈"):
-            st.success(a)
-        elif a.startswith("⚠️") or a.startswith("📉"):
-             st.error(a)
-        else:
-            st.info(a)
-else:
-    st.write("No alerts at this time.")
+with alerts_slot.container():
+    st.subheader("🚨 Alerts")
+    alert_list = alerts.generate_all_alerts(df, selected_name)
+    if alert_list:
+        for a in alert_list:
+             # choose severity visualization
+            if a.startswith("🚀") or a.startswith("📈"):
+                st.success(a)
+            elif a.startswith("⚠️") or a.startswith("📉"):
+                 st.error(a)
+            else:
+                st.info(a)
+    else:
+        st.write("No alerts at this time.")
     
-# Cmparison panel (watchlist & NSE)
 
-st.subheader("📋 Comparative Performance")
+# Panels below are fragments: a widget inside one reruns only that panel
+# (with the inputs it was last called with), not the whole script
 
-# Build comparsion dict from session watchlist 
-watchlist_names = st.session_state.watchlist
-watchlist_dict = {name: config.TICKERS.get(name, names) for name in watchlist_names if config.TICKERS.get(name, None) is not None}
+def load_watchlist(period, interval, display_currency):
+    with profiling.cache_probe("app.load_multiple_watchlist"):
+        watchlist_data = load_multiple_watchlist(watchlist_symbols(), period=period, interval=interval)
+    if watchlist_data and display_currency != "Native":
+        with profiling.stage_timer("fx.convert"):
+            watchlist_data = fx.convert_universe(watchlist_data, display_currency, period=period, interval=interval)
+    return watchlist_data
 
-with st.spinner("Loading watchlist data..."):
-    watchlist_data = load_multiple_watchlist(watchlist_dict, period=period, interval=interval)
-    
-# Cumulative returns plot
-if watchlist_data:
-    fig_cum = charts.plot_cumulative_returns(watchlist_data)
-    st.plotly_chart(fig_cum, use_container_width=True)
-else:
-    st.write("No watchlist data available for comparison.")
-    
-# NSE special comparison
-if compare_nse:
-    st.subheader("NSE vs Global Index Comparison")
-    # try to fetch NSE index (^NSE20) and S&P 500 (^GSPC)
-    nse_symbol = config.TICKERS.get("Kenya Market Index (NSE20)") or config.TICKERS.get("Nairobi Securities Exchange")
-    sp_symbol = config.TICKERS.get("S&P 500") or "^GSPC"
-    try:
-        nse_df = load_ticker_data(nse_symbol, period=period, interval=interval)
-        sp_df = load_ticker_data(sp_symbol, period=period, interval=interval)
-        # Prepare simple cumulative return serires
-        def cumulative_from_close(d):
-            s = d["Close"].pct_change().fillna(0) + 1
-            return s.cumprod() - 1
-        if nse_df is not None and not nse_df.empty and sp_df is not None and not sp_df.empty:
-            comp_dict = {
-                "NSE20": nse_df.assign(Cumulative_Return=cumulative_from_close(nse_df))['Cumulative_Return'],
-                "S&P 500": sp_df.assign(Cumulative_Return=cumulative_from_close(sp_df))['Cumulative_Return']
+def add_to_watchlist(name):
+    if name not in st.session_state.watchlist:
+        st.session_state.watchlist = st.session_state.watchlist + [name]
+
+@st.fragment
+def comparison_panel(selected_name, period, interval, display_currency):
+    with profiling.stage_timer("panel.comparison"):
+        st.subheader("📋 Comparative Performance")
+        watch_cols = st.columns([4, 1])
+        watch_cols[0].multiselect("Watchlist", list(config.TICKERS), key="watchlist")
+        watch_cols[1].button(f"Add {selected_name}", on_click=add_to_watchlist, args=(selected_name,),
+                             disabled=selected_name in st.session_state.watchlist)
+
+        with st.spinner("Loading watchlist data..."):
+            watchlist_data = load_watchlist(period, interval, display_currency)
+
+        # Cumulative returns plot
+        if watchlist_data:
+            fig_cum = charts.plot_cumulative_returns(watchlist_data)
+            render_chart(fig_cum)
+        else:
+            st.write("No watchlist data available for comparison.")
+
+    if watchlist_data and len(watchlist_data) > 1:
+        optimizer_panel(watchlist_data)
+    if watchlist_data:
+        exposures_panel(watchlist_data, period, interval)
+
+# Portfolio optimizer over the watchlist (covariance and frontier are cached)
+@st.fragment
+def optimizer_panel(watchlist_data):
+    with st.expander("⚖️ Portfolio Optimizer"), profiling.stage_timer("panel.optimizer"):
+        opt_cols = st.columns(3)
+        long_only = opt_cols[0].checkbox("Long only", value=True)
+        max_weight = opt_cols[1].slider("Max weight per asset", min_value=round(1 / len(watchlist_data), 2) + 0.01,
+                                        max_value=1.0, value=1.0, step=0.01)
+        shrink = opt_cols[2].checkbox("Shrink covariance (Ledoit-Wolf)", value=True)
+        try:
+            moments = optimizer.moments_from_data(watchlist_data, shrinkage="ledoit_wolf" if shrink else None)
+            frontier = optimizer.efficient_frontier(moments, long_only=long_only, max_weight=max_weight)
+            best = {
+                "Min Variance": optimizer.min_variance(moments, long_only=long_only, max_weight=max_weight),
+                "Max Sharpe": optimizer.max_sharpe(moments, long_only=long_only, max_weight=max_weight)
             }
-            # Convert to DataFrame
-            comp_dfs = {k: d.to_frame(name='Cumulative_Return') if isinstance(d, pd.Series) else d for k, d in comp_dict.items()}
-            # Reformat to DataFrame map like other functions
-            comp_plot_map = {}
-            for k, series in comp_dfs.items():
-                if isinstance(series, pd.DataFrame) and 'Cumulative_Return' in series.columns:
-                    tmp_df = pd.DataFrame({'Cumulative_Return': series['Cumulative_Return']})
-                    tmp_df.index = nse_df.inde if k == "NSE20" else sp_df.index
-                    comp_plot_map[k] = tmp_df
-                    
-            # plot
-            st.plotly_chart(charts.plot_cumulative_returns(comp_plot_map, title="NSE20 vs S&P 500 Cumulative Returns"), use_container_width=True)
+            render_chart(charts.plot_efficient_frontier(frontier["Frontier"], best))
+            st.dataframe(pd.DataFrame({name: p["Weights"] for name, p in best.items()}).round(4))
+        except ValueError as e:
+            st.warning(f"Optimizer unavailable: {e}")
+
+# Rolling factor exposures of the watchlist against the benchmark indices
+@st.fragment
+def exposures_panel(watchlist_data, period, interval):
+    with st.expander("📐 Factor Exposures"), profiling.stage_timer("panel.exposures"):
+        benchmark_dict = {name: config.TICKERS[name] for name in config.FACTOR_BENCHMARKS if name in config.TICKERS}
+        with profiling.cache_probe("app.load_multiple_watchlist"):
+            benchmark_data = load_multiple_watchlist(benchmark_dict, period=period, interval=interval)
+        assets = {name: data for name, data in watchlist_data.items() if name not in benchmark_data}
+        exposure_panel = exposures_from_data(assets, benchmark_data, window=config.FACTOR_WINDOW)
+        if assets and not exposure_panel.empty:
+            st.dataframe(latest_exposures(exposure_panel).round(3))
+            beta_benchmark = st.selectbox("Rolling beta against", list(benchmark_data))
+            render_chart(charts.plot_rolling_betas(exposure_panel, beta_benchmark))
+        else:
+            st.write("Add non-benchmark tickers to the watchlist to see their exposures.")
+
+# Pairs / cointegration scan over the configured universe
+@st.fragment
+def pairs_panel():
+    with st.expander("🔗 Pairs Scan"), profiling.stage_timer("panel.pairs"):
+        pair_cols = st.columns(2)
+        pair_universe = pair_cols[0].radio("Universe", ["all", "nse", "cross"], horizontal=True,
+                                           format_func={"all": "All", "nse": "NSE only", "cross": "Cross-market"}.get)
+        min_corr = pair_cols[1].slider("Minimum |correlation|", 0.0, 1.0, config.PAIRS_MIN_CORRELATION, 0.05)
+        if st.button("Run pairs scan"):
+            with profiling.cache_probe("app.load_screener_universe"):
+                universe_data = load_screener_universe()
+            pair_results = scan_pairs(universe_data, min_correlation=min_corr, universe=pair_universe)
+            if pair_results.empty:
+                st.write("No pairs pass the correlation filter.")
+            else:
+                st.dataframe(pair_results.round(4))
+
+# NSE special comparison
+@st.fragment
+def nse_panel(period, interval, display_currency):
+    with profiling.stage_timer("panel.nse"):
+        if not st.toggle("Compare with NSE Index", value=True):
+            return
+        st.subheader("NSE vs Global Index Comparison")
+        # try to fetch NSE index (^NSE20) and S&P 500 (^GSPC)
+        nse_symbol = config.TICKERS.get("Kenya Market Index (NSE20)") or config.TICKERS.get("Nairobi Securities Exchange")
+        sp_symbol = config.TICKERS.get("S&P 500") or "^GSPC"
+        try:
+            with profiling.cache_probe("app.load_ticker_data"):
+                nse_df = load_ticker_data(nse_symbol, period=period, interval=interval)
+            with profiling.cache_probe("app.load_ticker_data"):
+                sp_df = load_ticker_data(sp_symbol, period=period, interval=interval)
+            if nse_df is not None and not nse_df.empty and sp_df is not None and not sp_df.empty:
+                # Align on the union of NSE and NYSE trading days (as-of, forward filled)
+                aligned = align_panel({nse_symbol: nse_df, sp_symbol: sp_df}, column="Close")
+                if display_currency != "Native":
+                    aligned = fx.convert_panel(aligned, None, display_currency, period=period, interval=interval)
+                cumulative = aligned / aligned.iloc[0] - 1
+                comp_plot_map = {
+                    "NSE20": pd.DataFrame({'Cumulative_Return': cumulative[nse_symbol]}),
+                    "S&P 500": pd.DataFrame({'Cumulative_Return': cumulative[sp_symbol]})
+                }
+
+                # plot
+                render_chart(charts.plot_cumulative_returns(comp_plot_map, title="NSE20 vs S&P 500 Cumulative Returns"))
+            else:
+                st.info("NSE or S&P 500 data not available for comparison.")
+        except Exception as e:
+            logger.error("Error loading NSE or S&P 500 data for comparison.", exc_info=e)
+            st.error("Failed to load NSE or S&P 500 data for comparison.")
+
+# Developer panel
+@st.fragment
+def developer_panel(selected_name, selected_symbol, df, period, interval, display_currency, profile_report):
+    with st.expander("Developer Panel"):
+        st.write("Selected symbol:", selected_symbol)
+        st.write("Data sample:")
+        st.dataframe(df.tail().reset_index())
+        st.write("Columnns:", df.columns.tolist())
+
+        # Per-stage timings
+        st.markdown("**Stage timings** (download, indicators, metrics, alerts, charts, panels)")
+        stage_summary = profiling.get_stage_summary()
+        if stage_summary.empty:
+            st.write("No timings recorded yet.")
+        else:
+            st.dataframe(stage_summary, use_container_width=True)
+            hist_stage = st.selectbox("Latency histogram for stage", stage_summary["Stage"].tolist())
+            hist = profiling.get_stage_histogram(hist_stage)
+            if not hist.empty:
+                st.bar_chart(hist.set_index(hist["Bin_Start_ms"].round(2))["Count"])
+
+        if st.button("Reset timings"):
+            profiling.reset_stats()
+
+        # Data-quality checks applied on load (flagged, dropped and repaired bars)
+        st.markdown("**Data quality**")
+        quality_table = quality_report({selected_name: df, **(load_watchlist(period, interval, display_currency) or {})})
+        if quality_table.empty:
+            st.write("No quality summaries available.")
         else:
-            st.info("NSE or S&P 500 data not available for comparison.")
-    except Exception as e:
-        logger.error("Error loading NSE or S&P 500 data for comparison.", exc_info=e)
-        st.error("Failed to load NSE or S&P 500 data for comparison.")
-        
+            st.dataframe(quality_table, use_container_width=True)
+
+        # Profiler capture for the next full script run
+        st.session_state.profile_engine = st.radio("Profiler", ["cprofile", "pyinstrument"], horizontal=True)
+        if st.button("Profile next run"):
+            st.session_state.profile_next_run = True
+            st.rerun(scope="app")
+
+        if profile_report is not None:
+            st.text(profile_report)
+
+comparison_panel(selected_name, period, interval, display_currency)
+pairs_panel()
+nse_panel(period, interval, display_currency)
+
+# Fundamentals come from a separate, slow endpoint, so they fill in last
+with profiling.cache_probe("app.load_fundamentals"):
+    fundamentals = load_fundamentals(selected_symbol)
+if fundamentals:
+    fundamentals_slot.json(fundamentals)
+else:
+    fundamentals_slot.write("No fundamentals available.")
+
 # Footer / debug info
 
 st.markdown("---")
 st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Data provided by Yahoo Finance | Built with Streamlit""")
 
-# Developer panel
-with st.expander("Developer Panel"):
-    st.write("Selected symbol:", selected_symbol)
-    st.write("Data sample:")
-    st.dataframe(df.tail().reset_index())
-    st.write("Columnns:", df.columns.tolist())
-    
-           
-           
-           
-    
-        
+# Stop the whole-run capture here (fragment reruns are not profiled)
+profile_report = None
+if profile_run is not None:
+    st.session_state.profile_next_run = False
+    profile_report = profile_run.stop()
+
+developer_panel(selected_name, selected_symbol, df, period, interval, display_currency, profile_report)
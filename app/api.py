@@ -0,0 +1,459 @@
+"""
+Analytics HTTP API.
+
+Serves bars, indicators, signals, summary statistics, portfolio metrics,
+correlations and alerts to other services without a Streamlit session:
+
+    python -m app.api --port 8502
+
+    GET /bars/{ticker}            OHLCV and returns
+    GET /indicators/{ticker}      ?columns=RSI,MA_20 (default: all)
+    GET /signals/{ticker}         MA / RSI / MACD / Bollinger signal flags
+    GET /summary/{ticker}         summary statistics
+    GET /alerts/{ticker}          alert messages
+    GET /portfolio                ?tickers=AAPL,MSFT&weights=0.6,0.4
+    GET /correlation              ?tickers=AAPL,MSFT,^GSPC
+
+All data endpoints take `period` and `interval`. Frames are returned as
+compact JSON ({"columns", "index", "data"}) or, with `?format=arrow` or an
+`Accept: application/vnd.apache.arrow.stream` header, as an Arrow IPC
+stream. Every response carries an ETag derived from a content hash of
+the bars it was computed from and of the settings that shape the result
+(cleaning, adjustment, indicator and metric parameters), so a matching
+If-None-Match gets a 304 without recomputing anything. Encoded bodies are kept in a shared in-process LRU
+and concurrent requests for the same resource share one computation.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.utils.config import (
+    API_CACHE_SIZE, API_HOST, API_MAX_TICKERS, API_PORT, DEFAULT_INTERVAL, DEFAULT_PERIOD, TICKERS
+)
+from app.utils import data_loader, quality
+from app.utils import indicators as indicator_utils
+from app.utils.compact import with_indicators
+from app.utils.data_loader import INTRADAY_INTERVALS, PERIOD_DAYS, RESAMPLE_RULES, get_data, load_ohlcv
+from app.utils.indicators import TECHNICAL_INDICATORS, identify_signals
+from app.utils.memo import fingerprint
+from app.utils.net import SingleFlight
+from app.components import metrics
+from app.components.alerts import generate_all_alerts
+
+logger = logging.getLogger(__name__)
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+INTERVALS = INTRADAY_INTERVALS + list(RESAMPLE_RULES) + ["5d"]
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Daily_Return", "Cumulative_Return"]
+SIGNAL_COLUMNS = ["Close", "MA_Signal", "RSI_Signal", "MACD_Signal_Flag", "BB_Signal"]
+SIGNAL_INPUTS = ["MA_20", "MA_50", "RSI", "MACD", "MACD_Signal", "BB_Upper", "BB_Lower"]
+ALERT_INPUTS = ["MA_20", "MA_50"]
+
+# Friendly names for configured symbols (the portfolio beta looks up 'S&P 500')
+SYMBOL_NAMES = {symbol: name for name, symbol in TICKERS.items()}
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU of encoded response bodies keyed by ETag.
+
+    The ETag already encodes the resource, its parameters, the format, the
+    bars' content and the relevant settings, so entries never need
+    invalidating: new or revised bars produce a new key and stale entries
+    age out.
+    """
+
+    def __init__(self, max_entries=API_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry
+
+    def put(self, etag, body, media_type):
+        with self._lock:
+            self._entries[etag] = (body, media_type)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, media_type
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = ResponseCache()
+_flight = SingleFlight()
+
+
+def clear_api_cache():
+    """Drop all cached response bodies."""
+    _cache.clear()
+
+
+def _jsonable(value):
+    # Plain Python types for json.dumps (NaN/inf become null)
+    if isinstance(value, pd.DataFrame):
+        return json.loads(_frame_json(value))
+    if isinstance(value, pd.Series):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _frame_json(frame):
+    return frame.to_json(orient="split", date_format="iso", date_unit="s")
+
+
+def _arrow_stream(frame):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(result, fmt):
+    """
+    Encode an endpoint result.
+
+    Args:
+        result: DataFrame, dict or list
+        fmt (str): 'json' or 'arrow' (DataFrames only)
+
+    Returns:
+        tuple: (body bytes, media type)
+    """
+    if fmt == "arrow":
+        return _arrow_stream(result), ARROW_MEDIA_TYPE
+    if isinstance(result, pd.DataFrame):
+        return _frame_json(result).encode(), JSON_MEDIA_TYPE
+    return json.dumps(_jsonable(result), separators=(",", ":")).encode(), JSON_MEDIA_TYPE
+
+
+def data_versions(tickers, period, interval):
+    """
+    Version keys of the bars behind a request.
+
+    Bars come from the data loader's series cache, so this is a slice of
+    an in-memory frame unless the cache has expired.
+
+    Args:
+        tickers (list): Ticker symbols
+        period (str): Data period
+        interval (str): Data interval
+
+    Returns:
+        list: One content fingerprint of the OHLCV bars per ticker
+
+    Raises:
+        HTTPException: 404 if a ticker has no data
+    """
+    versions = []
+    for ticker in tickers:
+        bars = load_ohlcv(ticker, period=period, interval=interval)
+        if bars is None or bars.empty:
+            raise HTTPException(404, f"No data for {ticker}")
+        versions.append(fingerprint(bars))
+    return versions
+
+
+def config_version():
+    """
+    Fingerprint of the settings that change results computed from the same bars.
+
+    Covers bar cleaning and repair, corporate-action adjustment, compact
+    storage, indicator parameters and metric annualization; they are read
+    from the modules that use them, so runtime overrides are picked up.
+
+    Returns:
+        str: Content hash
+    """
+    return fingerprint(
+        data_loader.QUALITY_ENABLED, data_loader.CORPORATE_ACTIONS_MODE, data_loader.COMPACT_MODE,
+        {name: value for name, value in vars(quality).items() if name.startswith("QUALITY_")},
+        indicator_utils.INDICATOR_PARAMS, indicator_utils.INDICATOR_SMOOTHING, indicator_utils.TRADING_DAYS_PER_YEAR,
+        metrics.TRADING_DAYS_PER_YEAR, metrics.EXCHANGE_EXTRA_HOLIDAYS
+    )
+
+
+def make_etag(resource, params, fmt, versions, config=None):
+    key = repr((resource, sorted(params.items()), fmt, versions, config))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def _matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def resolve(resource, params, tickers, period, interval, fmt, compute, if_none_match=None):
+    """
+    Serve one resource: 304, cached body or a (shared) computation.
+
+    Args:
+        resource (str): Endpoint name
+        params (dict): Parameters that change the result (part of the ETag)
+        tickers (list): Tickers whose bars the result depends on
+        period (str): Data period
+        interval (str): Data interval
+        fmt (str): 'json' or 'arrow'
+        compute (callable): Builds the result (DataFrame, dict or list)
+        if_none_match (str): Request If-None-Match header
+
+    Returns:
+        tuple: (status, etag, body, media type)
+    """
+    etag = make_etag(resource, params, fmt, data_versions(tickers, period, interval), config_version())
+    if _matches(if_none_match, etag):
+        return 304, etag, b"", None
+
+    cached = _cache.get(etag)
+    if cached is None:
+        cached, _ = _flight.do(etag, lambda: _cache.put(etag, *encode(compute(), fmt)))
+    return 200, etag, *cached
+
+
+# Request parsing
+
+def _format(request, tabular):
+    fmt = request.query_params.get("format")
+    if fmt is None:
+        fmt = "arrow" if ARROW_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+    if fmt not in ("json", "arrow"):
+        raise HTTPException(400, f"Unknown format: {fmt}")
+    if fmt == "arrow" and not tabular:
+        raise HTTPException(406, "Arrow output is only available for tabular endpoints")
+    return fmt
+
+
+def _period_interval(request):
+    period = request.query_params.get("period", DEFAULT_PERIOD)
+    interval = request.query_params.get("interval", DEFAULT_INTERVAL)
+    if period not in PERIOD_DAYS:
+        raise HTTPException(400, f"Unknown period: {period}")
+    if interval not in INTERVALS:
+        raise HTTPException(400, f"Unknown interval: {interval}")
+    return period, interval
+
+
+def _list_param(request, name, required=False):
+    raw = request.query_params.get(name, "")
+    values = [value.strip() for value in raw.split(",") if value.strip()]
+    if required and not values:
+        raise HTTPException(400, f"Missing '{name}'")
+    return values
+
+
+def _tickers(request):
+    tickers = list(dict.fromkeys(_list_param(request, "tickers", required=True)))
+    if len(tickers) > API_MAX_TICKERS:
+        raise HTTPException(400, f"At most {API_MAX_TICKERS} tickers per request")
+    return tickers
+
+
+def _load(ticker, period, interval, indicators=None):
+    # Indicators are materialized lazily, only the ones the endpoint needs
+    data = get_data(ticker, period=period, interval=interval, include_indicators=indicators is not None,
+                    lazy_indicators=True)
+    if data is None or data.empty:
+        raise HTTPException(404, f"No data for {ticker}")
+    return with_indicators(data, indicators) if indicators is not None else data
+
+
+def _load_many(tickers, period, interval):
+    return {SYMBOL_NAMES.get(ticker, ticker): _load(ticker, period, interval) for ticker in tickers}
+
+
+async def _respond(request, resource, params, tickers, period, interval, compute, tabular=False):
+    fmt = _format(request, tabular)
+    status, etag, body, media_type = await run_in_threadpool(
+        resolve, resource, params, tickers, period, interval, fmt, compute,
+        request.headers.get("if-none-match")
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+# Endpoints
+
+async def bars(request):
+    ticker = request.path_params["ticker"]
+    period, interval = _period_interval(request)
+
+    def compute():
+        data = _load(ticker, period, interval)
+        return data[[column for column in BAR_COLUMNS if column in data.columns]]
+
+    return await _respond(request, "bars", {"ticker": ticker}, [ticker], period, interval, compute, tabular=True)
+
+
+async def indicators(request):
+    ticker = request.path_params["ticker"]
+    period, interval = _period_interval(request)
+    columns = _list_param(request, "columns") or TECHNICAL_INDICATORS
+    unknown = [column for column in columns if column not in TECHNICAL_INDICATORS]
+    if unknown:
+        raise HTTPException(400, f"Unknown indicators: {', '.join(unknown)}")
+
+    def compute():
+        return _load(ticker, period, interval, indicators=columns)[columns]
+
+    params = {"ticker": ticker, "columns": tuple(columns)}
+    return await _respond(request, "indicators", params, [ticker], period, interval, compute, tabular=True)
+
+
+async def signals(request):
+    ticker = request.path_params["ticker"]
+    period, interval = _period_interval(request)
+
+    def compute():
+        return identify_signals(_load(ticker, period, interval, indicators=SIGNAL_INPUTS))[SIGNAL_COLUMNS]
+
+    return await _respond(request, "signals", {"ticker": ticker}, [ticker], period, interval, compute, tabular=True)
+
+
+async def summary(request):
+    ticker = request.path_params["ticker"]
+    period, interval = _period_interval(request)
+
+    def compute():
+        return metrics.get_summary_statistics(_load(ticker, period, interval))
+
+    return await _respond(request, "summary", {"ticker": ticker}, [ticker], period, interval, compute)
+
+
+async def alerts(request):
+    ticker = request.path_params["ticker"]
+    period, interval = _period_interval(request)
+
+    def compute():
+        data = _load(ticker, period, interval, indicators=ALERT_INPUTS)
+        return {"ticker": ticker, "alerts": generate_all_alerts(data, SYMBOL_NAMES.get(ticker, ticker))}
+
+    return await _respond(request, "alerts", {"ticker": ticker}, [ticker], period, interval, compute)
+
+
+async def portfolio(request):
+    tickers = _tickers(request)
+    period, interval = _period_interval(request)
+    weights = _list_param(request, "weights")
+    if weights and len(weights) != len(tickers):
+        raise HTTPException(400, "'weights' must have one value per ticker")
+    try:
+        weights = tuple(float(weight) for weight in weights)
+    except ValueError:
+        raise HTTPException(400, "'weights' must be numbers")
+
+    def compute():
+        data = _load_many(tickers, period, interval)
+        weight_map = dict(zip(data, weights)) if weights else None
+        return metrics.calculate_portfolio_metrics(data, weights=weight_map)
+
+    params = {"tickers": tuple(tickers), "weights": weights}
+    return await _respond(request, "portfolio", params, tickers, period, interval, compute)
+
+
+async def correlation(request):
+    tickers = _tickers(request)
+    period, interval = _period_interval(request)
+
+    def compute():
+        return metrics.calculate_correlation_summary(_load_many(tickers, period, interval))
+
+    params = {"tickers": tuple(tickers)}
+    return await _respond(request, "correlation", params, tickers, period, interval, compute, tabular=True)
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "cached_responses": len(_cache), "cache_hits": _cache.hits,
+                         "cache_misses": _cache.misses})
+
+
+async def _http_error(request, exc):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+
+def create_app():
+    """
+    Build the ASGI application.
+
+    Returns:
+        Starlette: The API app
+    """
+    routes = [
+        Route("/health", health),
+        Route("/bars/{ticker}", bars),
+        Route("/indicators/{ticker}", indicators),
+        Route("/signals/{ticker}", signals),
+        Route("/summary/{ticker}", summary),
+        Route("/alerts/{ticker}", alerts),
+        Route("/portfolio", portfolio),
+        Route("/correlation", correlation)
+    ]
+    return Starlette(routes=routes, exception_handlers={HTTPException: _http_error})
+
+
+def serve(host=API_HOST, port=API_PORT):
+    """
+    Run the API with uvicorn (blocking).
+
+    Args:
+        host (str): Bind address
+        port (int): Port
+    """
+    import uvicorn
+
+    uvicorn.run(create_app(), host=host, port=port, log_level="info")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Market analytics HTTP API")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
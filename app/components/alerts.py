@@ -1,5 +1,6 @@
 import pandas as pd
 import logging
+from app.utils.profiling import timed
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +93,7 @@ def volatility_alert(data: pd.DataFrame, stock_name: str, threshold: float = 0.0
     return alerts
 
 
+@timed('alerts.generate_all_alerts')
 def generate_all_alerts(data: pd.DataFrame, stock_name: str):
     """
     Aggregate all alert types for a given stock.
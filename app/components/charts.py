@@ -1,11 +1,16 @@
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import logging
+from app.utils.profiling import timed
+from app.utils.lazy_modules import lazy_import
+
+# Plotly is imported when the first figure is built, not at app start-up
+go = lazy_import("plotly.graph_objects")
+px = lazy_import("plotly.express")
 
 logger = logging.getLogger(__name__)
 
-def plot_price_chart(data, ticker_name):
+@timed('charts.plot_price_chart')
+def plot_price_chart(data, ticker_name, currency=None):
     # Plot candlestick chart with moving avergaes and Bollinger Band
     if data is None or data.empty:
         logger.warning(f"No data available to plot for {ticker_name}")
@@ -72,13 +77,14 @@ def plot_price_chart(data, ticker_name):
     fig.update_layout(
         title=f'{ticker_name} - Price with Technical Indicators',
         xaxis_title='Date',
-        yaxis_title='Price (USD / KES)',
+        yaxis_title=f'Price ({currency})' if currency else 'Price (USD / KES)',
         template='plotly_white',
         hovermode='x unified',
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     return fig
 
+@timed('charts.plot_volume_chart')
 def plot_volume_chart(data, ticker_name):
     # Plot volume chart
     if data is None or data.empty:
@@ -98,7 +104,8 @@ def plot_volume_chart(data, ticker_name):
     )
     return fig
 
-def plot_cumulative_returns(data_dict):
+@timed('charts.plot_cumulative_returns')
+def plot_cumulative_returns(data_dict, title="Cumulative Returns Comparison (Kenya vs Global)"):
     # Plot cumulative returns comparison between multiple tickers
     fig = go.Figure()
     
@@ -112,7 +119,7 @@ def plot_cumulative_returns(data_dict):
             ))
     
     fig.update_layout(
-        title="Cumulative Returns Comparison (Kenya vs Global)",
+        title=title,
         yaxis_title='Cumulative Return (%)',
         xaxis_title='Date',
         template='plotly_white',
@@ -121,6 +128,7 @@ def plot_cumulative_returns(data_dict):
     )
     return fig
 
+@timed('charts.plot_correlation_heatmap')
 def plot_correlation_heatmap(corr_matrix):
     # Plot correlation heatmap
     if corr_matrix is None or corr_matrix.empty:
@@ -141,4 +149,65 @@ def plot_correlation_heatmap(corr_matrix):
     )
     return fig
 
-        
\ No newline at end of file
+        
+@timed('charts.plot_efficient_frontier')
+def plot_efficient_frontier(frontier, portfolios=None):
+    # Plot the efficient frontier (volatility vs return) with highlighted portfolios
+    if frontier is None or frontier.empty:
+        logger.warning("No frontier data available to plot")
+        return go.Figure()
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=frontier['Volatility'],
+        y=frontier['Expected_Return'],
+        mode='lines',
+        name='Efficient Frontier',
+        line=dict(color='blue', width=2)
+    ))
+
+    for name, portfolio in (portfolios or {}).items():
+        fig.add_trace(go.Scatter(
+            x=[portfolio['Volatility']],
+            y=[portfolio['Expected_Return']],
+            mode='markers',
+            name=name,
+            marker=dict(size=12, symbol='star')
+        ))
+
+    fig.update_layout(
+        title='Efficient Frontier',
+        xaxis_title='Annualized Volatility',
+        yaxis_title='Annualized Return',
+        template='plotly_white',
+        hovermode='closest',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+@timed('charts.plot_rolling_betas')
+def plot_rolling_betas(panel, benchmark):
+    # Plot rolling betas of every ticker against one benchmark
+    if panel is None or panel.empty:
+        logger.warning("No exposure data available to plot")
+        return go.Figure()
+    fig = go.Figure()
+
+    betas = panel['Beta'].xs(benchmark, axis=1, level='Benchmark')
+    for name in betas.columns:
+        fig.add_trace(go.Scatter(
+            x=betas.index,
+            y=betas[name],
+            mode='lines',
+            name=name
+        ))
+
+    fig.update_layout(
+        title=f'Rolling Beta vs {benchmark}',
+        yaxis_title='Beta',
+        xaxis_title='Date',
+        template='plotly_white',
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
@@ -0,0 +1,228 @@
+"""
+Rolling factor exposures (beta, alpha, R squared) of many assets against
+several benchmarks at once.
+
+Every statistic is a function of six windowed sums per (asset, benchmark)
+pair: n, sum(x), sum(y), sum(x^2), sum(y^2) and sum(xy).
+For a full history these come from cumulative sums (one pass, no Python
+loop over windows); for live data `ExposureEngine.update` adds the new bar
+and subtracts the one leaving the window, so one bar costs
+O(assets x benchmarks) regardless of history length.
+"""
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from app.utils.config import FACTOR_WINDOW, TRADING_DAYS_PER_YEAR
+from app.utils.calendars import align_returns
+from app.utils.profiling import timed
+
+logger = logging.getLogger(__name__)
+
+METRICS = ['Beta', 'Alpha', 'R2']
+
+
+def _prepare(assets, benchmarks, center):
+    # Centered values with NaN replaced by 0, plus the validity mask of each (asset, benchmark) pair
+    x = benchmarks - center[1]
+    y = assets - center[0]
+    valid = np.isfinite(y)[:, :, None] & np.isfinite(x)[:, None, :]
+    return np.nan_to_num(y), np.nan_to_num(x), valid
+
+
+def _pair_terms(y, x, valid):
+    # Per-row contributions to the six windowed sums, shape (6, rows, assets, benchmarks)
+    mask = valid.astype(float)
+    yb = y[:, :, None] * mask
+    xb = x[:, None, :] * mask
+    return np.stack([mask, xb, yb, xb * xb, yb * yb, xb * yb])
+
+
+def _statistics(sums, center):
+    # Beta, alpha (per bar) and R^2 from centered windowed sums (n, Sx, Sy, Sxx, Syy, Sxy)
+    n, sx, sy, sxx, syy, sxy = sums
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        cov_xy = sxy - sx * sy / n
+        beta = cov_xy / var_x
+        r2 = cov_xy * cov_xy / (var_x * var_y)
+        # Beta and R^2 are shift invariant; alpha needs the raw means
+        alpha = (sy / n + center[0][:, None]) - beta * (sx / n + center[1][None, :])
+    enough = n >= 3
+    beta = np.where(enough & (var_x > 0), beta, np.nan)
+    r2 = np.where(enough & (var_x > 0) & (var_y > 0), np.clip(r2, 0.0, 1.0), np.nan)
+    alpha = np.where(np.isfinite(beta), alpha, np.nan)
+    return beta, alpha, r2
+
+
+def _to_panel(index, tickers, benchmarks, beta, alpha, r2):
+    columns = pd.MultiIndex.from_product([METRICS, tickers, benchmarks], names=['Metric', 'Ticker', 'Benchmark'])
+    values = np.concatenate([m.reshape(len(index), -1) for m in (beta, alpha, r2)], axis=1)
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+@timed('factors.rolling_exposures')
+def rolling_exposures(asset_returns, benchmark_returns, window=FACTOR_WINDOW, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Rolling beta, alpha and R squared of every asset against every benchmark.
+
+    Args:
+        asset_returns (pd.DataFrame): Asset returns (dates x tickers)
+        benchmark_returns (pd.DataFrame): Benchmark returns on the same dates
+        window (int): Rolling window in bars
+        periods_per_year (int): Bars per year used to annualize alpha
+
+    Returns:
+        pd.DataFrame: Panel with (Metric, Ticker, Benchmark) columns
+    """
+    benchmark_returns = benchmark_returns.reindex(asset_returns.index)
+    y_raw = asset_returns.to_numpy(dtype=float)
+    x_raw = benchmark_returns.to_numpy(dtype=float)
+
+    # Centering keeps the cumulative-sum differences well conditioned
+    center = (np.nan_to_num(np.nanmean(y_raw, axis=0)), np.nan_to_num(np.nanmean(x_raw, axis=0)))
+    y, x, valid = _prepare(y_raw, x_raw, center)
+
+    cumulative = np.cumsum(_pair_terms(y, x, valid), axis=1)
+    windowed = cumulative.copy()
+    windowed[:, window:] -= cumulative[:, :-window]
+    # Only full windows are reported
+    windowed[:, :window - 1] = np.nan
+
+    beta, alpha, r2 = _statistics(windowed, center)
+    return _to_panel(asset_returns.index, list(asset_returns.columns), list(benchmark_returns.columns),
+                     beta, alpha * periods_per_year, r2)
+
+
+def exposures_from_data(data_dict, benchmarks, window=FACTOR_WINDOW, how='union'):
+    """
+    Rolling exposures of a universe of stock frames against benchmark frames.
+
+    Args:
+        data_dict (dict): name -> DataFrame with 'Close' (the assets)
+        benchmarks (dict): name -> DataFrame with 'Close' (the benchmarks)
+        window (int): Rolling window in bars
+        how (str): Calendar alignment, 'union' or 'intersection' of trading days
+
+    Returns:
+        pd.DataFrame: Panel with (Metric, Ticker, Benchmark) columns
+    """
+    returns = align_returns({**data_dict, **benchmarks}, how=how)
+    if returns.empty:
+        return pd.DataFrame()
+    assets = [name for name in data_dict if name in returns.columns and name not in benchmarks]
+    return rolling_exposures(returns[assets], returns[list(benchmarks)], window=window)
+
+
+def latest_exposures(panel):
+    """
+    Most recent row of an exposure panel as a table.
+
+    Args:
+        panel (pd.DataFrame): Output of `rolling_exposures`
+
+    Returns:
+        pd.DataFrame: (Ticker, Benchmark) rows with Beta, Alpha and R2 columns
+    """
+    if panel.empty:
+        return pd.DataFrame(columns=METRICS)
+    return panel.iloc[-1].unstack('Metric')[METRICS]
+
+
+class ExposureEngine:
+    """
+    Incrementally maintained rolling exposures.
+
+    Example:
+        engine = ExposureEngine(window=60)
+        engine.fit(asset_returns, benchmark_returns)
+        engine.update(new_asset_row, new_benchmark_row, timestamp)
+        engine.latest()
+    """
+
+    def __init__(self, window=FACTOR_WINDOW, periods_per_year=TRADING_DAYS_PER_YEAR):
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self._panel = pd.DataFrame()
+        self._pending = []
+        self.tickers = []
+        self.benchmarks = []
+        self._center = None
+        self._sums = None
+        self._rows = deque()
+
+    def fit(self, asset_returns, benchmark_returns):
+        """
+        Compute the full rolling panel and seed the running window sums.
+
+        Args:
+            asset_returns (pd.DataFrame): Asset returns (dates x tickers)
+            benchmark_returns (pd.DataFrame): Benchmark returns on the same dates
+
+        Returns:
+            pd.DataFrame: The rolling exposure panel
+        """
+        benchmark_returns = benchmark_returns.reindex(asset_returns.index)
+        self.tickers = list(asset_returns.columns)
+        self.benchmarks = list(benchmark_returns.columns)
+        self._panel = rolling_exposures(asset_returns, benchmark_returns, self.window, self.periods_per_year)
+        self._pending = []
+
+        y_raw = asset_returns.to_numpy(dtype=float)
+        x_raw = benchmark_returns.to_numpy(dtype=float)
+        self._center = (np.nan_to_num(np.nanmean(y_raw, axis=0)), np.nan_to_num(np.nanmean(x_raw, axis=0)))
+        y, x, valid = _prepare(y_raw[-self.window:], x_raw[-self.window:], self._center)
+        terms = _pair_terms(y, x, valid)
+        self._sums = terms.sum(axis=1)
+        self._rows = deque(terms.transpose(1, 0, 2, 3), maxlen=self.window)
+        return self._panel
+
+    @property
+    def panel(self):
+        """Full rolling panel including bars added by `update`."""
+        if self._pending:
+            self._panel = pd.concat([self._panel] + self._pending)
+            self._pending = []
+        return self._panel
+
+    def update(self, asset_row, benchmark_row, timestamp):
+        """
+        Add one bar and slide the window.
+
+        Args:
+            asset_row (pd.Series or dict): ticker -> return for the new bar
+            benchmark_row (pd.Series or dict): benchmark -> return for the new bar
+            timestamp (datetime-like): Bar timestamp
+
+        Returns:
+            pd.DataFrame: Latest exposures (see `latest_exposures`)
+        """
+        if self._sums is None:
+            raise RuntimeError("ExposureEngine.fit must be called before update")
+
+        y_raw = pd.Series(asset_row, dtype=float).reindex(self.tickers).to_numpy()[None, :]
+        x_raw = pd.Series(benchmark_row, dtype=float).reindex(self.benchmarks).to_numpy()[None, :]
+        y, x, valid = _prepare(y_raw, x_raw, self._center)
+        terms = _pair_terms(y, x, valid)[:, 0]
+
+        if len(self._rows) == self.window:
+            self._sums -= self._rows[0]
+        self._rows.append(terms)
+        self._sums += terms
+
+        beta, alpha, r2 = _statistics(self._sums[:, None], self._center)
+        if len(self._rows) < self.window:
+            beta, alpha, r2 = (np.full_like(m, np.nan) for m in (beta, alpha, r2))
+        # Appending to the panel is deferred, so an update does not copy the history
+        row = _to_panel(pd.DatetimeIndex([timestamp]), self.tickers, self.benchmarks,
+                        beta, alpha * self.periods_per_year, r2)
+        self._pending.append(row)
+        return latest_exposures(row)
+
+    def latest(self):
+        """Latest exposures as a (Ticker, Benchmark) x (Beta, Alpha, R2) table."""
+        if self._pending:
+            return latest_exposures(self._pending[-1])
+        return latest_exposures(self._panel)
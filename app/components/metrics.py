@@ -1,11 +1,22 @@
 import pandas as pd
 import numpy as np
 import logging
-from app.utils.config import TRADING_DAYS_PER_YEAR
+from app.utils.config import EXCHANGE_EXTRA_HOLIDAYS, TRADING_DAYS_PER_YEAR
+from app.utils.profiling import timed
+from app.utils.calendars import align_returns
+from app.utils.memo import memoize
+from app.utils.sketches import TDigest
 
 logger = logging.getLogger(__name__)
 
 
+def _metric_params():
+    # Config the cached metrics depend on (annualization, calendar alignment)
+    return TRADING_DAYS_PER_YEAR, EXCHANGE_EXTRA_HOLIDAYS
+
+
+@timed('metrics.get_summary_statistics')
+@memoize('metrics.get_summary_statistics', params=_metric_params)
 def get_summary_statistics(data):
     """
     Calculate summary statistics for stock data.
@@ -38,13 +49,20 @@ def get_summary_statistics(data):
     return stats
 
 
-def calculate_portfolio_metrics(data_dict, weights=None):
+@timed('metrics.calculate_portfolio_metrics')
+@memoize('metrics.calculate_portfolio_metrics', params=_metric_params)
+def calculate_portfolio_metrics(data_dict, weights=None, how='union'):
     """
     Calculate portfolio-level metrics.
     
+    Returns are aligned on the union of the tickers' trading calendars, so
+    mixing Nairobi and US listings no longer drops every row where one
+    market was closed.
+    
     Args:
         data_dict (dict): Dictionary of stock DataFrames
         weights (dict): Dictionary of weights for each stock (must sum to 1)
+        how (str): Calendar alignment, 'union' or 'intersection' of trading days
     
     Returns:
         dict: Portfolio metrics
@@ -63,18 +81,16 @@ def calculate_portfolio_metrics(data_dict, weights=None):
         logger.warning(f"Weights sum to {weight_sum}, normalizing to 1.0")
         weights = {k: v/weight_sum for k, v in weights.items()}
     
-    # Extract returns
-    returns_df = pd.DataFrame({
-        name: data['Daily_Return'] 
-        for name, data in data_dict.items()
-    }).dropna()
+    # Extract calendar-aligned returns
+    returns_df = align_returns(data_dict, how=how)
     
     if returns_df.empty:
         logger.error("No valid returns data found")
         return None
     
-    # Calculate portfolio returns
-    portfolio_returns = sum(returns_df[name] * weights.get(name, 0) 
+    # Calculate portfolio returns (a leg whose market is closed contributes
+    # nothing that day; its move is booked on its next session)
+    portfolio_returns = sum(returns_df[name].fillna(0) * weights.get(name, 0) 
                            for name in returns_df.columns)
     
     # Calculate metrics
@@ -177,12 +193,15 @@ def calculate_var(returns, confidence=0.95):
     Calculate Value at Risk (VaR).
     
     Args:
-        returns (pd.Series): Daily returns
+        returns (pd.Series or TDigest): Daily returns, or a sketch of them
+            (approximate VaR without the raw returns)
         confidence (float): Confidence level (e.g., 0.95 for 95%)
     
     Returns:
         float: VaR value (negative indicates loss)
     """
+    if isinstance(returns, TDigest):
+        return float(returns.quantile(1 - confidence))
     return np.percentile(returns, (1 - confidence) * 100)
 
 
@@ -191,12 +210,14 @@ def calculate_cvar(returns, confidence=0.95):
     Calculate Conditional Value at Risk (CVaR/Expected Shortfall).
     
     Args:
-        returns (pd.Series): Daily returns
+        returns (pd.Series or TDigest): Daily returns, or a sketch of them
         confidence (float): Confidence level
     
     Returns:
         float: CVaR value (average of returns below VaR)
     """
+    if isinstance(returns, TDigest):
+        return returns.tail_mean(1 - confidence)
     var = calculate_var(returns, confidence)
     return returns[returns <= var].mean()
 
@@ -205,6 +226,10 @@ def calculate_portfolio_beta(returns_df, weights, market_col='S&P 500'):
     """
     Calculate portfolio beta relative to market.
     
+    Weights are renormalized over the assets present in `returns_df`. A
+    position in the market itself is part of the portfolio (with a beta of 1)
+    rather than silently dropped.
+    
     Args:
         returns_df (pd.DataFrame): Returns for all assets
         weights (dict): Portfolio weights
@@ -217,8 +242,13 @@ def calculate_portfolio_beta(returns_df, weights, market_col='S&P 500'):
         logger.warning(f"Market column '{market_col}' not found")
         return None
     
-    portfolio_returns = sum(returns_df[col] * weights.get(col, 0) 
-                           for col in returns_df.columns if col != market_col)
+    held = {col: weights.get(col, 0) for col in returns_df.columns if weights.get(col, 0) != 0}
+    total_weight = sum(held.values())
+    if total_weight == 0:
+        logger.warning("No portfolio weights on the available assets")
+        return None
+    
+    portfolio_returns = sum(returns_df[col] * (weight / total_weight) for col, weight in held.items())
     
     market_returns = returns_df[market_col]
     
@@ -255,6 +285,7 @@ def calculate_rolling_metrics(data, window=20):
     return df
 
 
+@timed('metrics.compare_stocks')
 def compare_stocks(data_dict, metric='Total_Return'):
     """
     Compare multiple stocks based on a specific metric.
@@ -288,19 +319,19 @@ def compare_stocks(data_dict, metric='Total_Return'):
     return df
 
 
-def calculate_correlation_summary(data_dict):
+@timed('metrics.calculate_correlation_summary')
+@memoize('metrics.calculate_correlation_summary', params=_metric_params)
+def calculate_correlation_summary(data_dict, how='union'):
     """
     Calculate correlation summary between all stocks.
     
     Args:
         data_dict (dict): Dictionary of stock DataFrames
+        how (str): Calendar alignment, 'union' or 'intersection' of trading days
     
     Returns:
         pd.DataFrame: Correlation matrix
     """
-    returns_df = pd.DataFrame({
-        name: data['Daily_Return'] 
-        for name, data in data_dict.items()
-    }).dropna()
+    returns_df = align_returns(data_dict, how=how)
     
     return returns_df.corr()
\ No newline at end of file
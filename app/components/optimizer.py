@@ -0,0 +1,421 @@
+"""
+Mean-variance portfolio optimization.
+
+All problems are solved as the parametric QP
+
+    minimize 0.5 * w' S w - lam * mu' w
+    subject to sum(w) = 1, lower <= w <= upper
+
+with accelerated projected gradient (FISTA). lam = 0 is the minimum
+variance portfolio and increasing lam walks up the efficient frontier, so
+a whole frontier is one batched solve: every lam is a column of a weight
+matrix, the gradient is a single matrix product and the projection onto
+the capped simplex is vectorized across columns. Solutions are cached
+and reused as warm starts when the frontier is redrawn.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from app.utils.config import (
+    COVARIANCE_CACHE_SIZE, FRONTIER_POINTS, OPTIMIZER_MAX_WEIGHT, RISK_FREE_RATE, TRADING_DAYS_PER_YEAR
+)
+from app.utils.calendars import align_returns
+from app.utils.memo import fingerprint
+from app.utils.profiling import timed
+
+logger = logging.getLogger(__name__)
+
+_moments_cache = OrderedDict()
+_warm_starts = {}
+_cache_lock = threading.Lock()
+
+
+class PortfolioMoments:
+    """Annualized expected returns and covariance of a set of assets."""
+
+    def __init__(self, names, mu, cov, shrinkage=0.0):
+        self.names = list(names)
+        self.mu = mu
+        self.cov = cov
+        self.shrinkage = shrinkage
+        # Gradient Lipschitz constant (largest eigenvalue) for the solver step size
+        self.lipschitz = float(np.linalg.eigvalsh(cov)[-1]) if len(cov) else 0.0
+
+    def performance(self, weights, risk_free_rate=RISK_FREE_RATE):
+        """
+        Return, volatility and Sharpe ratio of one or more weight vectors.
+
+        Args:
+            weights (np.ndarray): Weights (n,) or (n, k)
+            risk_free_rate (float): Annual risk-free rate
+
+        Returns:
+            tuple: (returns, volatilities, sharpe ratios)
+        """
+        weights = np.asarray(weights, dtype=float)
+        returns = self.mu @ weights
+        variances = np.einsum('i...,ij,j...->...', weights, self.cov, weights)
+        volatility = np.sqrt(np.maximum(variances, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(volatility > 0, (returns - risk_free_rate) / volatility, 0.0)
+        return returns, volatility, sharpe
+
+
+def ledoit_wolf(returns):
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+    Args:
+        returns (np.ndarray): Demeaned or raw returns (observations x assets)
+
+    Returns:
+        tuple: (shrunk covariance, shrinkage intensity in [0, 1])
+    """
+    x = returns - returns.mean(axis=0)
+    t, n = x.shape
+    sample = x.T @ x / t
+    target = np.trace(sample) / n
+
+    # Distance of the sample covariance from the target, and its estimation error
+    d2 = np.sum((sample - target * np.eye(n)) ** 2) / n
+    b2 = np.sum((x ** 2).T @ (x ** 2) / t - sample ** 2) / (n * t)
+    b2 = min(b2, d2)
+    delta = b2 / d2 if d2 > 0 else 0.0
+
+    return delta * target * np.eye(n) + (1 - delta) * sample, delta
+
+
+def _moments_key(returns_df, shrinkage):
+    # Content hash of the returns panel: revised earlier returns (adjustments,
+    # FX conversion, quality repairs) must not be served a stale covariance
+    return (fingerprint(returns_df), shrinkage)
+
+
+def estimate_moments(returns_df, shrinkage='ledoit_wolf'):
+    """
+    Annualized mean returns and covariance, cached per returns version.
+
+    Args:
+        returns_df (pd.DataFrame): Daily returns (dates x assets)
+        shrinkage (str or float): 'ledoit_wolf', a fixed intensity in [0, 1],
+            or None for the sample covariance
+
+    Returns:
+        PortfolioMoments: Moments of the assets with complete returns
+    """
+    returns_df = returns_df.dropna(axis=1, how='all').dropna()
+    key = _moments_key(returns_df, shrinkage)
+    with _cache_lock:
+        if key in _moments_cache:
+            _moments_cache.move_to_end(key)
+            return _moments_cache[key]
+
+    values = returns_df.to_numpy(dtype=float)
+    if shrinkage == 'ledoit_wolf':
+        cov, intensity = ledoit_wolf(values)
+    else:
+        cov = np.cov(values, rowvar=False, ddof=1).reshape(values.shape[1], values.shape[1])
+        intensity = float(shrinkage or 0.0)
+        if intensity:
+            target = np.trace(cov) / len(cov)
+            cov = intensity * target * np.eye(len(cov)) + (1 - intensity) * cov
+
+    moments = PortfolioMoments(returns_df.columns, values.mean(axis=0) * TRADING_DAYS_PER_YEAR,
+                               cov * TRADING_DAYS_PER_YEAR, shrinkage=intensity)
+    with _cache_lock:
+        _moments_cache[key] = moments
+        while len(_moments_cache) > COVARIANCE_CACHE_SIZE:
+            _moments_cache.popitem(last=False)
+    return moments
+
+
+def moments_from_data(data_dict, shrinkage='ledoit_wolf', how='union'):
+    """
+    Moments of a universe of stock frames (calendar-aligned returns).
+
+    Args:
+        data_dict (dict): name -> DataFrame with a 'Close' column
+        shrinkage (str or float): See `estimate_moments`
+        how (str): Calendar alignment, 'union' or 'intersection' of trading days
+
+    Returns:
+        PortfolioMoments: Cached moments
+    """
+    return estimate_moments(align_returns(data_dict, how=how), shrinkage=shrinkage)
+
+
+def project_capped_simplex(values, lower=0.0, upper=1.0):
+    """
+    Euclidean projection onto {w : sum(w) = 1, lower <= w <= upper}, column-wise.
+
+    Exact: sum(clip(v - tau, lower, upper)) is piecewise linear in tau, so the
+    breakpoints are sorted once and tau is interpolated on the crossing segment.
+
+    Args:
+        values (np.ndarray): Points to project, (n,) or (n, k)
+        lower (float): Lower bound per weight
+        upper (float): Upper bound per weight
+
+    Returns:
+        np.ndarray: Projected points with the input's shape
+    """
+    v = np.asarray(values, dtype=float)
+    squeeze = v.ndim == 1
+    if squeeze:
+        v = v[:, None]
+    n, k = v.shape
+
+    breakpoints = np.concatenate([v - upper, v - lower])
+    # Passing an upper breakpoint frees a weight (slope -1), a lower one pins it (slope +1)
+    slope_change = np.concatenate([-np.ones(n), np.ones(n)])
+    order = np.argsort(breakpoints, axis=0)
+    b = np.take_along_axis(breakpoints, order, axis=0)
+    slope = np.cumsum(slope_change[order], axis=0)
+
+    totals = np.empty_like(b)
+    totals[0] = n * upper
+    totals[1:] = n * upper + np.cumsum(slope[:-1] * np.diff(b, axis=0), axis=0)
+
+    segment = np.clip((totals >= 1.0).sum(axis=0) - 1, 0, 2 * n - 1)
+    cols = np.arange(k)
+    seg_slope = slope[segment, cols]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = np.where(seg_slope != 0, b[segment, cols] + (totals[segment, cols] - 1.0) / -seg_slope,
+                       b[segment, cols])
+
+    projected = np.clip(v - tau, lower, upper)
+    return projected[:, 0] if squeeze else projected
+
+
+def _bounds(n, long_only, max_weight):
+    upper = OPTIMIZER_MAX_WEIGHT if max_weight is None else max_weight
+    lower = 0.0 if long_only else -upper
+    if n * upper < 1.0 - 1e-12:
+        raise ValueError(f"max_weight={upper} is infeasible for {n} assets (needs at least {1.0 / n:.4f})")
+    return lower, upper
+
+
+def _solve(moments, lams, lower, upper, start=None, tol=1e-8, max_iter=5000):
+    # Batched FISTA over the columns of lams with adaptive restart; returns weights (n, k)
+    mu, cov = moments.mu, moments.cov
+    n, lams = len(mu), np.atleast_1d(np.asarray(lams, dtype=float))
+    step = 1.0 / max(moments.lipschitz, 1e-12)
+
+    if start is None:
+        start = np.full((n, len(lams)), 1.0 / n)
+    weights = project_capped_simplex(start, lower, upper)
+    momentum, t = weights.copy(), np.ones(len(lams))
+    for iteration in range(max_iter):
+        gradient = cov @ momentum - np.outer(mu, lams)
+        updated = project_capped_simplex(momentum - step * gradient, lower, upper)
+        delta = updated - weights
+        change = np.max(np.abs(delta))
+        if change < tol:
+            weights = updated
+            break
+
+        # Restart the momentum of columns that started moving uphill
+        t = np.where(np.sum((momentum - updated) * delta, axis=0) > 0, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next) * delta
+        weights, t = updated, t_next
+    else:
+        logger.warning(f"Optimizer stopped after {max_iter} iterations (last change {change:.2e})")
+    return weights
+
+
+def _result(moments, weights, risk_free_rate):
+    ret, vol, sharpe = moments.performance(weights, risk_free_rate)
+    return {
+        'Weights': pd.Series(weights, index=moments.names),
+        'Expected_Return': float(ret),
+        'Volatility': float(vol),
+        'Sharpe_Ratio': float(sharpe)
+    }
+
+
+def _max_return_weights(mu, lower, upper):
+    # Linear program on the capped simplex: fill the highest-return assets first
+    weights = np.full(len(mu), lower)
+    remaining = 1.0 - weights.sum()
+    for i in np.argsort(-mu):
+        add = min(upper - lower, remaining)
+        weights[i] += add
+        remaining -= add
+        if remaining <= 0:
+            break
+    return weights
+
+
+def _lambda_max(moments, lower, upper):
+    # Smallest lam at which the maximum return corner satisfies the KKT conditions:
+    # for i ranked above j by return, lam * (mu_i - mu_j) >= (S w)_i - (S w)_j
+    mu = moments.mu
+    corner = _max_return_weights(mu, lower, upper)
+    marginal = moments.cov @ corner
+    top = corner > lower
+    bottom = corner < upper
+    gap = mu[top][:, None] - mu[bottom][None, :]
+    needed = marginal[top][:, None] - marginal[bottom][None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(gap > 1e-12, needed / gap, 0.0)
+    lam = float(ratios.max()) if ratios.size else 0.0
+    return max(lam, 1e-12) * 1.01, float(mu @ corner)
+
+
+@timed('optimizer.min_variance')
+def min_variance(moments, long_only=True, max_weight=None, risk_free_rate=RISK_FREE_RATE):
+    """
+    Minimum variance portfolio.
+
+    Args:
+        moments (PortfolioMoments): Asset moments (see `estimate_moments`)
+        long_only (bool): Disallow short positions
+        max_weight (float): Cap on each absolute weight (default from config)
+        risk_free_rate (float): Annual risk-free rate for the reported Sharpe
+
+    Returns:
+        dict: Weights (pd.Series), Expected_Return, Volatility, Sharpe_Ratio
+    """
+    lower, upper = _bounds(len(moments.mu), long_only, max_weight)
+    return _result(moments, _solve(moments, [0.0], lower, upper)[:, 0], risk_free_rate)
+
+
+@timed('optimizer.target_return')
+def target_return(moments, target, long_only=True, max_weight=None, risk_free_rate=RISK_FREE_RATE):
+    """
+    Minimum variance portfolio with a given expected (annual) return.
+
+    Args:
+        moments (PortfolioMoments): Asset moments
+        target (float): Annualized target return
+        long_only (bool): Disallow short positions
+        max_weight (float): Cap on each absolute weight
+        risk_free_rate (float): Annual risk-free rate for the reported Sharpe
+
+    Returns:
+        dict: Optimal portfolio (see `min_variance`), or None if the target
+            is above the attainable maximum
+    """
+    lower, upper = _bounds(len(moments.mu), long_only, max_weight)
+    lam_high, max_ret = _lambda_max(moments, lower, upper)
+    min_ret = moments.mu @ _solve(moments, [0.0], lower, upper)[:, 0]
+    if target > max_ret + 1e-9:
+        logger.warning(f"Target return {target:.4f} exceeds the attainable maximum {max_ret:.4f}")
+        return None
+    if target <= min_ret:
+        return min_variance(moments, long_only, max_weight, risk_free_rate)
+
+    # Return is non-decreasing in lam: bisect, warm starting each solve
+    lam_low, weights = 0.0, None
+    for _ in range(60):
+        lam = (lam_low + lam_high) / 2
+        weights = _solve(moments, [lam], lower, upper, start=weights)
+        achieved = moments.mu @ weights[:, 0]
+        if abs(achieved - target) < 1e-7:
+            break
+        if achieved < target:
+            lam_low = lam
+        else:
+            lam_high = lam
+    return _result(moments, weights[:, 0], risk_free_rate)
+
+
+@timed('optimizer.efficient_frontier')
+def efficient_frontier(moments, points=FRONTIER_POINTS, long_only=True, max_weight=None,
+                       risk_free_rate=RISK_FREE_RATE):
+    """
+    Efficient frontier solved as one batched, warm-started problem.
+
+    Args:
+        moments (PortfolioMoments): Asset moments
+        points (int): Number of frontier portfolios
+        long_only (bool): Disallow short positions
+        max_weight (float): Cap on each absolute weight
+        risk_free_rate (float): Annual risk-free rate
+
+    Returns:
+        dict: 'Frontier' (DataFrame of Expected_Return/Volatility/Sharpe_Ratio,
+            ordered by return), 'Weights' (assets x points DataFrame) and 'Lambda'
+    """
+    n = len(moments.mu)
+    lower, upper = _bounds(n, long_only, max_weight)
+    key = (tuple(moments.names), points, lower, upper)
+
+    with _cache_lock:
+        previous = _warm_starts.get(key)
+    start = previous[1] if previous is not None else None
+    if previous is not None and previous[0] is moments:
+        lams = previous[2]
+    else:
+        lam_high = _lambda_max(moments, lower, upper)[0]
+        # Dense near the minimum variance end, where the frontier bends most
+        lams = np.concatenate([[0.0], np.geomspace(lam_high * 1e-4, lam_high, points - 1)])
+
+    weights = _solve(moments, lams, lower, upper, start=start)
+    with _cache_lock:
+        _warm_starts[key] = (moments, weights, lams)
+
+    returns, volatility, sharpe = moments.performance(weights, risk_free_rate)
+    frontier = pd.DataFrame({'Expected_Return': returns, 'Volatility': volatility, 'Sharpe_Ratio': sharpe})
+    return {
+        'Frontier': frontier,
+        'Weights': pd.DataFrame(weights, index=moments.names),
+        'Lambda': lams
+    }
+
+
+@timed('optimizer.max_sharpe')
+def max_sharpe(moments, long_only=True, max_weight=None, risk_free_rate=RISK_FREE_RATE, points=FRONTIER_POINTS):
+    """
+    Maximum Sharpe ratio (tangency) portfolio.
+
+    The tangency portfolio lies on the frontier, so the best frontier point
+    is refined with a golden-section search over lam between its neighbours.
+
+    Args:
+        moments (PortfolioMoments): Asset moments
+        long_only (bool): Disallow short positions
+        max_weight (float): Cap on each absolute weight
+        risk_free_rate (float): Annual risk-free rate
+        points (int): Frontier resolution used for the initial bracket
+
+    Returns:
+        dict: Optimal portfolio (see `min_variance`)
+    """
+    lower, upper = _bounds(len(moments.mu), long_only, max_weight)
+    frontier = efficient_frontier(moments, points, long_only, max_weight, risk_free_rate)
+    lams, weights = frontier['Lambda'], frontier['Weights'].to_numpy()
+    best = int(np.argmax(frontier['Frontier']['Sharpe_Ratio'].to_numpy()))
+
+    def sharpe_at(lam, start):
+        w = _solve(moments, [lam], lower, upper, start=start)
+        return moments.performance(w[:, 0], risk_free_rate)[2], w
+
+    low, high = lams[max(best - 1, 0)], lams[min(best + 1, len(lams) - 1)]
+    best_w = weights[:, best:best + 1]
+    best_sharpe = frontier['Frontier']['Sharpe_Ratio'].iloc[best]
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(40):
+        if high - low < 1e-9 * max(1.0, high):
+            break
+        a, b = high - ratio * (high - low), low + ratio * (high - low)
+        sharpe_a, w_a = sharpe_at(a, best_w)
+        sharpe_b, w_b = sharpe_at(b, best_w)
+        if sharpe_a >= sharpe_b:
+            high, candidate = b, (sharpe_a, w_a)
+        else:
+            low, candidate = a, (sharpe_b, w_b)
+        if candidate[0] > best_sharpe:
+            best_sharpe, best_w = candidate
+    return _result(moments, best_w[:, 0], risk_free_rate)
+
+
+def clear_optimizer_cache():
+    """Drop cached covariance estimates and frontier warm starts."""
+    with _cache_lock:
+        _moments_cache.clear()
+        _warm_starts.clear()
@@ -0,0 +1,285 @@
+"""
+Pairs / cointegration scan over a universe of tickers.
+
+1. Prune: one correlation matrix of daily returns keeps only pairs with
+   |corr| >= a threshold (out of n * (n - 1) / 2 candidates).
+2. Test: for each surviving pair an Engle-Granger test is run in both
+   directions (OLS hedge ratio on log prices, then an ADF regression on
+   the spread) together with the spread's mean-reversion half-life.
+   Pairs are tested in chunks, each chunk fully vectorized with NumPy
+   (batched 2x2 / (p+1)x(p+1) normal equations); large scans spread the
+   chunks over a process pool.
+3. Cache: results are memoized per universe data version and parameters.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from app.utils.config import (
+    PAIRS_ADF_LAGS, PAIRS_CACHE_SIZE, PAIRS_CHUNK_SIZE, PAIRS_MIN_CORRELATION, PAIRS_MIN_OBSERVATIONS,
+    PAIRS_PARALLEL_MIN_PAIRS, PAIRS_SIGNIFICANCE, PAIRS_WORKERS
+)
+from app.utils.calendars import align_panel, exchange_for, series_version
+from app.utils.profiling import timed
+
+logger = logging.getLogger(__name__)
+
+# MacKinnon (2010) response surface for the Engle-Granger test with two
+# variables and a constant: critical value = b0 + b1 / T + b2 / T^2
+EG_CRITICAL_VALUES = {
+    '1%': (-3.89644, -10.9519, -22.527),
+    '5%': (-3.33613, -6.1101, -6.823),
+    '10%': (-3.04445, -4.2412, -2.720)
+}
+
+UNIVERSES = ('all', 'nse', 'cross')
+
+_scan_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Log prices shared with pool workers (set once per worker by the initializer)
+_worker_prices = None
+
+
+def critical_value(level, observations):
+    """
+    Engle-Granger critical value for a sample size.
+
+    Args:
+        level (str): '1%', '5%' or '10%'
+        observations (int): Number of observations in the test regression
+
+    Returns:
+        float: Critical ADF statistic (reject no-cointegration below it)
+    """
+    b0, b1, b2 = EG_CRITICAL_VALUES[level]
+    return b0 + b1 / observations + b2 / observations ** 2
+
+
+def _batched_ols(design, target):
+    # Solve one least-squares problem per pair: design (k, m, p), target (k, m)
+    xtx = np.einsum('kmi,kmj->kij', design, design)
+    xty = np.einsum('kmi,km->ki', design, target)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = np.linalg.pinv(xtx)
+    coefs = np.einsum('kij,kj->ki', inverse, xty)
+    residuals = target - np.einsum('kmi,ki->km', design, coefs)
+    return coefs, residuals, inverse
+
+
+def _adf_statistic(spread, lags):
+    # ADF t-statistic of gamma in d(e_t) = gamma * e_{t-1} + sum(phi_i * d(e_{t-i})) (no constant),
+    # vectorized over pairs; spread has shape (k, T)
+    diff = np.diff(spread, axis=1)
+    m = diff.shape[1] - lags
+    target = diff[:, lags:]
+    columns = [spread[:, lags:-1]] + [diff[:, lags - i:lags - i + m] for i in range(1, lags + 1)]
+    design = np.stack(columns, axis=2)
+
+    coefs, residuals, inverse = _batched_ols(design, target)
+    dof = max(m - design.shape[2], 1)
+    sigma2 = (residuals ** 2).sum(axis=1) / dof
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return coefs[:, 0] / np.sqrt(sigma2 * inverse[:, 0, 0]), m
+
+
+def _half_life(spread):
+    # Half-life from d(s_t) = a + lam * s_{t-1}: -ln(2) / lam (inf when not mean reverting)
+    lagged = spread[:, :-1]
+    change = np.diff(spread, axis=1)
+    lagged_c = lagged - lagged.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lam = (lagged_c * (change - change.mean(axis=1, keepdims=True))).sum(axis=1) / (lagged_c ** 2).sum(axis=1)
+        return np.where(lam < 0, -np.log(2) / lam, np.inf)
+
+
+def _engle_granger(y, x, lags):
+    # Hedge ratio, spread and ADF statistic of y on x for many pairs: y, x shape (k, T)
+    x_c = x - x.mean(axis=1, keepdims=True)
+    y_c = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = (x_c * y_c).sum(axis=1) / (x_c ** 2).sum(axis=1)
+    spread = y_c - beta[:, None] * x_c
+    stat, observations = _adf_statistic(spread, lags)
+    return beta, spread, stat, observations
+
+
+def _test_chunk(pairs, lags, prices=None):
+    # Engle-Granger in both directions for a chunk of (i, j) index pairs; keeps the stronger direction
+    prices = _worker_prices if prices is None else prices
+    left, right = prices[:, pairs[:, 0]].T, prices[:, pairs[:, 1]].T
+
+    beta_lr, spread_lr, stat_lr, observations = _engle_granger(left, right, lags)
+    beta_rl, spread_rl, stat_rl, _ = _engle_granger(right, left, lags)
+    use_lr = ~(stat_rl < stat_lr)
+
+    stat = np.where(use_lr, stat_lr, stat_rl)
+    beta = np.where(use_lr, beta_lr, beta_rl)
+    spread = np.where(use_lr[:, None], spread_lr, spread_rl)
+    dependent = np.where(use_lr, pairs[:, 0], pairs[:, 1])
+    independent = np.where(use_lr, pairs[:, 1], pairs[:, 0])
+
+    std = spread.std(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscore = np.where(std > 0, spread[:, -1] / std, np.nan)
+    return {
+        'dependent': dependent,
+        'independent': independent,
+        'hedge_ratio': beta,
+        'adf_stat': stat,
+        'half_life': _half_life(spread),
+        'spread_z': zscore,
+        'observations': observations
+    }
+
+
+def _init_worker(prices):
+    global _worker_prices
+    _worker_prices = prices
+
+
+def _universe_mask(names, universe):
+    # Which (i, j) pairs belong to the requested universe
+    nse = np.array([exchange_for(name) == 'NSE' for name in names])
+    if universe == 'nse':
+        return nse[:, None] & nse[None, :]
+    if universe == 'cross':
+        return nse[:, None] != nse[None, :]
+    return np.ones((len(names), len(names)), dtype=bool)
+
+
+def candidate_pairs(returns, min_correlation=PAIRS_MIN_CORRELATION, universe='all'):
+    """
+    Correlation-pruned candidate pairs.
+
+    Args:
+        returns (pd.DataFrame): Daily returns (dates x tickers), no missing values
+        min_correlation (float): Minimum absolute return correlation
+        universe (str): 'all', 'nse' (both legs on the NSE) or 'cross'
+            (one NSE and one non-NSE leg)
+
+    Returns:
+        tuple: (pairs as an (k, 2) int array of column positions, their correlations)
+    """
+    if universe not in UNIVERSES:
+        raise ValueError(f"universe must be one of {UNIVERSES}, got {universe!r}")
+
+    values = returns.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(values, rowvar=False).reshape(values.shape[1], values.shape[1])
+    keep = np.triu(np.abs(np.nan_to_num(corr)) >= min_correlation, k=1) & _universe_mask(returns.columns, universe)
+    i, j = np.nonzero(keep)
+    return np.column_stack([i, j]), corr[i, j]
+
+
+def _scan_key(data_dict, min_correlation, universe, lags, significance, min_observations):
+    versions = tuple((name, series_version(data['Close'])) for name, data in sorted(data_dict.items()))
+    return (versions, min_correlation, universe, lags, significance, min_observations)
+
+
+def _drop_short_histories(data_dict, min_observations):
+    # One short ticker would otherwise shrink the date intersection for every pair
+    kept, short = {}, []
+    for name, data in data_dict.items():
+        if data is None or data.empty:
+            continue
+        if data['Close'].count() < min_observations:
+            short.append(name)
+        else:
+            kept[name] = data
+    if short:
+        logger.warning(f"Pairs scan: skipping {', '.join(map(str, short))} "
+                       f"(fewer than {min_observations} observations)")
+    return kept
+
+
+@timed('pairs.scan_pairs')
+def scan_pairs(data_dict, min_correlation=PAIRS_MIN_CORRELATION, universe='all', lags=PAIRS_ADF_LAGS,
+               significance=PAIRS_SIGNIFICANCE, max_workers=PAIRS_WORKERS, chunk_size=PAIRS_CHUNK_SIZE,
+               min_observations=PAIRS_MIN_OBSERVATIONS):
+    """
+    Scan a universe for cointegrated pairs.
+
+    Args:
+        data_dict (dict): name -> DataFrame with a 'Close' column
+        min_correlation (float): Minimum absolute return correlation to test a pair
+        universe (str): 'all', 'nse' or 'cross' (see `candidate_pairs`)
+        lags (int): Lagged differences in the ADF regression
+        significance (str): '1%', '5%' or '10%' level for the 'Cointegrated' flag
+        max_workers (int): Process pool size (scans below
+            PAIRS_PARALLEL_MIN_PAIRS candidates run in-process)
+        chunk_size (int): Pairs per vectorized chunk
+        min_observations (int): Tickers with fewer bars are skipped (with a
+            warning) before their histories are intersected
+
+    Returns:
+        pd.DataFrame: One row per tested pair, most cointegrated first
+    """
+    data_dict = _drop_short_histories(data_dict, min_observations)
+    key = _scan_key(data_dict, min_correlation, universe, lags, significance, min_observations)
+    with _cache_lock:
+        if key in _scan_cache:
+            _scan_cache.move_to_end(key)
+            return _scan_cache[key].copy()
+
+    # Common history only: the tests need both legs observed on the same dates
+    prices = align_panel(data_dict, column='Close', how='intersection', fill='none').dropna()
+    prices = prices.loc[:, (prices > 0).all()]
+    if prices.shape[1] < 2 or len(prices) < lags + 10:
+        logger.warning("Not enough overlapping history for a pairs scan")
+        return _empty_result()
+
+    log_prices = np.log(prices.to_numpy(dtype=float))
+    pairs, correlations = candidate_pairs(prices.pct_change().iloc[1:], min_correlation, universe)
+    total = prices.shape[1] * (prices.shape[1] - 1) // 2
+    logger.info(f"Pairs scan: {len(pairs)} of {total} pairs pass |corr| >= {min_correlation}")
+    if len(pairs) == 0:
+        return _empty_result()
+
+    chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+    if max_workers and max_workers > 1 and len(pairs) >= PAIRS_PARALLEL_MIN_PAIRS:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(log_prices,)) as pool:
+            parts = list(pool.map(_test_chunk, chunks, [lags] * len(chunks)))
+    else:
+        parts = [_test_chunk(chunk, lags, log_prices) for chunk in chunks]
+
+    results = {name: np.concatenate([part[name] for part in parts]) for name in parts[0] if name != 'observations'}
+    observations = parts[0]['observations']
+    names = np.asarray(prices.columns, dtype=object)
+
+    table = pd.DataFrame({
+        'Asset_1': names[results['dependent']],
+        'Asset_2': names[results['independent']],
+        'Correlation': correlations,
+        'Hedge_Ratio': results['hedge_ratio'],
+        'ADF_Stat': results['adf_stat'],
+        'Critical_Value': critical_value(significance, observations),
+        'Half_Life': results['half_life'],
+        'Spread_Z': results['spread_z']
+    })
+    table['Cointegrated'] = table['ADF_Stat'] < table['Critical_Value']
+    table['Significance'] = None
+    for level in ('10%', '5%', '1%'):
+        table.loc[table['ADF_Stat'] < critical_value(level, observations), 'Significance'] = level
+    table = table.sort_values('ADF_Stat').reset_index(drop=True)
+
+    with _cache_lock:
+        _scan_cache[key] = table
+        while len(_scan_cache) > PAIRS_CACHE_SIZE:
+            _scan_cache.popitem(last=False)
+    return table.copy()
+
+
+def _empty_result():
+    return pd.DataFrame(columns=['Asset_1', 'Asset_2', 'Correlation', 'Hedge_Ratio', 'ADF_Stat',
+                                 'Critical_Value', 'Half_Life', 'Spread_Z', 'Cointegrated', 'Significance'])
+
+
+def clear_pairs_cache():
+    """Drop memoized pair scans."""
+    with _cache_lock:
+        _scan_cache.clear()
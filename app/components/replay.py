@@ -0,0 +1,383 @@
+"""
+Accelerated historical replay for load-testing the real-time path.
+
+Stored bars for N tickers are merged into one time-ordered stream and
+released at `speedup` times real time. Gaps longer than one bar (nights,
+weekends, holidays) count as a single bar, so a replay is not mostly
+idle. Every released bar goes through the path a live feed would take
+(`LivePipeline`):
+
+1. quality check and snapshot index refresh (`SnapshotIndex.append_bars`,
+   which validates the bar and recomputes indicators on the trailing window);
+2. optionally, persisting the bar in the Parquet store (buffered and
+   written in batches, so per-bar cost does not depend on store writes);
+3. alert generation on the ticker's trailing window.
+
+The report gives the end-to-end latency from a bar's scheduled arrival to
+its alerts being evaluated (percentiles), throughput against the offered
+rate, and how the backlog of released-but-unprocessed bars grows. A
+backlog that keeps growing means the pipeline cannot sustain that rate.
+
+Example:
+    engine = ReplayEngine(["SCOM", "EQTY"], interval="1m", speedup=1000)
+    report = engine.run()
+"""
+import logging
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from app.utils import store
+from app.utils.config import (
+    REPLAY_SPEEDUP, REPLAY_WORKERS, SCREENER_TAIL_BARS, LIVE_STORE_FLUSH_BARS, LIVE_STORE_FLUSH_SECONDS
+)
+from app.utils.indicator_graph import evaluate_indicators
+from app.components.alerts import generate_all_alerts
+from app.components.screener import SnapshotIndex
+
+logger = logging.getLogger(__name__)
+
+BAR_SECONDS = {"m": 60, "h": 3600, "d": 86400, "wk": 7 * 86400, "mo": 30 * 86400}
+ALERT_INDICATORS = ["MA_20", "MA_50"]
+
+
+def bar_seconds(interval):
+    """
+    Nominal length of one bar.
+
+    Args:
+        interval (str): Bar interval ('1m', '15m', '1h', '1d', '1wk', ...)
+
+    Returns:
+        int: Seconds per bar
+    """
+    match = re.fullmatch(r"(\d+)(m|h|d|wk|mo)", interval)
+    if match is None:
+        raise ValueError(f"Unknown interval: {interval}")
+    return int(match.group(1)) * BAR_SECONDS[match.group(2)]
+
+
+class LivePipeline:
+    """
+    Per-bar real-time path: validate, refresh the snapshot row, persist, alert.
+
+    Args:
+        index (SnapshotIndex): Index to refresh (a new one by default)
+        interval (str): Bar interval (store partition)
+        store_root (str): Persist bars under this store root (None: skip)
+        alerts (bool): Evaluate alerts after each bar
+        sketches (ReturnSketches): Return distributions to extend with each
+            bar's return (None: skip)
+        flush_bars (int): Write buffered bars to the store once this many are pending
+        flush_seconds (float): Also write them once the oldest has waited this long
+    """
+
+    def __init__(self, index=None, interval="1d", store_root=None, alerts=True, sketches=None,
+                 flush_bars=LIVE_STORE_FLUSH_BARS, flush_seconds=LIVE_STORE_FLUSH_SECONDS):
+        self.index = index if index is not None else SnapshotIndex()
+        self.interval = interval
+        self.store_root = store_root
+        self.alerts_enabled = alerts
+        self.sketches = sketches
+        self.flush_bars = flush_bars
+        self.flush_seconds = flush_seconds
+        self.alert_count = 0
+        self.rejected = 0
+        self._lock = threading.Lock()  # counters are updated from every replay worker
+        # ticker -> bars accepted but not yet persisted; flushes write in arrival order
+        self._pending = {}
+        self._pending_bars = 0
+        self._pending_since = None
+        self._flush_lock = threading.Lock()
+
+    def seed(self, ticker, history):
+        """
+        Load the history that precedes the replay.
+
+        Args:
+            ticker (str): Ticker symbol
+            history (pd.DataFrame): OHLCV bars
+        """
+        self.index.update(ticker, history)
+
+    def on_bars(self, ticker, bars):
+        """
+        Process newly arrived bars for one ticker.
+
+        Args:
+            ticker (str): Ticker symbol
+            bars (pd.DataFrame): New OHLCV bars
+
+        Returns:
+            list: Alert messages raised by the bars
+        """
+        if not self.index.append_bars(ticker, bars):
+            with self._lock:
+                self.rejected += len(bars)
+            return []
+        if self.store_root is not None:
+            self._buffer(ticker, bars)
+        if not self.alerts_enabled and self.sketches is None:
+            return []
+
+        window = self.index.window(ticker)
+        window['Daily_Return'] = window['Close'].pct_change()
+        if self.sketches is not None:
+            # Only returns after the last one already sketched are added
+            self.sketches.update(ticker, window['Daily_Return'])
+        if not self.alerts_enabled:
+            return []
+        for name, series in evaluate_indicators(window, ALERT_INDICATORS).items():
+            window[name] = series
+        messages = generate_all_alerts(window, ticker)
+        with self._lock:
+            self.alert_count += len(messages)
+        return messages
+
+    def flush(self):
+        """
+        Write all buffered bars to the store (one append per ticker).
+
+        A ticker whose write fails keeps its bars buffered (ahead of any that
+        arrived meanwhile) for the next flush; the other tickers are written.
+
+        Returns:
+            int: Bars written
+        """
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_bars, self._pending_since = 0, None
+            failed = {}
+            for ticker, frames in pending.items():
+                try:
+                    store.append_bars(ticker, self.interval, pd.concat(frames) if len(frames) > 1 else frames[0],
+                                      root=self.store_root)
+                    written += sum(len(frame) for frame in frames)
+                except Exception as e:
+                    logger.error(f"Could not store {ticker} bars, keeping them for the next flush: {str(e)}")
+                    failed[ticker] = frames
+            if failed:
+                with self._lock:
+                    for ticker, frames in failed.items():
+                        self._pending[ticker] = frames + self._pending.get(ticker, [])
+                        self._pending_bars += sum(len(frame) for frame in frames)
+                    # The re-buffered bars count towards the next flush as usual
+                    self._pending_since = time.monotonic()
+        return written
+
+    def _buffer(self, ticker, bars):
+        now = time.monotonic()
+        with self._lock:
+            self._pending.setdefault(ticker, []).append(bars)
+            self._pending_bars += len(bars)
+            if self._pending_since is None:
+                self._pending_since = now
+            due = (self._pending_bars >= self.flush_bars
+                   or now - self._pending_since >= self.flush_seconds)
+        if due:
+            self.flush()
+
+
+class ReplayStats:
+    """Latency and backlog samples collected during one replay."""
+
+    def __init__(self):
+        self.latencies = []
+        self.backlog = []
+        self.failures = 0
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def record_failure(self):
+        # Failed bars are kept out of the latency samples and throughput
+        with self._lock:
+            self.failures += 1
+
+    def record_backlog(self, elapsed, depth):
+        self.backlog.append((elapsed, depth))
+
+    def report(self, offered_seconds, speedup, tickers, scheduled):
+        """
+        Summarize the run.
+
+        Args:
+            offered_seconds (float): Wall time the schedule spans
+            speedup (float): Replay speed-up (None: as fast as possible)
+            tickers (int): Tickers replayed
+            scheduled (int): Bars in the schedule (the offered load, whether
+                or not they were processed successfully)
+
+        Returns:
+            dict: Bars (processed successfully), Failed_Bars, Scheduled_Bars,
+                Tickers, Speedup, Wall_s, Offered_Bars_s, Throughput_Bars_s,
+                Latency_p50/p95/p99/max_ms, Backlog_Max, Backlog_Final and
+                Backlog_Growth_Bars_s (slope of the backlog over the run)
+        """
+        bars = len(self.latencies)
+        wall = (self.finished - self.started) if self.started is not None else 0.0
+        latencies = np.array(self.latencies) * 1000 if bars else np.array([np.nan])
+        depth = np.array([sample[1] for sample in self.backlog], dtype=float)
+        elapsed = np.array([sample[0] for sample in self.backlog], dtype=float)
+        growth = (np.polyfit(elapsed, depth, 1)[0]
+                  if len(depth) > 1 and np.ptp(elapsed) > 0 else 0.0)
+        return {
+            "Bars": bars,
+            "Failed_Bars": self.failures,
+            "Scheduled_Bars": scheduled,
+            "Tickers": tickers,
+            "Speedup": speedup,
+            "Wall_s": wall,
+            "Offered_Bars_s": scheduled / offered_seconds if offered_seconds > 0 else float("inf"),
+            "Throughput_Bars_s": bars / wall if wall > 0 else float("inf"),
+            "Latency_p50_ms": float(np.percentile(latencies, 50)),
+            "Latency_p95_ms": float(np.percentile(latencies, 95)),
+            "Latency_p99_ms": float(np.percentile(latencies, 99)),
+            "Latency_max_ms": float(latencies.max()),
+            "Backlog_Max": int(depth.max()) if len(depth) else 0,
+            "Backlog_Final": int(depth[-1]) if len(depth) else 0,
+            "Backlog_Growth_Bars_s": float(growth)
+        }
+
+
+class ReplayEngine:
+    """
+    Replays stored bars through a `LivePipeline` at an accelerated pace.
+
+    Bars before `start` (or the first `warmup` bars when no start is
+    given) seed the pipeline; the rest are released on schedule. Each
+    ticker is pinned to one worker so its bars are processed in order.
+
+    Args:
+        tickers (list): Ticker symbols in the store
+        interval (str): Bar interval
+        speedup (float): Replay speed relative to real time (None: release
+            every bar immediately, i.e. maximum throughput)
+        root (str): Store root holding the historical bars
+        start, end (datetime-like): Replay window
+        warmup (int): Seed bars per ticker when `start` is None
+        pipeline (LivePipeline): Path under test (a default one otherwise)
+        workers (int): Consumer threads
+        data (dict): ticker -> bars to replay instead of reading the store
+    """
+
+    def __init__(self, tickers, interval="1d", speedup=REPLAY_SPEEDUP, root=None, start=None, end=None,
+                 warmup=SCREENER_TAIL_BARS, pipeline=None, workers=REPLAY_WORKERS, data=None):
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.speedup = speedup
+        self.root = root
+        self.start = start
+        self.end = end
+        self.warmup = warmup
+        self.pipeline = pipeline if pipeline is not None else LivePipeline(interval=interval)
+        self.workers = max(1, workers)
+        self.data = data
+        self._live = {}
+        self.schedule = None
+
+    def load(self):
+        """
+        Read the bars, seed the pipeline and build the release schedule.
+
+        Returns:
+            pd.DataFrame: Schedule with Offset_s (seconds after the start of
+                the replay), Ticker and Position (row in the ticker's bars)
+        """
+        parts = []
+        for ticker in self.tickers:
+            if self.data is not None:
+                bars = self.data.get(ticker, pd.DataFrame())
+            else:
+                bars = store.read_bars(ticker, self.interval, end=self.end, root=self.root)
+            if bars is None or bars.empty:
+                logger.warning(f"No stored {self.interval} bars for {ticker}, skipping")
+                continue
+            if self.start is not None:
+                split = int(bars.index.searchsorted(pd.Timestamp(self.start)))
+            else:
+                split = min(self.warmup, len(bars) - 1)
+            if split > 0:
+                self.pipeline.seed(ticker, bars.iloc[:split])
+            live = bars.iloc[split:]
+            self._live[ticker] = live
+            parts.append(pd.DataFrame({"Timestamp": live.index, "Ticker": ticker,
+                                       "Position": np.arange(len(live))}))
+
+        if not parts:
+            self.schedule = pd.DataFrame(columns=["Offset_s", "Ticker", "Position"])
+            return self.schedule
+
+        events = pd.concat(parts, ignore_index=True).sort_values("Timestamp", kind="stable")
+        # Market time between consecutive timestamps, with long gaps collapsed to one bar
+        stamps = pd.Index(events["Timestamp"].unique()).sort_values()
+        gaps = stamps.to_series().diff().dt.total_seconds().to_numpy()[1:]
+        gaps = np.minimum(gaps, bar_seconds(self.interval))
+        market_offset = pd.Series(np.concatenate([[0.0], np.cumsum(gaps)]), index=stamps)
+        scale = 0.0 if not self.speedup else 1.0 / self.speedup
+        events["Offset_s"] = market_offset.reindex(events["Timestamp"]).to_numpy() * scale
+        self.schedule = events[["Offset_s", "Ticker", "Position"]].reset_index(drop=True)
+        return self.schedule
+
+    def run(self):
+        """
+        Replay the schedule and measure the pipeline.
+
+        Returns:
+            dict: `ReplayStats.report` of the run
+        """
+        if self.schedule is None:
+            self.load()
+        stats = ReplayStats()
+        queues = [queue.Queue() for _ in range(self.workers)]
+        route = {ticker: i % self.workers for i, ticker in enumerate(self._live)}
+
+        def consume(inbox):
+            while True:
+                item = inbox.get()
+                if item is None:
+                    return
+                due, ticker, position = item
+                try:
+                    self.pipeline.on_bars(ticker, self._live[ticker].iloc[position:position + 1])
+                except Exception as e:
+                    logger.error(f"Replay pipeline failed for {ticker}: {str(e)}")
+                    stats.record_failure()
+                else:
+                    stats.record_latency(time.perf_counter() - due)
+
+        consumers = [threading.Thread(target=consume, args=(inbox,), daemon=True) for inbox in queues]
+        for consumer in consumers:
+            consumer.start()
+
+        stats.started = time.perf_counter()
+        for offset, ticker, position in self.schedule.itertuples(index=False):
+            due = stats.started + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            queues[route[ticker]].put((due, ticker, position))
+            stats.record_backlog(time.perf_counter() - stats.started, sum(inbox.qsize() for inbox in queues))
+
+        for inbox in queues:
+            inbox.put(None)
+        for consumer in consumers:
+            consumer.join()
+        self.pipeline.flush()
+        stats.finished = time.perf_counter()
+
+        offered = float(self.schedule["Offset_s"].iloc[-1]) if len(self.schedule) else 0.0
+        report = stats.report(offered, self.speedup, len(self._live), len(self.schedule))
+        report["Alerts"] = self.pipeline.alert_count
+        report["Rejected_Bars"] = self.pipeline.rejected
+        logger.info(f"Replayed {report['Bars']} bars ({report['Failed_Bars']} failed) in {report['Wall_s']:.2f}s "
+                    f"(p99 latency {report['Latency_p99_ms']:.1f} ms, backlog max {report['Backlog_Max']})")
+        return report
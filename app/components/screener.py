@@ -0,0 +1,332 @@
+import logging
+import operator
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+from app.utils.config import QUALITY_ENABLED, SCREENER_TAIL_BARS
+from app.utils.calendars import series_version
+from app.utils.indicator_graph import evaluate_indicators
+from app.utils.indicators import TECHNICAL_INDICATORS
+from app.utils.profiling import timed
+from app.utils.quality import validate_append
+
+logger = logging.getLogger(__name__)
+
+BASE_FIELDS = ['Close', 'Volume', 'Daily_Return', 'Cumulative_Return']
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+_CONDITION = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|==|!=|<|>)\s*([A-Za-z_][A-Za-z0-9_]*|[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)\s*$')
+
+
+def parse_filters(text):
+    """
+    Parse a screen such as "RSI < 30 and Close > MA_200".
+
+    Args:
+        text (str): Conditions joined by 'and'; the right-hand side is a
+            number or another field name
+
+    Returns:
+        list: (field, op, value) tuples for `SnapshotIndex.query`
+    """
+    conditions = []
+    for part in re.split(r'\s+and\s+', text.strip(), flags=re.IGNORECASE):
+        if not part:
+            continue
+        match = _CONDITION.match(part)
+        if match is None:
+            raise ValueError(f"Cannot parse screen condition: {part!r}")
+        field, op, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        conditions.append((field, op, value))
+    return conditions
+
+
+class SnapshotIndex:
+    """
+    Columnar table of the latest values (price, returns, indicators) per ticker.
+
+    Each ticker owns one row of a float64 matrix, so a screen over thousands
+    of symbols is a handful of vectorized comparisons. Rows are refreshed
+    incrementally: `update` skips tickers whose data version is unchanged,
+    and `append_bars` recomputes a row from a short trailing window instead
+    of the full history.
+
+    Example:
+        index = SnapshotIndex()
+        index.update_many(data_dict)
+        index.query("RSI < 30 and Close > MA_200", sort_by='RSI')
+    """
+
+    def __init__(self, fields=None, tail=SCREENER_TAIL_BARS):
+        self.fields = list(fields or BASE_FIELDS + TECHNICAL_INDICATORS)
+        self.tail = tail
+        self._field_pos = {field: i for i, field in enumerate(self.fields)}
+        self._values = np.full((16, len(self.fields)), np.nan)
+        self._timestamps = np.full(16, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self._tickers = []
+        self._rows = {}
+        self._buffers = {}
+        self._first_close = {}
+        self._versions = {}
+        # Re-entrant: append_bars falls back to update, and both call _set_row
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._rows
+
+    @property
+    def tickers(self):
+        """Tickers currently indexed."""
+        return list(self._tickers)
+
+    def update(self, ticker, data):
+        """
+        Refresh a ticker's row from its (full) price frame.
+
+        Indicator columns already present in `data` are used as-is; missing
+        ones are computed on the trailing window.
+
+        Args:
+            ticker (str): Ticker or friendly name
+            data (pd.DataFrame): Time-indexed OHLCV data
+
+        Returns:
+            bool: True if the row changed, False if the data was unchanged or empty
+        """
+        if data is None or data.empty or 'Close' not in data.columns:
+            return False
+
+        version = series_version(data['Close'])
+        # The index is shared across sessions: check and refresh atomically
+        with self._lock:
+            if self._versions.get(ticker) == version:
+                return False
+
+            buffer = data.iloc[-self.tail:]
+            self._first_close[ticker] = float(data['Close'].iloc[0])
+            self._set_row(ticker, buffer, self._latest_values(ticker, buffer))
+            self._versions[ticker] = version
+        return True
+
+    def update_many(self, data_dict):
+        """
+        Refresh several tickers.
+
+        Args:
+            data_dict (dict): ticker -> DataFrame
+
+        Returns:
+            int: Number of rows that changed
+        """
+        return sum(self.update(ticker, data) for ticker, data in data_dict.items())
+
+    def append_bars(self, ticker, bars):
+        """
+        Add newly arrived bars for an indexed ticker and refresh its row.
+
+        Only the trailing window is recomputed (a few hundred rows), so the
+        cost does not grow with the length of the history.
+
+        Args:
+            ticker (str): Indexed ticker
+            bars (pd.DataFrame): New OHLCV bars (later timestamps win on overlap)
+
+        Returns:
+            bool: True if the row changed
+        """
+        if bars is None or bars.empty:
+            return False
+
+        # Read-modify-write of the window: concurrent appends must not drop bars
+        with self._lock:
+            if ticker not in self._buffers:
+                return self.update(ticker, bars)
+
+            if QUALITY_ENABLED:
+                # Reject or repair bad bars before they reach the indicators
+                bars, _ = validate_append(self._buffers[ticker], bars, ticker)
+                if bars.empty:
+                    return False
+
+            base_columns = [col for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in bars.columns]
+            buffer = self._buffers[ticker][base_columns]
+            buffer = pd.concat([buffer, bars[base_columns]])
+            buffer = buffer[~buffer.index.duplicated(keep='last')].sort_index().iloc[-self.tail:]
+
+            # Stored indicator columns are stale now, so recompute everything on the window
+            self._set_row(ticker, buffer, self._latest_values(ticker, buffer, recompute=True))
+            self._versions[ticker] = series_version(buffer['Close'])
+        return True
+
+    def window(self, ticker):
+        """
+        Trailing bars kept for a ticker (at most `tail` rows).
+
+        Args:
+            ticker (str): Indexed ticker
+
+        Returns:
+            pd.DataFrame: A copy of the window (empty if the ticker is not indexed)
+        """
+        with self._lock:
+            buffer = self._buffers.get(ticker)
+            return buffer.copy() if buffer is not None else pd.DataFrame()
+
+    def remove(self, ticker):
+        """
+        Drop a ticker from the index.
+
+        Args:
+            ticker (str): Indexed ticker
+        """
+        with self._lock:
+            if ticker not in self._rows:
+                return
+            row = self._rows.pop(ticker)
+            last = len(self._tickers) - 1
+            # Move the last row into the freed slot to keep the matrix dense
+            if row != last:
+                moved = self._tickers[last]
+                self._values[row] = self._values[last]
+                self._timestamps[row] = self._timestamps[last]
+                self._tickers[row] = moved
+                self._rows[moved] = row
+            self._tickers.pop()
+            for store in (self._buffers, self._first_close, self._versions):
+                store.pop(ticker, None)
+
+    def snapshot(self):
+        """
+        Current table as a DataFrame.
+
+        Returns:
+            pd.DataFrame: One row per ticker with 'Last_Date' and all fields
+        """
+        with self._lock:
+            n = len(self._tickers)
+            table = pd.DataFrame(self._values[:n].copy(), index=pd.Index(self._tickers, name='Ticker'),
+                                 columns=self.fields)
+            table.insert(0, 'Last_Date', self._timestamps[:n].copy())
+        return table
+
+    @timed('screener.query')
+    def query(self, conditions=None, sort_by=None, ascending=True, limit=None, columns=None):
+        """
+        Filter and sort the snapshot.
+
+        Args:
+            conditions (str or list): Screen text (see `parse_filters`) or
+                (field, op, value) tuples; value may be a number or a field name
+            sort_by (str): Field to sort by
+            ascending (bool): Sort direction
+            limit (int): Maximum number of rows returned
+            columns (list): Fields to include (default: all)
+
+        Returns:
+            pd.DataFrame: Matching tickers
+        """
+        if isinstance(conditions, str):
+            conditions = parse_filters(conditions)
+
+        with self._lock:
+            n = len(self._tickers)
+            values = self._values[:n]
+            mask = np.ones(n, dtype=bool)
+            with np.errstate(invalid='ignore'):
+                for field, op, value in conditions or []:
+                    lhs = values[:, self._column(field)]
+                    rhs = values[:, self._column(value)] if isinstance(value, str) else value
+                    # NaN (e.g. MA_200 on a short history) never matches
+                    mask &= OPERATORS[op](lhs, rhs)
+
+            rows = np.flatnonzero(mask)
+            if sort_by is not None:
+                keys = values[rows, self._column(sort_by)]
+                # Missing values sort last in either direction
+                keys = np.where(np.isnan(keys), np.inf, keys if ascending else -keys)
+                rows = rows[np.argsort(keys, kind='stable')]
+            if limit is not None:
+                rows = rows[:limit]
+
+            fields = list(columns or self.fields)
+            result = pd.DataFrame(values[np.ix_(rows, [self._column(f) for f in fields])],
+                                  index=pd.Index([self._tickers[i] for i in rows], name='Ticker'),
+                                  columns=fields)
+            result.insert(0, 'Last_Date', self._timestamps[rows])
+        return result
+
+    def _column(self, field):
+        if field not in self._field_pos:
+            raise KeyError(f"Unknown screener field: {field!r}")
+        return self._field_pos[field]
+
+    def _latest_values(self, ticker, buffer, recompute=False):
+        # Latest value of every field, computing indicators missing from the window
+        values = {}
+        if 'Close' in buffer.columns:
+            values['Close'] = buffer['Close'].iloc[-1]
+            values['Daily_Return'] = (buffer['Close'].iloc[-1] / buffer['Close'].iloc[-2] - 1
+                                      if len(buffer) > 1 else np.nan)
+            values['Cumulative_Return'] = buffer['Close'].iloc[-1] / self._first_close[ticker] - 1
+        if 'Volume' in buffer.columns:
+            values['Volume'] = buffer['Volume'].iloc[-1]
+
+        wanted = [field for field in self.fields if field not in values]
+        stored = [] if recompute else [field for field in wanted if field in buffer.columns]
+        for field in stored:
+            values[field] = buffer[field].iloc[-1]
+
+        missing = [field for field in wanted if field not in stored]
+        if missing:
+            base = buffer.drop(columns=[col for col in buffer.columns if col in missing or col == 'Daily_Return'])
+            base = base.astype({col: 'float64' for col in base.columns})
+            base['Daily_Return'] = base['Close'].pct_change()
+            try:
+                computed = evaluate_indicators(base, missing)
+            except KeyError as e:
+                logger.error(f"Error computing screener fields for {ticker}: {str(e)}")
+                computed = {}
+            for field, series in computed.items():
+                values[field] = series.iloc[-1]
+        return values
+
+    def _set_row(self, ticker, buffer, values):
+        with self._lock:
+            row = self._rows.get(ticker)
+            if row is None:
+                row = len(self._tickers)
+                if row == len(self._values):
+                    self._grow()
+                self._tickers.append(ticker)
+                self._rows[ticker] = row
+
+            self._values[row] = [float(values.get(field, np.nan)) for field in self.fields]
+            last = pd.Timestamp(buffer.index[-1])
+            self._timestamps[row] = np.datetime64(last.tz_localize(None) if last.tz is not None else last, 'ns')
+            self._buffers[ticker] = buffer
+
+    def _grow(self):
+        # Double the row capacity (amortized O(1) inserts)
+        capacity = len(self._values) * 2
+        values = np.full((capacity, len(self.fields)), np.nan)
+        values[:len(self._values)] = self._values
+        timestamps = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        timestamps[:len(self._timestamps)] = self._timestamps
+        self._values, self._timestamps = values, timestamps
@@ -0,0 +1,471 @@
+"""
+Streaming tick-to-bar aggregation for real-time intraday bars.
+
+Trade (or quote) ticks arrive in batches from a pluggable source and are
+rolled up into OHLCV bars for several intervals at once (1m/5m/15m/1h by
+default). Each batch is processed with a handful of vectorized passes: one
+sort by (symbol, time), then per interval a bucket id per tick, group
+boundaries and `reduceat` reductions. Python-level work is per *bar*, not
+per tick.
+
+Bars are finalized by an event-time watermark: the latest tick time seen
+minus a grace window. A bar stays open (and absorbs late or out-of-order
+ticks) until the watermark passes its end; ticks for a bar that was already
+emitted are counted as late and dropped. Finished bars go to sinks, by
+default one `LivePipeline` per interval (quality check, snapshot index /
+incremental indicators, store, alerts).
+
+Sources are iterables of `TickBatch`:
+    * `FileTickSource` replays a CSV or Parquet tick file
+    * `SocketTickSource` reads 'symbol,timestamp_ns,price,size' lines from TCP
+
+Example:
+    aggregator = TickAggregator(["1m", "5m"], sinks=[live_sink(["1m", "5m"], store_root="data/store")])
+    aggregator.run(FileTickSource("ticks.parquet"))
+"""
+import io
+import logging
+import os
+import socket
+
+import numpy as np
+import pandas as pd
+from app.utils.config import TICK_BATCH_SIZE, TICK_GRACE_SECONDS, TICK_INTERVALS
+from app.components.replay import LivePipeline, bar_seconds
+
+logger = logging.getLogger(__name__)
+
+TICK_COLUMNS = ['Symbol', 'Timestamp', 'Price', 'Size']
+BAR_COLUMNS = ['Ticker', 'Open', 'High', 'Low', 'Close', 'Volume', 'Ticks']
+
+# Columns of the per-bar state matrices
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _COUNT = range(6)
+_BUCKET, _FIRST, _LAST = range(3)
+
+
+class TickBatch:
+    """
+    A batch of ticks in columnar form.
+
+    Args:
+        codes (np.ndarray): Symbol code per tick (index into `names`)
+        names (list): Ticker for each code
+        timestamps (np.ndarray): Tick times, int64 nanoseconds since the epoch (UTC)
+        prices (np.ndarray): Trade price (or quote mid) per tick
+        sizes (np.ndarray): Traded size per tick (0 for quotes)
+    """
+
+    def __init__(self, codes, names, timestamps, prices, sizes=None):
+        self.codes = np.asarray(codes)
+        self.names = list(names)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.sizes = (np.zeros(len(self.prices)) if sizes is None
+                      else np.nan_to_num(np.asarray(sizes, dtype=np.float64)))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Build a batch from a frame with Symbol, Timestamp, Price and (optional) Size.
+
+        Timestamps may be datetimes (naive ones are taken as UTC) or integer
+        nanoseconds since the epoch.
+
+        Args:
+            frame (pd.DataFrame): Ticks
+
+        Returns:
+            TickBatch: The batch
+        """
+        codes, names = pd.factorize(frame['Symbol'])
+        stamps = frame['Timestamp']
+        if pd.api.types.is_integer_dtype(stamps):
+            timestamps = stamps.to_numpy(dtype=np.int64)
+        else:
+            timestamps = pd.DatetimeIndex(pd.to_datetime(stamps, utc=True)).as_unit('ns').asi8
+        sizes = frame['Size'].to_numpy() if 'Size' in frame.columns else None
+        return cls(codes, names, timestamps, frame['Price'].to_numpy(), sizes)
+
+
+class FileTickSource:
+    """
+    Replays ticks stored in a CSV or Parquet file, in batches.
+
+    Args:
+        path (str): Tick file with TICK_COLUMNS
+        batch_size (int): Ticks per batch
+    """
+
+    def __init__(self, path, batch_size=TICK_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+
+    def __iter__(self):
+        if self.path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for record_batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.batch_size):
+                yield TickBatch.from_frame(record_batch.to_pandas())
+        else:
+            for chunk in pd.read_csv(self.path, chunksize=self.batch_size):
+                yield TickBatch.from_frame(chunk)
+
+
+class SocketTickSource:
+    """
+    Reads ticks from a TCP feed of 'symbol,timestamp_ns,price,size' lines.
+
+    Lines are parsed in bulk with the C CSV parser, one receive buffer at a
+    time; the stream ends when the sender closes the connection.
+
+    Args:
+        host (str): Feed host
+        port (int): Feed port
+        chunk_bytes (int): Receive buffer size (about 30 bytes per tick)
+        timeout (float): Socket timeout in seconds
+    """
+
+    def __init__(self, host, port, chunk_bytes=TICK_BATCH_SIZE * 32, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.chunk_bytes = chunk_bytes
+        self.timeout = timeout
+
+    def __iter__(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            pending = b''
+            while True:
+                data = conn.recv(self.chunk_bytes)
+                if not data:
+                    break
+                pending += data
+                cut = pending.rfind(b'\n') + 1
+                if cut == 0:
+                    continue
+                yield self._parse(pending[:cut])
+                pending = pending[cut:]
+            if pending.strip():
+                yield self._parse(pending)
+
+    @staticmethod
+    def _parse(payload):
+        frame = pd.read_csv(io.BytesIO(payload), names=TICK_COLUMNS, header=None,
+                            dtype={'Timestamp': np.int64, 'Price': np.float64, 'Size': np.float64})
+        return TickBatch.from_frame(frame)
+
+
+class _OpenBars:
+    """Open bars of one interval: a dense slot table plus a (symbol, bucket) -> slot map."""
+
+    def __init__(self, width, capacity=256):
+        self.width = width
+        self.values = np.zeros((capacity, 6))
+        self.times = np.zeros((capacity, 3), dtype=np.int64)
+        self.symbols = np.zeros(capacity, dtype=np.int64)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.slots = {}
+        self.free = []
+        self.top = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _allocate(self, count):
+        reused = [self.free.pop() for _ in range(min(count, len(self.free)))]
+        fresh = count - len(reused)
+        if self.top + fresh > len(self.used):
+            self._grow(self.top + fresh)
+        slots = np.array(reused + list(range(self.top, self.top + fresh)), dtype=np.int64)
+        self.top += fresh
+        return slots
+
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self.used))
+        for name in ('values', 'times', 'symbols', 'used'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def merge(self, symbols, buckets, values, times):
+        # Fold per-batch partial bars (one per symbol/bucket) into the open bars
+        keys = list(zip(symbols.tolist(), buckets.tolist()))
+        slots = np.fromiter((self.slots.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+        new = slots < 0
+        if new.any():
+            fresh = self._allocate(int(new.sum()))
+            slots[new] = fresh
+            for key, slot in zip((key for key, flag in zip(keys, new) if flag), fresh.tolist()):
+                self.slots[key] = slot
+            self.values[fresh] = values[new]
+            self.times[fresh] = times[new]
+            self.symbols[fresh] = symbols[new]
+            self.used[fresh] = True
+
+        old = ~new
+        if old.any():
+            rows, part, part_times = slots[old], values[old], times[old]
+            state, state_times = self.values[rows], self.times[rows]
+            earlier = part_times[:, _FIRST] < state_times[:, _FIRST]
+            later = part_times[:, _LAST] >= state_times[:, _LAST]
+            state[earlier, _OPEN] = part[earlier, _OPEN]
+            state_times[earlier, _FIRST] = part_times[earlier, _FIRST]
+            state[later, _CLOSE] = part[later, _CLOSE]
+            state_times[later, _LAST] = part_times[later, _LAST]
+            state[:, _HIGH] = np.maximum(state[:, _HIGH], part[:, _HIGH])
+            state[:, _LOW] = np.minimum(state[:, _LOW], part[:, _LOW])
+            state[:, _VOLUME] += part[:, _VOLUME]
+            state[:, _COUNT] += part[:, _COUNT]
+            self.values[rows] = state
+            self.times[rows] = state_times
+
+    def pop_closed(self, watermark):
+        # Bars whose end is at or before the watermark, sorted by symbol and time
+        top = self.top
+        ends = (self.times[:top, _BUCKET] + 1) * self.width
+        rows = np.flatnonzero(self.used[:top] & (ends <= watermark))
+        if len(rows) == 0:
+            return None
+        rows = rows[np.lexsort((self.times[rows, _BUCKET], self.symbols[rows]))]
+        symbols, buckets = self.symbols[rows], self.times[rows, _BUCKET]
+        values = self.values[rows]
+        for key in zip(symbols.tolist(), buckets.tolist()):
+            del self.slots[key]
+        self.used[rows] = False
+        self.free.extend(rows.tolist())
+        return symbols, buckets, values
+
+
+class TickAggregator:
+    """
+    Builds OHLCV bars for several intervals from a stream of tick batches.
+
+    Bars are aligned to the epoch (UTC) and timestamped with their start.
+    Open, high, low and close follow tick time, not arrival order, so
+    out-of-order ticks within the grace window produce the same bars as a
+    sorted stream.
+
+    Args:
+        intervals (list): Bar intervals ('1m', '5m', '15m', '1h', ...)
+        grace (float): Seconds a bar stays open after its end for late ticks
+        sinks (list): Callables `sink(interval, bars)` receiving finished bars
+            (a frame indexed by bar start with BAR_COLUMNS)
+    """
+
+    def __init__(self, intervals=TICK_INTERVALS, grace=TICK_GRACE_SECONDS, sinks=None):
+        self.intervals = list(intervals)
+        self.widths = [bar_seconds(interval) * 10 ** 9 for interval in self.intervals]
+        self.grace = int(grace * 10 ** 9)
+        self.sinks = list(sinks or [])
+        self.watermark = np.iinfo(np.int64).min
+        self._open = [_OpenBars(width) for width in self.widths]
+        self._symbol_ids = {}
+        self._symbols = []
+        self.ticks = 0
+        self.late = {interval: 0 for interval in self.intervals}
+        self.bars = {interval: 0 for interval in self.intervals}
+
+    @property
+    def open_bars(self):
+        """Bars currently open, per interval."""
+        return {interval: len(state) for interval, state in zip(self.intervals, self._open)}
+
+    def process(self, batch):
+        """
+        Aggregate one batch of ticks and emit the bars it closes.
+
+        Args:
+            batch (TickBatch): Ticks (any order)
+
+        Returns:
+            dict: interval -> finished bars (only intervals that closed bars)
+        """
+        if len(batch) == 0:
+            return {}
+        ids = np.array([self._symbol_id(name) for name in batch.names], dtype=np.int64)
+        symbols = ids[batch.codes]
+        timestamps = batch.timestamps
+
+        # One stable sort by (symbol, time) serves every interval: within a
+        # symbol, bucket ids are then non-decreasing for any bar width
+        if len(timestamps) < 2 or (np.diff(timestamps) >= 0).all():
+            sort_key = symbols.astype(np.uint16) if len(self._symbols) <= 2 ** 16 else symbols
+            order = np.argsort(sort_key, kind='stable')
+        else:
+            order = np.lexsort((timestamps, symbols))
+        symbols, timestamps = symbols[order], timestamps[order]
+        prices, sizes = batch.prices[order], batch.sizes[order]
+        symbol_change = symbols[1:] != symbols[:-1]
+
+        for interval, width, state in zip(self.intervals, self.widths, self._open):
+            buckets = timestamps // width
+            keep = None
+            if self.watermark > np.iinfo(np.int64).min:
+                keep = (buckets + 1) * width > self.watermark
+                late = len(keep) - int(keep.sum())
+                if late:
+                    self.late[interval] += late
+                else:
+                    keep = None
+            if keep is None:
+                self._aggregate(state, symbols, buckets, timestamps, prices, sizes, symbol_change)
+            else:
+                kept_symbols = symbols[keep]
+                self._aggregate(state, kept_symbols, buckets[keep], timestamps[keep], prices[keep],
+                                sizes[keep], kept_symbols[1:] != kept_symbols[:-1])
+
+        self.ticks += len(timestamps)
+        self.watermark = max(self.watermark, int(timestamps.max()) - self.grace)
+        return self._emit(self.watermark)
+
+    def flush(self):
+        """
+        Close every open bar (end of stream) and flush sinks that buffer them.
+
+        Returns:
+            dict: interval -> finished bars
+        """
+        finished = self._emit(np.iinfo(np.int64).max)
+        for sink in self.sinks:
+            flush = getattr(sink, 'flush', None)
+            if flush is None:
+                continue
+            try:
+                flush()
+            except Exception as e:
+                logger.error(f"Bar sink flush failed: {str(e)}")
+        return finished
+
+    def run(self, source):
+        """
+        Consume a tick source to the end, then flush.
+
+        Args:
+            source (iterable): TickBatch iterable (e.g. FileTickSource)
+
+        Returns:
+            dict: Ticks, Late (per interval), Bars (per interval)
+        """
+        for batch in source:
+            self.process(batch)
+        self.flush()
+        logger.info(f"Aggregated {self.ticks} ticks into {sum(self.bars.values())} bars "
+                    f"({sum(self.late.values())} late ticks dropped)")
+        return {'Ticks': self.ticks, 'Late': dict(self.late), 'Bars': dict(self.bars)}
+
+    def _symbol_id(self, name):
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[name] = len(self._symbols)
+            self._symbols.append(name)
+        return symbol_id
+
+    @staticmethod
+    def _aggregate(state, symbols, buckets, timestamps, prices, sizes, symbol_change):
+        if len(symbols) == 0:
+            return
+        starts = np.flatnonzero(np.concatenate(([True], symbol_change | (buckets[1:] != buckets[:-1]))))
+        ends = np.append(starts[1:], len(symbols)) - 1
+        values = np.empty((len(starts), 6))
+        values[:, _OPEN] = prices[starts]
+        values[:, _HIGH] = np.maximum.reduceat(prices, starts)
+        values[:, _LOW] = np.minimum.reduceat(prices, starts)
+        values[:, _CLOSE] = prices[ends]
+        values[:, _VOLUME] = np.add.reduceat(sizes, starts)
+        values[:, _COUNT] = ends - starts + 1
+        times = np.empty((len(starts), 3), dtype=np.int64)
+        times[:, _BUCKET] = buckets[starts]
+        times[:, _FIRST] = timestamps[starts]
+        times[:, _LAST] = timestamps[ends]
+        state.merge(symbols[starts], buckets[starts], values, times)
+
+    def _emit(self, watermark):
+        finished = {}
+        for interval, state in zip(self.intervals, self._open):
+            closed = state.pop_closed(watermark)
+            if closed is None:
+                continue
+            symbols, buckets, values = closed
+            index = pd.DatetimeIndex(pd.to_datetime(buckets * state.width, unit='ns', utc=True), name='Datetime')
+            bars = pd.DataFrame(values[:, :_COUNT], index=index,
+                                columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+            bars.insert(0, 'Ticker', np.array(self._symbols, dtype=object)[symbols])
+            bars['Ticks'] = values[:, _COUNT].astype(np.int64)
+            self.bars[interval] += len(bars)
+            finished[interval] = bars
+            for sink in self.sinks:
+                try:
+                    sink(interval, bars)
+                except Exception as e:
+                    logger.error(f"Bar sink failed for {interval} bars: {str(e)}")
+        return finished
+
+
+def pipeline_sink(pipelines):
+    """
+    Sink routing finished bars to one `LivePipeline` per interval.
+
+    Args:
+        pipelines (dict): interval -> LivePipeline (other intervals are ignored)
+
+    Returns:
+        callable: `sink(interval, bars)` for `TickAggregator`, with a `flush()`
+            that persists the bars the pipelines still buffer
+    """
+    def sink(interval, bars):
+        pipeline = pipelines.get(interval)
+        if pipeline is None:
+            return
+        for ticker, frame in bars.groupby('Ticker', sort=False):
+            pipeline.on_bars(ticker, frame.drop(columns=['Ticker', 'Ticks']))
+
+    def flush():
+        for pipeline in pipelines.values():
+            pipeline.flush()
+
+    sink.flush = flush
+    return sink
+
+
+def live_sink(intervals=TICK_INTERVALS, store_root=None, alerts=True):
+    """
+    Sink feeding the real-time path for each interval: quality check,
+    snapshot index (incremental indicators), store and alerts. Stored bars
+    are written in batches (see `LivePipeline`); `TickAggregator.flush`
+    writes the remainder at the end of a stream.
+
+    Args:
+        intervals (list): Intervals to forward
+        store_root (str): Persist bars under this store root (None: skip)
+        alerts (bool): Evaluate alerts on every bar
+
+    Returns:
+        callable: Sink with a `pipelines` attribute (interval -> LivePipeline)
+    """
+    pipelines = {interval: LivePipeline(interval=interval, store_root=store_root, alerts=alerts)
+                 for interval in intervals}
+    sink = pipeline_sink(pipelines)
+    sink.pipelines = pipelines
+    return sink
+
+
+def write_tick_file(path, ticks):
+    """
+    Save ticks for `FileTickSource` replay.
+
+    Args:
+        path (str): Target .parquet or .csv file
+        ticks (pd.DataFrame): Frame with TICK_COLUMNS
+
+    Returns:
+        str: Path written
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith('.parquet'):
+        ticks[TICK_COLUMNS].to_parquet(path, index=False)
+    else:
+        ticks[TICK_COLUMNS].to_csv(path, index=False)
+    return path
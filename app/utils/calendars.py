@@ -0,0 +1,265 @@
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, EasterMonday, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr,
+    USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+from .config import ALIGNED_PANEL_CACHE_SIZE, EXCHANGE_EXTRA_HOLIDAYS, KENYA_TICKERS, TICKERS
+from .memo import fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class NYSECalendar(AbstractHolidayCalendar):
+    """NYSE full-day holidays (rule based)."""
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+class NSECalendar(AbstractHolidayCalendar):
+    """
+    Nairobi Securities Exchange public holidays (rule based).
+
+    Eid al-Fitr and ad-hoc gazetted holidays move every year; list them in
+    `EXCHANGE_EXTRA_HOLIDAYS['NSE']`.
+    """
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        GoodFriday,
+        EasterMonday,
+        Holiday('Labour Day', month=5, day=1, observance=sunday_to_monday),
+        Holiday('Madaraka Day', month=6, day=1, observance=sunday_to_monday),
+        Holiday('Mashujaa Day', month=10, day=20, observance=sunday_to_monday),
+        Holiday('Jamhuri Day', month=12, day=12, observance=sunday_to_monday),
+        Holiday('Christmas', month=12, day=25, observance=sunday_to_monday),
+        Holiday('Boxing Day', month=12, day=26, observance=sunday_to_monday)
+    ]
+
+
+EXCHANGE_CALENDARS = {
+    'NYSE': NYSECalendar,
+    'NSE': NSECalendar
+}
+
+_panel_cache = OrderedDict()
+_panel_lock = threading.Lock()
+
+
+def exchange_for(name):
+    """
+    Exchange a ticker (or its friendly name from config) trades on.
+
+    Args:
+        name (str): Ticker symbol or friendly name (e.g. 'Safaricom', 'SCOM.NR')
+
+    Returns:
+        str: Exchange code ('NSE' or 'NYSE')
+    """
+    symbol = TICKERS.get(name, name)
+    if name in KENYA_TICKERS or symbol in KENYA_TICKERS.values():
+        return 'NSE'
+    if symbol.endswith('.NR') or symbol.startswith('^NSE'):
+        return 'NSE'
+    return 'NYSE'
+
+
+@lru_cache(maxsize=64)
+def _trading_days(exchange, start, end, extra_holidays):
+    # extra_holidays is part of the key so edits to EXCHANGE_EXTRA_HOLIDAYS
+    # are not served from a stale entry
+    calendar = EXCHANGE_CALENDARS[exchange]()
+    holidays = list(calendar.holidays(start, end)) + [pd.Timestamp(day) for day in extra_holidays]
+    return pd.date_range(start, end, freq=CustomBusinessDay(holidays=holidays))
+
+
+def trading_days(exchange, start, end):
+    """
+    Trading sessions of an exchange between two dates (inclusive).
+
+    Args:
+        exchange (str): Exchange code ('NSE', 'NYSE')
+        start (datetime-like): First date
+        end (datetime-like): Last date
+
+    Returns:
+        pd.DatetimeIndex: Session dates
+    """
+    return _trading_days(exchange, pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(),
+                         tuple(EXCHANGE_EXTRA_HOLIDAYS.get(exchange, ())))
+
+
+def build_date_index(exchanges, start, end, how='union'):
+    """
+    Union or intersection of several exchanges' trading days.
+
+    Args:
+        exchanges (iterable): Exchange codes
+        start (datetime-like): First date
+        end (datetime-like): Last date
+        how (str): 'union' (any market open) or 'intersection' (all open)
+
+    Returns:
+        pd.DatetimeIndex: Combined session dates
+    """
+    indexes = [trading_days(exchange, start, end) for exchange in sorted(set(exchanges))]
+    combined = indexes[0]
+    for index in indexes[1:]:
+        combined = combined.union(index) if how == 'union' else combined.intersection(index)
+    return combined
+
+
+def _to_dates(index):
+    # Session dates for daily bars regardless of timezone
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def _is_daily(index):
+    # Median bar spacing of about a day; weekends and holidays only stretch
+    # a minority of gaps, and illiquid tickers may skip a session or two.
+    # (Computed as a Timedelta: asi8 is in the index's own unit.)
+    if len(index) < 2:
+        return True
+    spacing = pd.Series(pd.DatetimeIndex(index)).diff().median()
+    return pd.Timedelta(hours=20) <= spacing <= pd.Timedelta(days=4)
+
+
+def series_version(series):
+    """
+    Version key for a series: a content hash of its index and values.
+
+    Args:
+        series (pd.Series): Time-indexed series
+
+    Returns:
+        str: Key that changes when bars are added, removed or revised anywhere
+    """
+    return fingerprint(series.index, series.to_numpy())
+
+
+def align_panel(data_dict, column='Close', how='union', fill='ffill', limit=None):
+    """
+    Align one column of several tickers on a shared trading-day index.
+
+    Daily series are placed on the union (or intersection) of their
+    exchanges' trading calendars with a vectorized as-of join, so a Nairobi
+    holiday no longer discards a US session (and vice versa). Non-daily
+    series are aligned on the union/intersection of their own timestamps.
+    Results are cached per universe and data version.
+
+    Args:
+        data_dict (dict): name -> DataFrame (or Series)
+        column (str): Column to align (ignored for Series values)
+        how (str): 'union' or 'intersection'
+        fill (str): 'ffill' (carry last value, as-of join), 'zero', or 'none'
+        limit (int): Maximum consecutive rows to forward fill
+
+    Returns:
+        pd.DataFrame: Aligned wide panel (dates x names), trimmed to the
+            first row where every series has started
+    """
+    series_map = {}
+    for name, data in data_dict.items():
+        if data is None or len(data) == 0:
+            continue
+        series = data if isinstance(data, pd.Series) else data[column]
+        series_map[name] = series.dropna()
+
+    if not series_map:
+        return pd.DataFrame()
+
+    key = (tuple((name, series_version(s)) for name, s in sorted(series_map.items())), column, how, fill, limit)
+    with _panel_lock:
+        if key in _panel_cache:
+            _panel_cache.move_to_end(key)
+            return _panel_cache[key].copy()
+
+    daily = all(_is_daily(s.index) for s in series_map.values())
+    if daily:
+        series_map = {name: s.set_axis(_to_dates(s.index)) for name, s in series_map.items()}
+        series_map = {name: s[~s.index.duplicated(keep='last')] for name, s in series_map.items()}
+
+    observed = [s.index for s in series_map.values()]
+    if daily:
+        start = min(index[0] for index in observed)
+        end = max(index[-1] for index in observed)
+        exchanges = [exchange_for(name) for name in series_map]
+        target = build_date_index(exchanges, start, end, how)
+        if how == 'union':
+            # Keep sessions the rule-based calendars do not know about
+            for index in observed:
+                target = target.union(index)
+    else:
+        target = observed[0]
+        for index in observed[1:]:
+            target = target.union(index) if how == 'union' else target.intersection(index)
+
+    # Build all columns at once (inserting one by one fragments wide universes)
+    if fill == 'ffill':
+        columns = {name: series.reindex(target, method='ffill', limit=limit) for name, series in series_map.items()}
+    else:
+        columns = {name: series.reindex(target) for name, series in series_map.items()}
+    panel = pd.DataFrame(columns, index=target)
+    if fill == 'zero':
+        panel = panel.fillna(0.0)
+
+    # Start where every series has data
+    started = panel.notna().all(axis=1) if fill != 'zero' else pd.Series(True, index=panel.index)
+    if started.any():
+        panel = panel.loc[started.idxmax():]
+    else:
+        panel = panel.iloc[0:0]
+
+    with _panel_lock:
+        _panel_cache[key] = panel
+        while len(_panel_cache) > ALIGNED_PANEL_CACHE_SIZE:
+            _panel_cache.popitem(last=False)
+    return panel.copy()
+
+
+def align_returns(data_dict, how='union'):
+    """
+    Daily returns of several tickers on a shared calendar.
+
+    Each ticker's return is taken over its own sessions (close against its
+    previous close) and placed on the aligned calendar. Rows where a market
+    was closed are NaN for that ticker, not a 0% day, so volatility and
+    correlation are not biased towards zero; the move across the holiday is
+    booked on the ticker's next session.
+
+    Args:
+        data_dict (dict): name -> DataFrame with a 'Close' column
+        how (str): 'union' or 'intersection'
+
+    Returns:
+        pd.DataFrame: Aligned returns (dates x names)
+    """
+    prices = align_panel(data_dict, column='Close', how=how, fill='none')
+    if prices.empty:
+        return prices
+    returns = prices.ffill().pct_change().where(prices.notna())
+    return returns.iloc[1:].dropna(how='all')
+
+
+def clear_alignment_cache():
+    """Drop all cached aligned panels."""
+    with _panel_lock:
+        _panel_cache.clear()
@@ -0,0 +1,152 @@
+"""
+Memory-compact storage for OHLCV + indicator frames.
+
+Accuracy tolerance
+------------------
+Prices, returns and indicators are computed in float64 and only then cast
+to float32, so every stored value is the float64 result rounded to a 24-bit
+mantissa: relative error <= 2**-24 (~6e-8) per value. `COMPACT_RTOL` (1e-6)
+is the documented tolerance callers can rely on when comparing compact and
+full-precision frames.
+
+Indicators recomputed lazily from a compact frame are evaluated in float64
+on the float32 prices, so input rounding propagates. Price-scale indicators
+(moving averages, Bollinger bands, ATR) stay within `COMPACT_RTOL`;
+return-based values (volatility, MACD, BB_Percent) within an absolute error
+of `COMPACT_ATOL`; the 0-100 oscillators (RSI, Stochastic %K/%D) within
+`COMPACT_OSCILLATOR_ATOL`, since they divide small price differences.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .config import COMPACT_ATOL, COMPACT_OSCILLATOR_ATOL, COMPACT_PRICE_DTYPE, COMPACT_RTOL
+from .lazy_indicators import LazyIndicatorFrame
+
+logger = logging.getLogger(__name__)
+
+BASE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Daily_Return', 'Cumulative_Return']
+OSCILLATOR_COLUMNS = ['RSI', 'Stochastic_K', 'Stochastic_D']
+
+
+def downcast_volume(volume):
+    """
+    Store volume as the smallest integer type that holds it.
+
+    Falls back to float32 if the series has missing or fractional values.
+
+    Args:
+        volume (pd.Series): Volume series
+
+    Returns:
+        pd.Series: Downcast volume
+    """
+    values = volume.to_numpy()
+    if volume.isna().any() or not np.all(np.mod(values, 1) == 0):
+        return volume.astype(COMPACT_PRICE_DTYPE)
+
+    if len(values) and values.min() < 0:
+        return pd.to_numeric(volume.astype(np.int64), downcast='integer')
+    return pd.to_numeric(volume.astype(np.int64), downcast='unsigned')
+
+
+def compact_frame(data, lazy_indicators=False, downcast=True):
+    """
+    Convert a stock DataFrame to its memory-compact representation.
+
+    Args:
+        data (pd.DataFrame): Stock data with OHLCV and optional indicators
+        lazy_indicators (bool): Drop indicator columns and recompute them on
+            demand with `with_indicators()` instead of storing them
+        downcast (bool): Cast floats to float32 and volume to a sized integer
+
+    Returns:
+        pd.DataFrame: Compact copy of the data
+    """
+    if data is None or data.empty:
+        return data
+
+    if lazy_indicators:
+        df = data[[col for col in data.columns if col in BASE_COLUMNS]].copy()
+        df.attrs['lazy_indicators'] = True
+    else:
+        df = data.copy()
+
+    if not downcast:
+        return df
+
+    for col in df.columns:
+        if col == 'Volume':
+            df[col] = downcast_volume(df[col])
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(COMPACT_PRICE_DTYPE)
+
+    df.attrs['compact'] = True
+    return df
+
+
+def with_indicators(data, columns=None):
+    """
+    Materialize indicators for a frame stored with `lazy_indicators=True`.
+
+    Only the requested indicators (and their shared intermediates) are
+    computed, in float64, and returned alongside the stored columns; the
+    stored frame itself is left untouched.
+
+    Args:
+        data (pd.DataFrame): Compact (or full) stock data
+        columns (list): Indicator columns to keep (default: all)
+
+    Returns:
+        pd.DataFrame: Data with the requested indicators
+    """
+    if data is None or data.empty or not data.attrs.get('lazy_indicators'):
+        return data
+
+    lazy = LazyIndicatorFrame(data.astype({col: np.float64 for col in data.columns}))
+    full = lazy.materialize(columns)
+
+    if data.attrs.get('compact'):
+        full = compact_frame(full)
+    full.attrs.pop('lazy_indicators', None)
+    return full
+
+
+def memory_usage_mb(data):
+    """
+    Deep memory usage of a frame in megabytes.
+
+    Args:
+        data (pd.DataFrame): Any DataFrame
+
+    Returns:
+        float: Memory usage in MB
+    """
+    if data is None:
+        return 0.0
+    return data.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def frames_match(compact, full, rtol=COMPACT_RTOL, atol=COMPACT_ATOL):
+    """
+    Check that a compact frame agrees with its full-precision source.
+
+    Args:
+        compact (pd.DataFrame): Compact frame
+        full (pd.DataFrame): Full-precision frame
+        rtol (float): Relative tolerance
+        atol (float): Absolute tolerance (oscillators use `COMPACT_OSCILLATOR_ATOL`)
+
+    Returns:
+        bool: True if every shared numeric column is within tolerance
+    """
+    for col in compact.columns:
+        if col not in full.columns:
+            continue
+        col_atol = max(atol, COMPACT_OSCILLATOR_ATOL) if col in OSCILLATOR_COLUMNS else atol
+        if not np.allclose(compact[col].to_numpy(np.float64), full[col].to_numpy(np.float64),
+                           rtol=rtol, atol=col_atol, equal_nan=True):
+            logger.warning(f"Compact column {col} exceeds tolerance")
+            return False
+    return True
@@ -19,6 +19,66 @@ TRADING_DAYS_PER_YEAR = 252
 DEFAULT_PERIOD = "1y"
 DEFAULT_INTERVAL = "1d"
 
+# Serve shorter periods / coarser intervals by slicing and resampling a cached
+# daily series instead of re-downloading (a miss fetches only the requested
+# period; longer requests widen the cached series)
+DERIVE_FROM_CACHE = True
+# Base series kept in memory for derivation (least recently used evicted)
+SERIES_CACHE_SIZE = 128
+
+# Background prefetch of series needed further down the page (watchlist,
+# comparison and benchmark tickers) while the first panels render
+PREFETCH_WORKERS = 4
+
+# Local bar store (a directory of Parquet partitions per ticker/interval)
+STORE_DIR = "data/store"
+
+# Provider limits for intraday intervals: max span of one request and how far
+# back the provider serves data at all (days)
+INTRADAY_LIMITS = {
+    "1m": {"window_days": 7, "lookback_days": 30},
+    "2m": {"window_days": 60, "lookback_days": 60},
+    "5m": {"window_days": 60, "lookback_days": 60},
+    "15m": {"window_days": 60, "lookback_days": 60},
+    "30m": {"window_days": 60, "lookback_days": 60},
+    "60m": {"window_days": 730, "lookback_days": 730},
+    "90m": {"window_days": 60, "lookback_days": 60},
+    "1h": {"window_days": 730, "lookback_days": 730}
+}
+
+# Parallel requests when fetching a long range in provider-legal chunks
+CHUNK_FETCH_WORKERS = 4
+
+# Per-provider request rate limits (token bucket: sustained requests/second
+# and burst size); concurrent identical requests share one fetch
+PROVIDER_RATE_LIMITS = {
+    "yahoo": {"rate": 2.0, "burst": 8},
+    "http": {"rate": 5.0, "burst": 10},
+    "nse": {"rate": 1.0, "burst": 2}
+}
+
+# Shared HTTP session for requests-based calls
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 2
+HTTP_TIMEOUT = 10
+HTTP_USER_AGENT = "Mozilla/5.0 (market-dashboard)"
+
+# Analytics HTTP API (app/api.py): bind address, encoded responses kept in
+# memory, and tickers allowed in one portfolio/correlation request
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+API_CACHE_SIZE = 256
+API_MAX_TICKERS = 50
+
+# Memoized analytics (app/utils/memo.py): results of the summary, portfolio,
+# correlation, signal and indicator functions keyed by the content of their
+# inputs, in a byte-bounded LRU; set MEMO_DISK_DIR (e.g. "data/memo") to also
+# keep them on disk, shared between worker processes and restarts
+MEMO_ENABLED = True
+MEMO_MAX_BYTES = 64 * 2 ** 20
+MEMO_DISK_DIR = None
+MEMO_DISK_MAX_BYTES = 512 * 2 ** 20
+
 # Technical indicator parameters
 INDICATOR_PARAMS = {
     "RSI_PERIOD": 14,
@@ -35,6 +95,19 @@ INDICATOR_PARAMS = {
     "VOLATILITY_LONG": 50
 }
 
+# Indicators the dashboard actually displays / alerts on (others are computed lazily)
+DASHBOARD_INDICATORS = ["MA_20", "MA_50", "MA_200", "BB_Upper", "BB_Lower"]
+
+# Memory-compact frames (see app/utils/compact.py for the accuracy tolerance)
+COMPACT_MODE = False
+COMPACT_PRICE_DTYPE = "float32"
+COMPACT_RTOL = 1e-6
+COMPACT_ATOL = 1e-5
+COMPACT_OSCILLATOR_ATOL = 1e-3
+
+# RSI/ATR smoothing: "simple" (rolling mean) or "wilder" (Wilder's smoothing, compiled kernels)
+INDICATOR_SMOOTHING = "simple"
+
 KENYA_TICKERS = {
     "EABL": "EABL",
     "KCB": "KCB",
@@ -43,6 +116,128 @@ KENYA_TICKERS = {
     "NSE 20 Index": "NSE20"
 }
 
+# NSE daily price-list ingestion: archived pages, per-ticker CSVs read by
+# get_local_kenyan_data, and process pool sizing (small batches run in-process)
+NSE_ARCHIVE_DIR = "data/raw/nse"
+NSE_PROCESSED_DIR = "data/processed/Kenya"
+NSE_INGEST_WORKERS = 4
+NSE_INGEST_PARALLEL_MIN_FILES = 50
+
+# Corporate actions (splits, bonus issues, dividends) per ticker, and how local
+# Kenyan bars are adjusted: "total" (splits + dividends, total-return series),
+# "split" (share events only) or None (raw prices)
+CORPORATE_ACTIONS_DIR = "data/corporate_actions"
+CORPORATE_ACTIONS_MODE = "total"
+CORPORATE_ACTIONS_CACHE_SIZE = 64
+
+
+# Trading calendars: holidays the rule-based calendars cannot derive
+# (moving religious holidays, one-off closures)
+EXCHANGE_EXTRA_HOLIDAYS = {
+    "NSE": ["2023-04-21", "2024-04-10", "2025-03-31"],  # Eid al-Fitr
+    "NYSE": ["2025-01-09"]  # National Day of Mourning
+}
+
+# Quote currency per exchange, with per-ticker overrides
+EXCHANGE_CURRENCIES = {"NSE": "KES", "NYSE": "USD"}
+TICKER_CURRENCIES = {}
+
+# Display currencies offered by the dashboard and memoized converted universes
+DISPLAY_CURRENCIES = ["Native", "USD", "KES"]
+FX_CACHE_SIZE = 32
+
+# Sector per friendly name (symbols resolve through TICKERS); unknown
+# tickers fall into "Other"
+TICKER_SECTORS = {
+    "Kenya Market Index (NSE20)": "Index",
+    "NSE 20 Index": "Index",
+    "S&P 500": "Index",
+    "NASDAQ": "Index",
+    "Safaricom": "Telecommunication",
+    "Equity Group": "Banking",
+    "Equity Bank": "Banking",
+    "KCB": "Banking",
+    "EABL": "Manufacturing",
+    "Apple": "Technology",
+    "Microsoft": "Technology"
+}
+
+# Return distribution sketches (app/utils/sketches.py): t-digest compression
+# (higher keeps more centroids and is more accurate) and the calendar period
+# each ticker/sector digest covers
+SKETCH_COMPRESSION = 300
+SKETCH_BUCKET = "M"
+
+# Number of aligned cross-market panels kept in memory
+ALIGNED_PANEL_CACHE_SIZE = 32
+
+# Screener: trailing bars kept per ticker to refresh its snapshot row
+# (covers MA_200; EMA/MACD warm-up error is below 1e-8 at this length)
+SCREENER_TAIL_BARS = 260
+SCREENER_PERIOD = "1y"
+SCREENER_DEFAULT_FILTER = "RSI < 30 and Close > MA_200"
+
+# Portfolio optimizer: annual risk-free rate, default per-asset weight cap,
+# frontier resolution and cached covariance estimates
+RISK_FREE_RATE = 0.02
+OPTIMIZER_MAX_WEIGHT = 1.0
+FRONTIER_POINTS = 100
+COVARIANCE_CACHE_SIZE = 16
+
+# Factor exposures: benchmarks (friendly names from TICKERS) and rolling window (bars)
+FACTOR_BENCHMARKS = ["S&P 500", "Kenya Market Index (NSE20)", "NASDAQ"]
+FACTOR_WINDOW = 60
+
+# Pairs scan: correlation pruning threshold, ADF lags and significance,
+# process pool sizing (smaller scans run in-process) and cached scans.
+# Tickers with fewer than PAIRS_MIN_OBSERVATIONS bars (e.g. recent listings)
+# are left out so they don't cut the common history of every other pair.
+PAIRS_MIN_CORRELATION = 0.7
+PAIRS_MIN_OBSERVATIONS = 250
+PAIRS_ADF_LAGS = 1
+PAIRS_SIGNIFICANCE = "5%"
+PAIRS_WORKERS = 4
+PAIRS_CHUNK_SIZE = 2000
+PAIRS_PARALLEL_MIN_PAIRS = 5000
+PAIRS_CACHE_SIZE = 8
+
+# Data quality checks: a volume spike is QUALITY_VOLUME_SPIKE x the trailing
+# median volume; a split-like jump is a close-to-close ratio within
+# QUALITY_SPLIT_TOLERANCE of a common split ratio (or its inverse)
+QUALITY_VOLUME_SPIKE = 10.0
+QUALITY_VOLUME_WINDOW = 20
+QUALITY_SPLIT_RATIOS = [1.5, 2, 3, 4, 5, 10]
+QUALITY_SPLIT_TOLERANCE = 0.03
+QUALITY_CONTEXT_BARS = 20  # existing bars used as context when checking appends
+QUALITY_ENABLED = True
+
+# Repair per issue: 'drop' the bar, 'fill' missing fields, 'clip' High/Low to
+# the bar's range, or 'keep' (flag only)
+QUALITY_REPAIRS = {
+    "missing_fields": "fill",
+    "non_positive_price": "drop",
+    "high_low_inverted": "clip",
+    "stale_bar": "keep",
+    "volume_spike": "keep",
+    "split_jump": "keep"
+}
+
+# Historical replay load test (app/components/replay.py): default speed-up
+# over real time and consumer threads (each ticker stays on one thread)
+REPLAY_SPEEDUP = 1000
+REPLAY_WORKERS = 1
+# Live bars are persisted in batches: buffered bars are written once this many
+# are pending or the oldest has waited this many seconds
+LIVE_STORE_FLUSH_BARS = 500
+LIVE_STORE_FLUSH_SECONDS = 5.0
+
+# Streaming tick aggregation (app/components/ticks.py): bar intervals built
+# from ticks, seconds a bar stays open for late/out-of-order ticks, and ticks
+# per source batch
+TICK_INTERVALS = ["1m", "5m", "15m", "1h"]
+TICK_GRACE_SECONDS = 5
+TICK_BATCH_SIZE = 65536
+
 
 # Logging configuration
 LOG_LEVEL = "INFO"
@@ -56,6 +251,10 @@ PAGE_ICON = "📊"
 # Cache TTL (time-to-live) for streamlit cache
 CACHE_TTL = timedelta(hours=1)
 
+# Per-stage timing instrumentation (shown in the Developer Panel)
+PROFILING_ENABLED = True
+PROFILING_MAX_SAMPLES = 1000
+
 # UI Messages
 MESSAGES = {
     "loading": "Loading data...",
@@ -0,0 +1,426 @@
+"""
+Corporate-action adjustment of daily bars.
+
+Events are stored per ticker (one CSV per ticker under
+CORPORATE_ACTIONS_DIR) with these types:
+
+    split     Ratio new shares per old share (2 for a 2:1 split, 0.5 for 1:2)
+    bonus     Ratio share multiplier (1.1 for a 1-for-10 bonus issue)
+    dividend  Amount cash per share, paid to holders before the ex-date
+
+Prices before an event's ex-date are multiplied by the event's price factor
+(1 / Ratio for splits and bonus issues, 1 - Amount / previous close for
+dividends) and volumes by the share ratio. For each ticker the
+cumulative factors are precomputed as suffix products over its events, so
+adjusting any series is a `searchsorted` plus one vectorized multiply.
+A new event only rescales the bars (and cached adjusted frames) before its
+ex-date.
+
+Modes: 'split' adjusts for splits and bonus issues only (prices stay
+comparable with quotes); 'total' also folds dividends in, so returns
+computed from the adjusted close are total returns.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .config import CORPORATE_ACTIONS_CACHE_SIZE, CORPORATE_ACTIONS_DIR
+from .memo import fingerprint
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ('split', 'bonus', 'dividend')
+EVENT_COLUMNS = ['Date', 'Type', 'Ratio', 'Amount', 'Reference_Price']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+MODES = ('split', 'total')
+
+
+def _dates(index):
+    # Naive datetime64[ns] session dates of a daily index
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().to_numpy(dtype='datetime64[ns]')
+
+
+def _suffix_products(factors):
+    # cum[k] = prod(factors[k:]), with cum[len(factors)] = 1
+    cum = np.ones(len(factors) + 1)
+    if len(factors):
+        cum[:-1] = np.cumprod(factors[::-1])[::-1]
+    return cum
+
+
+def normalize_events(events):
+    """
+    Validate and normalize an event table.
+
+    Args:
+        events (pd.DataFrame or list): Rows with Date, Type and Ratio (splits,
+            bonus issues) or Amount (dividends); Reference_Price optional
+
+    Returns:
+        pd.DataFrame: Events with EVENT_COLUMNS, sorted by date
+    """
+    events = pd.DataFrame(events)
+    for col in EVENT_COLUMNS:
+        if col not in events.columns:
+            events[col] = np.nan
+    events = events[EVENT_COLUMNS].copy()
+    if events.empty:
+        return events.astype({'Date': 'datetime64[ns]', 'Type': object, 'Ratio': float, 'Amount': float,
+                              'Reference_Price': float})
+    events['Date'] = pd.DatetimeIndex(_dates(events['Date']))
+    events['Type'] = events['Type'].str.lower()
+    events[['Ratio', 'Amount', 'Reference_Price']] = events[['Ratio', 'Amount', 'Reference_Price']].astype(float)
+
+    unknown = ~events['Type'].isin(EVENT_TYPES)
+    if unknown.any():
+        raise ValueError(f"Unknown corporate action types: {sorted(events.loc[unknown, 'Type'].unique())}")
+    shares = events['Type'] != 'dividend'
+    if (shares & ~(events['Ratio'] > 0)).any():
+        raise ValueError("Splits and bonus issues need a positive Ratio")
+    if (~shares & ~(events['Amount'] >= 0)).any():
+        raise ValueError("Dividends need a non-negative Amount")
+    return events.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+class AdjustmentBook:
+    """
+    One ticker's events and their precomputed cumulative factors.
+
+    `price_cum[mode][k]` is the product of the price factors of events k and
+    later, so a bar with `k` events on or before its date is multiplied by
+    `price_cum[mode][k]`.
+    """
+
+    def __init__(self, events=None):
+        self.events = normalize_events(events if events is not None else [])
+        self._warned_unpriced = False
+        self._rebuild()
+
+    def __len__(self):
+        return len(self.events)
+
+    def _factors(self):
+        # Per-event price factor (both modes) and share factor
+        events = self.events
+        shares = (events['Type'] != 'dividend').to_numpy()
+        ratio = events['Ratio'].to_numpy()
+        dividend = 1 - events['Amount'].to_numpy() / events['Reference_Price'].to_numpy()
+        # Dividends not yet priced count as 1 until `resolve` sees the closes
+        dividend = np.where(np.isnan(dividend), 1.0, dividend)
+        split_factor = np.where(shares, 1 / np.where(shares, ratio, 1.0), 1.0)
+        total_factor = np.where(shares, split_factor, dividend)
+        volume_factor = np.where(shares, ratio, 1.0)
+        return split_factor, total_factor, volume_factor
+
+    def _rebuild(self):
+        self.dates = self.events['Date'].to_numpy(dtype='datetime64[ns]')
+        split_factor, total_factor, volume_factor = self._factors()
+        self.price_cum = {'split': _suffix_products(split_factor), 'total': _suffix_products(total_factor)}
+        self.volume_cum = _suffix_products(volume_factor)
+
+    @property
+    def unresolved(self):
+        """Dividends whose factor still needs the close before the ex-date."""
+        return (self.events['Type'] == 'dividend') & self.events['Reference_Price'].isna()
+
+    def resolve(self, close):
+        """
+        Fill missing dividend reference prices from a close series.
+
+        Args:
+            close (pd.Series): Raw daily closes
+
+        Returns:
+            bool: True if any factor changed (dividends dated before the
+                first close stay unpriced and do not count as a change)
+        """
+        pending = self.unresolved.to_numpy()
+        if not pending.any() or close is None or close.empty:
+            return False
+        close = close.dropna()
+        dates = _dates(close.index)
+        # Last close strictly before each ex-date
+        positions = np.searchsorted(dates, self.dates[pending], side='left') - 1
+        reference = np.where(positions >= 0, close.to_numpy(dtype=float)[np.maximum(positions, 0)], np.nan)
+        priced = ~np.isnan(reference)
+        if not priced.all() and not self._warned_unpriced:
+            # Once per book: `adjust` retries on every load
+            logger.warning("Dividends before the start of the price history are left unadjusted")
+            self._warned_unpriced = True
+        if not priced.any():
+            return False
+        rows = self.events.index[np.flatnonzero(pending)[priced]]
+        self.events.loc[rows, 'Reference_Price'] = reference[priced]
+        self._rebuild()
+        return True
+
+    def insert(self, event):
+        """
+        Add one event, rescaling only the cumulative factors before it.
+
+        Args:
+            event (dict or pd.Series): Normalized event row
+
+        Returns:
+            tuple: (position, split price factor, total price factor, volume factor)
+        """
+        row = normalize_events([event])
+        date = row['Date'].to_numpy(dtype='datetime64[ns]')[0]
+        k = int(np.searchsorted(self.dates, date, side='right'))
+        self.events = pd.concat([self.events.iloc[:k], row, self.events.iloc[k:]], ignore_index=True)
+        self.dates = np.insert(self.dates, k, date)
+
+        split_factor, total_factor, volume_factor = (factor[k] for factor in self._factors())
+        for mode, factor in (('split', split_factor), ('total', total_factor)):
+            cum = self.price_cum[mode]
+            self.price_cum[mode] = np.concatenate([cum[:k + 1] * factor, cum[k:]])
+        self.volume_cum = np.concatenate([self.volume_cum[:k + 1] * volume_factor, self.volume_cum[k:]])
+        return k, split_factor, total_factor, volume_factor
+
+    def factors(self, index, mode='total'):
+        """
+        Cumulative price and volume factors for each bar.
+
+        Args:
+            index (pd.DatetimeIndex): Bar dates
+            mode (str): 'split' or 'total'
+
+        Returns:
+            tuple: (price factors, volume factors) as arrays aligned with `index`
+        """
+        positions = np.searchsorted(self.dates, _dates(index), side='right')
+        return self.price_cum[mode][positions], self.volume_cum[positions]
+
+
+class CorporateActions:
+    """
+    Per-ticker event store with memoized adjusted frames.
+
+    Example:
+        actions = CorporateActions()
+        actions.add_events('SCOM', [{'Date': '2024-06-03', 'Type': 'split', 'Ratio': 2}])
+        adjusted = actions.adjust('SCOM', raw_bars, mode='total')
+    """
+
+    def __init__(self, root=CORPORATE_ACTIONS_DIR, cache_size=CORPORATE_ACTIONS_CACHE_SIZE):
+        self.root = root
+        self.cache_size = cache_size
+        self._books = {}
+        self._adjusted = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.csv")
+
+    def book(self, ticker):
+        """
+        Adjustment book of a ticker (loaded from disk on first use).
+
+        Args:
+            ticker (str): Ticker code
+
+        Returns:
+            AdjustmentBook: Events and cumulative factors
+        """
+        with self._lock:
+            if ticker not in self._books:
+                path = self._path(ticker)
+                events = pd.read_csv(path) if os.path.exists(path) else None
+                self._books[ticker] = AdjustmentBook(events)
+            return self._books[ticker]
+
+    def events(self, ticker):
+        """Recorded events of a ticker (a copy)."""
+        return self.book(ticker).events.copy()
+
+    def save(self, ticker):
+        """Write a ticker's events to its CSV."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            events = self.book(ticker).events
+            events.assign(Date=events['Date'].dt.strftime('%Y-%m-%d')).to_csv(self._path(ticker), index=False)
+
+    def add_events(self, ticker, events, prices=None, save=True):
+        """
+        Record new events and update only the history they affect.
+
+        Cumulative factors are rescaled for bars before each new ex-date,
+        and cached adjusted frames of the ticker are patched in place
+        (bars on or after the ex-date are untouched).
+
+        Args:
+            ticker (str): Ticker code
+            events (pd.DataFrame or list): New events (see `normalize_events`)
+            prices (pd.DataFrame): Raw bars used to price dividends (optional;
+                otherwise resolved from the next adjusted series)
+            save (bool): Persist the events
+
+        Returns:
+            int: Number of events added (exact duplicates are ignored)
+        """
+        new = normalize_events(events)
+        added = 0
+        with self._lock:
+            book = self.book(ticker)
+            if prices is not None and 'Close' in prices.columns:
+                new = self._price_dividends(new, prices['Close'])
+            for _, event in new.iterrows():
+                if self._is_duplicate(book.events, event):
+                    continue
+                k, split_factor, total_factor, volume_factor = book.insert(event)
+                self._patch_cached(ticker, book.dates[k], split_factor, total_factor, volume_factor)
+                added += 1
+            if added and save:
+                self.save(ticker)
+        if added:
+            logger.info(f"Recorded {added} corporate actions for {ticker}")
+        return added
+
+    @staticmethod
+    def _price_dividends(events, close):
+        pending = (events['Type'] == 'dividend') & events['Reference_Price'].isna()
+        if pending.any():
+            book = AdjustmentBook(events[pending])
+            book.resolve(close)
+            events.loc[pending, 'Reference_Price'] = book.events['Reference_Price'].to_numpy()
+        return events
+
+    @staticmethod
+    def _is_duplicate(existing, event):
+        same = (existing['Date'] == event['Date']) & (existing['Type'] == event['Type'])
+        for col in ('Ratio', 'Amount'):
+            same &= (existing[col] == event[col]) | (existing[col].isna() & pd.isna(event[col]))
+        return bool(same.any())
+
+    def _patch_cached(self, ticker, date, split_factor, total_factor, volume_factor):
+        # Rescale the rows before the new ex-date of every cached frame of the ticker
+        for (cached_ticker, mode, _), frame in self._adjusted.items():
+            if cached_ticker != ticker:
+                continue
+            factor = split_factor if mode == 'split' else total_factor
+            rows = int(np.searchsorted(_dates(frame.index), date, side='left'))
+            if rows == 0:
+                continue
+            prices = [col for col in PRICE_COLUMNS if col in frame.columns]
+            frame.iloc[:rows, [frame.columns.get_loc(col) for col in prices]] *= factor
+            if 'Volume' in frame.columns and volume_factor != 1:
+                frame.iloc[:rows, frame.columns.get_loc('Volume')] *= volume_factor
+
+    def adjust(self, ticker, data, mode='total'):
+        """
+        Adjusted copy of raw bars.
+
+        Args:
+            ticker (str): Ticker code
+            data (pd.DataFrame): Raw daily bars (Open/High/Low/Close/Volume)
+            mode (str): 'split' or 'total' (see module docstring)
+
+        Returns:
+            pd.DataFrame: Bars with prices and volume adjusted (OHLCV columns only)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown adjustment mode {mode!r}, expected one of {MODES}")
+        if data is None or data.empty:
+            return data
+        columns = [col for col in PRICE_COLUMNS + ['Volume'] if col in data.columns]
+
+        with self._lock:
+            book = self.book(ticker)
+            if mode == 'total' and book.resolve(data['Close']):
+                self.save(ticker)
+                self._drop_cached(ticker)
+
+            # Content hash, so a revised earlier bar is not served stale
+            key = (ticker, mode, fingerprint(data[columns]))
+            if key in self._adjusted:
+                self._adjusted.move_to_end(key)
+                return self._adjusted[key].copy()
+
+            adjusted = data[columns].astype(float)
+            if len(book):
+                price_factor, volume_factor = book.factors(adjusted.index, mode)
+                prices = [col for col in PRICE_COLUMNS if col in columns]
+                adjusted[prices] = adjusted[prices].to_numpy() * price_factor[:, None]
+                if 'Volume' in columns:
+                    adjusted['Volume'] = adjusted['Volume'].to_numpy() * volume_factor
+
+            self._adjusted[key] = adjusted
+            while len(self._adjusted) > self.cache_size:
+                self._adjusted.popitem(last=False)
+            return adjusted.copy()
+
+    def _drop_cached(self, ticker):
+        for key in [key for key in self._adjusted if key[0] == ticker]:
+            del self._adjusted[key]
+
+    def clear_cache(self):
+        """Drop memoized adjusted frames and loaded books."""
+        with self._lock:
+            self._adjusted.clear()
+            self._books.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_corporate_actions():
+    """
+    Process-wide event store rooted at CORPORATE_ACTIONS_DIR.
+
+    Returns:
+        CorporateActions: Shared store
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CorporateActions()
+        return _registry
+
+
+def adjust_for_actions(data, ticker, mode='total', actions=None):
+    """
+    Adjust raw bars for a ticker's recorded corporate actions.
+
+    Non-OHLCV columns are carried over unchanged.
+
+    Args:
+        data (pd.DataFrame): Raw daily bars
+        ticker (str): Ticker code
+        mode (str): 'split' or 'total'
+        actions (CorporateActions): Event store (default: shared store)
+
+    Returns:
+        pd.DataFrame: Adjusted bars
+    """
+    if data is None or data.empty:
+        return data
+    actions = actions or get_corporate_actions()
+    adjusted = actions.adjust(ticker, data, mode)
+    result = data.copy()
+    result[adjusted.columns] = adjusted
+    return result
+
+
+def total_return_index(data, ticker, actions=None):
+    """
+    Total-return index (dividends reinvested), starting at 1.
+
+    Args:
+        data (pd.DataFrame): Raw daily bars with 'Close'
+        ticker (str): Ticker code
+        actions (CorporateActions): Event store (default: shared store)
+
+    Returns:
+        pd.Series: Growth of one unit invested at the first close
+    """
+    actions = actions or get_corporate_actions()
+    close = actions.adjust(ticker, data, mode='total')['Close']
+    return (close / close.iloc[0]).rename('Total_Return_Index')
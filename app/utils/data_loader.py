@@ -1,15 +1,70 @@
-import yfinance as yf
 import pandas as pd
 import logging
-from .config import TICKERS, DEFAULT_PERIOD, DEFAULT_INTERVAL
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .config import (
+    TICKERS, DEFAULT_PERIOD, DEFAULT_INTERVAL, COMPACT_MODE, CACHE_TTL,
+    DERIVE_FROM_CACHE, SERIES_CACHE_SIZE, INTRADAY_LIMITS, CHUNK_FETCH_WORKERS, QUALITY_ENABLED,
+    QUALITY_CONTEXT_BARS, NSE_PROCESSED_DIR, CORPORATE_ACTIONS_MODE, PREFETCH_WORKERS
+)
+from . import store
+from .quality import clean_bars, validate_append
+from .corporate_actions import adjust_for_actions
+from .net import SingleFlight, throttle
 from .indicators import add_technical_indicators
+from .compact import compact_frame
+from .profiling import stage_timer, timed
+from .lazy_modules import lazy_import
+
+# Imported on the first download (keeps dashboard start-up fast)
+yf = lazy_import("yfinance")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Approximate calendar length of each Yahoo period, for "covers" comparisons
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "ytd": 366,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": float("inf")
+}
+
+# Calendar offsets for month/year periods; "Nd" periods count trading sessions
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3), "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1), "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5), "10y": pd.DateOffset(years=10)
+}
+
+INTRADAY_INTERVALS = ["1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"]
+
+# Coarse intervals that can be built locally by OHLCV aggregation, and the
+# pandas resample rule for each (weeks start Monday, as Yahoo labels them)
+RESAMPLE_RULES = {"1d": "D", "1wk": "W-MON", "1mo": "MS", "3mo": "QS"}
+
+OHLCV_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# (ticker, interval) -> (period, fetched_at, raw OHLCV frame); only the longest
+# period per key is kept, shorter periods / coarser intervals are derived from
+# it. Expired entries are evicted on store and at most SERIES_CACHE_SIZE are
+# kept (least recently used first out)
+_series_cache = OrderedDict()
+_series_lock = threading.Lock()
+
+# Concurrent identical downloads (e.g. the watchlist and the main chart both
+# asking for ^GSPC) share one in-flight request
+_flight = SingleFlight()
+
+# Background loader for `prefetch` (created on first use)
+_prefetch_pool = None
+_prefetch_lock = threading.Lock()
+
 
-def get_data(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, include_indicators=True):
+@timed('data_loader.get_data')
+def get_data(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, include_indicators=True,
+             compact=COMPACT_MODE, lazy_indicators=False, quality=QUALITY_ENABLED):
     """
     Fetch stock data with optional technical indicators.
     
@@ -18,6 +73,11 @@ def get_data(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, include_i
         period (str): Data period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
         interval (str): Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
         include_indicators (bool): Whether to calculate technical indicators
+        compact (bool): Store prices/indicators as float32 and volume as a downcast integer
+        lazy_indicators (bool): Skip materializing indicators; compute only the ones
+            needed with `compact.with_indicators()` or `LazyIndicatorFrame`
+        quality (bool): Check and repair bars before computing returns and
+            indicators (summary stored in `data.attrs['quality']`)
     
     Returns:
         pd.DataFrame: Stock data with OHLCV and optional indicators
@@ -28,26 +88,32 @@ def get_data(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, include_i
             logger.error("get_data() accepts a single ticker string, not a list.")
             return None
         
-        logger.info(f"Fetching data for {ticker}...")
-        data = yf.download(ticker, period=period, interval=interval, progress=False)
+        data = load_ohlcv(ticker, period=period, interval=interval)
 
-        if data.empty:
+        if data is None or data.empty:
             logger.warning(f"No data returned for {ticker}")
             return None
         
-        data.dropna(inplace=True)
-
-        if isinstance(data.columns, pd.MultiIndex):
-            # Extract the first level of column names
-            data.columns = data.columns.get_level_values(0)
+        quality_summary = None
+        if quality:
+            data, quality_summary = clean_bars(data, ticker, interval)
+            if data.empty:
+                logger.warning(f"No usable bars for {ticker} after quality checks")
+                return None
         
         # Add basic return calculation
         data['Daily_Return'] = data['Close'].pct_change()
         data['Cumulative_Return'] = (1 + data['Daily_Return']).cumprod() - 1
         
-        if include_indicators and len(data) > 0:
+        if include_indicators and not lazy_indicators and len(data) > 0:
             data = add_technical_indicators(data)
         
+        if compact or (include_indicators and lazy_indicators):
+            data = compact_frame(data, lazy_indicators=include_indicators and lazy_indicators, downcast=compact)
+        
+        if quality_summary is not None:
+            data.attrs['quality'] = quality_summary
+        
         logger.info(f"Successfully fetched {len(data)} rows for {ticker}")
         return data
         
@@ -56,6 +122,362 @@ def get_data(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, include_i
         return None
 
 
+def yahoo_provider(ticker, start=None, end=None, interval=DEFAULT_INTERVAL, period=None):
+    """
+    Default data provider: one Yahoo Finance download.
+    
+    Providers are callables with this signature returning an OHLCV DataFrame;
+    tests and alternative sources can pass their own to `fetch_history`.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        start (datetime-like): Range start (used when `period` is None)
+        end (datetime-like): Range end
+        interval (str): Data interval
+        period (str): Yahoo period instead of an explicit range
+    
+    Returns:
+        pd.DataFrame: Raw OHLCV data
+    """
+    throttle("yahoo")
+    if period is not None:
+        return yf.download(ticker, period=period, interval=interval, progress=False)
+    return yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+
+
+def _normalize_bars(data):
+    # Flat OHLCV columns without empty (all-NaN) rows; partially missing bars
+    # are left for the quality stage to repair instead of being dropped
+    if data is None or data.empty:
+        return pd.DataFrame() if data is None else data
+
+    if isinstance(data.columns, pd.MultiIndex):
+        # Extract the first level of column names
+        data.columns = data.columns.get_level_values(0)
+
+    prices = [col for col in ("Open", "High", "Low", "Close") if col in data.columns]
+    return data.dropna(how="all", subset=prices or None)
+
+
+def _download(ticker, period, interval):
+    # Single provider round trip, normalized to flat OHLCV columns; callers
+    # arriving while the same download is in flight wait for its result
+    def fetch():
+        logger.info(f"Fetching data for {ticker}...")
+        with stage_timer('data_loader.download') as stage:
+            data = yahoo_provider(ticker, interval=interval, period=period)
+            stage['rows'] = len(data)
+        return _normalize_bars(data)
+
+    data, shared = _flight.do(("download", ticker, period, interval), fetch)
+    if shared:
+        logger.info(f"Shared in-flight download of {ticker} {period}/{interval}")
+    # Every caller, the leader included, gets its own frame so none can
+    # mutate the one handed to the others
+    return data.copy()
+
+
+def split_date_range(start, end, window):
+    """
+    Split [start, end) into consecutive windows no longer than `window`.
+    
+    Args:
+        start (datetime-like): Range start
+        end (datetime-like): Range end
+        window (pd.Timedelta): Maximum span of one window
+    
+    Returns:
+        list: (window_start, window_end) tuples covering the range
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    windows = []
+    while start < end:
+        window_end = min(start + window, end)
+        windows.append((start, window_end))
+        start = window_end
+    return windows
+
+
+@timed('data_loader.fetch_history')
+def fetch_history(ticker, start, end, interval="1m", provider=None, max_workers=CHUNK_FETCH_WORKERS,
+                  window=None, save=True, store_root=None):
+    """
+    Fetch a long date range in provider-legal chunks and stitch the results.
+    
+    The range is split into windows no longer than the provider allows for
+    the interval (see `INTRADAY_LIMITS`), fetched concurrently with at most
+    `max_workers` requests in flight, then concatenated and de-duplicated on
+    the timestamp index. Windows older than the provider's lookback limit
+    are skipped with a warning.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        start (datetime-like): Range start
+        end (datetime-like): Range end
+        interval (str): Data interval (e.g. 1m, 5m, 15m)
+        provider (callable): Provider (default: `yahoo_provider`)
+        max_workers (int): Maximum concurrent requests
+        window (pd.Timedelta): Override the per-request span limit
+        save (bool): Append the stitched bars to the local store
+        store_root (str): Store root directory (default from config)
+    
+    Returns:
+        pd.DataFrame: Stitched OHLCV bars (empty if nothing was returned)
+    """
+    provider = provider or yahoo_provider
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    limits = INTRADAY_LIMITS.get(interval)
+    
+    if limits is not None:
+        if window is None:
+            window = pd.Timedelta(days=limits['window_days'])
+        earliest = pd.Timestamp.now(tz=start.tz).normalize() - pd.Timedelta(days=limits['lookback_days'])
+        if start < earliest:
+            logger.warning(f"{ticker} {interval} history only available from {earliest.date()}, clipping start")
+            start = earliest
+    if window is None:
+        window = end - start
+    
+    windows = split_date_range(start, end, window)
+    if not windows:
+        return pd.DataFrame()
+    
+    def fetch_window(bounds):
+        window_start, window_end = bounds
+        try:
+            with stage_timer('data_loader.download') as stage:
+                chunk = provider(ticker, start=window_start, end=window_end, interval=interval)
+                stage['rows'] = len(chunk)
+            return _normalize_bars(chunk)
+        except Exception as e:
+            logger.error(f"Error fetching {ticker} {interval} {window_start} - {window_end}: {str(e)}")
+            return None
+    
+    logger.info(f"Fetching {ticker} {interval} in {len(windows)} chunks...")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as pool:
+        chunks = [chunk for chunk in pool.map(fetch_window, windows) if chunk is not None and not chunk.empty]
+    
+    if not chunks:
+        logger.warning(f"No data returned for {ticker} {interval} between {start} and {end}")
+        return pd.DataFrame()
+    
+    data = store.merge_bars(None, pd.concat(chunks))
+    
+    if QUALITY_ENABLED:
+        # Stop bad bars at the store boundary, using the stored tail as context
+        existing = (store.read_tail(ticker, interval, QUALITY_CONTEXT_BARS, end=data.index[0], root=store_root)
+                    if save else None)
+        data, _ = validate_append(existing, data, ticker, interval)
+    
+    if save:
+        store.append_bars(ticker, interval, data, root=store_root)
+    
+    return data
+
+
+def slice_period(data, period):
+    """
+    Keep only the trailing `period` of a series.
+    
+    Args:
+        data (pd.DataFrame): Time-indexed data
+        period (str): Yahoo-style period (5d, 1mo, 1y, ytd, max, ...)
+    
+    Returns:
+        pd.DataFrame: Trailing slice of the data
+    """
+    if data.empty or period == "max":
+        return data
+    
+    if period.endswith("d") and period[:-1].isdigit():
+        # Like the provider, "5d" is the last five sessions, not calendar days
+        sessions = data.index.normalize()
+        first = sessions.unique()[-int(period[:-1]):][0]
+        return data[sessions >= first]
+    
+    end = data.index[-1]
+    if period == "ytd":
+        start = end.normalize().replace(month=1, day=1)
+    else:
+        start = end - PERIOD_OFFSETS[period]
+    return data[data.index >= start]
+
+
+def resample_ohlcv(data, interval):
+    """
+    Aggregate bars into a coarser interval (weekly/monthly from daily, daily from intraday).
+    
+    Args:
+        data (pd.DataFrame): OHLCV data at a finer interval
+        interval (str): Target interval (1d, 1wk, 1mo, 3mo)
+    
+    Returns:
+        pd.DataFrame: Aggregated OHLCV bars
+    """
+    agg = {col: how for col, how in OHLCV_AGGREGATION.items() if col in data.columns}
+    bars = data.resample(RESAMPLE_RULES[interval], label="left", closed="left").agg(agg)
+    bars = bars.dropna(subset=["Close"])
+    
+    if interval == "1d" and bars.index.tz is not None:
+        # Daily bars are date-labelled, like Yahoo's own daily series
+        bars.index = bars.index.tz_localize(None)
+    return bars
+
+
+def can_derive(base_period, base_interval, period, interval):
+    """
+    Whether a cached (period, interval) series can serve a request locally.
+    
+    Args:
+        base_period (str): Period of the cached series
+        base_interval (str): Interval of the cached series
+        period (str): Requested period
+        interval (str): Requested interval
+    
+    Returns:
+        bool: True if slicing and/or resampling the cached series suffices
+    """
+    if PERIOD_DAYS.get(base_period, 0) < PERIOD_DAYS.get(period, float("inf")):
+        return False
+    if base_interval == interval:
+        return True
+    if interval not in RESAMPLE_RULES:
+        return False
+    if interval == "1d":
+        return base_interval in INTRADAY_INTERVALS
+    return base_interval == "1d" or base_interval in INTRADAY_INTERVALS
+
+
+def _cached_base(ticker, period, interval):
+    # Find the cached series that can serve the request (exact interval first)
+    now = time.time()
+    ttl = CACHE_TTL.total_seconds()
+    with _series_lock:
+        candidates = [(key[1], entry) for key, entry in _series_cache.items()
+                      if key[0] == ticker and now - entry[1] < ttl]
+
+    candidates.sort(key=lambda item: item[0] != interval)
+    for base_interval, (base_period, _, data) in candidates:
+        if can_derive(base_period, base_interval, period, interval):
+            with _series_lock:
+                if (ticker, base_interval) in _series_cache:
+                    _series_cache.move_to_end((ticker, base_interval))
+            return base_interval, data
+    return None, None
+
+
+def _store_series(ticker, period, interval, data):
+    now = time.time()
+    ttl = CACHE_TTL.total_seconds()
+    with _series_lock:
+        for key in [key for key, entry in _series_cache.items() if now - entry[1] >= ttl]:
+            del _series_cache[key]
+        existing = _series_cache.get((ticker, interval))
+        if existing is None or PERIOD_DAYS.get(period, 0) >= PERIOD_DAYS.get(existing[0], 0):
+            _series_cache[(ticker, interval)] = (period, now, data)
+        _series_cache.move_to_end((ticker, interval))
+        while len(_series_cache) > SERIES_CACHE_SIZE:
+            _series_cache.popitem(last=False)
+
+
+def clear_series_cache():
+    """Drop all in-memory base series used for local derivation."""
+    with _series_lock:
+        _series_cache.clear()
+
+
+def load_ohlcv(ticker, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL, derive=DERIVE_FROM_CACHE):
+    """
+    Load raw OHLCV bars, deriving them locally from a cached series when possible.
+    
+    Shorter periods are served by slicing the longest cached series, and
+    weekly/monthly bars are aggregated from daily (daily from intraday), so
+    flipping period/interval controls does not cost a network round trip.
+    On a miss only the requested period is fetched (as daily bars for weekly
+    or coarser requests); a later request for a longer period fetches that
+    period and replaces the cached series.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        period (str): Data period
+        interval (str): Data interval
+        derive (bool): Use/populate the in-memory base series cache
+    
+    Returns:
+        pd.DataFrame: OHLCV bars (a fresh copy, safe to modify)
+    """
+    if not derive:
+        return _download(ticker, period, interval)
+    
+    base_interval, base = _cached_base(ticker, period, interval)
+    if base is None:
+        # "ytd" is fetched as "1y", which always contains it and can also
+        # serve the shorter periods
+        fetch_period = "1y" if period == "ytd" else period
+        fetch_interval = "1d" if interval in RESAMPLE_RULES and interval != "1d" else interval
+        
+        def fetch():
+            # A caller that finished while this one was starting may have filled the cache
+            cached_interval, cached = _cached_base(ticker, period, interval)
+            if cached is not None:
+                return cached_interval, cached
+            fetched = _download(ticker, fetch_period, fetch_interval)
+            if not fetched.empty:
+                _store_series(ticker, fetch_period, fetch_interval, fetched)
+            return fetch_interval, fetched
+
+        # Download and cache as one flight, so no caller sees neither
+        (base_interval, base), _ = _flight.do(("series", ticker, fetch_period, fetch_interval), fetch)
+        if base.empty:
+            return base.copy()
+    else:
+        logger.info(f"Deriving {ticker} {period}/{interval} from cached {base_interval} series")
+    
+    with stage_timer('data_loader.derive') as stage:
+        data = slice_period(base, period)
+        if base_interval != interval:
+            data = resample_ohlcv(data, interval)
+        stage['rows'] = len(data)
+    return data.copy()
+
+
+def _prefetch_one(ticker, period, interval):
+    try:
+        return load_ohlcv(ticker, period=period, interval=interval)
+    except Exception as e:
+        logger.error(f"Error prefetching {ticker}: {str(e)}")
+        return None
+
+
+def prefetch(tickers, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL):
+    """
+    Start loading tickers in the background.
+    
+    A later `load_ohlcv` (or `get_data`) for a prefetched ticker is served
+    from the base series cache, or joins the download if it is still in
+    flight, so a page can prefetch the data for panels further down and
+    render the first panels meanwhile. Tickers already cached are skipped.
+    
+    Args:
+        tickers (iterable): Ticker symbols
+        period (str): Data period
+        interval (str): Data interval
+    
+    Returns:
+        list: Futures resolving to the OHLCV frames (None on error)
+    """
+    global _prefetch_pool
+    pending = [ticker for ticker in dict.fromkeys(tickers)
+               if DERIVE_FROM_CACHE and _cached_base(ticker, period, interval)[1] is None]
+    if not pending:
+        return []
+    with _prefetch_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return [_prefetch_pool.submit(_prefetch_one, ticker, period, interval) for ticker in pending]
+
+
+@timed('data_loader.get_fundamentals')
 def get_fundamentals(ticker):
     """
     Fetch fundamental data for a stock.
@@ -67,8 +489,11 @@ def get_fundamentals(ticker):
         dict: Fundamental metrics
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        def fetch():
+            throttle("yahoo")
+            return yf.Ticker(ticker).info
+
+        info, _ = _flight.do(("fundamentals", ticker), fetch)
         
         fundamentals = {
             'Name': info.get('longName', 'N/A'),
@@ -150,11 +575,26 @@ def validate_data(data):
     
     return True
 
-def get_local_kenyan_data(ticker, include_indicators=True):
+@timed('data_loader.get_local_kenyan_data')
+def get_local_kenyan_data(ticker, include_indicators=True, adjust=CORPORATE_ACTIONS_MODE):
+    """
+    Load pre-built NSE daily bars for a ticker.
+    
+    Args:
+        ticker (str): NSE ticker code (e.g. 'SCOM')
+        include_indicators (bool): Whether to calculate technical indicators
+        adjust (str): Corporate-action adjustment: 'total' (splits, bonus
+            issues and dividends, so returns are total returns), 'split'
+            (share events only) or None (raw prices)
+    
+    Returns:
+        pd.DataFrame: OHLCV data with returns and optional indicators
+    """
     
     import os
     
-    filepath = os.path.join("data", "processed", "Kenya", f"{ticker}.csv")
+    # Built by app.utils.nse_ingest.ingest_price_lists
+    filepath = os.path.join(NSE_PROCESSED_DIR, f"{ticker}.csv")
     
     if not os.path.exists(filepath):
         logger.error(f"Local Kenyan data file not found: {filepath}")
@@ -169,6 +609,14 @@ def get_local_kenyan_data(ticker, include_indicators=True):
             logger.error(f"Kenyan data missing required columns: {required_cols}")
             return None
         
+        if QUALITY_ENABLED:
+            data, quality_summary = clean_bars(data, ticker)
+            data.attrs['quality'] = quality_summary
+        
+        # Remove split/bonus/dividend jumps before returns and indicators see them
+        if adjust:
+            data = adjust_for_actions(data, ticker, mode=adjust)
+        
         # Calculate returns
         data['Daily_Return'] = data['Close'].pct_change()
         data['Cumulative_Return'] = (1 + data['Daily_Return']).cumprod() - 1
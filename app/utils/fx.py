@@ -0,0 +1,294 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    DEFAULT_INTERVAL, DEFAULT_PERIOD, EXCHANGE_CURRENCIES, FX_CACHE_SIZE, TICKER_CURRENCIES
+)
+from .calendars import exchange_for, series_version
+from .data_loader import load_ohlcv
+from .indicator_graph import INDICATOR_REGISTRY, evaluate_indicators
+from . import store
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+_converted_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# (symbol, interval, version) of rate series already persisted to the store,
+# least recently seen first and capped like the converted-universe cache
+_stored_versions = OrderedDict()
+
+
+def currency_for(name):
+    """
+    Quote currency of a ticker (or friendly name from config).
+
+    Args:
+        name (str): Ticker symbol or friendly name
+
+    Returns:
+        str: ISO currency code (e.g. 'KES', 'USD')
+    """
+    if name in TICKER_CURRENCIES:
+        return TICKER_CURRENCIES[name]
+    return EXCHANGE_CURRENCIES[exchange_for(name)]
+
+
+def fx_symbol(from_currency, to_currency):
+    """
+    Yahoo symbol of an FX pair quoted as `to_currency` per `from_currency`.
+
+    Args:
+        from_currency (str): Currency being converted from
+        to_currency (str): Currency being converted to
+
+    Returns:
+        str: e.g. 'USDKES=X' (KES per USD)
+    """
+    return f"{from_currency}{to_currency}=X"
+
+
+def get_fx_rate(from_currency, to_currency, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL):
+    """
+    Conversion rate series (units of `to_currency` per unit of `from_currency`).
+
+    Rates are loaded through the same provider and derivation cache as
+    prices and persisted to the local store. If the direct pair is not
+    quoted, the inverse pair is used.
+
+    Args:
+        from_currency (str): Source currency
+        to_currency (str): Target currency
+        period (str): Data period
+        interval (str): Data interval
+
+    Returns:
+        pd.Series: Close rate by date, or None if the currencies match or no
+            rate is available (callers skip conversion in that case)
+    """
+    if from_currency == to_currency:
+        return None
+
+    for symbol, invert in ((fx_symbol(from_currency, to_currency), False),
+                           (fx_symbol(to_currency, from_currency), True)):
+        try:
+            bars = load_ohlcv(symbol, period=period, interval=interval)
+        except Exception as e:
+            logger.error(f"Error fetching FX rate {symbol}: {str(e)}")
+            continue
+        if bars is None or bars.empty:
+            continue
+
+        version = (symbol, interval, series_version(bars['Close']))
+        with _cache_lock:
+            stored = version in _stored_versions
+            if stored:
+                _stored_versions.move_to_end(version)
+        if not stored:
+            try:
+                store.append_bars(symbol, interval, bars)
+                with _cache_lock:
+                    _stored_versions[version] = True
+                    while len(_stored_versions) > FX_CACHE_SIZE:
+                        _stored_versions.popitem(last=False)
+            except Exception as e:
+                logger.warning(f"Could not store FX rate {symbol}: {str(e)}")
+
+        rate = bars['Close']
+        return (1.0 / rate) if invert else rate
+
+    logger.error(f"No FX rate available for {from_currency}->{to_currency}")
+    return None
+
+
+def _rate_on(rate, index):
+    # As-of (forward filled) rate on another series' dates; leading gaps take the first quote
+    rate = rate.copy()
+    if rate.index.tz is not None:
+        rate.index = rate.index.tz_localize(None)
+    rate.index = rate.index.normalize()
+    rate = rate[~rate.index.duplicated(keep='last')]
+
+    target = pd.DatetimeIndex(index)
+    lookup = target.tz_localize(None).normalize() if target.tz is not None else target.normalize()
+    values = rate.reindex(lookup, method='ffill').bfill()
+    return pd.Series(values.to_numpy(), index=index)
+
+
+def rate_matrix(index, currencies, to_currency, rates):
+    """
+    Date-aligned conversion factors for a wide panel.
+
+    Args:
+        index (pd.DatetimeIndex): Panel dates
+        currencies (dict): column -> quote currency
+        to_currency (str): Target currency
+        rates (dict): currency -> rate series into `to_currency`
+
+    Returns:
+        pd.DataFrame: Factors with the panel's shape (1.0 where no conversion is needed)
+    """
+    factors = {}
+    for column, currency in currencies.items():
+        rate = rates.get(currency)
+        if currency == to_currency or rate is None:
+            factors[column] = np.ones(len(index))
+        else:
+            factors[column] = _rate_on(rate, index).to_numpy()
+    return pd.DataFrame(factors, index=index)
+
+
+def _load_rates(currencies, to_currency, rates, period, interval):
+    rates = dict(rates or {})
+    for currency in set(currencies.values()):
+        if currency != to_currency and currency not in rates:
+            rates[currency] = get_fx_rate(currency, to_currency, period, interval)
+    return rates
+
+
+def convert_panel(panel, currencies, to_currency, rates=None, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL):
+    """
+    Convert a wide price panel into one currency with a single vectorized multiply.
+
+    Args:
+        panel (pd.DataFrame): Prices (dates x names)
+        currencies (dict): name -> quote currency (default: looked up per column)
+        to_currency (str): Target currency
+        rates (dict): Optional preloaded currency -> rate series
+        period (str): Period used when loading missing rates
+        interval (str): Interval used when loading missing rates
+
+    Returns:
+        pd.DataFrame: Converted prices
+    """
+    if currencies is None:
+        currencies = {column: currency_for(column) for column in panel.columns}
+    rates = _load_rates(currencies, to_currency, rates, period, interval)
+    return panel * rate_matrix(panel.index, currencies, to_currency, rates)[panel.columns]
+
+
+def convert_returns(returns, currencies, to_currency, rates=None, period=DEFAULT_PERIOD,
+                    interval=DEFAULT_INTERVAL):
+    """
+    Convert a wide panel of simple returns into one currency.
+
+    Uses (1 + r_local) * (fx_t / fx_{t-1}) - 1, vectorized over the panel;
+    the first row has no previous rate and is left in local terms.
+
+    Args:
+        returns (pd.DataFrame): Returns (dates x names)
+        currencies (dict): name -> quote currency (default: looked up per column)
+        to_currency (str): Target currency
+        rates (dict): Optional preloaded currency -> rate series
+        period (str): Period used when loading missing rates
+        interval (str): Interval used when loading missing rates
+
+    Returns:
+        pd.DataFrame: Returns in the target currency
+    """
+    if currencies is None:
+        currencies = {column: currency_for(column) for column in returns.columns}
+    rates = _load_rates(currencies, to_currency, rates, period, interval)
+    factors = rate_matrix(returns.index, currencies, to_currency, rates)[returns.columns]
+    fx_change = (factors / factors.shift(1)).fillna(1.0)
+    return (1 + returns) * fx_change - 1
+
+
+def convert_frame(data, from_currency, to_currency, rate=None, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL):
+    """
+    Convert one stock frame's prices and recompute returns and indicators.
+
+    Args:
+        data (pd.DataFrame): Stock data with OHLC(V) and optional indicators
+        from_currency (str): Quote currency of the data
+        to_currency (str): Target currency
+        rate (pd.Series): Optional preloaded rate series
+        period (str): Period used when loading the rate
+        interval (str): Interval used when loading the rate
+
+    Returns:
+        pd.DataFrame: Converted copy (the input is returned unchanged if no
+            conversion is needed or the rate is unavailable)
+    """
+    if data is None or data.empty or from_currency == to_currency:
+        return data
+    if rate is None:
+        rate = get_fx_rate(from_currency, to_currency, period, interval)
+        if rate is None:
+            return data
+
+    df = data.copy()
+    columns = [col for col in PRICE_COLUMNS if col in df.columns]
+    df[columns] = df[columns].to_numpy() * _rate_on(rate, df.index).to_numpy()[:, None]
+
+    if 'Daily_Return' in df.columns:
+        df['Daily_Return'] = df['Close'].pct_change()
+    if 'Cumulative_Return' in df.columns:
+        df['Cumulative_Return'] = (1 + df['Daily_Return']).cumprod() - 1
+
+    # Indicators are not linear in a time-varying rate, so recompute them
+    indicators = [col for col in df.columns if col in INDICATOR_REGISTRY]
+    if indicators:
+        base = df.drop(columns=indicators)
+        for name, values in evaluate_indicators(base, indicators).items():
+            df[name] = values
+
+    df.attrs['currency'] = to_currency
+    return df
+
+
+def convert_universe(data_dict, to_currency, period=DEFAULT_PERIOD, interval=DEFAULT_INTERVAL):
+    """
+    Convert every frame of a universe into one currency, memoized per
+    (universe, currency, rates) version.
+
+    Args:
+        data_dict (dict): name -> stock DataFrame
+        to_currency (str): Target currency
+        period (str): Period used when loading rates
+        interval (str): Interval used when loading rates
+
+    Returns:
+        dict: name -> converted DataFrame (copies the caller may modify)
+    """
+    # Rates come from the loader's cache; their versions keep a revised or
+    # extended FX series from serving conversions made with the old one
+    currencies = {name: currency_for(name) for name in data_dict}
+    rates = _load_rates(currencies, to_currency, None, period, interval)
+    key = (tuple((name, series_version(data['Close'])) for name, data in sorted(data_dict.items())
+                 if data is not None and 'Close' in data.columns), to_currency, period, interval,
+           tuple((currency, series_version(rate) if rate is not None else None)
+                 for currency, rate in sorted(rates.items())))
+    with _cache_lock:
+        if key in _converted_cache:
+            _converted_cache.move_to_end(key)
+            return _copy_universe(_converted_cache[key])
+
+    converted = {
+        name: convert_frame(data, currencies[name], to_currency, rates.get(currencies[name]))
+        if rates.get(currencies[name]) is not None else data
+        for name, data in data_dict.items()
+    }
+
+    with _cache_lock:
+        _converted_cache[key] = converted
+        while len(_converted_cache) > FX_CACHE_SIZE:
+            _converted_cache.popitem(last=False)
+    return _copy_universe(converted)
+
+
+def _copy_universe(data_dict):
+    return {name: data.copy() if data is not None else None for name, data in data_dict.items()}
+
+
+def clear_fx_cache():
+    """Drop memoized converted universes and the record of stored rates."""
+    with _cache_lock:
+        _converted_cache.clear()
+        _stored_versions.clear()
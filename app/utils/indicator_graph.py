@@ -0,0 +1,214 @@
+import logging
+
+import pandas as pd
+
+from .memo import function_digest
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorNode:
+    """
+    One node of the indicator dependency graph.
+
+    Attributes:
+        name (str): Output column / node name
+        inputs (list): Names of the data columns or nodes this node reads
+        func (callable): Called with one Series per input, in order
+        public (bool): Whether the node is a user-facing indicator column
+            (False for shared intermediates such as rolling means)
+    """
+
+    def __init__(self, name, inputs, func, public=True):
+        self.name = name
+        self.inputs = list(inputs)
+        self.func = func
+        self.public = public
+        self._digest = None
+
+    @property
+    def digest(self):
+        """Hash of the node's function (code and closure values), taken once per node."""
+        if self._digest is None:
+            self._digest = function_digest(self.func)
+        return self._digest
+
+    def __repr__(self):
+        return f"IndicatorNode({self.name!r}, inputs={self.inputs!r}, public={self.public})"
+
+
+# Registry of all known nodes, in registration order
+INDICATOR_REGISTRY = {}
+
+# Called before every evaluation, e.g. to rebuild nodes after a parameter change
+_REFRESH_HOOKS = []
+
+
+def register_indicator(name, inputs, func=None, public=True, overwrite=False):
+    """
+    Register an indicator (or shared intermediate) in the dependency graph.
+
+    Can be used directly or as a decorator:
+
+        @register_indicator('Close_SMA_10', inputs=['Close'])
+        def sma_10(close):
+            return close.rolling(window=10).mean()
+
+    Args:
+        name (str): Node name; public nodes become DataFrame columns
+        inputs (list): Data columns or node names the function reads
+        func (callable): Function of one Series per input
+        public (bool): False for intermediates that are not output columns
+        overwrite (bool): Allow replacing an existing node of the same name
+
+    Returns:
+        callable: `func` (or a decorator when `func` is omitted)
+    """
+    def decorator(f):
+        if name in INDICATOR_REGISTRY and not overwrite:
+            existing = INDICATOR_REGISTRY[name]
+            if not public and not existing.public and existing.inputs == list(inputs):
+                # Same intermediate declared twice (e.g. MA_20 and BB_Middle windows)
+                return f
+            raise ValueError(f"Indicator '{name}' is already registered")
+        INDICATOR_REGISTRY[name] = IndicatorNode(name, inputs, f, public)
+        return f
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def unregister_indicator(name):
+    """
+    Remove a node from the registry.
+
+    Args:
+        name (str): Node name
+    """
+    INDICATOR_REGISTRY.pop(name, None)
+
+
+def add_refresh_hook(hook):
+    """
+    Run `hook()` before every graph evaluation.
+
+    Lets the module that registers a family of nodes re-register them when
+    the settings they were built from change (see
+    `indicators._sync_builtin_indicators`).
+
+    Args:
+        hook (callable): Zero-argument function; should be cheap when nothing changed
+    """
+    if hook not in _REFRESH_HOOKS:
+        _REFRESH_HOOKS.append(hook)
+
+
+def list_indicators(public_only=True):
+    """
+    Names of registered indicators.
+
+    Args:
+        public_only (bool): Exclude shared intermediates
+
+    Returns:
+        list: Indicator names in registration order
+    """
+    return [name for name, node in INDICATOR_REGISTRY.items() if node.public or not public_only]
+
+
+def resolve_order(names, columns=(), computed=()):
+    """
+    Topologically order the nodes needed to compute `names`.
+
+    Args:
+        names (list): Requested node names
+        columns (iterable): Raw data columns usable as leaf inputs
+        computed (iterable): Nodes already computed (skipped with their inputs)
+
+    Returns:
+        list: Node names in an order where every input precedes its consumer
+
+    Raises:
+        KeyError: If a name is neither registered nor a data column
+        ValueError: If the graph has a cycle
+    """
+    columns = set(columns)
+    computed = set(computed)
+    order = []
+    state = {}  # name -> 'visiting' | 'done'
+
+    def visit(name):
+        if name in computed or state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Cycle in indicator graph at '{name}'")
+        if name not in INDICATOR_REGISTRY:
+            if name in columns:
+                return
+            raise KeyError(f"Unknown indicator or missing column: '{name}'")
+
+        state[name] = 'visiting'
+        for dep in INDICATOR_REGISTRY[name].inputs:
+            visit(dep)
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def evaluate_indicators(data, names=None, cache=None):
+    """
+    Evaluate the requested indicators, running every shared node once.
+
+    Args:
+        data (pd.DataFrame): Stock data providing the raw input columns
+        names (list): Indicators to compute (default: all public indicators)
+        cache (dict): Optional node-name -> Series memo; reused and filled in
+            so repeated calls on the same data skip finished nodes
+
+    Returns:
+        dict: Requested name -> pd.Series
+    """
+    for hook in _REFRESH_HOOKS:
+        hook()
+    if names is None:
+        names = list_indicators()
+    if cache is None:
+        cache = {}
+
+    def lookup(name):
+        if name in cache:
+            return cache[name]
+        value = data[name]
+        if isinstance(value, pd.DataFrame):
+            value = value.iloc[:, 0]
+        return value
+
+    for name in resolve_order(names, columns=data.columns, computed=cache):
+        node = INDICATOR_REGISTRY[name]
+        result = node.func(*(lookup(dep) for dep in node.inputs))
+        if isinstance(result, pd.Series):
+            result = result.rename(name)
+        cache[name] = result
+
+    return {name: cache[name] for name in names}
+
+
+def compute_indicators(data, names=None):
+    """
+    Return a copy of `data` with the requested indicator columns added.
+
+    Args:
+        data (pd.DataFrame): Stock OHLCV data
+        names (list): Indicators to compute (default: all public indicators)
+
+    Returns:
+        pd.DataFrame: Data with indicator columns
+    """
+    df = data.copy()
+    for name, values in evaluate_indicators(data, names).items():
+        df[name] = values
+    return df
@@ -1,56 +1,45 @@
+import threading
+from functools import partial
+
 import pandas as pd
 import numpy as np
-from .config import INDICATOR_PARAMS, TRADING_DAYS_PER_YEAR
+from .config import INDICATOR_PARAMS, INDICATOR_SMOOTHING, TRADING_DAYS_PER_YEAR
+from . import kernels
+from .profiling import timed
+from .indicator_graph import INDICATOR_REGISTRY, add_refresh_hook, compute_indicators, register_indicator
+from .memo import memoize
+
 
+def _indicator_params():
+    # Everything besides the frame that indicator output depends on, including
+    # each node's function so an overwritten indicator never serves old results
+    _sync_builtin_indicators()
+    graph = tuple((name, tuple(node.inputs), node.digest)
+                  for name, node in INDICATOR_REGISTRY.items())
+    return INDICATOR_PARAMS, INDICATOR_SMOOTHING, graph
 
-def add_technical_indicators(data):
+
+@timed('indicators.add_technical_indicators')
+@memoize('indicators.add_technical_indicators', params=_indicator_params)
+def add_technical_indicators(data, indicators=None):
     """
     Add technical indicators to stock data.
     
+    Indicators are evaluated through the dependency graph in
+    `indicator_graph`, so shared intermediates (e.g. the 20-period rolling
+    Close mean behind both MA_20 and BB_Middle) are computed once.
+    
     Args:
         data (pd.DataFrame): Stock OHLCV data
+        indicators (list): Indicator names to add (default: all built-in indicators,
+            see `TECHNICAL_INDICATORS`); may include user-registered indicators
     
     Returns:
         pd.DataFrame: Data with technical indicators added
     """
-    df = data.copy()
-    
-    # Moving Averages
-    df['MA_20'] = df['Close'].rolling(window=INDICATOR_PARAMS['MA_SHORT']).mean()
-    df['MA_50'] = df['Close'].rolling(window=INDICATOR_PARAMS['MA_MEDIUM']).mean()
-    df['MA_200'] = df['Close'].rolling(window=INDICATOR_PARAMS['MA_LONG']).mean()
-    
-    # Exponential Moving Averages
-    df['EMA_12'] = df['Close'].ewm(span=INDICATOR_PARAMS['EMA_FAST'], adjust=False).mean()
-    df['EMA_26'] = df['Close'].ewm(span=INDICATOR_PARAMS['EMA_SLOW'], adjust=False).mean()
-    
-    # MACD
-    df['MACD'] = df['EMA_12'] - df['EMA_26']
-    df['MACD_Signal'] = df['MACD'].ewm(span=INDICATOR_PARAMS['MACD_SIGNAL'], adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
-    
-    # Bollinger Bands
-    df = add_bollinger_bands(df)
-    
-    # RSI (Relative Strength Index)
-    df['RSI'] = calculate_rsi(df['Close'])
-    
-    # Volatility
-    df['Volatility_20'] = df['Daily_Return'].rolling(
-        window=INDICATOR_PARAMS['VOLATILITY_SHORT']
-    ).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
-    
-    df['Volatility_50'] = df['Daily_Return'].rolling(
-        window=INDICATOR_PARAMS['VOLATILITY_LONG']
-    ).std() * np.sqrt(TRADING_DAYS_PER_YEAR)
-    
-    # Average True Range (ATR)
-    df['ATR'] = calculate_atr(df)
-    
-    # Stochastic Oscillator
-    df = add_stochastic_oscillator(df)
-    
-    return df
+    if indicators is None:
+        indicators = TECHNICAL_INDICATORS
+    return compute_indicators(data, indicators)
 
 
 def add_bollinger_bands(data, period=None, std_multiplier=None):
@@ -85,13 +74,14 @@ def add_bollinger_bands(data, period=None, std_multiplier=None):
     return df
 
 
-def calculate_rsi(prices, period=None):
+def calculate_rsi(prices, period=None, smoothing=None):
     """
     Calculate Relative Strength Index.
     
     Args:
         prices (pd.Series): Price series
         period (int): RSI period (default from config)
+        smoothing (str): 'simple' rolling mean or 'wilder' smoothing (default from config)
     
     Returns:
         pd.Series: RSI values
@@ -99,7 +89,14 @@ def calculate_rsi(prices, period=None):
     if period is None:
         period = INDICATOR_PARAMS['RSI_PERIOD']
     
-    delta = prices.diff()
+    return _rsi_from_delta(prices.diff(), period, smoothing)
+
+
+def _rsi_from_delta(delta, period, smoothing=None):
+    # RSI from precomputed price changes (shared with the indicator graph)
+    if (smoothing or INDICATOR_SMOOTHING) == 'wilder':
+        return pd.Series(kernels.rsi_from_delta_wilder(delta, period), index=delta.index)
+    
     gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
     loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
     
@@ -109,13 +106,14 @@ def calculate_rsi(prices, period=None):
     return rsi
 
 
-def calculate_atr(data, period=None):
+def calculate_atr(data, period=None, smoothing=None):
     """
     Calculate Average True Range.
     
     Args:
         data (pd.DataFrame): Stock data with High, Low, Close columns
         period (int): ATR period (default from config)
+        smoothing (str): 'simple' rolling mean or 'wilder' smoothing (default from config)
     
     Returns:
         pd.Series: ATR values
@@ -123,15 +121,29 @@ def calculate_atr(data, period=None):
     if period is None:
         period = INDICATOR_PARAMS['ATR_PERIOD']
     
-    high_low = data['High'] - data['Low']
-    high_close = np.abs(data['High'] - data['Close'].shift())
-    low_close = np.abs(data['Low'] - data['Close'].shift())
+    true_range = calculate_true_range(data['High'], data['Low'], data['Close'])
+    return _atr_from_true_range(true_range, period, smoothing)
+
+
+def _atr_from_true_range(true_range, period, smoothing=None):
+    if (smoothing or INDICATOR_SMOOTHING) == 'wilder':
+        return pd.Series(kernels.wilder_smooth(true_range, period), index=true_range.index)
+    return true_range.rolling(window=period).mean()
+
+
+def calculate_true_range(high, low, close):
+    """
+    Calculate True Range in one fused kernel pass.
     
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = np.max(ranges, axis=1)
-    atr = true_range.rolling(window=period).mean()
+    Args:
+        high (pd.Series): High prices
+        low (pd.Series): Low prices
+        close (pd.Series): Close prices (the previous bar's close is used)
     
-    return atr
+    Returns:
+        pd.Series: True range values
+    """
+    return pd.Series(kernels.true_range(high, low, close), index=high.index)
 
 
 def add_stochastic_oscillator(data, k_period=14, d_period=3):
@@ -149,9 +161,8 @@ def add_stochastic_oscillator(data, k_period=14, d_period=3):
     df = data.copy()
     
     # Calculate %K
-    low_min = df['Low'].rolling(window=k_period).min()
-    high_max = df['High'].rolling(window=k_period).max()
-    df['Stochastic_K'] = 100 * (df['Close'] - low_min) / (high_max - low_min)
+    low_min, high_max = _rolling_low_high(df['Low'], df['High'], k_period)
+    df['Stochastic_K'] = _stochastic_k(df['Close'], low_min, high_max)
     
     # Calculate %D (moving average of %K)
     df['Stochastic_D'] = df['Stochastic_K'].rolling(window=d_period).mean()
@@ -159,6 +170,16 @@ def add_stochastic_oscillator(data, k_period=14, d_period=3):
     return df
 
 
+def _stochastic_k(close, low_min, high_max):
+    return 100 * (close - low_min) / (high_max - low_min)
+
+
+def _rolling_low_high(low, high, window):
+    # Rolling min of Low and max of High in one kernel pass
+    low_min, high_max = kernels.rolling_min_max(low, high, window)
+    return pd.Series(low_min, index=low.index), pd.Series(high_max, index=high.index)
+
+
 def calculate_ema(prices, span):
     """
     Calculate Exponential Moving Average.
@@ -187,6 +208,112 @@ def calculate_sma(prices, window):
     return prices.rolling(window=window).mean()
 
 
+# Built-in indicator graph
+#
+# Each indicator declares its inputs (raw columns or other nodes). Shared
+# intermediates are private nodes named after their parameters, so e.g.
+# MA_20 and BB_Middle both read 'Close_SMA_20' and it is computed once.
+
+def _identity(series):
+    return series
+
+
+def _sma_node(column, window):
+    name = f'{column}_SMA_{window}'
+    register_indicator(name, [column], lambda s: calculate_sma(s, window), public=False)
+    return name
+
+
+def _std_node(column, window):
+    name = f'{column}_STD_{window}'
+    register_indicator(name, [column], lambda s: s.rolling(window=window).std(), public=False)
+    return name
+
+
+def _low_high_node(window):
+    name = f'Low_High_Range_{window}'
+    register_indicator(name, ['Low', 'High'], lambda low, high: _rolling_low_high(low, high, window),
+                       public=False)
+    return name
+
+
+def _register_builtin_indicators(params=INDICATOR_PARAMS, k_period=14, d_period=3, overwrite=False):
+    register = partial(register_indicator, overwrite=overwrite)
+
+    # Moving Averages
+    register('MA_20', [_sma_node('Close', params['MA_SHORT'])], _identity)
+    register('MA_50', [_sma_node('Close', params['MA_MEDIUM'])], _identity)
+    register('MA_200', [_sma_node('Close', params['MA_LONG'])], _identity)
+
+    # Exponential Moving Averages and MACD
+    register('EMA_12', ['Close'], lambda c: calculate_ema(c, params['EMA_FAST']))
+    register('EMA_26', ['Close'], lambda c: calculate_ema(c, params['EMA_SLOW']))
+    register('MACD', ['EMA_12', 'EMA_26'], lambda fast, slow: fast - slow)
+    register('MACD_Signal', ['MACD'], lambda m: calculate_ema(m, params['MACD_SIGNAL']))
+    register('MACD_Histogram', ['MACD', 'MACD_Signal'], lambda m, sig: m - sig)
+
+    # Bollinger Bands
+    bb_std = _std_node('Close', params['BOLLINGER_PERIOD'])
+    multiplier = params['BOLLINGER_STD']
+    register('BB_Middle', [_sma_node('Close', params['BOLLINGER_PERIOD'])], _identity)
+    register('BB_Upper', ['BB_Middle', bb_std], lambda mid, std: mid + (std * multiplier))
+    register('BB_Lower', ['BB_Middle', bb_std], lambda mid, std: mid - (std * multiplier))
+    register('BB_Width', ['BB_Upper', 'BB_Lower'], lambda upper, lower: upper - lower)
+    register('BB_Percent', ['Close', 'BB_Upper', 'BB_Lower'],
+             lambda close, upper, lower: (close - lower) / (upper - lower))
+
+    # RSI
+    register('Close_Delta', ['Close'], lambda c: c.diff(), public=False)
+    register('RSI', ['Close_Delta'], lambda delta: _rsi_from_delta(delta, params['RSI_PERIOD']))
+
+    # Volatility
+    annualize = np.sqrt(TRADING_DAYS_PER_YEAR)
+    register('Volatility_20', [_std_node('Daily_Return', params['VOLATILITY_SHORT'])],
+             lambda std: std * annualize)
+    register('Volatility_50', [_std_node('Daily_Return', params['VOLATILITY_LONG'])],
+             lambda std: std * annualize)
+
+    # Average True Range
+    register('True_Range', ['High', 'Low', 'Close'], calculate_true_range, public=False)
+    register('ATR', ['True_Range'], lambda tr: _atr_from_true_range(tr, params['ATR_PERIOD']))
+
+    # Stochastic Oscillator
+    register('Stochastic_K', ['Close', _low_high_node(k_period)],
+             lambda close, low_high: _stochastic_k(close, *low_high))
+    register('Stochastic_D', ['Stochastic_K'], lambda k: k.rolling(window=d_period).mean())
+
+
+# INDICATOR_PARAMS the built-in nodes were last built with
+_builtin_params = None
+_builtin_lock = threading.Lock()
+
+
+def _sync_builtin_indicators():
+    # Windows are baked into the built-in nodes (and the shared intermediates'
+    # names), so rebuild them whenever INDICATOR_PARAMS is changed at runtime
+    global _builtin_params
+    if _builtin_params == INDICATOR_PARAMS:
+        return
+    with _builtin_lock:
+        if _builtin_params != INDICATOR_PARAMS:
+            params = dict(INDICATOR_PARAMS)
+            _register_builtin_indicators(params, overwrite=_builtin_params is not None)
+            _builtin_params = params
+
+
+_sync_builtin_indicators()
+add_refresh_hook(_sync_builtin_indicators)
+
+# Columns added by add_technical_indicators (in output order)
+TECHNICAL_INDICATORS = [
+    'MA_20', 'MA_50', 'MA_200', 'EMA_12', 'EMA_26', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width', 'BB_Percent', 'RSI',
+    'Volatility_20', 'Volatility_50', 'ATR', 'Stochastic_K', 'Stochastic_D'
+]
+
+
+@timed('indicators.identify_signals')
+@memoize('indicators.identify_signals')
 def identify_signals(data):
     """
     Identify buy/sell signals based on technical indicators.
@@ -0,0 +1,275 @@
+"""
+Compiled indicator kernels.
+
+Numba is optional: when it is installed the loop kernels below are JIT
+compiled, otherwise the same Python functions run as-is (and the kernels
+that vectorize cleanly use a pure-NumPy path). True range and rolling
+min/max are bit-identical in both paths. Wilder smoothing is not: without
+Numba it runs on pandas' compiled EWM, which evaluates the update as a
+weighted average rather than (s * (period - 1) + x) / period, so results
+can differ from the loop kernel in the last few bits (relative error
+around 1e-15).
+"""
+import importlib.util
+import logging
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Numba itself is imported (and each kernel compiled) on the first kernel
+# call, so importing the indicator modules stays cheap at app start-up
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def _jit(func):
+    if not NUMBA_AVAILABLE:
+        return func
+    compiled = None
+
+    @wraps(func)
+    def kernel(*args):
+        nonlocal compiled
+        if compiled is None:
+            import numba
+            compiled = numba.njit(cache=True, nogil=True)(func)
+        return compiled(*args)
+    return kernel
+
+
+def _wilder_smooth_loop(values, period, out):
+    # Seed with the simple mean of the first `period` valid values (placed at
+    # the last of them), then apply s_t = (s_{t-1} * (period - 1) + x_t) / period;
+    # NaNs anywhere carry the previous value forward.
+    n = len(values)
+    total = 0.0
+    count = 0
+    i = 0
+    while i < n and count < period:
+        if not np.isnan(values[i]):
+            total += values[i]
+            count += 1
+        i += 1
+    if count < period:
+        return out
+
+    smoothed = total / period
+    out[i - 1] = smoothed
+    for j in range(i, n):
+        value = values[j]
+        if not np.isnan(value):
+            smoothed = (smoothed * (period - 1) + value) / period
+        out[j] = smoothed
+    return out
+
+
+def _true_range_loop(high, low, close, out):
+    # Fused high-low / |high-prev close| / |low-prev close| maximum
+    out[0] = high[0] - low[0]
+    for i in range(1, len(high)):
+        prev_close = close[i - 1]
+        high_low = high[i] - low[i]
+        high_close = abs(high[i] - prev_close)
+        low_close = abs(low[i] - prev_close)
+        # Same NaN-skipping semantics as np.fmax
+        best = high_low
+        if np.isnan(best) or high_close > best:
+            best = high_close
+        if np.isnan(best) or low_close > best:
+            best = low_close
+        out[i] = best
+    return out
+
+
+def _rolling_min_max_loop(low, high, window, out_min, out_max):
+    # Single pass monotonic-deque rolling min of `low` and max of `high`;
+    # a NaN in a column's window yields NaN for that column only
+    # (pandas min_periods=window).
+    n = len(low)
+    min_idx = np.empty(n, dtype=np.int64)
+    max_idx = np.empty(n, dtype=np.int64)
+    min_head = min_tail = 0
+    max_head = max_tail = 0
+    last_nan_low = -1
+    last_nan_high = -1
+
+    for i in range(n):
+        lo = low[i]
+        hi = high[i]
+        if np.isnan(lo):
+            last_nan_low = i
+        else:
+            while min_tail > min_head and low[min_idx[min_tail - 1]] >= lo:
+                min_tail -= 1
+            min_idx[min_tail] = i
+            min_tail += 1
+        if np.isnan(hi):
+            last_nan_high = i
+        else:
+            while max_tail > max_head and high[max_idx[max_tail - 1]] <= hi:
+                max_tail -= 1
+            max_idx[max_tail] = i
+            max_tail += 1
+
+        while min_tail > min_head and min_idx[min_head] <= i - window:
+            min_head += 1
+        while max_tail > max_head and max_idx[max_head] <= i - window:
+            max_head += 1
+
+        if i >= window - 1:
+            if last_nan_low <= i - window:
+                out_min[i] = low[min_idx[min_head]]
+            if last_nan_high <= i - window:
+                out_max[i] = high[max_idx[max_head]]
+    return out_min, out_max
+
+
+_wilder_smooth_kernel = _jit(_wilder_smooth_loop)
+_true_range_kernel = _jit(_true_range_loop)
+_rolling_min_max_kernel = _jit(_rolling_min_max_loop)
+
+
+def _as_float_array(values):
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def wilder_smooth(values, period):
+    """
+    Wilder's smoothing (an EMA with alpha = 1/period seeded by a simple mean).
+
+    Args:
+        values (array-like): Input values (NaNs are skipped)
+        period (int): Smoothing period
+
+    Returns:
+        np.ndarray: Smoothed values (NaN until `period` valid values are seen)
+    """
+    values = _as_float_array(values)
+    period = int(period)
+    out = np.full(len(values), np.nan)
+
+    if NUMBA_AVAILABLE:
+        return _wilder_smooth_kernel(values, period, out)
+
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+    seed_at = valid[period - 1]
+    # Wilder's recursion via pandas' compiled EWM (ignore_na=True decays only
+    # on observations and carries NaNs forward). Not bit-identical to
+    # _wilder_smooth_loop: the seed is a pairwise sum and the update is
+    # rearranged, so the two agree only to floating-point rounding
+    series = values[seed_at:].copy()
+    series[0] = values[valid[:period]].sum() / period
+    out[seed_at:] = pd.Series(series).ewm(alpha=1 / period, adjust=False, ignore_na=True).mean().to_numpy()
+    return out
+
+
+def true_range(high, low, close):
+    """
+    True range in one fused pass.
+
+    Args:
+        high (array-like): High prices
+        low (array-like): Low prices
+        close (array-like): Close prices (the previous bar's close is used)
+
+    Returns:
+        np.ndarray: True range (first bar is high - low)
+    """
+    high, low, close = _as_float_array(high), _as_float_array(low), _as_float_array(close)
+    if len(high) == 0:
+        return np.empty(0)
+
+    if NUMBA_AVAILABLE:
+        return _true_range_kernel(high, low, close, np.empty(len(high)))
+
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def rolling_min_max(low, high=None, window=14):
+    """
+    Rolling minimum of `low` and rolling maximum of `high` in a single pass.
+
+    Args:
+        low (array-like): Series to take the rolling minimum of
+        high (array-like): Series to take the rolling maximum of (default: `low`)
+        window (int): Window length
+
+    Returns:
+        tuple: (rolling_min, rolling_max) arrays, NaN until the window is full
+    """
+    low = _as_float_array(low)
+    high = low if high is None else _as_float_array(high)
+    n = len(low)
+    out_min = np.full(n, np.nan)
+    out_max = np.full(n, np.nan)
+    if n < window:
+        return out_min, out_max
+
+    if NUMBA_AVAILABLE:
+        return _rolling_min_max_kernel(low, high, int(window), out_min, out_max)
+
+    # np.min/np.max propagate NaN, matching the kernel's NaN-window rule
+    out_min[window - 1:] = np.lib.stride_tricks.sliding_window_view(low, window).min(axis=1)
+    out_max[window - 1:] = np.lib.stride_tricks.sliding_window_view(high, window).max(axis=1)
+    return out_min, out_max
+
+
+def wilder_rsi(close, period=14):
+    """
+    RSI with Wilder smoothing of average gains and losses.
+
+    Args:
+        close (array-like): Close prices
+        period (int): RSI period
+
+    Returns:
+        np.ndarray: RSI values (0-100)
+    """
+    close = _as_float_array(close)
+    delta = np.empty(len(close))
+    if len(close):
+        delta[0] = np.nan
+        delta[1:] = close[1:] - close[:-1]
+    return rsi_from_delta_wilder(delta, period)
+
+
+def rsi_from_delta_wilder(delta, period=14):
+    """
+    Wilder RSI from precomputed price changes.
+
+    Args:
+        delta (array-like): Close-to-close changes (first value NaN)
+        period (int): RSI period
+
+    Returns:
+        np.ndarray: RSI values (0-100)
+    """
+    delta = _as_float_array(delta)
+    gain = np.where(np.isnan(delta), np.nan, np.where(delta > 0, delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.where(delta < 0, -delta, 0.0))
+    avg_gain = wilder_smooth(gain, period)
+    avg_loss = wilder_smooth(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def wilder_atr(high, low, close, period=14):
+    """
+    Average True Range with Wilder smoothing.
+
+    Args:
+        high (array-like): High prices
+        low (array-like): Low prices
+        close (array-like): Close prices
+        period (int): ATR period
+
+    Returns:
+        np.ndarray: ATR values
+    """
+    return wilder_smooth(true_range(high, low, close), period)
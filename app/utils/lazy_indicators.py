@@ -0,0 +1,69 @@
+import logging
+
+from .indicator_graph import INDICATOR_REGISTRY, evaluate_indicators, list_indicators
+from .indicators import TECHNICAL_INDICATORS
+
+logger = logging.getLogger(__name__)
+
+
+class LazyIndicatorFrame:
+    """
+    Stock data whose indicator columns are computed on first access.
+
+    Base columns (OHLCV, returns, and any indicators already stored) are read
+    straight from the wrapped frame. Other indicators are evaluated through
+    the indicator dependency graph only when requested, and every node
+    computed along the way (shared rolling means/stds, price deltas, true
+    range) is memoized, so e.g. MA_20 and BB_Middle share one rolling pass.
+
+    Example:
+        lazy = LazyIndicatorFrame(data)
+        lazy['RSI']                             # computes delta + RSI only
+        lazy.materialize(['MA_20', 'BB_Upper'])  # DataFrame with just those
+    """
+
+    def __init__(self, data):
+        self.data = data
+        # Stored indicator columns count as already-computed graph nodes
+        self._cache = {col: data[col] for col in data.columns if col in INDICATOR_REGISTRY}
+
+    @property
+    def columns(self):
+        """All base and indicator columns available from this frame."""
+        return list(self.data.columns) + [name for name in list_indicators() if name not in self.data.columns]
+
+    @property
+    def computed_columns(self):
+        """Indicator columns computed so far."""
+        return [name for name in self._cache
+                if INDICATOR_REGISTRY[name].public and name not in self.data.columns]
+
+    def __contains__(self, name):
+        return name in self.data.columns or name in INDICATOR_REGISTRY
+
+    def __getitem__(self, name):
+        if name in self.data.columns:
+            return self.data[name]
+        if name not in INDICATOR_REGISTRY:
+            raise KeyError(name)
+        return evaluate_indicators(self.data, [name], cache=self._cache)[name]
+
+    def materialize(self, columns=None):
+        """
+        Build a regular DataFrame with the base columns plus requested indicators.
+
+        Args:
+            columns (list): Indicator names to compute (default: the
+                `add_technical_indicators` set)
+
+        Returns:
+            pd.DataFrame: Base data with the requested indicator columns
+        """
+        if columns is None:
+            columns = TECHNICAL_INDICATORS
+
+        df = self.data.copy()
+        missing = [name for name in columns if name not in df.columns]
+        for name, values in evaluate_indicators(self.data, missing, cache=self._cache).items():
+            df[name] = values
+        return df
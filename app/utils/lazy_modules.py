@@ -0,0 +1,52 @@
+"""
+Deferred imports for heavy optional-at-startup dependencies.
+
+`lazy_import("yfinance")` returns a module stand-in that performs the real
+import on first attribute access, so importing the dashboard modules does
+not pay for yfinance or plotly.express until a download or figure is made.
+Attribute assignment (e.g. monkeypatching `yf.download` in tests) is
+forwarded to the real module.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports `name` when an attribute is first used."""
+
+    def _load(self):
+        # importlib's per-module locks make concurrent first uses safe
+        return importlib.import_module(self.__name__)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Import a module on first use.
+    
+    Args:
+        name (str): Absolute module name
+    
+    Returns:
+        module: The module itself if already imported, otherwise a `LazyModule`
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -0,0 +1,489 @@
+"""
+Content-addressed memoization for pure analytics functions.
+
+Results are keyed by a fingerprint of the call's inputs: the raw buffers of
+every DataFrame/Series/array argument (values, index, dtypes, names) plus
+any parameters the function reads from config. Identical data therefore
+hits the cache no matter which session, rerun or loader produced the frame,
+and changed data can never be served a stale result.
+
+The memory tier is an LRU bounded in bytes (`MEMO_MAX_BYTES`). When
+`MEMO_DISK_DIR` is set, computed results are also written there (pickle,
+pruned oldest-first beyond `MEMO_DISK_MAX_BYTES`), so other worker
+processes and restarts reuse them, and entries evicted from memory are
+still a disk read away. Keys include a hash of the app's source files, so
+a code change (including to a helper the function calls) starts a fresh
+set of disk entries; old ones are pruned as the tier fills.
+
+Example:
+    @memoize('metrics.get_summary_statistics', params=lambda: TRADING_DAYS_PER_YEAR)
+    def get_summary_statistics(data):
+        ...
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+import types
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+import numpy as np
+import pandas as pd
+
+from .config import MEMO_DISK_DIR, MEMO_DISK_MAX_BYTES, MEMO_ENABLED, MEMO_MAX_BYTES
+from .net import SingleFlight
+from .profiling import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Per-item overhead assumed for containers when estimating entry sizes
+_ITEM_OVERHEAD = 64
+
+
+def _feed(digest, value):
+    # Type tags keep e.g. a list and a tuple (or 1 and '1') from colliding
+    if isinstance(value, pd.DataFrame):
+        dtypes = value.dtypes.to_numpy()
+        digest.update(b'F' + repr([_dtype_name(dtype) for dtype in dtypes]).encode())
+        _feed(digest, value.index)
+        _feed(digest, value.columns)
+        if all(isinstance(dtype, np.dtype) and not dtype.hasobject for dtype in dtypes):
+            # One 2-D buffer per dtype instead of a Series per column
+            unique = dict.fromkeys(dtypes)
+            for dtype in unique:
+                block = value if len(unique) == 1 else value.loc[:, dtypes == dtype]
+                _feed(digest, block.to_numpy())
+        else:
+            for position in range(value.shape[1]):
+                _feed(digest, value.iloc[:, position].array)
+    elif isinstance(value, pd.Series):
+        digest.update(b'S')
+        _feed(digest, value.name)
+        _feed(digest, value.index)
+        _feed(digest, value.array)
+    elif isinstance(value, pd.Index):
+        digest.update(b'I')
+        _feed(digest, value.names)
+        _feed(digest, value.array if not isinstance(value, pd.MultiIndex) else value.to_flat_index().array)
+    elif isinstance(value, pd.api.extensions.ExtensionArray):
+        if hasattr(value, 'asi8'):
+            # Datetime/timedelta/period: integer ticks plus dtype (unit, tz, freq)
+            digest.update(b'T' + f'{value.dtype}'.encode())
+            _feed(digest, value.asi8)
+        else:
+            _feed(digest, value.to_numpy())
+    elif isinstance(value, np.ndarray):
+        digest.update(b'A' + f'{value.dtype.str}{value.shape}'.encode())
+        if value.dtype.hasobject:
+            digest.update(repr(value.ravel().tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(value).view(np.uint8).data)
+    elif isinstance(value, dict):
+        digest.update(b'D%d' % len(value))
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update((b'L' if isinstance(value, list) else b'U') + b'%d' % len(value))
+        for item in value:
+            _feed(digest, item)
+    else:
+        digest.update(b'V' + f'{type(value).__name__}:{value!r}'.encode())
+
+
+def _dtype_name(dtype):
+    return dtype.str if isinstance(dtype, np.dtype) else str(dtype)
+
+
+def fingerprint(*values):
+    """
+    Content hash of arbitrary (nested) call inputs.
+
+    DataFrames, Series and arrays are hashed from their buffers, so two
+    frames with equal values, index, column names and dtypes match even if
+    they are different objects.
+
+    Args:
+        *values: Frames, series, arrays, containers and plain scalars
+
+    Returns:
+        str: Hex digest (128 bit)
+    """
+    digest = hashlib.sha256()  # hardware-accelerated on most CPUs
+    for value in values:
+        _feed(digest, value)
+    return digest.hexdigest()[:32]
+
+
+def estimate_bytes(value):
+    """
+    Approximate memory held by a cached result.
+
+    Args:
+        value: Result object
+
+    Returns:
+        int: Bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) + _ITEM_OVERHEAD for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(v) + _ITEM_OVERHEAD for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    # Callers own what they get back; the cached object must not be mutated
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class MemoCache:
+    """
+    Byte-bounded LRU of computed results with an optional on-disk tier.
+
+    Args:
+        max_bytes (int): Memory budget for cached results
+        disk_dir (str): Directory for the disk tier (None: memory only)
+        disk_max_bytes (int): Disk budget; the oldest files are removed beyond it
+    """
+
+    def __init__(self, max_bytes=None, disk_dir=None, disk_max_bytes=None):
+        self.max_bytes = MEMO_MAX_BYTES if max_bytes is None else max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = MEMO_DISK_MAX_BYTES if disk_max_bytes is None else disk_max_bytes
+        self._entries = OrderedDict()  # key -> (value, bytes)
+        self._bytes = 0
+        self._disk_bytes = None  # scanned lazily
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """Estimated bytes held in memory."""
+        return self._bytes
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Args:
+            key (str): Fingerprint
+
+        Returns:
+            tuple: (found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+
+        found, value = self._read_disk(key)
+        with self._lock:
+            if found:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+        if found:
+            self._remember(key, value)
+        return found, value
+
+    def put(self, key, value):
+        """
+        Store a result in memory (and on disk when the disk tier is enabled).
+
+        Args:
+            key (str): Fingerprint
+            value: Result (must be picklable for the disk tier)
+        """
+        self._remember(key, value)
+        if self.disk_dir is not None:
+            self._write_disk(key, value)
+
+    def clear(self, disk=False):
+        """
+        Drop all cached results.
+
+        Args:
+            disk (bool): Also delete the disk tier's files
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+        if disk and self.disk_dir is not None:
+            for path, _, _ in self._disk_files():
+                _remove(path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        """
+        Cache counters.
+
+        Returns:
+            dict: Entries, Bytes, Hits, Disk_Hits, Misses and Hit_Rate
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'Entries': len(self._entries),
+                'Bytes': self._bytes,
+                'Hits': self.hits,
+                'Disk_Hits': self.disk_hits,
+                'Misses': self.misses,
+                'Hit_Rate': (self.hits + self.disk_hits) / lookups if lookups else np.nan
+            }
+
+    def _remember(self, key, value):
+        size = estimate_bytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return False, None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                value = pickle.load(handle)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable memo entry {path}: {str(e)}")
+            _remove(path)
+            return False, None
+        try:
+            os.utime(path)  # recently used files are pruned last
+        except OSError:
+            pass
+        return True, value
+
+    def _write_disk(self, key, value):
+        path = self._path(key)
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Memo result for {key} is not picklable: {str(e)}")
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial file
+            temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, 'wb') as handle:
+                handle.write(payload)
+            os.replace(temp, path)
+        except OSError as e:
+            logger.warning(f"Could not write memo entry {path}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += len(payload)
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._prune_disk()
+
+    def _disk_files(self):
+        files = []
+        for folder, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith('.pkl'):
+                    path = os.path.join(folder, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _prune_disk(self):
+        # Remove least recently used files down to 80% of the budget
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * 0.8
+        for path, size, _ in files:
+            if total <= target:
+                break
+            if _remove(path):
+                total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_flight = SingleFlight()
+
+
+def get_memo_cache():
+    """Process-wide cache shared by all `memoize`d functions."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MemoCache(disk_dir=MEMO_DISK_DIR)
+        return _cache
+
+
+def clear_memo_cache(disk=False):
+    """
+    Drop memoized results.
+
+    Args:
+        disk (bool): Also delete the disk tier's files
+    """
+    get_memo_cache().clear(disk=disk)
+
+
+@lru_cache(maxsize=1)
+def code_version():
+    """
+    Hash of every Python source file of the app package (computed once).
+
+    Returns:
+        str: Hex digest that changes with any code change in the package
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _code_digest(code):
+    # Bytecode, constants and referenced names of a function and its nested code
+    digest = hashlib.blake2b(digest_size=8)
+    stack = [code]
+    while stack:
+        code = stack.pop()
+        nested = [const for const in code.co_consts if isinstance(const, types.CodeType)]
+        digest.update(code.co_code)
+        digest.update(repr([const for const in code.co_consts if not isinstance(const, types.CodeType)]).encode())
+        digest.update(repr(code.co_names).encode())
+        stack.extend(nested)
+    return digest.hexdigest()
+
+
+def function_digest(func, _seen=None):
+    """
+    Hash of what a function computes: its code plus the values it closes over.
+
+    Two lambdas built by the same factory with different arguments (e.g. a
+    rolling window) therefore differ, and re-registering a callback with new
+    code changes the digest. Module-level helpers it calls are covered by
+    `code_version()`.
+
+    Args:
+        func (callable): Function, lambda or other callable
+
+    Returns:
+        str: Hex digest
+    """
+    code = getattr(func, '__code__', None)
+    if code is None:
+        # Builtins, partials and callable objects: fall back to their repr
+        return fingerprint(repr(func))
+    seen = set() if _seen is None else _seen
+    seen.add(id(func))
+    cells = []
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # cell not filled yet
+            value = None
+        if callable(value):
+            value = 'self' if id(value) in seen else function_digest(value, seen)
+        cells.append(value)
+    return fingerprint(func.__module__, func.__qualname__, _code_digest(code), func.__defaults__, cells)
+
+
+def memoize(stage, params=None):
+    """
+    Decorator caching a pure function by the content of its arguments.
+
+    The key covers the function (module, name, bytecode and constants),
+    `code_version()` (so editing the function or any app module it calls
+    never reads old disk entries), every positional and keyword argument,
+    and `params()`, which should return the config values the function
+    reads. Results are returned as copies. Concurrent calls with the same
+    key compute once. Hits and misses are recorded under `stage` in
+    app.utils.profiling.
+
+    Args:
+        stage (str): Stage name for cache statistics
+        params (callable): Zero-argument function returning extra key material
+    """
+    def decorator(func):
+        code = getattr(func, '__code__', None)
+        namespace = (func.__module__, func.__qualname__, _code_digest(code) if code else None, code_version())
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not MEMO_ENABLED:
+                return func(*args, **kwargs)
+
+            key = fingerprint(namespace, args, kwargs, params() if params is not None else None)
+            cache = get_memo_cache()
+            found, value = cache.get(key)
+            record_cache(stage, hit=found)
+            if found:
+                return _copy(value)
+
+            def compute():
+                # A fresh copy is consolidated, which makes the copies served on hits cheap
+                result = _copy(func(*args, **kwargs))
+                cache.put(key, result)
+                return result
+
+            result, _ = _flight.do(key, compute)
+            return _copy(result)
+        return wrapper
+    return decorator
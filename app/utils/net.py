@@ -0,0 +1,267 @@
+"""
+Network plumbing shared by the data providers.
+
+- `SingleFlight` coalesces concurrent identical requests: the first caller
+  runs the fetch, later callers with the same key wait for and share its
+  result (or exception) instead of issuing their own request.
+- `TokenBucket` limits the request rate per provider (`PROVIDER_RATE_LIMITS`),
+  blocking callers until a token is available.
+- `get_http_session` returns one process-wide `requests.Session` with a
+  pooled, retrying adapter; `http_get` combines all three.
+"""
+import logging
+import threading
+import time
+
+from .config import HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_TIMEOUT, HTTP_USER_AGENT, PROVIDER_RATE_LIMITS
+from .lazy_modules import lazy_import
+
+# Only needed once the first HTTP request is made
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    short bursts pass immediately and sustained load is held to `rate`.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens without waiting.
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Take tokens, sleeping until they are available.
+
+        Args:
+            tokens (float): Tokens to take (at most `capacity`)
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            TimeoutError: If the tokens are not available within `timeout`
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity:g}")
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            if timeout is not None and waited + delay > timeout:
+                raise TimeoutError(f"Rate limit wait exceeded {timeout}s")
+            self._sleep(delay)
+            waited += delay
+
+
+class _Call:
+    # One in-flight fetch and the callers waiting on it
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    Example:
+        flight = SingleFlight()
+        data, shared = flight.do(("AAPL", "1y", "1d"), lambda: download("AAPL"))
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key (hashable): Request identity
+            fn (callable): Zero-argument fetch
+
+        Returns:
+            tuple: (result, shared) where shared is True for callers that
+                received another caller's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """Number of keys currently being fetched."""
+        with self._lock:
+            return len(self._calls)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+_http_flight = SingleFlight()
+
+
+def rate_limiter(provider):
+    """
+    Shared token bucket of a provider (see `PROVIDER_RATE_LIMITS`).
+
+    Args:
+        provider (str): Provider name, e.g. 'yahoo' or 'http'
+
+    Returns:
+        TokenBucket: The provider's bucket, or None if it is not rate limited
+    """
+    limits = PROVIDER_RATE_LIMITS.get(provider)
+    if limits is None:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            bucket = _buckets[provider] = TokenBucket(limits['rate'], limits['burst'])
+        return bucket
+
+
+def throttle(provider):
+    """
+    Block until the provider's rate limit allows one more request.
+
+    Args:
+        provider (str): Provider name
+
+    Returns:
+        float: Seconds spent waiting
+    """
+    bucket = rate_limiter(provider)
+    if bucket is None:
+        return 0.0
+    waited = bucket.acquire()
+    if waited > 0:
+        logger.debug(f"Rate limited {provider} request for {waited:.2f}s")
+    return waited
+
+
+def get_http_session():
+    """
+    Process-wide `requests.Session` with a pooled, retrying adapter.
+
+    Reusing one session keeps TCP/TLS connections alive across requests
+    instead of reconnecting for every call.
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=frozenset(['GET', 'HEAD']))
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = HTTP_USER_AGENT
+            _session = session
+        return _session
+
+
+def http_get(url, params=None, provider='http', timeout=HTTP_TIMEOUT):
+    """
+    Rate-limited, coalesced GET through the shared session.
+
+    Concurrent calls for the same URL and parameters share one request.
+
+    Args:
+        url (str): URL to fetch
+        params (dict): Query parameters
+        provider (str): Rate-limit bucket to draw from
+        timeout (float): Request timeout in seconds
+
+    Returns:
+        requests.Response: Response with its body already read
+
+    Raises:
+        requests.RequestException: On connection errors or HTTP error statuses
+    """
+    key = (url, tuple(sorted((params or {}).items())))
+
+    def fetch():
+        throttle(provider)
+        response = get_http_session().get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        response.content  # read the body so waiters can share the response
+        return response
+
+    response, _ = _http_flight.do(key, fetch)
+    return response
+
+
+def reset_network_state():
+    """Close the shared session and drop rate-limit buckets (tests, config changes)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    with _buckets_lock:
+        _buckets.clear()
@@ -0,0 +1,311 @@
+"""
+Ingestion of Nairobi Securities Exchange daily price lists.
+
+NSE publishes one price list per trading day (HTML pages, or PDFs exported
+to HTML tables). Each list has one row per security with the day's low,
+high, closing price, previous close and volume; opening prices are not
+published, so Open is taken as the previous close.
+
+Pages are parsed with a streaming lxml parser (rows are processed and
+discarded as they are read, so memory does not grow with the page size),
+normalized into per-ticker daily OHLCV bars and appended incrementally to
+the local store and to the CSVs read by `get_local_kenyan_data`.
+"""
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+from .config import (
+    KENYA_TICKERS, NSE_ARCHIVE_DIR, NSE_INGEST_PARALLEL_MIN_FILES, NSE_INGEST_WORKERS, NSE_PROCESSED_DIR,
+    QUALITY_ENABLED, STORE_DIR
+)
+from . import store
+from .net import http_get
+from .quality import validate_append
+from .profiling import timed
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Normalized header text -> field (headers such as "12 Month High" are ignored)
+COLUMN_ALIASES = {
+    'code': 'Ticker', 'ticker': 'Ticker', 'symbol': 'Ticker', 'security code': 'Ticker',
+    'company': 'Company', 'security': 'Company', 'name': 'Company', 'company name': 'Company',
+    'open': 'Open', 'day open': 'Open', 'opening price': 'Open',
+    'high': 'High', 'day high': 'High', 'high price': 'High',
+    'low': 'Low', 'day low': 'Low', 'low price': 'Low',
+    'close': 'Close', 'price': 'Close', 'day price': 'Close', 'closing price': 'Close', 'vwap': 'Close',
+    'previous': 'Previous', 'prev': 'Previous', 'prev close': 'Previous', 'previous close': 'Previous',
+    'previous price': 'Previous',
+    'volume': 'Volume', 'vol': 'Volume', 'shares traded': 'Volume', 'volume traded': 'Volume'
+}
+
+# Friendly names from config, matched on the first word of the company cell
+_COMPANY_CODES = {name.split()[0].lower(): code for name, code in KENYA_TICKERS.items()}
+
+_MONTHS = {name: i + 1 for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])}
+_MONTH = r'((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*)'
+# (pattern, order of the year/month/day groups)
+_DATE_PATTERNS = [
+    (re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)'), 'ymd'),
+    (re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?[\s\-]+{_MONTH}[\s\-,]+(\d{{4}})\b', re.IGNORECASE), 'dmy'),
+    (re.compile(rf'\b{_MONTH}\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b', re.IGNORECASE), 'mdy'),
+    (re.compile(r'(?<!\d)(\d{1,2})/(\d{1,2})/(\d{4})(?!\d)'), 'dmy'),
+    (re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'), 'ymd')
+]
+_HEADER_NOISE = re.compile(r'\(.*?\)|[^a-z0-9() ]')
+_SPACES = re.compile(r'\s+')
+_HEADING_TAGS = {'title', 'h1', 'h2', 'h3', 'h4', 'caption', 'p', 'div', 'span'}
+_MANIFEST = 'nse_manifest.json'
+
+
+def _parse_date(text):
+    # First recognizable date in free text (numeric forms are day-first)
+    for pattern, order in _DATE_PATTERNS:
+        for match in pattern.finditer(text or ''):
+            parts = dict(zip(order, match.groups()))
+            month = parts['m']
+            month = int(month) if month.isdigit() else _MONTHS.get(month[:3].lower())
+            try:
+                return pd.Timestamp(year=int(parts['y']), month=month, day=int(parts['d']))
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def _number(text):
+    # "1,234.50" -> 1234.5; blanks and dashes (no trades) -> NaN
+    text = (text or '').strip().replace(',', '').replace('KES', '').strip()
+    if text in ('', '-', '--', 'N/A', 'n/a'):
+        return np.nan
+    negative = text.startswith('(') and text.endswith(')')
+    try:
+        value = float(text.strip('()'))
+    except ValueError:
+        return np.nan
+    return -value if negative else value
+
+
+def _header_map(cells):
+    # Column position -> field for a header row (None if it is not one)
+    fields = {}
+    for i, cell in enumerate(cells):
+        key = _SPACES.sub(' ', _HEADER_NOISE.sub(' ', cell.lower())).strip()
+        field = COLUMN_ALIASES.get(key)
+        if field is not None and field not in fields.values():
+            fields[i] = field
+    has_name = 'Ticker' in fields.values() or 'Company' in fields.values()
+    return fields if has_name and 'Close' in fields.values() else None
+
+
+def _ticker_for(record):
+    code = (record.get('Ticker') or '').strip().upper()
+    if code:
+        return code
+    company = (record.get('Company') or '').strip()
+    return _COMPANY_CODES.get(company.split()[0].lower()) if company else None
+
+
+def parse_price_list(source, date=None):
+    """
+    Parse one daily price list into OHLCV rows.
+
+    Rows are streamed with `lxml.etree.iterparse` and cleared once read.
+    The trading date is taken from `date`, else from the page headings,
+    else from the file name.
+
+    Args:
+        source (str or file-like): Path to (or open binary file of) an HTML page
+        date (datetime-like): Trading date, if known
+
+    Returns:
+        pd.DataFrame: Columns Date, Ticker, Open, High, Low, Close, Volume
+            (empty if no price table or date was found)
+    """
+    date = pd.Timestamp(date).normalize() if date is not None else None
+    page_date = None
+    fields = None
+    records = []
+
+    for _, element in etree.iterparse(source, events=('end',), html=True, recover=True):
+        tag = element.tag if isinstance(element.tag, str) else ''
+        if tag == 'tr':
+            cells = [' '.join(cell.itertext()).strip() for cell in element if cell.tag in ('td', 'th')]
+            # Only rows before a table's header (or made of <th> cells) can start one
+            header = _header_map(cells) if fields is None or element.find('th') is not None else None
+            if header is not None:
+                fields = header
+            elif fields is not None and cells:
+                record = {field: cells[i] for i, field in fields.items() if i < len(cells)}
+                ticker = _ticker_for(record)
+                if ticker:
+                    records.append((ticker, *(_number(record.get(field)) for field in
+                                              ('Open', 'High', 'Low', 'Close', 'Previous', 'Volume'))))
+            # Rows are consumed; free them and any already-processed siblings
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        elif tag in _HEADING_TAGS and page_date is None and date is None:
+            page_date = _parse_date(' '.join(element.itertext()))
+        elif tag == 'table':
+            fields = None
+
+    if date is None:
+        date = page_date
+    if date is None and isinstance(source, str):
+        date = _parse_date(os.path.basename(source))
+    if date is None or not records:
+        if records:
+            logger.warning(f"No trading date found in {source}, skipping {len(records)} rows")
+        return pd.DataFrame(columns=['Date', 'Ticker'] + BAR_COLUMNS)
+
+    rows = pd.DataFrame(records, columns=['Ticker', 'Open', 'High', 'Low', 'Close', 'Previous', 'Volume'])
+    rows = rows[rows['Close'].notna()]
+    # Price lists carry no opening price; the previous close is the closest proxy
+    rows['Open'] = rows['Open'].fillna(rows['Previous']).fillna(rows['Close'])
+    rows['High'] = rows['High'].fillna(rows[['Open', 'Close']].max(axis=1))
+    rows['Low'] = rows['Low'].fillna(rows[['Open', 'Close']].min(axis=1))
+    rows['Volume'] = rows['Volume'].fillna(0.0)
+    rows.insert(0, 'Date', date)
+    return rows.drop(columns='Previous').drop_duplicates('Ticker', keep='last').reset_index(drop=True)
+
+
+def _parse_file(path):
+    # Worker entry point: errors are logged, not raised, so one bad page
+    # does not abort a multi-year ingest
+    try:
+        return parse_price_list(path)
+    except Exception as e:
+        logger.error(f"Error parsing NSE price list {path}: {str(e)}")
+        return None
+
+
+def _fingerprint(path):
+    info = os.stat(path)
+    return [info.st_size, info.st_mtime_ns]
+
+
+def _load_manifest(root):
+    path = os.path.join(root, _MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(root, manifest):
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, _MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def archived_pages(archive_dir=NSE_ARCHIVE_DIR):
+    """
+    Price-list pages in the archive directory (recursive), oldest name first.
+
+    Args:
+        archive_dir (str): Directory of saved .html/.htm pages
+
+    Returns:
+        list: File paths
+    """
+    paths = []
+    for folder, _, files in os.walk(archive_dir):
+        paths.extend(os.path.join(folder, name) for name in files if name.lower().endswith(('.html', '.htm')))
+    return sorted(paths)
+
+
+def download_price_list(url, date, archive_dir=NSE_ARCHIVE_DIR):
+    """
+    Save one price-list page into the archive (rate limited as 'nse').
+
+    Args:
+        url (str): Page URL
+        date (datetime-like): Trading date (used for the file name)
+        archive_dir (str): Archive directory
+
+    Returns:
+        str: Path of the saved page
+    """
+    date = pd.Timestamp(date)
+    folder = os.path.join(archive_dir, str(date.year))
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{date:%Y-%m-%d}.html")
+    response = http_get(url, provider='nse')
+    with open(path, 'wb') as f:
+        f.write(response.content)
+    return path
+
+
+@timed('nse_ingest.ingest')
+def ingest_price_lists(paths=None, store_root=None, csv_dir=NSE_PROCESSED_DIR, max_workers=NSE_INGEST_WORKERS,
+                       force=False):
+    """
+    Parse archived price lists and append the bars to the store and CSVs.
+
+    Pages already ingested (same size and modification time, tracked in a
+    manifest in the store root) are skipped unless `force` is set, so
+    re-running over a growing archive only parses new pages. Large batches
+    are parsed in a process pool.
+
+    Args:
+        paths (list): Page paths (default: every page in NSE_ARCHIVE_DIR)
+        store_root (str): Store root directory (default from config)
+        csv_dir (str): Output directory for per-ticker CSVs (None to skip)
+        max_workers (int): Process pool size (batches below
+            NSE_INGEST_PARALLEL_MIN_FILES pages are parsed in-process)
+        force (bool): Re-parse pages already in the manifest
+
+    Returns:
+        pd.DataFrame: Per-ticker report (New_Bars, Total_Bars, First, Last)
+    """
+    root = store_root or STORE_DIR
+    paths = archived_pages() if paths is None else list(paths)
+    manifest = {} if force else _load_manifest(root)
+    pending = [path for path in paths if manifest.get(os.path.abspath(path)) != _fingerprint(path)]
+    logger.info(f"Ingesting {len(pending)} NSE price lists ({len(paths) - len(pending)} unchanged)")
+    if not pending:
+        return pd.DataFrame(columns=['New_Bars', 'Total_Bars', 'First', 'Last'])
+
+    if max_workers and max_workers > 1 and len(pending) >= NSE_INGEST_PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parsed = list(pool.map(_parse_file, pending, chunksize=max(1, len(pending) // (4 * max_workers))))
+    else:
+        parsed = [_parse_file(path) for path in pending]
+
+    frames = [frame for frame in parsed if frame is not None and not frame.empty]
+    report = {}
+    if frames:
+        rows = pd.concat(frames, ignore_index=True).sort_values('Date', kind='stable')
+        for ticker, bars in rows.groupby('Ticker', sort=True):
+            bars = bars.drop_duplicates('Date', keep='last').set_index('Date')[BAR_COLUMNS]
+            bars.index.name = 'Date'
+            existing = store.read_bars(ticker, '1d', root=root)
+            if QUALITY_ENABLED:
+                bars, _ = validate_append(existing, bars, ticker)
+                if bars.empty:
+                    continue
+            store.append_bars(ticker, '1d', bars, root=root)
+            merged = store.merge_bars(existing, bars)
+            if csv_dir is not None:
+                os.makedirs(csv_dir, exist_ok=True)
+                merged.rename_axis('Date').to_csv(os.path.join(csv_dir, f"{ticker}.csv"))
+            report[ticker] = {'New_Bars': len(bars), 'Total_Bars': len(merged),
+                              'First': merged.index[0], 'Last': merged.index[-1]}
+
+    # Pages that failed to parse are retried on the next run
+    for path, frame in zip(pending, parsed):
+        if frame is not None:
+            manifest[os.path.abspath(path)] = _fingerprint(path)
+    _save_manifest(root, manifest)
+    return pd.DataFrame.from_dict(report, orient='index', columns=['New_Bars', 'Total_Bars', 'First', 'Last'])
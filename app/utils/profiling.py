@@ -0,0 +1,294 @@
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from .config import PROFILING_ENABLED, PROFILING_MAX_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# stage name -> recent (seconds, rows) samples
+_samples = defaultdict(lambda: deque(maxlen=PROFILING_MAX_SAMPLES))
+# stage name -> {'calls', 'total', 'rows', 'hits', 'misses'} running totals
+_totals = defaultdict(lambda: {'calls': 0, 'total': 0.0, 'rows': 0, 'hits': 0, 'misses': 0})
+
+
+def _count_rows(obj):
+    """Best-effort row count for a stage input or output."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(len(v) for v in obj.values() if isinstance(v, (pd.DataFrame, pd.Series)))
+    return None
+
+
+def record_stage(stage, seconds, rows=None):
+    """
+    Record one timed execution of a pipeline stage.
+
+    Args:
+        stage (str): Stage name (e.g. 'data_loader.download')
+        seconds (float): Wall time spent in the stage
+        rows (int): Number of rows processed (optional)
+    """
+    if not PROFILING_ENABLED:
+        return
+
+    with _lock:
+        _samples[stage].append((seconds, rows or 0))
+        totals = _totals[stage]
+        totals['calls'] += 1
+        totals['total'] += seconds
+        totals['rows'] += rows or 0
+
+
+def record_cache(stage, hit):
+    """
+    Record a cache hit or miss for a stage.
+
+    Args:
+        stage (str): Stage name
+        hit (bool): True for a cache hit, False for a miss
+    """
+    if not PROFILING_ENABLED:
+        return
+
+    with _lock:
+        _totals[stage]['hits' if hit else 'misses'] += 1
+
+
+@contextmanager
+def stage_timer(stage, rows=None):
+    """
+    Context manager that times a block and records it under `stage`.
+
+    The yielded dict can be updated with a 'rows' entry once the number
+    of processed rows is known inside the block.
+
+    Args:
+        stage (str): Stage name
+        rows (int): Number of rows processed, if known up front
+    """
+    record = {'rows': rows}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record_stage(stage, time.perf_counter() - start, record.get('rows'))
+
+
+def timed(stage):
+    """
+    Decorator that records wall time and rows processed for a function.
+
+    Rows are taken from the returned DataFrame/Series when there is one,
+    otherwise from the first positional argument.
+
+    Args:
+        stage (str): Stage name
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                # Failing calls are recorded too, so they stay in the stage summary
+                rows = _count_rows(result)
+                if rows is None and args:
+                    rows = _count_rows(args[0])
+                record_stage(stage, time.perf_counter() - start, rows)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def cache_probe(stage):
+    """
+    Time a call to a cached loader and record whether it was a cache hit.
+
+    The cached function body should call `mark_cache_miss()`; since the body
+    only runs on a miss, an unmarked probe is counted as a hit.
+
+    Args:
+        stage (str): Stage name
+    """
+    stack = getattr(_local, 'probes', None)
+    if stack is None:
+        stack = _local.probes = []
+    stack.append(False)
+    try:
+        with stage_timer(stage) as record:
+            yield record
+    finally:
+        missed = stack.pop()
+        record_cache(stage, hit=not missed)
+
+
+def mark_cache_miss():
+    """Flag the innermost active `cache_probe` as a cache miss."""
+    stack = getattr(_local, 'probes', None)
+    if stack:
+        stack[-1] = True
+
+
+def get_stage_summary():
+    """
+    Aggregate timings per stage.
+
+    Returns:
+        pd.DataFrame: One row per stage with call counts, latency percentiles
+            (milliseconds, over the most recent samples), rows processed and
+            cache hit/miss counts
+    """
+    with _lock:
+        snapshot = {stage: (list(_samples[stage]), dict(totals)) for stage, totals in _totals.items()}
+
+    rows = []
+    for stage, (samples, totals) in snapshot.items():
+        times_ms = np.array([s[0] for s in samples]) * 1000
+        has_times = len(times_ms) > 0
+        rows.append({
+            'Stage': stage,
+            'Calls': totals['calls'],
+            'Total_s': totals['total'],
+            'Mean_ms': times_ms.mean() if has_times else np.nan,
+            'P50_ms': np.percentile(times_ms, 50) if has_times else np.nan,
+            'P95_ms': np.percentile(times_ms, 95) if has_times else np.nan,
+            'Max_ms': times_ms.max() if has_times else np.nan,
+            'Rows': totals['rows'],
+            'Cache_Hits': totals['hits'],
+            'Cache_Misses': totals['misses']
+        })
+
+    summary = pd.DataFrame(rows, columns=['Stage', 'Calls', 'Total_s', 'Mean_ms', 'P50_ms', 'P95_ms',
+                                          'Max_ms', 'Rows', 'Cache_Hits', 'Cache_Misses'])
+    return summary.sort_values('Total_s', ascending=False).reset_index(drop=True)
+
+
+def get_stage_histogram(stage, bins=20):
+    """
+    Latency histogram for one stage.
+
+    Args:
+        stage (str): Stage name
+        bins (int): Number of histogram bins
+
+    Returns:
+        pd.DataFrame: Bin edges (ms) and counts, empty if the stage has no samples
+    """
+    with _lock:
+        times_ms = np.array([s[0] for s in _samples.get(stage, ())]) * 1000
+
+    if len(times_ms) == 0:
+        return pd.DataFrame(columns=['Bin_Start_ms', 'Bin_End_ms', 'Count'])
+
+    counts, edges = np.histogram(times_ms, bins=bins)
+    return pd.DataFrame({'Bin_Start_ms': edges[:-1], 'Bin_End_ms': edges[1:], 'Count': counts})
+
+
+def reset_stats():
+    """Clear all recorded timings and cache counters."""
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+
+
+class ProfileCapture:
+    """
+    A running cProfile or pyinstrument capture.
+
+    Use `start_capture()` / `stop()` around code that does not fit in a
+    single `with` block (e.g. a whole Streamlit script run).
+    """
+
+    def __init__(self, engine='cprofile'):
+        self.engine = engine
+        self.report = None
+        self._profiler = None
+
+    def start(self):
+        if self.engine == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument not installed, falling back to cProfile")
+                self.engine = 'cprofile'
+            else:
+                self._profiler = Profiler()
+                self._profiler.start()
+                return self
+
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def stop(self, limit=30):
+        """
+        Stop the capture and build a text report.
+
+        Args:
+            limit (int): Number of functions to include (cProfile only)
+
+        Returns:
+            str: Profile report
+        """
+        if self._profiler is None:
+            return self.report
+
+        if self.engine == 'pyinstrument':
+            self._profiler.stop()
+            self.report = self._profiler.output_text(unicode=True, color=False)
+        else:
+            self._profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+            self.report = stream.getvalue()
+
+        self._profiler = None
+        return self.report
+
+
+def start_capture(engine='cprofile'):
+    """
+    Start a profiler capture.
+
+    Args:
+        engine (str): 'cprofile' (stdlib) or 'pyinstrument' (optional dependency)
+
+    Returns:
+        ProfileCapture: Running capture; call `.stop()` to get the report
+    """
+    return ProfileCapture(engine).start()
+
+
+@contextmanager
+def profile_capture(engine='cprofile'):
+    """
+    Profile a block of code.
+
+    Args:
+        engine (str): 'cprofile' or 'pyinstrument'
+
+    Yields:
+        ProfileCapture: Its `report` attribute is filled in when the block exits
+    """
+    capture = start_capture(engine)
+    try:
+        yield capture
+    finally:
+        capture.stop()
@@ -0,0 +1,352 @@
+"""
+Data-quality checks and repairs for OHLCV bars.
+
+All checks run as vectorized array operations over a "long" table of bars
+(every ticker stacked, sorted by ticker then time), so a whole universe is
+checked in one pass; lagged comparisons never cross ticker boundaries.
+
+Per-bar issues:
+    missing_fields      NaN in any of Open/High/Low/Close/Volume
+    non_positive_price  Open/High/Low/Close <= 0
+    high_low_inverted   High < Low, or Open/Close outside [Low, High]
+    stale_bar           Identical OHLCV to the previous bar
+    volume_spike        Volume above QUALITY_VOLUME_SPIKE x the trailing median
+    split_jump          Close/previous close near a common split ratio
+
+Daily series are also compared with their exchange's trading calendar to
+count missing sessions.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    QUALITY_CONTEXT_BARS, QUALITY_REPAIRS, QUALITY_SPLIT_RATIOS, QUALITY_SPLIT_TOLERANCE,
+    QUALITY_VOLUME_SPIKE, QUALITY_VOLUME_WINDOW
+)
+from .calendars import exchange_for, trading_days
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+ISSUES = ['missing_fields', 'non_positive_price', 'high_low_inverted', 'stale_bar', 'volume_spike', 'split_jump']
+DAILY_INTERVALS = ('1d', '5d')
+
+
+def _lagged(values, first):
+    # Previous row within the same ticker (NaN on each ticker's first row)
+    lagged = np.empty_like(values, dtype=float)
+    lagged[1:] = values[:-1]
+    lagged[0] = np.nan
+    lagged[first] = np.nan
+    return lagged
+
+
+def _flag_long(bars, codes):
+    # Boolean issue flags for a long table sorted by (codes, time)
+    values = {col: bars[col].to_numpy(dtype=float) if col in bars.columns else np.full(len(bars), np.nan)
+              for col in OHLCV_COLUMNS}
+    o, h, l, c, v = (values[col] for col in OHLCV_COLUMNS)
+    first = np.ones(len(bars), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prices = np.column_stack([o, h, l, c])
+        flags = {
+            'missing_fields': np.isnan(prices).any(axis=1) | np.isnan(v),
+            'non_positive_price': (prices <= 0).any(axis=1),
+            'high_low_inverted': (h < l) | (np.fmax(o, c) > h) | (np.fmin(o, c) < l)
+        }
+
+        stale = ~first
+        for col in OHLCV_COLUMNS:
+            stale &= values[col] == _lagged(values[col], first)
+        flags['stale_bar'] = stale
+
+        # Trailing median of earlier bars only, so a spike does not hide itself
+        trailing = (pd.Series(v).groupby(codes).rolling(QUALITY_VOLUME_WINDOW, min_periods=5).median()
+                    .to_numpy())
+        trailing = _lagged(trailing, first)
+        flags['volume_spike'] = (trailing > 0) & (v > QUALITY_VOLUME_SPIKE * trailing)
+
+        ratio = c / _lagged(c, first)
+        candidates = np.array(QUALITY_SPLIT_RATIOS + [1 / r for r in QUALITY_SPLIT_RATIOS], dtype=float)
+        distance = np.abs(ratio[:, None] / candidates[None, :] - 1).min(axis=1)
+        flags['split_jump'] = distance < QUALITY_SPLIT_TOLERANCE
+
+    return pd.DataFrame(flags, index=bars.index)
+
+
+def _stack(data_dict):
+    # Long OHLCV table of all tickers (RangeIndex), each row's ticker code, and each ticker's index
+    names, frames = [], []
+    for name, data in data_dict.items():
+        if data is None or data.empty:
+            continue
+        names.append(name)
+        frames.append(data if data.index.is_monotonic_increasing else data.sort_index())
+
+    columns = {
+        col: np.concatenate([frame[col].to_numpy(dtype=float) if col in frame.columns
+                             else np.full(len(frame), np.nan) for frame in frames]) if frames else np.empty(0)
+        for col in OHLCV_COLUMNS
+    }
+    codes = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+    return names, pd.DataFrame(columns), codes, [frame.index for frame in frames]
+
+
+def missing_sessions(index, ticker):
+    """
+    Trading sessions of the ticker's exchange that are absent from a daily index.
+
+    Args:
+        index (pd.DatetimeIndex): Bar timestamps (daily)
+        ticker (str): Ticker or friendly name
+
+    Returns:
+        pd.DatetimeIndex: Missing session dates
+    """
+    if len(index) == 0:
+        return pd.DatetimeIndex([])
+    dates = pd.DatetimeIndex(index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    dates = dates.normalize()
+    expected = trading_days(exchange_for(ticker), dates[0], dates[-1])
+    return expected.difference(dates)
+
+
+def check_universe(data_dict, interval='1d'):
+    """
+    Flag issues for every bar of every ticker in one vectorized pass.
+
+    Args:
+        data_dict (dict): name -> OHLCV DataFrame
+        interval (str): Bar interval (calendar gaps are only checked for daily bars)
+
+    Returns:
+        dict: name -> DataFrame of boolean issue flags aligned with its bars
+    """
+    names, long_bars, codes, indexes = _stack(data_dict)
+    if not names:
+        return {}
+    flags = _flag_long(long_bars, codes)[ISSUES].to_numpy()
+    bounds = _bounds(codes, len(names))
+    return {name: pd.DataFrame(flags[bounds[i]:bounds[i + 1]], index=indexes[i], columns=ISSUES)
+            for i, name in enumerate(names)}
+
+
+def _bounds(codes, count):
+    # Start offset of each ticker in the long table (plus the end)
+    return np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=count))])
+
+
+def summarize(flags, ticker, index=None, interval='1d', dropped=0, repaired=0):
+    """
+    Compact quality summary of one ticker.
+
+    Args:
+        flags (pd.DataFrame): Issue flags from `check_universe`
+        ticker (str): Ticker or friendly name
+        index (pd.DatetimeIndex): Bar timestamps (default: the flags' index)
+        interval (str): Bar interval
+        dropped (int): Bars removed by repairs
+        repaired (int): Bars modified by repairs
+
+    Returns:
+        dict: Rows, per-issue counts, Missing_Sessions, Dropped, Repaired and
+            Clean_Pct (share of bars with no issue)
+    """
+    index = flags.index if index is None else index
+    counts = flags[ISSUES].to_numpy()
+    summary = {'Rows': len(flags)}
+    summary.update({issue: int(count) for issue, count in zip(ISSUES, counts.sum(axis=0))})
+    summary['Missing_Sessions'] = len(missing_sessions(index, ticker)) if interval in DAILY_INTERVALS else 0
+    summary['Dropped'] = dropped
+    summary['Repaired'] = repaired
+    summary['Clean_Pct'] = float(100 * (1 - counts.any(axis=1).mean())) if len(flags) else 100.0
+    return summary
+
+
+def _repair_long(data, codes, flags, repairs):
+    # Vectorized repairs over a long table; returns (repaired copy, drop mask, modified mask)
+    repairs = {**QUALITY_REPAIRS, **(repairs or {})}
+    for issue in ('stale_bar', 'volume_spike', 'split_jump'):
+        if repairs.get(issue) not in ('keep', 'drop'):
+            logger.warning(f"Unsupported repair {repairs[issue]!r} for {issue}, keeping bars")
+
+    data = data.copy()
+    n = len(data)
+    drop = np.zeros(n, dtype=bool)
+    modified = np.zeros(n, dtype=bool)
+    for issue, action in repairs.items():
+        if action == 'drop' and issue in flags.columns:
+            drop |= flags[issue].to_numpy()
+
+    if repairs.get('missing_fields') == 'fill':
+        rows = flags['missing_fields'].to_numpy() & ~drop
+        # Carry the last close forward within each ticker; leading gaps cannot be filled
+        close = pd.Series(data['Close'].to_numpy(dtype=float)).groupby(codes).ffill().to_numpy()
+        drop |= np.isnan(close)
+        rows &= ~drop
+        if rows.any():
+            data['Close'] = np.where(rows, close, data['Close'].to_numpy(dtype=float))
+            for col in ('Open', 'High', 'Low'):
+                if col in data.columns:
+                    values = data[col].to_numpy(dtype=float)
+                    data[col] = np.where(rows & np.isnan(values), close, values)
+            if 'Volume' in data.columns:
+                volume = data['Volume'].to_numpy(dtype=float)
+                data['Volume'] = np.where(rows & np.isnan(volume), 0.0, volume)
+            modified |= rows
+
+    if repairs.get('high_low_inverted') == 'clip':
+        rows = flags['high_low_inverted'].to_numpy() & ~drop
+        if rows.any():
+            prices = data[PRICE_COLUMNS].to_numpy(dtype=float)
+            data['High'] = np.where(rows, np.nanmax(prices, axis=1), prices[:, 1])
+            data['Low'] = np.where(rows, np.nanmin(prices, axis=1), prices[:, 2])
+            modified |= rows
+
+    return data, drop, modified & ~drop
+
+
+def repair_bars(data, flags, repairs=None):
+    """
+    Apply the configured repair to each flagged bar.
+
+    Args:
+        data (pd.DataFrame): OHLCV bars (other columns are carried along)
+        flags (pd.DataFrame): Issue flags aligned with `data`
+        repairs (dict): issue -> 'drop' | 'fill' | 'clip' | 'keep' (default QUALITY_REPAIRS)
+
+    Returns:
+        tuple: (repaired DataFrame, number of dropped bars, number of modified bars)
+    """
+    repaired, drop, modified = _repair_long(data, np.zeros(len(data), dtype=int), flags, repairs)
+    return repaired[~drop], int(drop.sum()), int(modified.sum())
+
+
+def clean_bars(data, ticker, interval='1d', repairs=None):
+    """
+    Check and repair one ticker's bars.
+
+    Args:
+        data (pd.DataFrame): OHLCV bars
+        ticker (str): Ticker or friendly name
+        interval (str): Bar interval
+        repairs (dict): Repair overrides (see `repair_bars`)
+
+    Returns:
+        tuple: (clean DataFrame, quality summary dict)
+    """
+    if data is None or data.empty:
+        return data, None
+    data = data.sort_index()
+    flags = check_universe({ticker: data}, interval)[ticker]
+    cleaned, dropped, repaired = repair_bars(data, flags, repairs)
+    summary = summarize(flags, ticker, data.index, interval, dropped, repaired)
+    if dropped or repaired:
+        logger.info(f"Quality repairs for {ticker}: {dropped} bars dropped, {repaired} repaired")
+    return cleaned, summary
+
+
+def clean_universe(data_dict, interval='1d', repairs=None):
+    """
+    Check and repair a whole universe in one vectorized pass.
+
+    Args:
+        data_dict (dict): name -> OHLCV DataFrame
+        interval (str): Bar interval
+        repairs (dict): Repair overrides (see `repair_bars`)
+
+    Returns:
+        tuple: (name -> clean OHLCV DataFrame, per-ticker report DataFrame)
+    """
+    names, long_bars, codes, indexes = _stack(data_dict)
+    if not names:
+        return {}, quality_report({})
+    flags = _flag_long(long_bars, codes)
+    repaired, drop, modified = _repair_long(long_bars, codes, flags, repairs)
+
+    # Per-ticker counts with one segmented reduction
+    bounds = _bounds(codes, len(names))
+    starts = bounds[:-1]
+    flag_values = flags[ISSUES].to_numpy()
+    issue_counts = np.add.reduceat(flag_values.astype(int), starts, axis=0)
+    dirty = np.add.reduceat(flag_values.any(axis=1).astype(int), starts)
+    dropped = np.add.reduceat(drop.astype(int), starts)
+    changed = np.add.reduceat(modified.astype(int), starts)
+    values = repaired[OHLCV_COLUMNS].to_numpy()
+
+    cleaned, rows = {}, {}
+    for i, name in enumerate(names):
+        start, end = bounds[i], bounds[i + 1]
+        keep = ~drop[start:end]
+        cleaned[name] = pd.DataFrame(values[start:end][keep], index=indexes[i][keep], columns=OHLCV_COLUMNS)
+        summary = {'Rows': int(end - start)}
+        summary.update({issue: int(count) for issue, count in zip(ISSUES, issue_counts[i])})
+        summary['Missing_Sessions'] = (len(missing_sessions(indexes[i], name))
+                                       if interval in DAILY_INTERVALS else 0)
+        summary['Dropped'] = int(dropped[i])
+        summary['Repaired'] = int(changed[i])
+        summary['Clean_Pct'] = float(100 * (1 - dirty[i] / (end - start)))
+        rows[name] = summary
+    return cleaned, quality_report(rows)
+
+
+def validate_append(existing, new_bars, ticker, interval='1d', repairs=None):
+    """
+    Streaming check for bars about to be appended to a stored or live series.
+
+    The last QUALITY_CONTEXT_BARS existing bars are used as context (for
+    stale, spike and jump checks), only the new bars are repaired and
+    returned, so bad bars are stopped before they reach indicators.
+
+    Args:
+        existing (pd.DataFrame): Bars already accepted (may be None)
+        new_bars (pd.DataFrame): Incoming bars
+        ticker (str): Ticker or friendly name
+        interval (str): Bar interval
+        repairs (dict): Repair overrides (see `repair_bars`)
+
+    Returns:
+        tuple: (clean new bars, quality summary of the new bars)
+    """
+    if new_bars is None or new_bars.empty:
+        return new_bars, None
+    new_bars = new_bars.sort_index()
+    context = None
+    if existing is not None and not existing.empty:
+        context = existing[[col for col in OHLCV_COLUMNS if col in existing.columns]]
+        context = context[context.index < new_bars.index[0]].iloc[-QUALITY_CONTEXT_BARS:]
+
+    combined = new_bars if context is None or context.empty else pd.concat([context, new_bars])
+    flags = check_universe({ticker: combined}, interval)[ticker].iloc[-len(new_bars):]
+    cleaned, dropped, repaired = repair_bars(new_bars, flags, repairs)
+    span = combined.index if context is not None and not context.empty else new_bars.index
+    summary = summarize(flags, ticker, span, interval, dropped, repaired)
+    if dropped or repaired:
+        logger.warning(f"Rejected {dropped} and repaired {repaired} incoming bars for {ticker}")
+    return cleaned, summary
+
+
+def quality_report(summaries):
+    """
+    Per-ticker quality report table.
+
+    Args:
+        summaries (dict): name -> summary dict (from `summarize`) or DataFrame
+            whose attrs carry a 'quality' summary
+
+    Returns:
+        pd.DataFrame: One row per ticker
+    """
+    rows = {}
+    for name, item in summaries.items():
+        summary = item.attrs.get('quality') if isinstance(item, pd.DataFrame) else item
+        if summary:
+            rows[name] = summary
+    return pd.DataFrame.from_dict(rows, orient='index')
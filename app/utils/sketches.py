@@ -0,0 +1,463 @@
+"""
+Mergeable quantile sketches for return distributions.
+
+`TDigest` summarizes a stream of values in a few hundred weighted
+centroids, with the highest resolution in the tails, so VaR/CVaR at 95-99%
+stay accurate while the raw values are never kept. Digests merge: the
+digest of two streams is the merge of their digests, which is what makes
+per-ticker / per-sector / per-period summaries combinable.
+
+`ReturnSketches` keeps one digest per (ticker, time bucket) and per
+(sector, time bucket), updated incrementally as returns arrive, and answers
+universe-wide questions (VaR, CVaR, histograms, cross-sectional percentile
+ranks) for any selection of tickers, sectors and periods.
+
+Example:
+    sketches = ReturnSketches()
+    sketches.update_many({name: df['Daily_Return'] for name, df in data_dict.items()})
+    sketches.var(0.99, sector='Banking', start='2024-01')
+"""
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .config import SKETCH_BUCKET, SKETCH_COMPRESSION, TICKER_SECTORS, TICKERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTOR = 'Other'
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl) with a vectorized compression step.
+
+    Incoming values are buffered; when the buffer fills, buffer and
+    centroids are sorted together and grouped so that no cluster spans more
+    than about one unit of the logit scale function. Clusters are therefore
+    tiny near the extremes and large around the median.
+
+    Args:
+        compression (float): Accuracy / size trade-off (roughly proportional
+            to the number of centroids kept)
+        buffer_size (int): Values buffered between compressions
+    """
+
+    def __init__(self, compression=SKETCH_COMPRESSION, buffer_size=None):
+        self.compression = compression
+        self.buffer_size = buffer_size or int(10 * compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def __len__(self):
+        """Number of centroids (after compressing any buffered values)."""
+        self._flush()
+        return len(self.means)
+
+    @property
+    def count(self):
+        """Total weight (number of values) summarized."""
+        return float(self.weights.sum()) + sum(len(m) if w is None else float(w.sum()) for m, w in self._buffer)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the digest."""
+        return self.means.nbytes + self.weights.nbytes + sum(m.nbytes + (0 if w is None else w.nbytes)
+                                                             for m, w in self._buffer)
+
+    def update(self, values, weights=None):
+        """
+        Add values (NaN and infinite values are ignored).
+
+        Args:
+            values (array-like): Observations
+            weights (array-like): Optional weight per value
+
+        Returns:
+            TDigest: self
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        # Unit weights are implied (None) until compression, halving the buffer
+        finite = np.isfinite(values)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            finite &= weights > 0
+        if not finite.all():
+            values = values[finite]
+            weights = None if weights is None else weights[finite]
+        if len(values) == 0:
+            return self
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._flush()
+        return self
+
+    def merge(self, *others):
+        """
+        Fold other digests into this one.
+
+        Args:
+            *others (TDigest): Digests to merge
+
+        Returns:
+            TDigest: self
+        """
+        for other in others:
+            if other.count == 0:
+                continue
+            other._flush()
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._buffer.append((other.means, other.weights))
+            self._buffered += len(other.means)
+        self._flush()
+        return self
+
+    @classmethod
+    def from_values(cls, values, compression=SKETCH_COMPRESSION):
+        """Digest of an array of values."""
+        return cls(compression).update(values)
+
+    @classmethod
+    def merged(cls, digests, compression=SKETCH_COMPRESSION):
+        """New digest combining `digests` (which are left unchanged)."""
+        return cls(compression).merge(*digests)
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s).
+
+        Args:
+            q (float or array-like): Probabilities in [0, 1]
+
+        Returns:
+            float or np.ndarray: Quantile values (NaN for an empty digest)
+        """
+        positions, means, total = self._knots()
+        if total == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        return np.interp(np.asarray(q, dtype=np.float64) * total, positions, means)
+
+    def cdf(self, x):
+        """
+        Approximate fraction of values at or below `x`.
+
+        Args:
+            x (float or array-like): Values
+
+        Returns:
+            float or np.ndarray: Probabilities in [0, 1]
+        """
+        positions, means, total = self._knots()
+        if total == 0:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else np.nan
+        return np.interp(x, means, positions) / total
+
+    def tail_mean(self, q):
+        """
+        Mean of the values below the `q` quantile (CVaR for q = 1 - confidence).
+
+        Args:
+            q (float): Tail probability in (0, 1]
+
+        Returns:
+            float: Lower-tail mean
+        """
+        positions, means, total = self._knots()
+        if total == 0 or q <= 0:
+            return np.nan
+        # Integrate the piecewise-linear quantile function over [0, q]
+        cut = q * total
+        inside = positions < cut
+        xs = np.append(positions[inside], cut)
+        ys = np.append(means[inside], np.interp(cut, positions, means))
+        return float(np.sum((ys[1:] + ys[:-1]) * np.diff(xs)) / 2 / cut)
+
+    def histogram(self, bins=50, range=None):
+        """
+        Approximate histogram, like `np.histogram`.
+
+        Args:
+            bins (int or array-like): Number of bins or bin edges
+            range (tuple): (low, high) for evenly spaced bins (default: min, max)
+
+        Returns:
+            tuple: (counts, edges)
+        """
+        if np.ndim(bins):
+            edges = np.asarray(bins, dtype=np.float64)
+        else:
+            low, high = range if range is not None else (self.min, self.max)
+            edges = np.linspace(low, high, int(bins) + 1)
+        if self.count == 0:
+            return np.zeros(len(edges) - 1), edges
+        return np.diff(self.cdf(edges)) * self.count, edges
+
+    def to_dict(self):
+        """Plain representation (for storage or sending between processes)."""
+        self._flush()
+        return {'compression': self.compression, 'min': self.min, 'max': self.max,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a digest from `to_dict` output."""
+        digest = cls(state['compression'])
+        digest.means = np.asarray(state['means'], dtype=np.float64)
+        digest.weights = np.asarray(state['weights'], dtype=np.float64)
+        digest.min, digest.max = float(state['min']), float(state['max'])
+        return digest
+
+    def _knots(self):
+        # Quantile function knots: centroid centers plus the exact extremes
+        self._flush()
+        total = float(self.weights.sum())
+        if total == 0:
+            return None, None, 0.0
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [total]))
+        means = np.concatenate(([self.min], self.means, [self.max]))
+        return positions, np.maximum.accumulate(means), total
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [np.ones(len(m)) if w is None else w for m, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        # k2 scale function: k(q) = compression / Z(n) * log(q / (1 - q)); cluster
+        # sizes shrink in proportion to the tail probability, so extreme
+        # quantiles keep a constant relative accuracy
+        normalizer = 4 * np.log(max(total / self.compression, 1.0)) + 24
+        k = self.compression / normalizer * np.log(q / (1 - q))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], cluster[1:] != cluster[:-1])))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+
+def sector_for(name, sectors=None):
+    """
+    Sector of a ticker or friendly name.
+
+    Args:
+        name (str): Friendly name or symbol (e.g. 'Safaricom', 'SCOM.NR')
+        sectors (dict): Overrides of TICKER_SECTORS
+
+    Returns:
+        str: Sector ('Other' when unknown)
+    """
+    mapping = {**TICKER_SECTORS, **(sectors or {})}
+    if name in mapping:
+        return mapping[name]
+    for friendly, symbol in TICKERS.items():
+        if symbol == name and friendly in mapping:
+            return mapping[friendly]
+    return DEFAULT_SECTOR
+
+
+class ReturnSketches:
+    """
+    Incrementally maintained return distributions per ticker, sector and period.
+
+    Each return lands in the digest of its (ticker, bucket) and of its
+    (sector, bucket), where the bucket is the return's calendar period
+    (`SKETCH_BUCKET`, monthly by default). Queries merge the digests that
+    match a selection. Only returns newer than the last one seen for a
+    ticker are added, so re-sending an overlapping history is safe.
+
+    Args:
+        bucket (str): Period frequency for time buckets ('D', 'W', 'M', ...)
+        compression (float): Digest compression
+        sectors (dict): ticker -> sector overrides of TICKER_SECTORS
+    """
+
+    def __init__(self, bucket=SKETCH_BUCKET, compression=SKETCH_COMPRESSION, sectors=None):
+        self.bucket = bucket
+        self.compression = compression
+        self.sectors = dict(sectors or {})
+        self._by_ticker = {}
+        self._by_sector = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_ticker)
+
+    @property
+    def tickers(self):
+        """Tickers with at least one return."""
+        return sorted({ticker for ticker, _ in self._by_ticker})
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by all digests."""
+        return sum(d.nbytes for d in list(self._by_ticker.values()) + list(self._by_sector.values()))
+
+    def sector_of(self, ticker):
+        return sector_for(ticker, self.sectors)
+
+    def update(self, ticker, returns):
+        """
+        Add a ticker's returns (only those after the last one already added).
+
+        Args:
+            ticker (str): Ticker or friendly name
+            returns (pd.Series): Time-indexed returns
+
+        Returns:
+            int: Number of returns added
+        """
+        if returns is None or returns.empty:
+            return 0
+        returns = returns.dropna()
+        last = self._last.get(ticker)
+        if last is not None:
+            returns = returns[returns.index > last]
+        if returns.empty:
+            return 0
+
+        index = returns.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_localize(None)
+        codes, periods = pd.factorize(index.to_period(self.bucket))
+        order = np.argsort(codes, kind='stable')
+        values = returns.to_numpy(dtype=np.float64)[order]
+        bounds = np.searchsorted(codes[order], np.arange(len(periods) + 1))
+        sector = self.sector_of(ticker)
+
+        with self._lock:
+            for i, period in enumerate(periods):
+                chunk = values[bounds[i]:bounds[i + 1]]
+                for table, key in ((self._by_ticker, (ticker, period)), (self._by_sector, (sector, period))):
+                    digest = table.get(key)
+                    if digest is None:
+                        digest = table[key] = TDigest(self.compression)
+                    digest.update(chunk)
+            self._last[ticker] = returns.index.max()
+        return len(values)
+
+    def update_many(self, returns_dict):
+        """
+        Add returns for several tickers.
+
+        Args:
+            returns_dict (dict): ticker -> returns Series (or a frame with 'Daily_Return')
+
+        Returns:
+            int: Number of returns added
+        """
+        added = 0
+        for ticker, returns in returns_dict.items():
+            if isinstance(returns, pd.DataFrame):
+                returns = returns['Daily_Return'] if 'Daily_Return' in returns.columns else None
+            added += self.update(ticker, returns)
+        return added
+
+    def sketch(self, tickers=None, sector=None, start=None, end=None):
+        """
+        Merged digest of a selection.
+
+        Args:
+            tickers (list): Restrict to these tickers
+            sector (str): Restrict to one sector
+            start, end (datetime-like or str): Inclusive range of periods
+
+        Returns:
+            TDigest: Combined distribution (empty if nothing matches)
+        """
+        start = pd.Period(start, freq=self.bucket) if start is not None else None
+        end = pd.Period(end, freq=self.bucket) if end is not None else None
+
+        def in_range(period):
+            return (start is None or period >= start) and (end is None or period <= end)
+
+        with self._lock:
+            if tickers is None:
+                # Sector digests avoid merging every ticker's digest
+                digests = [d for (name, period), d in self._by_sector.items()
+                           if (sector is None or name == sector) and in_range(period)]
+            else:
+                wanted = set(tickers)
+                digests = [d for (name, period), d in self._by_ticker.items()
+                           if name in wanted and (sector is None or self.sector_of(name) == sector)
+                           and in_range(period)]
+            return TDigest.merged(digests, self.compression)
+
+    def var(self, confidence=0.95, **selection):
+        """Approximate Value at Risk of the selection's returns (negative = loss)."""
+        return float(self.sketch(**selection).quantile(1 - confidence))
+
+    def cvar(self, confidence=0.95, **selection):
+        """Approximate Conditional VaR (mean return at or below the VaR)."""
+        return self.sketch(**selection).tail_mean(1 - confidence)
+
+    def histogram(self, bins=50, range=None, **selection):
+        """
+        Approximate return histogram of the selection.
+
+        Returns:
+            tuple: (counts, edges), see `TDigest.histogram`
+        """
+        return self.sketch(**selection).histogram(bins, range)
+
+    def percentile_ranks(self, values, **selection):
+        """
+        Percentile rank of each value within the selection's distribution.
+
+        Args:
+            values (dict or pd.Series): ticker -> value (e.g. today's return)
+            **selection: tickers / sector / start / end for the reference distribution
+
+        Returns:
+            pd.Series: Ranks in [0, 100] indexed by ticker
+        """
+        values = pd.Series(values, dtype=np.float64)
+        ranks = self.sketch(**selection).cdf(values.to_numpy()) * 100
+        return pd.Series(ranks, index=values.index, name='Percentile_Rank')
+
+    def summary(self, by='sector', confidence=0.95, **selection):
+        """
+        Distribution statistics per sector or per ticker.
+
+        Args:
+            by (str): 'sector' or 'ticker'
+            confidence (float): VaR/CVaR confidence level
+            **selection: start / end (and sector when by='ticker')
+
+        Returns:
+            pd.DataFrame: Count, P05/P50/P95, VaR and CVaR indexed by sector/ticker
+        """
+        if by == 'sector':
+            groups = sorted({name for name, _ in self._by_sector})
+            sketches = {name: self.sketch(sector=name, **selection) for name in groups}
+        else:
+            sketches = {name: self.sketch(tickers=[name], **selection) for name in self.tickers}
+        column = by.capitalize()
+        var_col, cvar_col = f'VaR_{confidence:.0%}', f'CVaR_{confidence:.0%}'
+        rows = []
+        for name, digest in sketches.items():
+            if digest.count == 0:
+                continue
+            p05, p50, p95 = digest.quantile([0.05, 0.5, 0.95])
+            rows.append({column: name, 'Count': int(digest.count), 'P05': p05, 'P50': p50, 'P95': p95,
+                         var_col: float(digest.quantile(1 - confidence)),
+                         cvar_col: digest.tail_mean(1 - confidence)})
+        columns = [column, 'Count', 'P05', 'P50', 'P95', var_col, cvar_col]
+        return pd.DataFrame(rows, columns=columns).set_index(column)
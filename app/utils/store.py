@@ -0,0 +1,308 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .config import STORE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Intraday series are partitioned by month, daily and coarser ones by year,
+# so an append only rewrites the partitions its bars fall in
+INTRADAY_SUFFIXES = ("m", "h")
+
+# One lock per series so concurrent appends from this process serialize; the
+# lock file in the series directory also serializes other processes
+_path_locks = defaultdict(threading.Lock)
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _path_locks[path]
+
+
+@contextmanager
+def _file_lock(directory, shared=False):
+    # Advisory lock on `<directory>/.lock`: shared for readers, exclusive for writers
+    with open(os.path.join(directory, ".lock"), "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _write_lock(directory):
+    with _lock_for(directory):
+        os.makedirs(directory, exist_ok=True)
+        with _file_lock(directory):
+            yield
+
+
+def store_path(ticker, interval, root=None):
+    """
+    Location of the stored bars for a ticker/interval.
+
+    Args:
+        ticker (str): Ticker symbol (e.g. '^GSPC', 'SCOM.NR')
+        interval (str): Bar interval (e.g. '1m', '1d')
+        root (str): Store root directory (default from config)
+
+    Returns:
+        str: Directory holding one Parquet file per partition
+    """
+    safe_ticker = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+    return os.path.join(root or STORE_DIR, interval, safe_ticker)
+
+
+def _partition_labels(index, interval):
+    # 'YYYY-MM' for intraday bars, 'YYYY' otherwise
+    if interval.endswith(INTRADAY_SUFFIXES):
+        return pd.Index(index.year * 100 + index.month).map(lambda key: f"{key // 100:04d}-{key % 100:02d}")
+    return pd.Index(index.year).map(lambda year: f"{year:04d}")
+
+
+def _partition_bounds(label):
+    # Wall-clock [start, end) covered by a partition
+    start = pd.Timestamp(f"{label}-01" if len(label) == 7 else f"{label}-01-01")
+    return start, start + (pd.DateOffset(months=1) if len(label) == 7 else pd.DateOffset(years=1))
+
+
+def _partitions(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.parquet')] for name in os.listdir(directory) if name.endswith('.parquet'))
+
+
+def read_bars(ticker, interval, start=None, end=None, root=None):
+    """
+    Read stored bars, optionally restricted to [start, end).
+
+    Args:
+        ticker (str): Ticker symbol
+        interval (str): Bar interval
+        start (datetime-like): Inclusive start
+        end (datetime-like): Exclusive end
+        root (str): Store root directory
+
+    Returns:
+        pd.DataFrame: Stored bars, or None if nothing is stored
+    """
+    directory = store_path(ticker, interval, root)
+    labels = _partitions(directory)
+    if start is not None or end is not None:
+        # Partitions are labelled in the series' wall-clock time; a day of
+        # slack covers bounds given in another timezone
+        slack = pd.Timedelta(days=1)
+        lower = None if start is None else pd.Timestamp(start).tz_localize(None) - slack
+        upper = None if end is None else pd.Timestamp(end).tz_localize(None) + slack
+        labels = [label for label in labels
+                  if (lower is None or _partition_bounds(label)[1] > lower)
+                  and (upper is None or _partition_bounds(label)[0] < upper)]
+    if not labels:
+        return None
+
+    try:
+        with _file_lock(directory, shared=True):
+            frames = [pd.read_parquet(os.path.join(directory, f"{label}.parquet")) for label in labels]
+        data = pd.concat(frames) if len(frames) > 1 else frames[0]
+    except Exception as e:
+        logger.error(f"Error reading stored bars for {ticker} ({interval}): {str(e)}")
+        return None
+
+    if start is not None:
+        data = data[data.index >= _align_tz(start, data.index)]
+    if end is not None:
+        data = data[data.index < _align_tz(end, data.index)]
+    return data
+
+
+def read_tail(ticker, interval, bars, end=None, root=None):
+    """
+    Read the last `bars` stored bars before `end`, newest partitions first.
+
+    Only as many partitions as needed to cover `bars` rows are read, so the
+    cost does not grow with the stored history.
+
+    Args:
+        ticker (str): Ticker symbol
+        interval (str): Bar interval
+        bars (int): Number of bars wanted
+        end (datetime-like): Exclusive end (default: after the last bar)
+        root (str): Store root directory
+
+    Returns:
+        pd.DataFrame: Up to `bars` stored bars, or None if nothing is stored
+    """
+    directory = store_path(ticker, interval, root)
+    labels = _partitions(directory)
+    if end is not None:
+        upper = pd.Timestamp(end).tz_localize(None) + pd.Timedelta(days=1)
+        labels = [label for label in labels if _partition_bounds(label)[0] < upper]
+    if not labels:
+        return None
+
+    frames, rows = [], 0
+    try:
+        with _file_lock(directory, shared=True):
+            for label in reversed(labels):
+                frame = pd.read_parquet(os.path.join(directory, f"{label}.parquet"))
+                if end is not None:
+                    frame = frame[frame.index < _align_tz(end, frame.index)]
+                frames.append(frame)
+                rows += len(frame)
+                if rows >= bars:
+                    break
+    except Exception as e:
+        logger.error(f"Error reading stored bars for {ticker} ({interval}): {str(e)}")
+        return None
+
+    data = pd.concat(frames[::-1]) if len(frames) > 1 else frames[0]
+    return data.iloc[-bars:] if bars > 0 else data.iloc[0:0]
+
+
+def write_bars(ticker, interval, data, root=None):
+    """
+    Replace the stored bars for a ticker/interval.
+
+    Each partition is swapped atomically; partitions the new data does not
+    cover are removed.
+
+    Args:
+        ticker (str): Ticker symbol
+        interval (str): Bar interval
+        data (pd.DataFrame): Time-indexed bars
+        root (str): Store root directory
+
+    Returns:
+        str: Series directory written
+    """
+    directory = store_path(ticker, interval, root)
+    with _write_lock(directory):
+        stale = set(_partitions(directory))
+        for label, part in data.groupby(_partition_labels(data.index, interval), sort=True):
+            _write(os.path.join(directory, f"{label}.parquet"), part)
+            stale.discard(label)
+        for label in stale:
+            os.remove(os.path.join(directory, f"{label}.parquet"))
+    return directory
+
+
+def append_bars(ticker, interval, data, root=None):
+    """
+    Merge new bars into the store, de-duplicating on the timestamp index.
+
+    Newer rows win when a timestamp is already stored. Only the partitions
+    the new bars fall in are read and rewritten, so the cost of an append
+    does not grow with the stored history.
+
+    Args:
+        ticker (str): Ticker symbol
+        interval (str): Bar interval
+        data (pd.DataFrame): New time-indexed bars
+        root (str): Store root directory
+
+    Returns:
+        str: Series directory written
+    """
+    directory = store_path(ticker, interval, root)
+    if data is None or data.empty:
+        return directory
+
+    with _write_lock(directory):
+        for label, part in data.groupby(_partition_labels(data.index, interval), sort=True):
+            path = os.path.join(directory, f"{label}.parquet")
+            existing = pd.read_parquet(path) if os.path.exists(path) else None
+            _write(path, merge_bars(existing, part))
+
+    logger.info(f"Stored {len(data)} new bars for {ticker} ({interval})")
+    return directory
+
+
+def merge_bars(existing, new):
+    """
+    Stitch two bar frames on their timestamp index.
+
+    Args:
+        existing (pd.DataFrame): Previously stored bars (may be None)
+        new (pd.DataFrame): Incoming bars (win on duplicate timestamps)
+
+    Returns:
+        pd.DataFrame: Sorted, de-duplicated bars
+    """
+    frames = [frame for frame in (existing, new) if frame is not None and not frame.empty]
+    if not frames:
+        return new if new is not None else pd.DataFrame()
+
+    merged = pd.concat(frames) if len(frames) > 1 else frames[0]
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged.sort_index()
+
+
+def list_stored(interval, root=None):
+    """
+    Names of stored series for an interval (sanitized tickers).
+
+    Args:
+        interval (str): Bar interval
+        root (str): Store root directory
+
+    Returns:
+        list: Sorted series names
+    """
+    directory = os.path.join(root or STORE_DIR, interval)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if _partitions(os.path.join(directory, name)))
+
+
+def _write(path, data):
+    # Unique temp name, so concurrent writers never share a half-written file
+    handle = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.",
+                                         suffix=".tmp", delete=False)
+    handle.close()
+    try:
+        data.to_parquet(handle.name)
+        os.replace(handle.name, path)
+    except BaseException:
+        if os.path.exists(handle.name):
+            os.remove(handle.name)
+        raise
+
+
+def _align_tz(timestamp, index):
+    # Compare naive bounds against tz-aware indexes (and vice versa)
+    timestamp = pd.Timestamp(timestamp)
+    tz = getattr(index, 'tz', None)
+    if tz is not None and timestamp.tz is None:
+        return timestamp.tz_localize(tz)
+    if tz is None and timestamp.tz is not None:
+        return timestamp.tz_convert(None)
+    return timestamp
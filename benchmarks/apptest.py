@@ -0,0 +1,100 @@
+"""Helpers for driving the dashboard headless with streamlit.testing.
+
+AppTest always requests a whole-script run. `fragment_rerun` makes the
+runs issued from the current thread fragment-scoped instead (as the
+browser does when a widget inside a fragment changes); it is thread-local,
+so concurrent simulated sessions can mix both kinds of rerun.
+`concurrent_sessions` lets several AppTests run at once.
+"""
+import contextlib
+import os
+import threading
+from unittest.mock import MagicMock
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import app_test, local_script_runner
+from streamlit.testing.v1.util import patch_config_options
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+_local = threading.local()
+_install_lock = threading.Lock()
+
+
+def widget(at, kind, label):
+    """First widget of `kind` (e.g. 'selectbox') with the given label."""
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def fragment_ids(at):
+    """Map fragment function names to the ids registered on the last run."""
+    ids = {}
+    for fragment_id, wrapped in at._fragment_storage._fragments.items():
+        for cell in wrapped.__closure__ or ():
+            func = cell.cell_contents
+            if callable(func) and hasattr(func, "__name__") and func.__name__.endswith("_panel"):
+                ids[func.__name__] = fragment_id
+    return ids
+
+
+def _rerun_data(*args, **kwargs):
+    queue = getattr(_local, "fragment_queue", None)
+    if queue:
+        kwargs.setdefault("fragment_id_queue", list(queue))
+    return RerunData(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def fragment_rerun(at, fragment):
+    """Make `at.run()` calls in this block rerun only the named fragment.
+
+    After a fragment-scoped run AppTest only holds that fragment's
+    elements; the full element tree from before is put back on exit, so
+    the next run still reports every widget's state (as the browser
+    would) and the changed widget keeps its new value.
+
+    Args:
+        at: AppTest that has completed a full run
+        fragment: Fragment function name (e.g. 'nse_panel')
+    """
+    with _install_lock:
+        if local_script_runner.RerunData is RerunData:
+            local_script_runner.RerunData = _rerun_data
+    tree = at._tree
+    _local.fragment_queue = [fragment_ids(at)[fragment]]
+    try:
+        yield
+    finally:
+        _local.fragment_queue = None
+        at._tree = tree
+
+
+@contextlib.contextmanager
+def concurrent_sessions():
+    """Allow AppTests to run from several threads at the same time.
+
+    Every AppTest run installs a mock Runtime singleton and switches the
+    `global.appTest` option on, then clears both when it finishes, which
+    breaks any other run still in progress. Inside this block the option
+    stays on and the Runtime falls back to one shared mock.
+    """
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.dataframe_source_mgr = DataframeSourceManager()
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    instance, exists = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+    Runtime.exists = classmethod(lambda cls: True)
+    per_run_options = app_test.patch_config_options
+    app_test.patch_config_options = lambda options: contextlib.nullcontext()
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        Runtime.instance, Runtime.exists = instance, exists
+        app_test.patch_config_options = per_run_options
@@ -0,0 +1,204 @@
+"""Concurrent-user load test for one dashboard worker.
+
+Simulates many analyst sessions against a single process, the way one
+Streamlit worker serves them: every session is its own AppTest (own
+session state, shared st.cache_data / data-loader caches) driven from its
+own thread. Each session opens the page, then performs a random mix of
+realistic interactions with think time in between:
+
+* ticker switch and period change (sidebar widgets, whole-script rerun)
+* watchlist edit (comparison panel fragment rerun)
+* refresh (clears the data caches for everyone)
+
+Downloads come from the offline provider with an artificial latency. The
+report gives per-interaction latency percentiles, resident memory growth
+per session, and hit rates of the cached loaders and render timings
+recorded by app.utils.profiling.
+
+    python -m benchmarks.load_test [--sessions 10] [--steps 8] [--latency 0.2]
+"""
+import argparse
+import gc
+import logging
+import random
+import resource
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from app.utils import config, fx, profiling
+from app.utils.data_loader import clear_series_cache
+from benchmarks.apptest import APP_PATH, concurrent_sessions, fragment_rerun, widget
+from benchmarks.offline import offline_yfinance
+
+PERIODS = ["1mo", "3mo", "6mo", "1y", "2y"]
+
+# Interaction -> relative frequency in a session
+INTERACTION_MIX = {
+    "ticker_switch": 0.4,
+    "period_change": 0.25,
+    "watchlist_edit": 0.3,
+    "refresh": 0.05
+}
+
+
+def rss_mb():
+    """Resident set size of this process (MB); peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Session:
+    """One simulated analyst: an AppTest plus a seeded random interaction script."""
+
+    def __init__(self, number, timeout):
+        self.number = number
+        self.rng = random.Random(number)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = []
+        self.errors = 0
+
+    def _run(self, interaction, fragment=None):
+        start = time.perf_counter()
+        if fragment is None:
+            self.at.run()
+        else:
+            with fragment_rerun(self.at, fragment):
+                self.at.run()
+        self.latencies.append((interaction, time.perf_counter() - start))
+        if self.at.exception:
+            self.errors += 1
+
+    def open(self):
+        self._run("page_load")
+
+    def step(self):
+        interaction = self.rng.choices(list(INTERACTION_MIX), weights=list(INTERACTION_MIX.values()))[0]
+        if interaction == "ticker_switch":
+            box = widget(self.at, "selectbox", "Select asset (friendly name):")
+            box.select(self.rng.choice([name for name in config.TICKERS if name != box.value]))
+            self._run(interaction)
+        elif interaction == "period_change":
+            box = widget(self.at, "selectbox", "Period")
+            box.select(self.rng.choice([period for period in PERIODS if period != box.value]))
+            self._run(interaction)
+        elif interaction == "watchlist_edit":
+            box = widget(self.at, "multiselect", "Watchlist")
+            name = self.rng.choice(list(config.TICKERS))
+            current = list(box.value)
+            box.set_value([n for n in current if n != name] if name in current and len(current) > 1
+                          else current + [name] if name not in current else current)
+            self._run(interaction, fragment="comparison_panel")
+        else:
+            widget(self.at, "button", "Refresh data").click()
+            self._run(interaction)
+
+
+def _latency_table(sessions):
+    samples = {}
+    for session in sessions:
+        for interaction, seconds in session.latencies:
+            samples.setdefault(interaction, []).append(seconds * 1000)
+    rows = []
+    for interaction, times in samples.items():
+        times = np.array(times)
+        rows.append({"Interaction": interaction, "Count": len(times), "P50_ms": np.percentile(times, 50),
+                     "P95_ms": np.percentile(times, 95), "P99_ms": np.percentile(times, 99),
+                     "Max_ms": times.max()})
+    return pd.DataFrame(rows).set_index("Interaction").round(1)
+
+
+def _cache_table():
+    summary = profiling.get_stage_summary()
+    cached = summary[summary["Stage"].str.startswith("app.load") | (summary["Stage"] == "charts.render")]
+    cached = cached.set_index("Stage")[["Calls", "P50_ms", "P95_ms", "Cache_Hits", "Cache_Misses"]]
+    lookups = cached["Cache_Hits"] + cached["Cache_Misses"]
+    cached["Hit_Rate"] = (cached["Cache_Hits"] / lookups.where(lookups > 0)).round(3)
+    return cached.round(1)
+
+
+def run_load_test(sessions=10, steps=8, think=0.5, latency=0.2, timeout=300):
+    """Run concurrent sessions against one in-process dashboard.
+
+    Args:
+        sessions: Concurrent simulated users
+        steps: Interactions per session after the initial page load
+        think: Mean think time between interactions (seconds, exponential)
+        latency: Seconds added to each offline download / fundamentals call
+        timeout: AppTest timeout per run (seconds)
+
+    Returns:
+        tuple: (per-interaction latency table, cache table, summary dict)
+    """
+    with offline_yfinance(latency=latency), concurrent_sessions():
+        st.cache_data.clear()
+        clear_series_cache()
+        fx.clear_fx_cache()
+
+        # One untimed session first, so imports and module state are not
+        # counted as per-session memory
+        Session(-1, timeout).open()
+        profiling.reset_stats()
+        gc.collect()
+        baseline = rss_mb()
+
+        users = [Session(number, timeout) for number in range(sessions)]
+        start = time.perf_counter()
+
+        def drive(session):
+            time.sleep(session.rng.uniform(0, think))  # staggered arrivals
+            try:
+                session.open()
+                for _ in range(steps):
+                    time.sleep(session.rng.expovariate(1 / think) if think > 0 else 0)
+                    session.step()
+            except Exception as e:
+                session.errors += 1
+                print(f"Session {session.number} aborted: {e!r}")
+
+        threads = [threading.Thread(target=drive, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        gc.collect()
+        peak = rss_mb()
+        interactions = sum(len(user.latencies) for user in users)
+        summary = {
+            "Sessions": sessions,
+            "Interactions": interactions,
+            "Errors": sum(user.errors for user in users),
+            "Wall_s": round(wall, 2),
+            "Interactions_per_s": round(interactions / wall, 2),
+            "RSS_Baseline_MB": round(baseline, 1),
+            "RSS_End_MB": round(peak, 1),
+            "RSS_per_Session_MB": round((peak - baseline) / sessions, 2)
+        }
+        return _latency_table(users), _cache_table(), summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=8)
+    parser.add_argument("--think", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    latencies, caches, summary = run_load_test(args.sessions, args.steps, args.think, args.latency)
+    print(latencies.to_string())
+    print()
+    print(caches.to_string())
+    print()
+    for key, value in summary.items():
+        print(f"{key:>22}: {value}")
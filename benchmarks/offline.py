@@ -0,0 +1,80 @@
+"""Offline market data for benchmarks.
+
+Replaces the Yahoo Finance calls with deterministic synthetic bars so that
+timings measure the dashboard, not the network.
+"""
+import contextlib
+import os
+import tempfile
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+PERIOD_BARS = {"1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "max": 2520}
+
+
+def synthetic_bars(ticker, bars=504, end="2025-06-30", freq="B"):
+    """Random-walk OHLCV bars, seeded by the ticker so every call agrees.
+
+    Args:
+        ticker: Ticker symbol (currency pairs ending in '=X' are flat)
+        bars: Number of bars
+        end: Last bar timestamp
+        freq: Bar frequency ('B' business days, 'min' minutes, ...)
+
+    Returns:
+        DataFrame with Open, High, Low, Close and Volume
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    index = pd.date_range(end=end, periods=bars, freq=freq, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    if ticker.endswith("=X"):
+        close = np.full(bars, 130.0)
+    open_ = close * (1 + rng.normal(0, 0.003, bars))
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, bars)),
+        "Low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, bars)),
+        "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, bars).astype(float)
+    }, index=index)
+
+
+@contextlib.contextmanager
+def offline_yfinance(latency=0.0):
+    """Patch yfinance with synthetic data and run from a scratch directory.
+
+    The working directory is switched to a temporary folder so the bar store
+    and other relative data paths never touch the repository.
+
+    Args:
+        latency: Seconds each download / fundamentals request sleeps, to
+            stand in for the network round trip
+    """
+    import yfinance as yf
+
+    def download(tickers, period="1y", interval="1d", **kwargs):
+        time.sleep(latency)
+        return synthetic_bars(tickers, bars=PERIOD_BARS.get(period, 252))
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        @property
+        def info(self):
+            time.sleep(latency)
+            return {"longName": self.symbol, "symbol": self.symbol}
+
+    saved = yf.download, yf.Ticker
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        yf.download, yf.Ticker = download, Ticker
+        os.chdir(scratch)
+        try:
+            yield scratch
+        finally:
+            os.chdir(cwd)
+            yf.download, yf.Ticker = saved
@@ -0,0 +1,78 @@
+"""Rerun latency per dashboard interaction: whole script vs fragment.
+
+Before the dashboard was split into fragments every widget interaction
+reran the whole script; now a widget inside a panel reruns only that
+panel's fragment. For each interaction this drives the app headless
+(streamlit.testing AppTest, offline data) and times both kinds of rerun
+after the same widget change.
+
+    python -m benchmarks.rerun_latency [--repeat 5]
+"""
+import argparse
+import contextlib
+import statistics
+import time
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.apptest import APP_PATH, fragment_rerun, widget
+from benchmarks.offline import offline_yfinance
+
+# Interaction -> (fragment, widget kind, label, two values to alternate, setup)
+INTERACTIONS = {
+    "NSE comparison toggle": ("nse_panel", "toggle", "Compare with NSE Index", (False, True), None),
+    "Watchlist add/remove": ("comparison_panel", "multiselect", "Watchlist",
+                             (["S&P 500", "Safaricom", "Apple", "Microsoft"], ["S&P 500", "Safaricom", "Apple"]),
+                             None),
+    "Optimizer max weight": ("optimizer_panel", "slider", "Max weight per asset", (0.6, 0.8), None),
+    "Pairs min correlation": ("pairs_panel", "slider", "Minimum |correlation|", (0.5, 0.7), None),
+    "Screener sort": ("screener_panel", "selectbox", "Sort by", ("Close", "RSI"),
+                      ("checkbox", "Enable screener", True))
+}
+
+
+def _timed_run(at, fragment=None):
+    context = fragment_rerun(at, fragment) if fragment else contextlib.nullcontext()
+    start = time.perf_counter()
+    with context:
+        at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].value}")
+    return elapsed
+
+
+def measure(repeat=5, timeout=120):
+    """Time full-script and fragment reruns for every interaction.
+
+    Args:
+        repeat: Timed reruns per interaction and mode (values alternate)
+        timeout: AppTest timeout per run (seconds)
+
+    Returns:
+        DataFrame indexed by interaction with median milliseconds per mode
+    """
+    rows = []
+    with offline_yfinance():
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+        for interaction, (fragment, kind, label, values, setup) in INTERACTIONS.items():
+            if setup is not None:
+                widget(at, setup[0], setup[1]).set_value(setup[2])
+            at.run()  # warm caches for this panel
+            timings = {"full": [], "fragment": []}
+            for i in range(repeat):
+                for mode in timings:
+                    widget(at, kind, label).set_value(values[i % 2])
+                    timings[mode].append(_timed_run(at, fragment if mode == "fragment" else None))
+            full, partial = (statistics.median(timings[mode]) * 1000 for mode in ("full", "fragment"))
+            rows.append({"Interaction": interaction, "Fragment": fragment, "Full_Rerun_ms": round(full, 1),
+                         "Fragment_Rerun_ms": round(partial, 1), "Speedup": round(full / partial, 1)})
+    return pd.DataFrame(rows).set_index("Interaction")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(measure(repeat=args.repeat).to_string())
@@ -0,0 +1,84 @@
+"""Accuracy, size and latency of the return sketches against raw returns.
+
+Builds per-ticker/sector digests for a synthetic universe of fat-tailed
+(Student-t) daily returns and compares, for the whole universe and one
+sector, the sketched VaR/CVaR against numpy on the concatenated raw returns:
+
+    python -m benchmarks.sketches [--tickers 500] [--days 2520] [--bucket M]
+
+Digests only shrink below the raw data once a bucket holds more values than
+the digest keeps centroids (a few hundred): monthly buckets of daily returns
+stay exact and uncompressed, yearly or intraday ones compress.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.components.metrics import calculate_cvar, calculate_var
+from app.utils.config import SKETCH_BUCKET
+from app.utils.sketches import ReturnSketches
+
+SECTORS = ["Banking", "Energy", "Technology", "Telecommunication", "Manufacturing"]
+
+
+def synthetic_returns(tickers, days, seed=0):
+    """ticker -> business-daily Student-t(3) returns with per-ticker volatility."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2015-01-01", periods=days)
+    return {f"T{i:04d}": pd.Series(rng.standard_t(3, days) * rng.uniform(0.005, 0.03), index=index)
+            for i in range(tickers)}
+
+
+def _best(run, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = run()
+        times.append(time.perf_counter() - start)
+    return value, min(times) * 1000
+
+
+def measure(tickers=500, days=2520, bucket=SKETCH_BUCKET):
+    """Compare sketched and exact tail statistics.
+
+    Args:
+        tickers: Universe size
+        days: Returns per ticker
+        bucket: Digest period
+
+    Returns:
+        DataFrame with one row per (selection, statistic)
+    """
+    returns = synthetic_returns(tickers, days)
+    sectors = {ticker: SECTORS[i % len(SECTORS)] for i, ticker in enumerate(returns)}
+    sketches = ReturnSketches(bucket=bucket, sectors=sectors)
+
+    start = time.perf_counter()
+    sketches.update_many(returns)
+    build = time.perf_counter() - start
+    raw_bytes = tickers * days * 8
+    print(f"built {tickers * days:,} returns in {build:.2f}s "
+          f"({tickers * days / build:,.0f}/s); digests {sketches.nbytes / 1e6:.1f} MB vs raw {raw_bytes / 1e6:.1f} MB")
+
+    rows = []
+    for label, selection, members in (("universe", {}, list(returns)),
+                                      ("sector", {"sector": "Energy"},
+                                       [t for t, s in sectors.items() if s == "Energy"])):
+        for stat, exact_fn in (("VaR_95", calculate_var), ("CVaR_95", calculate_cvar)):
+            exact, exact_ms = _best(lambda: exact_fn(pd.concat([returns[t] for t in members])))
+            approx, approx_ms = _best(lambda: exact_fn(sketches.sketch(**selection)))
+            rows.append({"Selection": label, "Statistic": stat, "Exact": exact, "Sketch": approx,
+                         "Rel_Error": abs(approx - exact) / abs(exact), "Exact_ms": round(exact_ms, 2),
+                         "Sketch_ms": round(approx_ms, 2)})
+    return pd.DataFrame(rows).set_index(["Selection", "Statistic"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--bucket", default=SKETCH_BUCKET)
+    args = parser.parse_args()
+    print(measure(args.tickers, args.days, args.bucket).to_string())
@@ -0,0 +1,127 @@
+"""Dashboard cold start: import time and time to first paint.
+
+Each measurement runs in a fresh interpreter, as a newly started worker
+would. Two numbers matter for autoscaled deployments:
+
+* import time of the modules `app.py` imports (after Streamlit itself),
+  and which heavy dependencies that pulls in;
+* for the first session of a worker, the time from the script starting to
+  the first main-area element (first paint), the KPI cards and price chart
+  (first data) and the end of the run. Downloads come from the offline
+  provider with an artificial per-request latency.
+
+    python -m benchmarks.startup [--repeat 5] [--latency 0.2]
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# Modules imported at the top of app.py
+APP_MODULES = [
+    "app.utils.config", "app.utils.profiling", "app.utils.data_loader", "app.utils.compact",
+    "app.utils.calendars", "app.utils.quality", "app.utils.fx", "app.components.charts",
+    "app.components.alerts", "app.components.screener", "app.components.optimizer",
+    "app.components.factors", "app.components.pairs", "app.components.metrics"
+]
+HEAVY_MODULES = ["yfinance", "plotly.express", "numba"]
+
+
+def _measure_imports():
+    start = time.perf_counter()
+    import streamlit  # noqa: F401  (the server has this loaded before any session)
+    streamlit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in APP_MODULES:
+        importlib.import_module(name)
+    return {"streamlit_ms": streamlit_s * 1000, "app_imports_ms": (time.perf_counter() - start) * 1000,
+            "heavy_loaded": [name for name in HEAVY_MODULES if name in sys.modules]}
+
+
+def _measure_first_paint(latency):
+    from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+    from streamlit.testing.v1 import AppTest
+
+    from benchmarks.offline import offline_yfinance
+
+    marks = {}
+    start = None
+    enqueue = ForwardMsgQueue.enqueue
+
+    def record(queue, msg):
+        # Main-area elements only (delta_path[0] == 0; the sidebar is 1)
+        if start is not None and msg.WhichOneof("type") == "delta" and msg.metadata.delta_path[0] == 0:
+            if msg.delta.WhichOneof("type") == "new_element":
+                kind = msg.delta.new_element.WhichOneof("type")
+                elapsed = (time.perf_counter() - start) * 1000
+                marks.setdefault("first_paint_ms", elapsed)
+                if kind == "metric":
+                    marks.setdefault("first_kpi_ms", elapsed)
+                elif kind == "plotly_chart":
+                    marks.setdefault("first_chart_ms", elapsed)
+        return enqueue(queue, msg)
+
+    ForwardMsgQueue.enqueue = record
+    with offline_yfinance(latency=latency):
+        at = AppTest.from_file(APP_PATH, default_timeout=300)
+        start = time.perf_counter()
+        at.run()
+        marks["complete_ms"] = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].value}")
+    return marks
+
+
+def _child(kind, latency):
+    result = _measure_imports() if kind == "imports" else _measure_first_paint(latency)
+    print(json.dumps(result))
+
+
+def _spawn(kind, latency):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", kind, "--latency", str(latency)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(repeat=5, latency=0.2):
+    """Median cold-start timings over fresh interpreters.
+
+    Args:
+        repeat: Interpreters started per measurement
+        latency: Seconds added to every offline download and fundamentals call
+
+    Returns:
+        dict of median milliseconds, plus the heavy modules loaded by the imports
+    """
+    results = {}
+    for kind in ("imports", "paint"):
+        runs = [_spawn(kind, latency) for _ in range(repeat)]
+        for key in runs[0]:
+            if key.endswith("_ms"):
+                results[key] = round(statistics.median(run[key] for run in runs), 1)
+            else:
+                results[key] = runs[0][key]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--child", choices=["imports", "paint"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child, args.latency)
+    else:
+        for key, value in measure(repeat=args.repeat, latency=args.latency).items():
+            print(f"{key:>16}: {value}")
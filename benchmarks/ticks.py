@@ -0,0 +1,130 @@
+"""Throughput of the streaming tick-to-bar aggregator.
+
+Generates a synthetic trade stream (random-walk prices, arrival order
+jittered within the grace window) and measures ticks per second for:
+
+* aggregation alone (pre-built batches, 1m/5m/15m/1h bars)
+* file replay (Parquet decode + aggregation)
+* a local TCP feed (text parsing + aggregation)
+* aggregation feeding the live pipeline (quality, snapshot index, alerts)
+  for the 1m bars of a smaller universe
+
+    python -m benchmarks.ticks [--ticks 2000000] [--symbols 500]
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.components.ticks import FileTickSource, SocketTickSource, TickAggregator, TickBatch, live_sink, \
+    write_tick_file
+from app.utils.config import TICK_BATCH_SIZE, TICK_GRACE_SECONDS
+
+
+def synthetic_ticks(ticks, symbols, minutes=60, jitter=2.0, seed=0):
+    """Random-walk trades for `symbols` tickers over `minutes` of market time.
+
+    Args:
+        ticks: Number of ticks
+        symbols: Number of tickers
+        minutes: Event-time span
+        jitter: Arrival delay (seconds, uniform) so ticks arrive out of order
+        seed: Random seed
+
+    Returns:
+        DataFrame with Symbol, Timestamp (int64 ns), Price and Size, in arrival order
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"T{i:04d}" for i in range(symbols)], dtype=object)
+    start = pd.Timestamp("2025-06-30 06:00", tz="UTC").value
+    stamps = start + np.sort(rng.integers(0, minutes * 60 * 10 ** 9, ticks))
+    codes = rng.integers(0, symbols, ticks)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, ticks)))
+    arrival = np.argsort(stamps + rng.integers(0, int(jitter * 10 ** 9), ticks), kind="stable")
+    return pd.DataFrame({"Symbol": names[codes][arrival], "Timestamp": stamps[arrival],
+                         "Price": prices[arrival], "Size": rng.integers(1, 1000, ticks)[arrival].astype(float)})
+
+
+def _batches(ticks, size):
+    return [TickBatch.from_frame(ticks.iloc[i:i + size]) for i in range(0, len(ticks), size)]
+
+
+def _timed(label, ticks, run):
+    start = time.perf_counter()
+    aggregator = run()
+    wall = time.perf_counter() - start
+    return {"Path": label, "Ticks": ticks, "Wall_s": round(wall, 3), "Ticks_per_s": round(ticks / wall),
+            "Bars": sum(aggregator.bars.values()), "Late": sum(aggregator.late.values())}
+
+
+def _serve(lines):
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def send():
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(lines)
+        server.close()
+
+    threading.Thread(target=send, daemon=True).start()
+    return server.getsockname()
+
+
+def measure(ticks=2_000_000, symbols=500, batch_size=TICK_BATCH_SIZE, live_symbols=20):
+    """Run every path on the same stream.
+
+    Args:
+        ticks: Stream length
+        symbols: Tickers in the stream
+        batch_size: Ticks per batch
+        live_symbols: Tickers in the live-pipeline run (bar processing is the bottleneck there)
+
+    Returns:
+        DataFrame with one row per path
+    """
+    stream = synthetic_ticks(ticks, symbols)
+    rows = []
+
+    batches = _batches(stream, batch_size)
+
+    def aggregate():
+        aggregator = TickAggregator(grace=TICK_GRACE_SECONDS)
+        for batch in batches:
+            aggregator.process(batch)
+        aggregator.flush()
+        return aggregator
+    rows.append(_timed("aggregate", ticks, aggregate))
+
+    with tempfile.TemporaryDirectory() as root:
+        path = write_tick_file(os.path.join(root, "ticks.parquet"), stream)
+        rows.append(_timed("parquet replay", ticks,
+                           lambda: _run(TickAggregator(), FileTickSource(path, batch_size))))
+
+    lines = "\n".join(f"{s},{t},{p:.4f},{z:.0f}" for s, t, p, z in stream.itertuples(index=False)).encode()
+    address = _serve(lines + b"\n")
+    rows.append(_timed("tcp feed", ticks, lambda: _run(TickAggregator(), SocketTickSource(*address))))
+
+    small = synthetic_ticks(ticks // 10, live_symbols, minutes=30, seed=1)
+    rows.append(_timed(f"aggregate + live 1m ({live_symbols} tickers)", len(small),
+                       lambda: _run(TickAggregator(sinks=[live_sink(["1m"], alerts=True)]),
+                                    _batches(small, batch_size))))
+    return pd.DataFrame(rows).set_index("Path")
+
+
+def _run(aggregator, source):
+    aggregator.run(source)
+    return aggregator
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=2_000_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=TICK_BATCH_SIZE)
+    args = parser.parse_args()
+    print(measure(args.ticks, args.symbols, args.batch_size).to_string())
@@ -0,0 +1,164 @@
+import asyncio
+import io
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from app import api
+from app.utils import data_loader
+
+
+def _bars(seed, n=300):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-06-30", periods=n, name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": 1000.0}, index=index)
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    # Deterministic bars per ticker; `offline["n"]` bars are served, with
+    # `offline["revised"]` (position -> close) overriding earlier closes
+    state = {"n": 300, "downloads": 0, "revised": {}}
+
+    def fake_download(ticker, period=None, interval=None, progress=False, **kwargs):
+        state["downloads"] += 1
+        bars = _bars(sum(map(ord, ticker)), state["n"])
+        for position, close in state["revised"].items():
+            bars.iloc[position, bars.columns.get_loc("Close")] = close
+        return bars
+
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+    data_loader.clear_series_cache()
+    api.clear_api_cache()
+    yield state
+    data_loader.clear_series_cache()
+    api.clear_api_cache()
+
+
+def _get(app, path, query="", headers=None):
+    # Minimal ASGI client: one GET, returns (status, headers, body)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+             "root_path": "", "server": ("test", 80), "client": ("test", 1),
+             "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], {key.decode(): value.decode() for key, value in start["headers"]}, body
+
+
+def test_frames_as_json_and_arrow(offline):
+    app = api.create_app()
+    expected = data_loader.get_data("AAPL", period="1y", interval="1d", include_indicators=False)
+
+    status, headers, body = _get(app, "/bars/AAPL", "period=1y")
+    assert status == 200 and headers["content-type"] == api.JSON_MEDIA_TYPE
+    payload = json.loads(body)
+    assert payload["columns"] == api.BAR_COLUMNS and len(payload["data"]) == len(expected)
+    np.testing.assert_allclose([row[3] for row in payload["data"]], expected["Close"])
+
+    status, headers, body = _get(app, "/bars/AAPL", "period=1y", {"Accept": api.ARROW_MEDIA_TYPE})
+    assert headers["content-type"] == api.ARROW_MEDIA_TYPE
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all().to_pandas().set_index("Date")
+    pd.testing.assert_frame_equal(table, expected[api.BAR_COLUMNS], check_freq=False, check_index_type=False)
+
+    status, _, body = _get(app, "/indicators/AAPL", "columns=RSI,MA_20")
+    assert status == 200 and json.loads(body)["columns"] == ["RSI", "MA_20"]
+    assert _get(app, "/indicators/AAPL", "columns=NOPE")[0] == 400
+    assert _get(app, "/summary/AAPL", "format=arrow")[0] == 406
+
+    status, _, body = _get(app, "/portfolio", "tickers=AAPL,^GSPC&weights=0.5,0.5")
+    portfolio = json.loads(body)
+    assert status == 200 and portfolio["Correlation_Matrix"]["columns"] == ["Apple", "S&P 500"]
+    assert portfolio["Portfolio_Beta"] is not None
+
+
+def test_indicator_warmup_encodes_as_null(offline):
+    app = api.create_app()
+
+    def strict(constant):
+        raise ValueError(f"non-standard JSON constant {constant}")
+
+    # MA_200 is undefined for the first 199 bars: null in JSON, null in Arrow
+    status, _, body = _get(app, "/indicators/AAPL", "columns=MA_200&period=max")
+    values = [row[0] for row in json.loads(body, parse_constant=strict)["data"]]
+    assert status == 200 and len(values) == offline["n"]
+    assert values[:199] == [None] * 199 and None not in values[199:]
+
+    _, _, body = _get(app, "/indicators/AAPL", "columns=MA_200&period=max", {"Accept": api.ARROW_MEDIA_TYPE})
+    assert pa.ipc.open_stream(io.BytesIO(body)).read_all().column("MA_200").null_count == 199
+
+
+def test_etag_revalidation_and_cache(offline, monkeypatch):
+    app = api.create_app()
+    calls = []
+    summary = api.metrics.get_summary_statistics
+    monkeypatch.setattr(api.metrics, "get_summary_statistics", lambda data: calls.append(1) or summary(data))
+
+    status, headers, body = _get(app, "/summary/MSFT")
+    etag = headers["etag"]
+    assert status == 200 and "Sharpe_Ratio" in json.loads(body)
+
+    # Unchanged data: 304 on revalidation, cached body otherwise
+    assert _get(app, "/summary/MSFT", headers={"If-None-Match": etag})[0] == 304
+    assert _get(app, "/summary/MSFT")[2] == body
+    assert len(calls) == 1
+
+    # A new bar changes the data version, hence the ETag
+    offline["n"] += 1
+    data_loader.clear_series_cache()
+    status, headers, _ = _get(app, "/summary/MSFT", headers={"If-None-Match": etag})
+    assert status == 200 and headers["etag"] != etag
+    assert len(calls) == 2
+
+    # So does revising an earlier bar, or a setting that changes the result
+    etags = {headers["etag"]}
+    offline["revised"][-20] = 1.0
+    data_loader.clear_series_cache()
+    etags.add(_get(app, "/summary/MSFT")[1]["etag"])
+    monkeypatch.setattr(api.quality, "QUALITY_VOLUME_SPIKE", 5.0)
+    etags.add(_get(app, "/summary/MSFT")[1]["etag"])
+    assert len(etags) == 3 and len(calls) == 4
+
+
+def test_concurrent_requests_share_one_computation(offline, monkeypatch):
+    app = api.create_app()
+    calls = []
+    release = threading.Event()
+    correlation = api.metrics.calculate_correlation_summary
+
+    def slow_correlation(data):
+        calls.append(1)
+        release.wait(5)
+        return correlation(data)
+
+    monkeypatch.setattr(api.metrics, "calculate_correlation_summary", slow_correlation)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_get(app, "/correlation", "tickers=AAPL,MSFT")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while api._flight.in_flight() == 0:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({(status, body) for status, _, body in results}) == 1 and results[0][0] == 200
@@ -0,0 +1,66 @@
+import pandas as pd
+from app.utils.calendars import align_panel, align_returns, build_date_index, series_version, trading_days
+
+
+def _closes(dates, start=100.0):
+    return pd.DataFrame({"Close": [start + i for i in range(len(dates))]}, index=pd.DatetimeIndex(dates))
+
+
+def test_exchange_holidays_differ():
+    nyse = trading_days("NYSE", "2024-01-01", "2024-12-31")
+    nse = trading_days("NSE", "2024-01-01", "2024-12-31")
+
+    assert pd.Timestamp("2024-07-04") not in nyse and pd.Timestamp("2024-07-04") in nse
+    assert pd.Timestamp("2024-12-12") not in nse and pd.Timestamp("2024-12-12") in nyse
+
+    union = build_date_index(["NYSE", "NSE"], "2024-01-01", "2024-12-31", how="union")
+    intersection = build_date_index(["NYSE", "NSE"], "2024-01-01", "2024-12-31", how="intersection")
+    assert len(intersection) < len(nyse) < len(union)
+
+
+def test_added_extra_holiday_is_not_served_from_cache(monkeypatch):
+    from app.utils import calendars
+
+    assert pd.Timestamp("2024-03-05") in trading_days("NSE", "2024-03-01", "2024-03-31")
+    holidays = dict(calendars.EXCHANGE_EXTRA_HOLIDAYS)
+    holidays["NSE"] = list(holidays.get("NSE", [])) + ["2024-03-05"]
+    monkeypatch.setattr(calendars, "EXCHANGE_EXTRA_HOLIDAYS", holidays)
+    assert pd.Timestamp("2024-03-05") not in trading_days("NSE", "2024-03-01", "2024-03-31")
+
+
+def test_align_returns_keeps_rows_closed_in_one_market():
+    start, end = "2024-06-03", "2024-07-31"
+    data = {
+        "S&P 500": _closes(trading_days("NYSE", start, end)),
+        "Safaricom": _closes(trading_days("NSE", start, end))
+    }
+
+    prices = align_panel(data)
+    returns = align_returns(data)
+
+    # US Independence Day is kept, with the US price carried forward
+    assert prices.loc["2024-07-04", "S&P 500"] == prices.loc["2024-07-03", "S&P 500"]
+    # ... but the US return is missing that day rather than 0%, and the next
+    # session's return is taken against the last US close
+    assert pd.isna(returns.loc["2024-07-04", "S&P 500"])
+    assert returns.loc["2024-07-04", "Safaricom"] != 0
+    us_close = data["S&P 500"]["Close"]
+    assert returns.loc["2024-07-05", "S&P 500"] == us_close["2024-07-05"] / us_close["2024-07-03"] - 1
+    assert len(returns) > len(pd.DataFrame({k: v["Close"] for k, v in data.items()}).dropna()) - 1
+
+    # Revising an earlier bar (same length, bounds and last close) invalidates the cached panel
+    revised = {name: frame.copy() for name, frame in data.items()}
+    revised["Safaricom"].iloc[5, 0] = 999.0
+    assert series_version(revised["Safaricom"]["Close"]) != series_version(data["Safaricom"]["Close"])
+    assert align_panel(revised)["Safaricom"].max() == 999.0
+
+
+def test_intraday_and_weekly_bars_keep_their_own_timestamps():
+    minutes = pd.date_range("2024-06-03 13:30", periods=500, freq="min", tz="UTC")
+    intraday = align_panel({"AAPL": _closes(minutes), "MSFT": _closes(minutes[100:], start=50.0)})
+    assert intraday.shape == (400, 2) and intraday.index.equals(minutes[100:])
+
+    weeks = pd.date_range("2024-01-01", periods=30, freq="W-MON")
+    weekly = align_panel({"S&P 500": _closes(weeks), "Safaricom": _closes(weeks[:-1])}, fill="none")
+    assert weekly.index.equals(weeks)
+    assert weekly["Safaricom"].isna().sum() == 1
@@ -0,0 +1,25 @@
+import numpy as np
+from app.utils.indicators import add_technical_indicators
+from app.utils.compact import compact_frame, with_indicators, frames_match, memory_usage_mb
+from test_indicators import make_ohlcv
+
+
+def test_compact_frame_dtypes_and_tolerance():
+    full = add_technical_indicators(make_ohlcv())
+    compact = compact_frame(full)
+
+    assert compact["Close"].dtype == np.float32
+    assert compact["Volume"].dtype == np.uint32
+    assert memory_usage_mb(compact) < memory_usage_mb(full)
+    assert frames_match(compact, full)
+
+
+def test_lazy_indicators_recomputed_on_demand():
+    full = add_technical_indicators(make_ohlcv())
+    lazy = compact_frame(full, lazy_indicators=True)
+
+    assert "RSI" not in lazy.columns
+    materialized = with_indicators(lazy, ["RSI", "MA_20"])
+    assert {"RSI", "MA_20"} <= set(materialized.columns)
+    assert "ATR" not in materialized.columns
+    assert frames_match(materialized, full)
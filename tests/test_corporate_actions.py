@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from app.utils import corporate_actions, data_loader
+from app.utils.corporate_actions import CorporateActions
+
+SPLIT = {"Date": "2024-03-01", "Type": "split", "Ratio": 2}
+DIVIDEND = {"Date": "2024-02-15", "Type": "dividend", "Amount": 1.0}
+BONUS = {"Date": "2024-03-15", "Type": "bonus", "Ratio": 1.25}
+
+
+def _raw_bars():
+    # Smooth prices with a 2:1 split on 2024-03-01 and a 1-for-4 bonus on 2024-03-15
+    index = pd.bdate_range("2024-01-02", "2024-04-30")
+    close = np.linspace(40.0, 48.0, len(index))
+    close[index >= "2024-03-01"] /= 2
+    close[index >= "2024-03-15"] /= 1.25
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": 1000.0}, index=index)
+
+
+def _expected(data, events, dividends=True):
+    # Event-by-event loop over the history
+    prices = data[["Open", "High", "Low", "Close"]].copy()
+    volume = data["Volume"].copy()
+    for event in events:
+        before = data.index < pd.Timestamp(event["Date"])
+        if event["Type"] == "dividend":
+            if dividends:
+                factor = 1 - event["Amount"] / data.loc[before, "Close"].iloc[-1]
+                prices[before] *= factor
+        else:
+            prices[before] /= event["Ratio"]
+            volume[before] *= event["Ratio"]
+    return prices.assign(Volume=volume)
+
+
+def test_adjustment_removes_jumps_and_total_return(tmp_path):
+    data = _raw_bars()
+    actions = CorporateActions(root=str(tmp_path))
+    actions.add_events("SCOM", [SPLIT, DIVIDEND, BONUS], prices=data)
+
+    for mode in ("split", "total"):
+        adjusted = actions.adjust("SCOM", data, mode=mode)
+        pd.testing.assert_frame_equal(adjusted, _expected(data, [SPLIT, DIVIDEND, BONUS], mode == "total"),
+                                      check_freq=False)
+    split_adjusted = actions.adjust("SCOM", data, mode="split")
+    assert split_adjusted["Close"].pct_change().abs().max() < 0.01
+
+    # Total return = price return, with the ex-date move measured from the
+    # previous close less the dividend (paid per share outstanding, so raw prices)
+    index = corporate_actions.total_return_index(data, "SCOM", actions=actions)
+    price = split_adjusted["Close"]
+    growth = price / price.shift(1)
+    ex_date = pd.Timestamp(DIVIDEND["Date"])
+    growth[ex_date] = data["Close"][ex_date] / (data["Close"].shift(1)[ex_date] - DIVIDEND["Amount"])
+    assert np.allclose(index.iloc[1:], growth.iloc[1:].cumprod())
+
+
+def test_new_event_updates_only_affected_history(tmp_path):
+    data = _raw_bars()
+    actions = CorporateActions(root=str(tmp_path))
+    actions.add_events("SCOM", [SPLIT, BONUS])
+    before = actions.adjust("SCOM", data)
+
+    # A late-arriving dividend rescales only the bars before its ex-date
+    assert actions.add_events("SCOM", [DIVIDEND], prices=data) == 1
+    assert actions.add_events("SCOM", [DIVIDEND], prices=data) == 0
+    after = actions.adjust("SCOM", data)
+    ex_date = pd.Timestamp(DIVIDEND["Date"])
+    pd.testing.assert_frame_equal(after[after.index >= ex_date], before[before.index >= ex_date])
+    assert (after.loc[after.index < ex_date, "Close"] < before.loc[before.index < ex_date, "Close"]).all()
+
+    # The patched cache matches a cold rebuild from the saved events
+    fresh = CorporateActions(root=str(tmp_path))
+    assert len(fresh.events("SCOM")) == 3
+    pd.testing.assert_frame_equal(fresh.adjust("SCOM", data), after)
+
+    # Revising any field of an earlier bar is not served from the memo
+    revised = data.copy()
+    revised.iloc[5, revised.columns.get_loc("Open")] = 999.0
+    expected = after["Open"].iloc[5] * 999.0 / data["Open"].iloc[5]
+    assert np.isclose(fresh.adjust("SCOM", revised)["Open"].iloc[5], expected)
+
+
+def test_unpriceable_dividend_does_not_invalidate_on_every_load(tmp_path, monkeypatch):
+    data = _raw_bars()
+    actions = CorporateActions(root=str(tmp_path))
+    actions.add_events("SCOM", [SPLIT, {"Date": "2023-06-01", "Type": "dividend", "Amount": 1.0}])
+    saves = []
+    monkeypatch.setattr(actions, "save", saves.append)
+
+    actions.adjust("SCOM", data)
+    cached = [id(frame) for frame in actions._adjusted.values()]
+    for _ in range(2):
+        actions.adjust("SCOM", data)
+    # No re-save and no rebuilt frame: later loads are memo hits
+    assert saves == [] and [id(frame) for frame in actions._adjusted.values()] == cached
+    assert actions.book("SCOM").unresolved.sum() == 1
+
+
+def test_local_kenyan_data_is_adjusted(tmp_path, monkeypatch):
+    data = _raw_bars()
+    data.rename_axis("Date").to_csv(tmp_path / "SCOM.csv")
+    actions = CorporateActions(root=str(tmp_path / "actions"))
+    actions.add_events("SCOM", [SPLIT, BONUS])
+    monkeypatch.setattr(data_loader, "NSE_PROCESSED_DIR", str(tmp_path))
+    monkeypatch.setattr(corporate_actions, "_registry", actions)
+
+    raw = data_loader.get_local_kenyan_data("SCOM", include_indicators=False, adjust=None)
+    adjusted = data_loader.get_local_kenyan_data("SCOM", include_indicators=True)
+
+    assert raw["Daily_Return"].min() < -0.4
+    assert adjusted["Daily_Return"].abs().max() < 0.01
+    assert adjusted["Close"].iloc[-1] == raw["Close"].iloc[-1]
+    assert np.isclose(adjusted["Cumulative_Return"].iloc[-1], 48.0 / 40.0 - 1)
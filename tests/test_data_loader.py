@@ -66,3 +66,209 @@ def test_validate_data():
         "Volume": [1000000]
     })
     assert validate_data(insufficient_df) is False, "DataFrame with less than 2 rows should fail validation"
+
+
+def _fake_daily_bars(n=520):
+    index = pd.date_range("2023-01-02", periods=n, freq="B", name="Date")
+    close = pd.Series(range(100, 100 + n), index=index, dtype=float)
+    return pd.DataFrame({
+        "Open": close - 0.5,
+        "High": close + 1,
+        "Low": close - 1,
+        "Close": close,
+        "Volume": 1000
+    })
+
+
+def test_shorter_period_and_coarser_interval_derived_locally(monkeypatch):
+    from app.utils import data_loader
+
+    calls = []
+
+    def fake_download(ticker, period=None, interval=None, progress=False):
+        calls.append((ticker, period, interval))
+        return _fake_daily_bars()
+
+    data_loader.clear_series_cache()
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+
+    yearly = data_loader.get_data("AAPL", period="1y", interval="1d")
+    monthly_period = data_loader.get_data("AAPL", period="1mo", interval="1d")
+    weekly = data_loader.get_data("AAPL", period="6mo", interval="1wk")
+    data_loader.clear_series_cache()
+
+    # Only the requested period is fetched on a miss
+    assert calls == [("AAPL", "1y", "1d")]
+    assert len(monthly_period) < len(yearly)
+    assert monthly_period.index[-1] == yearly.index[-1]
+
+    # Weekly bars are OHLCV aggregates of the daily bars
+    week = weekly.index[1]
+    daily = _fake_daily_bars()
+    days = daily[(daily.index >= week) & (daily.index < week + pd.Timedelta(days=7))]
+    assert weekly.loc[week, "Open"] == days["Open"].iloc[0]
+    assert weekly.loc[week, "High"] == days["High"].max()
+    assert weekly.loc[week, "Close"] == days["Close"].iloc[-1]
+    assert weekly.loc[week, "Volume"] == days["Volume"].sum()
+    assert "MA_20" in weekly.columns
+
+    # The base series cache is bounded and drops expired entries on store
+    monkeypatch.setattr(data_loader, "SERIES_CACHE_SIZE", 2)
+    for ticker in ("MSFT", "GOOG", "AMZN"):
+        data_loader.get_data(ticker, period="1y", interval="1d")
+    assert [key[0] for key in data_loader._series_cache] == ["GOOG", "AMZN"]
+    monkeypatch.setattr(data_loader, "CACHE_TTL", pd.Timedelta(0))
+    data_loader.get_data("TSLA", period="1y", interval="1d")
+    assert list(data_loader._series_cache) == [("TSLA", "1d")]
+    data_loader.clear_series_cache()
+
+
+def test_cached_series_widens_on_demand_and_slices_sessions(monkeypatch):
+    from app.utils import data_loader
+
+    calls = []
+
+    def fake_download(ticker, period=None, interval=None, progress=False):
+        calls.append(period)
+        # Ends on a Tuesday, so the last five sessions span a weekend
+        return _fake_daily_bars().loc[:"2024-12-24"]
+
+    data_loader.clear_series_cache()
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+
+    week = data_loader.load_ohlcv("AAPL", period="5d", interval="1d")
+    assert list(week.index.strftime("%a")) == ["Wed", "Thu", "Fri", "Mon", "Tue"]
+    assert week.index[-1] == pd.Timestamp("2024-12-24")
+
+    data_loader.load_ohlcv("AAPL", period="1mo", interval="1d")
+    data_loader.load_ohlcv("AAPL", period="2y", interval="1d")
+    data_loader.load_ohlcv("AAPL", period="1y", interval="1wk")
+    data_loader.load_ohlcv("AAPL", period="ytd", interval="1d")
+    data_loader.clear_series_cache()
+
+    # The 5d series cannot serve a month; the 2y one serves everything after it
+    assert calls == ["5d", "1mo", "2y"]
+
+
+class FakeWindowedProvider:
+    # Serves 1-minute bars but rejects requests spanning more than `max_days`
+    def __init__(self, max_days=7):
+        self.max_span = pd.Timedelta(days=max_days)
+        self.requests = []
+
+    def __call__(self, ticker, start=None, end=None, interval="1m"):
+        if end - start > self.max_span:
+            raise ValueError("requested window exceeds provider limit")
+        self.requests.append((start, end))
+        # Overlap the previous window by one bar to exercise de-duplication
+        index = pd.date_range(start - pd.Timedelta(minutes=1), end, freq="1min", inclusive="left", tz="UTC")
+        close = pd.Series(range(100, 100 + len(index)), index=index, dtype=float)
+        return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10})
+
+
+def test_fetch_history_chunks_and_stitches(tmp_path):
+    from app.utils import data_loader, store
+
+    provider = FakeWindowedProvider(max_days=7)
+    end = pd.Timestamp.now(tz="UTC").floor("D")
+    start = end - pd.Timedelta(days=20)
+
+    data = data_loader.fetch_history("AAPL", start, end, interval="1m", provider=provider,
+                                     max_workers=2, store_root=str(tmp_path))
+
+    assert len(provider.requests) == 3
+    assert data.index.is_monotonic_increasing
+    assert not data.index.duplicated().any()
+    assert len(data) == 20 * 24 * 60 + 1
+
+    stored = store.read_bars("AAPL", "1m", root=str(tmp_path))
+    pd.testing.assert_frame_equal(stored, data, check_freq=False)
+
+
+def test_concurrent_identical_downloads_are_coalesced(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from app.utils import data_loader
+
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def fake_download(ticker, period=None, interval=None, progress=False):
+        calls.append((ticker, period, interval))
+        started.set()
+        release.wait(5)
+        return _fake_daily_bars()
+
+    data_loader.clear_series_cache()
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(data_loader.get_data, "^GSPC", "1y", "1d") for _ in range(4)]
+        assert started.wait(5)
+        release.set()
+        results = [future.result() for future in futures]
+    data_loader.clear_series_cache()
+
+    assert len(calls) == 1
+    assert all(result is not None and len(result) == len(results[0]) for result in results)
+    # Each caller gets its own frame
+    assert len({id(result) for result in results}) == 4
+
+
+def test_caller_arriving_while_series_is_cached_does_not_redownload(monkeypatch):
+    import threading
+    from app.utils import data_loader
+
+    calls = []
+    storing, release = threading.Event(), threading.Event()
+    store_series = data_loader._store_series
+
+    def fake_download(ticker, period=None, interval=None, progress=False):
+        calls.append(ticker)
+        return _fake_daily_bars()
+
+    def slow_store(*args):
+        storing.set()
+        release.wait(5)
+        store_series(*args)
+
+    data_loader.clear_series_cache()
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+    monkeypatch.setattr(data_loader, "_store_series", slow_store)
+
+    first = threading.Thread(target=data_loader.load_ohlcv, args=("^GSPC", "1y", "1d"))
+    first.start()
+    assert storing.wait(5)
+    # The download has finished but its series is not cached yet
+    second = threading.Thread(target=data_loader.load_ohlcv, args=("^GSPC", "1y", "1d"))
+    second.start()
+    second.join(0.2)
+    release.set()
+    first.join(5)
+    second.join(5)
+    data_loader.clear_series_cache()
+
+    assert calls == ["^GSPC"]
+
+
+def test_prefetch_warms_series_cache(monkeypatch):
+    from app.utils import data_loader
+
+    calls = []
+
+    def fake_download(ticker, period=None, interval=None, progress=False):
+        calls.append(ticker)
+        return _fake_daily_bars()
+
+    data_loader.clear_series_cache()
+    monkeypatch.setattr(data_loader.yf, "download", fake_download)
+
+    futures = data_loader.prefetch(["^GSPC", "AAPL", "^GSPC"], period="1y", interval="1d")
+    assert len(futures) == 2
+    assert all(future.result() is not None for future in futures)
+
+    # Later loads (and repeated prefetches) are served from the cache
+    assert data_loader.prefetch(["^GSPC"], period="6mo", interval="1wk") == []
+    assert get_data("AAPL", period="6mo", interval="1d") is not None
+    data_loader.clear_series_cache()
+    assert sorted(calls) == ["AAPL", "^GSPC"]
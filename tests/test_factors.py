@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from app.components.factors import ExposureEngine, rolling_exposures
+from app.components.metrics import calculate_portfolio_beta
+
+
+def _returns(n_days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=n_days)
+    benchmarks = pd.DataFrame(rng.normal(0.0004, 0.01, (n_days, 2)), index=index, columns=["S&P 500", "NSE20"])
+    loadings = np.array([[1.2, 0.3, 0.0], [0.1, 0.9, 0.5]])
+    assets = pd.DataFrame(benchmarks.to_numpy() @ loadings + rng.normal(0.0002, 0.008, (n_days, 3)),
+                          index=index, columns=["AAA", "BBB", "CCC"])
+    assets.iloc[10:14, 1] = np.nan
+    return assets, benchmarks
+
+
+def test_rolling_exposures_match_pandas_rolling():
+    assets, benchmarks = _returns()
+    panel = rolling_exposures(assets, benchmarks, window=40)
+
+    for ticker in assets.columns:
+        for benchmark in benchmarks.columns:
+            y, x = assets[ticker], benchmarks[benchmark]
+            beta = y.rolling(40).cov(x) / x.rolling(40).var()
+            r2 = y.rolling(40).corr(x) ** 2
+            alpha = (y.rolling(40).mean() - beta * x.rolling(40).mean()) * 252
+            assert np.allclose(panel[("Beta", ticker, benchmark)].iloc[60:], beta.iloc[60:], atol=1e-10)
+            assert np.allclose(panel[("R2", ticker, benchmark)].iloc[60:], r2.iloc[60:], atol=1e-10)
+            assert np.allclose(panel[("Alpha", ticker, benchmark)].iloc[60:], alpha.iloc[60:], atol=1e-10)
+    assert panel.iloc[:39].isna().all().all()
+
+
+def test_incremental_update_matches_batch():
+    assets, benchmarks = _returns()
+    engine = ExposureEngine(window=40)
+    engine.fit(assets.iloc[:-20], benchmarks.iloc[:-20])
+    for ts in assets.index[-20:]:
+        latest = engine.update(assets.loc[ts], benchmarks.loc[ts], ts)
+
+    batch = rolling_exposures(assets, benchmarks, window=40)
+    assert np.allclose(engine.panel.to_numpy(), batch.to_numpy(), atol=1e-10, equal_nan=True)
+    assert np.isclose(latest.loc[("AAA", "S&P 500"), "Beta"], batch[("Beta", "AAA", "S&P 500")].iloc[-1])
+
+
+def test_portfolio_beta_renormalizes_weights():
+    assets, benchmarks = _returns()
+    returns = pd.concat([assets, benchmarks[["S&P 500"]]], axis=1).dropna()
+
+    # Half in the market itself: beta is the blend, not half of AAA's beta
+    beta = calculate_portfolio_beta(returns, {"AAA": 0.5, "S&P 500": 0.5})
+    aaa_beta = calculate_portfolio_beta(returns, {"AAA": 1.0})
+    assert np.isclose(beta, 0.5 * aaa_beta + 0.5)
+    assert np.isclose(calculate_portfolio_beta(returns, {"AAA": 0.25}), aaa_beta)
+
+
+def test_benchmark_holidays_use_the_valid_pairs_of_each_window():
+    rng = np.random.default_rng(4)
+    index = pd.bdate_range("2023-01-02", periods=400)
+    benchmarks = pd.DataFrame(rng.normal(0.0004, 0.01, (400, 2)), index=index, columns=["S&P 500", "NSE20"])
+    loadings = np.array([[1.2, 0.3], [0.1, 0.9]])
+    assets = pd.DataFrame(benchmarks.to_numpy() @ loadings + rng.normal(0, 0.004, (400, 2)),
+                          index=index, columns=["AAA", "BBB"])
+    # Nairobi holidays, and a session missing from the benchmark feed altogether
+    quoted = benchmarks.copy()
+    quoted.loc[index[[120, 121, 200]], "NSE20"] = np.nan
+    quoted = quoted.drop(index[300])
+
+    panel = rolling_exposures(assets, quoted, window=60)
+    assert panel.iloc[59:].notna().all().all()
+
+    # The window ending on row 150 holds 58 valid NSE20 pairs
+    y, x = assets["BBB"].iloc[91:151], quoted["NSE20"].reindex(index).iloc[91:151]
+    valid = x.notna()
+    expected = np.cov(y[valid], x[valid])[0, 1] / x[valid].var()
+    assert np.isclose(panel[("Beta", "BBB", "NSE20")].iloc[150], expected)
+
+    # Full-history betas recover the dominant loadings
+    full = rolling_exposures(assets, quoted, window=len(index) - 1)
+    assert abs(full[("Beta", "AAA", "S&P 500")].iloc[-1] - 1.2) < 0.05
+    assert abs(full[("Beta", "BBB", "NSE20")].iloc[-1] - 0.9) < 0.1
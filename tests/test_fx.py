@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from app.utils import fx
+from app.utils.indicators import add_technical_indicators
+
+
+def _fake_rates(monkeypatch, quoted):
+    calls = []
+
+    def fake_load(symbol, period=None, interval=None):
+        calls.append(symbol)
+        return quoted.get(symbol)
+
+    monkeypatch.setattr(fx, "load_ohlcv", fake_load)
+    monkeypatch.setattr(fx.store, "append_bars", lambda *args, **kwargs: None)
+    fx.clear_fx_cache()
+    return calls
+
+
+def _bars(values, start="2024-01-02"):
+    index = pd.date_range(start, periods=len(values), freq="B", name="Date")
+    close = pd.Series(values, index=index, dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000})
+
+
+def test_convert_frame_scales_prices_and_recomputes_indicators(monkeypatch):
+    _fake_rates(monkeypatch, {"USDKES=X": _bars([130.0] * 80)})
+    data = _bars(np.linspace(10, 20, 60))
+    data["Daily_Return"] = data["Close"].pct_change()
+    data = add_technical_indicators(data)
+
+    converted = fx.convert_frame(data, "USD", "KES")
+
+    assert np.allclose(converted["Close"], data["Close"] * 130)
+    assert np.allclose(converted["MA_20"].dropna(), data["MA_20"].dropna() * 130)
+    assert np.allclose(converted["RSI"].dropna(), data["RSI"].dropna())
+    assert converted.attrs["currency"] == "KES"
+
+
+def test_convert_frame_takes_the_as_of_rate_across_calendar_gaps(monkeypatch):
+    _fake_rates(monkeypatch, {})
+    dates = pd.bdate_range("2024-01-02", periods=8, name="Date")
+    data = pd.DataFrame({"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.0,
+                         "Volume": np.arange(1000, 1008, dtype="int64")},
+                        index=dates.tz_localize("Africa/Nairobi"))
+    # FX quotes start late and skip a session the exchange traded
+    quoted = dates[[2, 3, 4, 6, 7]]
+    rate = pd.Series([0.5, 0.6, 0.7, 0.8, 0.9], index=quoted)
+
+    converted = fx.convert_frame(data, "KES", "USD", rate=rate)
+
+    # Leading sessions take the first quote, the gap carries the last one forward
+    expected = [0.5, 0.5, 0.5, 0.6, 0.7, 0.7, 0.8, 0.9]
+    assert np.allclose(converted["Close"], np.multiply(10.0, expected))
+    assert converted.index.equals(data.index)
+    pd.testing.assert_series_equal(converted["Volume"], data["Volume"])
+
+
+def test_convert_universe_uses_inverse_pair_and_memoizes(monkeypatch):
+    quoted = {"USDKES=X": _bars([125.0] * 40)}
+    calls = _fake_rates(monkeypatch, quoted)
+    universe = {"Safaricom": _bars(np.linspace(15, 18, 30)), "Apple": _bars(np.linspace(180, 190, 30))}
+
+    first = fx.convert_universe(universe, "USD")
+    # KES -> USD is not quoted directly, so the USD/KES rate is inverted
+    assert calls[:2] == ["KESUSD=X", "USDKES=X"]
+    assert np.allclose(first["Safaricom"]["Close"], universe["Safaricom"]["Close"] / 125)
+    pd.testing.assert_frame_equal(first["Apple"], universe["Apple"])
+
+    # Served from the cache as copies: mutating one result leaves the next intact
+    first["Safaricom"]["Close"] = 0.0
+    second = fx.convert_universe(universe, "USD")
+    assert np.allclose(second["Safaricom"]["Close"], universe["Safaricom"]["Close"] / 125)
+
+    # A revised rate series is a new cache key
+    quoted["USDKES=X"] = _bars([100.0] * 40)
+    third = fx.convert_universe(universe, "USD")
+    assert np.allclose(third["Safaricom"]["Close"], universe["Safaricom"]["Close"] / 100)
+
+
+def test_convert_returns_matches_converted_prices(monkeypatch):
+    _fake_rates(monkeypatch, {})
+    index = pd.bdate_range("2024-01-02", periods=10, name="Date")
+    prices = pd.DataFrame({"Safaricom": np.linspace(15, 18, 10)}, index=index)
+    rates = {"KES": pd.Series(np.linspace(0.0077, 0.0079, 10), index=prices.index)}
+
+    returns = fx.convert_returns(prices.pct_change().iloc[1:], {"Safaricom": "KES"}, "USD", rates=rates)
+    expected = fx.convert_panel(prices, {"Safaricom": "KES"}, "USD", rates=rates).pct_change().iloc[1:]
+
+    assert np.allclose(returns.iloc[1:], expected.iloc[1:])
+
+
+def test_stored_rate_versions_stay_bounded(monkeypatch):
+    quoted = {}
+    _fake_rates(monkeypatch, quoted)
+    appended = []
+    monkeypatch.setattr(fx.store, "append_bars", lambda symbol, *args, **kwargs: appended.append(symbol))
+
+    for day in range(fx.FX_CACHE_SIZE + 10):
+        quoted["USDKES=X"] = _bars([125.0 + day] * 5)
+        fx.get_fx_rate("USD", "KES")
+        # An unchanged series is not written again
+        fx.get_fx_rate("USD", "KES")
+
+    assert len(appended) == fx.FX_CACHE_SIZE + 10
+    assert len(fx._stored_versions) == fx.FX_CACHE_SIZE
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.utils.indicators import add_technical_indicators
+from app.utils.lazy_indicators import LazyIndicatorFrame
+from app.utils.indicator_graph import (
+    INDICATOR_REGISTRY, evaluate_indicators, register_indicator, resolve_order, unregister_indicator
+)
+
+
+def make_ohlcv(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    df = pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n)),
+        "Low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n)),
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, n)
+    }, index=pd.date_range("2022-01-03", periods=n, freq="B"))
+    df["Daily_Return"] = df["Close"].pct_change()
+    df["Cumulative_Return"] = (1 + df["Daily_Return"]).cumprod() - 1
+    return df
+
+
+def test_lazy_frame_matches_eager_indicators():
+    data = make_ohlcv()
+    eager = add_technical_indicators(data)
+    lazy = LazyIndicatorFrame(data).materialize()
+
+    pd.testing.assert_frame_equal(lazy[eager.columns], eager)
+
+
+def test_lazy_frame_computes_only_requested_columns():
+    lazy = LazyIndicatorFrame(make_ohlcv())
+    lazy["MA_20"]
+    lazy["BB_Middle"]
+
+    assert lazy.computed_columns == ["MA_20", "BB_Middle"]
+    # MA_20 and BB_Middle share one rolling mean
+    assert [name for name in lazy._cache if "SMA" in name] == ["Close_SMA_20"]
+    assert "RSI" in lazy and "RSI" not in lazy.computed_columns
+
+
+def test_graph_runs_shared_nodes_once():
+    calls = []
+
+    def counted_delta(close):
+        calls.append(1)
+        return close.diff()
+
+    register_indicator("Test_Delta", ["Close"], counted_delta, public=False)
+    register_indicator("Test_Up", ["Test_Delta"], lambda d: d.clip(lower=0))
+    register_indicator("Test_Down", ["Test_Delta"], lambda d: d.clip(upper=0))
+    try:
+        order = resolve_order(["Test_Up", "Test_Down"], columns=["Close"])
+        assert order.index("Test_Delta") < order.index("Test_Up")
+
+        result = evaluate_indicators(make_ohlcv(), ["Test_Up", "Test_Down"])
+        assert set(result) == {"Test_Up", "Test_Down"}
+        assert len(calls) == 1
+    finally:
+        for name in ("Test_Delta", "Test_Up", "Test_Down"):
+            unregister_indicator(name)
+
+    assert "Test_Up" not in INDICATOR_REGISTRY
+
+
+def test_overwritten_indicator_is_not_served_from_memo():
+    data = make_ohlcv()
+
+    def scaled(factor):
+        return lambda close: close * factor
+
+    register_indicator("Test_Scaled", ["Close"], scaled(2))
+    try:
+        first = add_technical_indicators(data, ["Test_Scaled"])
+        # Same code, different closure value
+        register_indicator("Test_Scaled", ["Close"], scaled(3), overwrite=True)
+        second = add_technical_indicators(data, ["Test_Scaled"])
+        # New code
+        register_indicator("Test_Scaled", ["Close"], lambda close: close - 1, overwrite=True)
+        third = add_technical_indicators(data, ["Test_Scaled"])
+    finally:
+        unregister_indicator("Test_Scaled")
+
+    np.testing.assert_allclose(first["Test_Scaled"], data["Close"] * 2)
+    np.testing.assert_allclose(second["Test_Scaled"], data["Close"] * 3)
+    np.testing.assert_allclose(third["Test_Scaled"], data["Close"] - 1)
+
+
+def test_changed_windows_rebuild_builtin_indicators(monkeypatch):
+    from app.utils import indicators
+
+    data = make_ohlcv()
+    default = add_technical_indicators(data, ["MA_20", "BB_Middle"])
+
+    monkeypatch.setitem(indicators.INDICATOR_PARAMS, "MA_SHORT", 5)
+    short = add_technical_indicators(data, ["MA_20", "BB_Middle"])
+    lazy = LazyIndicatorFrame(data)
+    pd.testing.assert_series_equal(short["MA_20"], data["Close"].rolling(5).mean(), check_names=False)
+    pd.testing.assert_series_equal(lazy["MA_20"], short["MA_20"])
+    # The Bollinger window is separate and still 20
+    pd.testing.assert_series_equal(short["BB_Middle"], default["BB_Middle"])
+
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(add_technical_indicators(data, ["MA_20", "BB_Middle"]), default)
+
+
+def _kernel_outputs(kernels, data):
+    return (kernels.true_range(data["High"], data["Low"], data["Close"]),
+            *kernels.rolling_min_max(data["Low"], data["High"], 14),
+            kernels.wilder_rsi(data["Close"], 14),
+            kernels.wilder_atr(data["High"], data["Low"], data["Close"], 14))
+
+
+def _reference_wilder(values, period):
+    # pandas EWM with alpha = 1/period, seeded with the SMA of the first `period` values
+    values = pd.Series(values, dtype=float)
+    valid = values.dropna()
+    seeded = values.loc[valid.index[period - 1]:].copy()
+    seeded.iloc[0] = valid.iloc[:period].mean()
+    smoothed = seeded.ewm(alpha=1 / period, adjust=False, ignore_na=True).mean()
+    return smoothed.reindex(values.index).to_numpy()
+
+
+def test_wilder_kernels_match_reference_values():
+    from app.utils import kernels
+
+    # Seed (1 + 2 + 3) / 3 = 2, then (2 * 2 + 4) / 3 and (8/3 * 2 + 5) / 3
+    np.testing.assert_allclose(kernels.wilder_smooth([1.0, 2, 3, 4, 5], 3),
+                               [np.nan, np.nan, 2, 8 / 3, 31 / 9])
+
+    data = make_ohlcv(500)
+    close = data["Close"]
+    delta = close.diff()
+    avg_gain = _reference_wilder(delta.clip(lower=0).where(delta.notna()), 14)
+    avg_loss = _reference_wilder((-delta).clip(lower=0).where(delta.notna()), 14)
+    np.testing.assert_allclose(kernels.wilder_rsi(close, 14), 100 - 100 / (1 + avg_gain / avg_loss),
+                               rtol=1e-10)
+
+    prev_close = close.shift(1)
+    true_range = pd.concat([data["High"] - data["Low"], (data["High"] - prev_close).abs(),
+                            (data["Low"] - prev_close).abs()], axis=1).max(axis=1)
+    np.testing.assert_allclose(kernels.wilder_atr(data["High"], data["Low"], close, 14),
+                               _reference_wilder(true_range, 14), rtol=1e-10)
+
+
+def test_wilder_seed_skips_interior_nans():
+    from app.utils import kernels
+
+    values = np.array([np.nan, 1, 2, np.nan, 4, 5, 6, 7])
+    looped = kernels._wilder_smooth_loop(values, 3, np.full(len(values), np.nan))
+
+    # Seeded with mean(1, 2, 4) at the position of the 4
+    assert np.isnan(looped[:4]).all()
+    assert looped[4] == pytest.approx(7 / 3)
+    np.testing.assert_allclose(looped, _reference_wilder(values, 3), rtol=1e-12)
+    np.testing.assert_allclose(kernels.wilder_smooth(values, 3), looped, rtol=1e-12)
+    assert np.isnan(kernels.wilder_smooth(values[:4], 3)).all()
+
+
+def test_loop_kernels_match_numpy_paths(monkeypatch):
+    from app.utils import kernels
+
+    data = make_ohlcv(500)
+    data.iloc[[40, 41, 200], data.columns.get_loc("Close")] = np.nan
+    # The loop kernels (compiled when Numba is installed, plain Python otherwise) ...
+    monkeypatch.setattr(kernels, "NUMBA_AVAILABLE", True)
+    looped = _kernel_outputs(kernels, data)
+    # ... against the vectorized NumPy / pandas fallbacks
+    monkeypatch.setattr(kernels, "NUMBA_AVAILABLE", False)
+    vectorized = _kernel_outputs(kernels, data)
+
+    for a, b in zip(looped[:3], vectorized[:3]):
+        np.testing.assert_array_equal(a, b)
+    # The Wilder fallback rearranges the arithmetic, so it only agrees to rounding
+    for a, b in zip(looped[3:], vectorized[3:]):
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+        np.testing.assert_allclose(a, b, rtol=1e-12)
+
+    # Rolling extremes match pandas exactly
+    np.testing.assert_array_equal(vectorized[1], data["Low"].rolling(14).min().to_numpy())
+
+    # A NaN in one column only blanks that column's windows (loop kernel run directly,
+    # so this holds whether or not Numba is installed)
+    low = np.array([1.0, 2, 3, 4, 5, 6])
+    high = np.array([2.0, 3, np.nan, 5, 6, 7])
+    looped = kernels._rolling_min_max_loop(low, high, 2, np.full(6, np.nan), np.full(6, np.nan))
+    for a, b in zip(looped, kernels.rolling_min_max(low, high, 2)):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(looped[0], pd.Series(low).rolling(2).min().to_numpy())
+    np.testing.assert_array_equal(looped[1], pd.Series(high).rolling(2).max().to_numpy())
+
+
+def test_compiled_kernels_match_python_loops():
+    pytest.importorskip("numba")
+    from app.utils import kernels
+
+    data = make_ohlcv(500)
+    high, low, close = (data[column].to_numpy(copy=True) for column in ("High", "Low", "Close"))
+    close[[40, 200]] = np.nan
+    n = len(close)
+    pairs = [
+        (kernels._true_range_kernel(high, low, close, np.empty(n)),
+         kernels._true_range_loop(high, low, close, np.empty(n))),
+        (kernels._wilder_smooth_kernel(close, 14, np.full(n, np.nan)),
+         kernels._wilder_smooth_loop(close, 14, np.full(n, np.nan))),
+        (kernels._rolling_min_max_kernel(low, high, 14, np.full(n, np.nan), np.full(n, np.nan)),
+         kernels._rolling_min_max_loop(low, high, 14, np.full(n, np.nan), np.full(n, np.nan))),
+    ]
+    for compiled, python in pairs:
+        np.testing.assert_array_equal(compiled, python)
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+from app.utils.lazy_modules import LazyModule, lazy_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_dashboard_modules_defer_heavy_imports():
+    # Fresh interpreter: importing what app.py imports must not load these
+    code = (
+        "import json, sys\n"
+        "import app.utils.data_loader, app.utils.fx, app.components.charts, app.components.screener\n"
+        "print(json.dumps([m for m in ('yfinance', 'plotly.express', 'numba', 'requests') if m in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(output.stdout.strip().splitlines()[-1]) == []
+
+
+def test_lazy_module_loads_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    colorsys = lazy_import("colorsys")
+    assert isinstance(colorsys, LazyModule) and "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert lazy_import("colorsys") is sys.modules["colorsys"]
+
+    # Patching through the proxy patches the real module
+    monkeypatch.setattr(colorsys, "ONE_THIRD", 0.5)
+    assert sys.modules["colorsys"].ONE_THIRD == 0.5
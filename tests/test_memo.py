@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from app.components import metrics
+from app.utils import memo
+from app.utils.memo import MemoCache, fingerprint, memoize
+
+
+def _bars(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    data = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": rng.integers(1000, 2000, n)}, index=pd.bdate_range("2024-01-02", periods=n))
+    data["Daily_Return"] = data["Close"].pct_change()
+    return data
+
+
+def test_fingerprint_follows_content_not_identity():
+    data = _bars()
+    assert fingerprint(data) == fingerprint(data.copy())
+    assert fingerprint(data, {"a": 1}) == fingerprint(_bars(), {"a": 1})
+
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc("Close")] += 0.01
+    assert fingerprint(changed) != fingerprint(data)
+    assert fingerprint(data.rename(columns={"Close": "Adj Close"})) != fingerprint(data)
+    assert fingerprint(data.astype({"Volume": "float64"})) != fingerprint(data)
+    assert fingerprint(data.tz_localize("UTC")) != fingerprint(data)
+    assert fingerprint(data, {"a": 1}) != fingerprint(data, {"a": 2})
+
+
+def test_fingerprint_separates_inputs_with_equal_buffers():
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+    frame = pd.DataFrame({"x": values[:2], "y": values[2:]})
+
+    # Same bytes laid out differently
+    assert fingerprint(values) != fingerprint(values.reshape(2, 2))
+    assert fingerprint(frame) != fingerprint(frame[["y", "x"]])
+    assert fingerprint(frame) != fingerprint(pd.DataFrame(values.reshape(2, 2), columns=["x", "y"]))
+    # Same values, different positions of the gap
+    assert fingerprint(np.array([1.0, np.nan])) != fingerprint(np.array([np.nan, 1.0]))
+    # Object columns hash their items, not their pointers
+    assert fingerprint(pd.Series(["a", "bc"])) == fingerprint(pd.Series(["a", "bc"]))
+    assert fingerprint(pd.Series(["a", "bc"])) != fingerprint(pd.Series(["ab", "c"]))
+    # Scalars and containers keep their type
+    assert len({fingerprint(value) for value in (1, 1.0, "1", True, (1,), [1])}) == 6
+
+
+def test_memoize_reuses_results_across_equal_inputs(monkeypatch):
+    memo.clear_memo_cache()
+    calls = []
+    params = {"window": 5}
+
+    @memoize("test.memo", params=lambda: params["window"])
+    def rolling(data):
+        calls.append(1)
+        return data["Close"].rolling(params["window"]).mean().to_frame("MA")
+
+    first = rolling(_bars())
+    first["MA"] = 0.0  # callers get their own copy
+    second = rolling(_bars())
+    assert len(calls) == 1
+    assert second["MA"].iloc[-1] == _bars()["Close"].iloc[-5:].mean()
+
+    params["window"] = 10
+    rolling(_bars())
+    assert len(calls) == 2
+
+    # Same name and bytecode but a different constant is a different function
+    @memoize("test.memo")
+    def scaled(data):
+        return data["Close"] * 2
+
+    doubled = scaled(_bars())
+
+    @memoize("test.memo")
+    def scaled(data):
+        return data["Close"] * 3
+
+    assert scaled(_bars()).equals(doubled * 1.5)
+
+    monkeypatch.setattr(memo, "MEMO_ENABLED", False)
+    rolling(_bars())
+    assert len(calls) == 3
+
+    # Library functions are memoized by content too
+    monkeypatch.setattr(memo, "MEMO_ENABLED", True)
+    stats = memo.get_memo_cache().stats()
+    data = _bars()
+    assert metrics.get_summary_statistics(data) == metrics.get_summary_statistics(_bars())
+    assert memo.get_memo_cache().stats()["Hits"] == stats["Hits"] + 1
+
+
+def test_cache_is_byte_bounded_and_spills_to_disk(tmp_path):
+    frame = pd.DataFrame({"x": np.arange(1000, dtype="float64")})  # ~8 KB
+    cache = MemoCache(max_bytes=20_000, disk_dir=str(tmp_path), disk_max_bytes=10**6)
+    for key in ("a1", "b2", "c3"):
+        cache.put(key, frame)
+    assert len(cache) == 2 and cache.nbytes <= 20_000
+
+    # The evicted entry is still on disk, and so visible to a fresh process
+    found, value = cache.get("a1")
+    assert found and value.equals(frame)
+    found, _ = MemoCache(disk_dir=str(tmp_path)).get("c3")
+    assert found
+    assert cache.stats()["Disk_Hits"] == 1
+
+    small = MemoCache(disk_dir=str(tmp_path), disk_max_bytes=20_000)
+    small.put("d4", frame)
+    assert sum(f.stat().st_size for f in tmp_path.rglob("*.pkl")) <= 20_000
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from app.utils import net
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    # Keep-alive server that counts requests and client connections
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.connections.add(self.client_address)
+        time.sleep(server.delay)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests, httpd.connections, httpd.delay = [], set(), 0.0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    net.reset_network_state()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    net.reset_network_state()
+
+
+def test_concurrent_identical_gets_share_one_request(server):
+    server.delay = 0.3
+    url = f"http://127.0.0.1:{server.server_port}/quote"
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(lambda _: net.http_get(url, params={"s": "SCOM"}), range(6)))
+
+    assert server.requests == ["/quote?s=SCOM"]
+    assert all(response.text == "/quote?s=SCOM" for response in responses)
+
+    # Different parameters are a different request
+    net.http_get(url, params={"s": "EQTY"})
+    assert len(server.requests) == 2
+
+
+def test_shared_session_reuses_connection(server):
+    url = f"http://127.0.0.1:{server.server_port}"
+    for i in range(3):
+        net.http_get(f"{url}/page/{i}")
+
+    assert len(server.requests) == 3
+    assert len(server.connections) == 1
+    assert net.get_http_session() is net.get_http_session()
+
+
+def test_token_bucket_limits_rate(server, monkeypatch):
+    now = [0.0]
+    bucket = net.TokenBucket(rate=2, capacity=2, clock=lambda: now[0],
+                             sleep=lambda seconds: now.__setitem__(0, now[0] + seconds))
+    waits = [bucket.acquire() for _ in range(4)]
+    # The burst passes, then one token every 1/rate seconds
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.5, 0.5])
+    assert not bucket.try_acquire()
+    with pytest.raises(TimeoutError):
+        bucket.acquire(timeout=0.1)
+
+    # http_get draws from the provider's bucket
+    monkeypatch.setattr(net, "PROVIDER_RATE_LIMITS", {"http": {"rate": 20.0, "burst": 1}})
+    url = f"http://127.0.0.1:{server.server_port}"
+    started = time.perf_counter()
+    for i in range(4):
+        net.http_get(f"{url}/limited/{i}")
+    assert time.perf_counter() - started >= 0.14
+    assert len(server.requests) == 4
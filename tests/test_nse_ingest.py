@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+from app.utils import data_loader, nse_ingest, store
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "nse")
+
+
+def _pages():
+    return nse_ingest.archived_pages(FIXTURES)
+
+
+def test_parse_price_list_normalizes_rows():
+    rows = nse_ingest.parse_price_list(os.path.join(FIXTURES, "price_list_2024_03_11.html"))
+
+    # The suspended counter (no price) and the index table are skipped
+    assert rows["Ticker"].tolist() == ["SCOM", "EQTY", "KCB", "EABL"]
+    assert (rows["Date"] == pd.Timestamp("2024-03-11")).all()
+    scom = rows.set_index("Ticker").loc["SCOM"]
+    # No opening price is published, so Open is the previous close
+    assert scom[["Open", "High", "Low", "Close", "Volume"]].tolist() == [15.95, 16.25, 15.80, 16.10, 4512300]
+
+    # Date from the file name, lower-case codes and "-" volume (no trades)
+    rows = nse_ingest.parse_price_list(os.path.join(FIXTURES, "20240312.html")).set_index("Ticker")
+    assert rows.loc["KCB", "Volume"] == 0 and rows.loc["KCB", "Open"] == 22.50
+    assert (rows["Date"] == pd.Timestamp("2024-03-12")).all()
+
+
+def test_ingest_appends_incrementally(tmp_path, monkeypatch):
+    root, csv_dir = str(tmp_path / "store"), str(tmp_path / "Kenya")
+    pages = _pages()
+    earlier = [os.path.join(FIXTURES, name) for name in ("price_list_2024_03_11.html", "20240312.html")]
+
+    first = nse_ingest.ingest_price_lists(earlier, store_root=root, csv_dir=csv_dir)
+    assert first.loc["SCOM", "New_Bars"] == 2 and first.loc["EABL", "Total_Bars"] == 1
+
+    # Unchanged pages are skipped; a new page only adds its own bars
+    assert nse_ingest.ingest_price_lists(earlier, store_root=root, csv_dir=csv_dir).empty
+    second = nse_ingest.ingest_price_lists(pages, store_root=root, csv_dir=csv_dir)
+    assert second.loc["SCOM", "New_Bars"] == 1 and second.loc["SCOM", "Total_Bars"] == 3
+    assert "EABL" not in second.index
+
+    stored = store.read_bars("SCOM", "1d", root=root)
+    assert stored["Close"].tolist() == [16.10, 16.45, 16.80]
+
+    # The CSVs are what the dashboard's local Kenyan loader reads
+    monkeypatch.setattr(data_loader, "NSE_PROCESSED_DIR", csv_dir)
+    local = data_loader.get_local_kenyan_data("SCOM", include_indicators=False)
+    assert local["Close"].tolist() == [16.10, 16.45, 16.80]
+    assert local.index[0] == pd.Timestamp("2024-03-11")
+
+
+def test_parallel_ingest_matches_sequential(tmp_path, monkeypatch):
+    # One page per session, generated from the heading-dated fixture
+    template = open(os.path.join(FIXTURES, "price_list_2024_03_11.html"), encoding="utf-8").read()
+    for day in pd.bdate_range("2024-04-01", periods=8):
+        html = template.replace("Monday, 11th March 2024", f"{day:%d %B %Y}")
+        (tmp_path / f"page_{day:%m%d}.html").write_text(html, encoding="utf-8")
+
+    pages = nse_ingest.archived_pages(str(tmp_path))
+    monkeypatch.setattr(nse_ingest, "NSE_INGEST_PARALLEL_MIN_FILES", 2)
+    sequential = nse_ingest.ingest_price_lists(pages, store_root=str(tmp_path / "a"), csv_dir=None,
+                                               max_workers=1)
+    parallel = nse_ingest.ingest_price_lists(pages, store_root=str(tmp_path / "b"), csv_dir=None,
+                                             max_workers=2)
+
+    assert sequential.loc["SCOM", "New_Bars"] == 8
+    pd.testing.assert_frame_equal(sequential, parallel)
+    for ticker in parallel.index:
+        pd.testing.assert_frame_equal(store.read_bars(ticker, "1d", root=str(tmp_path / "a")),
+                                      store.read_bars(ticker, "1d", root=str(tmp_path / "b")))
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.components import optimizer
+
+
+def _returns(n_assets=20, n_days=400, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, (n_days, 2))
+    loadings = rng.normal(1, 0.4, (2, n_assets))
+    values = factors @ loadings + rng.normal(0.0004, 0.012, (n_days, n_assets))
+    index = pd.bdate_range("2023-01-02", periods=n_days)
+    return pd.DataFrame(values, index=index, columns=[f"A{i}" for i in range(n_assets)])
+
+
+def test_projection_matches_bisection():
+    rng = np.random.default_rng(1)
+    points = rng.normal(0, 0.3, (30, 5))
+    projected = optimizer.project_capped_simplex(points, 0.0, 0.1)
+
+    for j in range(points.shape[1]):
+        low, high = points[:, j].min() - 1, points[:, j].max() + 1
+        for _ in range(200):
+            tau = (low + high) / 2
+            low, high = (tau, high) if np.clip(points[:, j] - tau, 0, 0.1).sum() > 1 else (low, tau)
+        assert np.allclose(projected[:, j], np.clip(points[:, j] - tau, 0, 0.1), atol=1e-12)
+
+
+def test_min_variance_matches_closed_form_without_bounds():
+    moments = optimizer.estimate_moments(_returns(5), shrinkage=None)
+    inverse = np.linalg.solve(moments.cov, np.ones(5))
+
+    result = optimizer.min_variance(moments, long_only=False, max_weight=10.0)
+
+    assert np.allclose(result["Weights"].to_numpy(), inverse / inverse.sum(), atol=1e-6)
+
+
+def test_frontier_constraints_and_tangency():
+    returns = _returns(40)
+    moments = optimizer.estimate_moments(returns)
+    assert optimizer.estimate_moments(returns) is moments
+
+    # Revised earlier returns (e.g. a split adjustment) are not served stale moments
+    revised = returns.copy()
+    revised.iloc[10:100, 0] *= 10
+    assert optimizer.estimate_moments(revised).cov[0, 0] > 10 * moments.cov[0, 0]
+    assert 0 < moments.shrinkage < 1
+
+    frontier = optimizer.efficient_frontier(moments, points=30, max_weight=0.1)
+    weights = frontier["Weights"]
+    assert np.allclose(weights.sum(), 1.0)
+    assert weights.min().min() >= -1e-12 and weights.max().max() <= 0.1 + 1e-12
+    assert np.all(np.diff(frontier["Frontier"]["Expected_Return"]) >= -1e-9)
+
+    tangency = optimizer.max_sharpe(moments, max_weight=0.1, points=30)
+    assert tangency["Sharpe_Ratio"] >= frontier["Frontier"]["Sharpe_Ratio"].max() - 1e-9
+
+    middle = frontier["Frontier"]["Expected_Return"].median()
+    targeted = optimizer.target_return(moments, middle, max_weight=0.1)
+    assert targeted["Expected_Return"] == pytest.approx(middle, abs=1e-6)
+
+    with pytest.raises(ValueError):
+        optimizer.min_variance(moments, max_weight=0.01)
+
+
+def test_shrinkage_handles_more_assets_than_days_and_late_listings():
+    returns = _returns(80, n_days=60)
+    returns["DELISTED"] = np.nan
+    returns.iloc[:10, 5] = np.nan  # listed after the panel starts
+
+    moments = optimizer.estimate_moments(returns)
+
+    # Empty columns are dropped, partial ones cut the history to complete rows
+    assert "DELISTED" not in moments.names and len(moments.names) == 80
+    sample = np.cov(returns.iloc[10:, :80].to_numpy(), rowvar=False)
+    assert np.linalg.matrix_rank(sample) < 80
+    # The shrunk covariance stays invertible, so the optimizer still solves
+    assert np.linalg.eigvalsh(moments.cov)[0] > 0
+    weights = optimizer.min_variance(moments, max_weight=0.05)["Weights"]
+    assert isinstance(weights, pd.Series) and np.isclose(weights.sum(), 1.0)
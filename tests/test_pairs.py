@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from app.components import pairs
+
+
+def _universe(seed=0, n_days=400):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=n_days)
+    trend = np.cumsum(rng.normal(0, 0.01, n_days))
+    stationary = np.zeros(n_days)
+    for t in range(1, n_days):
+        stationary[t] = 0.8 * stationary[t - 1] + rng.normal(0, 0.004)
+
+    log_prices = {
+        "Safaricom": 3 + trend + rng.normal(0, 0.002, n_days),
+        "SCOM.NR": 3.2 + 1.5 * trend + stationary,
+        "EQTY.NR": 3 + trend + np.cumsum(rng.normal(0, 0.006, n_days)),
+        "AAPL": 5 + np.cumsum(rng.normal(0, 0.01, n_days))
+    }
+    return {name: pd.DataFrame({"Close": np.exp(values)}, index=index) for name, values in log_prices.items()}
+
+
+def test_adf_statistic_matches_least_squares():
+    rng = np.random.default_rng(3)
+    spread = np.cumsum(rng.normal(0, 1, 300)) * 0.1 + rng.normal(0, 1, 300)
+    diff = np.diff(spread)
+    design = np.column_stack([spread[1:-1], diff[:-1]])
+    coefs = np.linalg.lstsq(design, diff[1:], rcond=None)[0]
+    residuals = diff[1:] - design @ coefs
+    sigma2 = residuals @ residuals / (len(residuals) - 2)
+    expected = coefs[0] / np.sqrt(sigma2 * np.linalg.inv(design.T @ design)[0, 0])
+
+    stat, _ = pairs._adf_statistic(spread[None, :], lags=1)
+    assert np.isclose(stat[0], expected)
+
+
+def test_scan_prunes_flags_cointegration_and_caches():
+    pairs.clear_pairs_cache()
+    data = _universe()
+
+    result = pairs.scan_pairs(data, min_correlation=0.5, max_workers=1)
+    found = {frozenset(p) for p in zip(result["Asset_1"], result["Asset_2"])}
+    assert frozenset({"Safaricom", "SCOM.NR"}) in found
+    # AAPL is an independent random walk, so every pair with it is pruned
+    assert not any("AAPL" in pair for pair in found)
+
+    top = result.iloc[0]
+    assert {top["Asset_1"], top["Asset_2"]} == {"Safaricom", "SCOM.NR"}
+    assert top["Cointegrated"] and np.isfinite(top["Half_Life"])
+    assert pairs.scan_pairs(data, min_correlation=0.5, max_workers=1).equals(result)
+
+
+def test_universe_filters():
+    data = _universe()
+    nse = pairs.scan_pairs(data, min_correlation=0.0, universe="nse", max_workers=1)
+    cross = pairs.scan_pairs(data, min_correlation=0.0, universe="cross", max_workers=1)
+
+    # "Safaricom" resolves to SCOM.NR through config, so all three Kenyan names are NSE
+    assert len(nse) == 3 and len(cross) == 3
+    assert all("AAPL" in (a, b) for a, b in zip(cross["Asset_1"], cross["Asset_2"]))
+
+
+def test_short_history_does_not_cut_the_common_window(caplog):
+    data = _universe()
+    full = pairs.scan_pairs(data, min_correlation=0.5, max_workers=1)
+
+    # A recent listing with 60 bars would otherwise leave every pair 60 observations
+    listing = data["AAPL"].iloc[-60:] * 0.5
+    with caplog.at_level("WARNING", logger=pairs.logger.name):
+        result = pairs.scan_pairs({**data, "NEWCO": listing}, min_correlation=0.5, max_workers=1)
+
+    pd.testing.assert_frame_equal(result, full)
+    assert "NEWCO" in caplog.text
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+from app.utils import profiling
+
+
+def test_stage_timer_and_summary():
+    profiling.reset_stats()
+
+    with profiling.stage_timer("test.stage") as stage:
+        stage["rows"] = 10
+
+    @profiling.timed("test.decorated")
+    def make_frame():
+        return pd.DataFrame({"Close": range(5)})
+
+    @profiling.timed("test.failing")
+    def fail():
+        raise ValueError("boom")
+
+    make_frame()
+    with pytest.raises(ValueError):
+        fail()
+    summary = profiling.get_stage_summary().set_index("Stage")
+
+    assert summary.loc["test.stage", "Calls"] == 1
+    assert summary.loc["test.stage", "Rows"] == 10
+    assert summary.loc["test.decorated", "Rows"] == 5
+    assert summary.loc["test.failing", "Calls"] == 1
+    assert profiling.get_stage_histogram("test.stage")["Count"].sum() == 1
+
+
+def test_cache_probe_counts_hits_and_misses():
+    profiling.reset_stats()
+
+    with profiling.cache_probe("test.cache"):
+        profiling.mark_cache_miss()
+    with profiling.cache_probe("test.cache"):
+        pass
+
+    row = profiling.get_stage_summary().set_index("Stage").loc["test.cache"]
+    assert row["Cache_Misses"] == 1
+    assert row["Cache_Hits"] == 1
+
+
+def test_profile_capture_produces_report():
+    with profiling.profile_capture() as capture:
+        sum(range(1000))
+
+    assert capture.report
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from app.utils import quality
+from app.utils.calendars import trading_days
+
+
+def _bars(seed=0):
+    index = trading_days("NYSE", "2024-01-01", "2024-12-31")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    volume = rng.integers(1000, 2000, len(index)).astype(float)
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": volume}, index=index)
+
+
+def _dirty_bars():
+    data = _bars()
+    data.iloc[10, 1] = np.nan                                # missing High
+    data.iloc[20, 3] = -1                                    # negative Close
+    data.iloc[30, [1, 2]] = [data.iloc[30, 2], data.iloc[30, 1]]  # High < Low
+    data.iloc[41] = data.iloc[40]                            # stale bar
+    data.iloc[50, 4] = data["Volume"].median() * 100         # volume spike
+    data.iloc[60:, :4] = data.iloc[60:, :4] / 2              # unadjusted 2:1 split
+    return data.drop(data.index[70])                         # missing session
+
+
+def test_clean_bars_flags_and_repairs():
+    data = _dirty_bars()
+    clean, summary = quality.clean_bars(data, "AAPL")
+
+    # The negative Close also lies outside [Low, High]
+    expected = dict.fromkeys(quality.ISSUES, 1) | {"high_low_inverted": 2}
+    assert {issue: summary[issue] for issue in quality.ISSUES} == expected
+    assert summary["Missing_Sessions"] == 1
+    assert summary["Dropped"] == 1 and len(clean) == len(data) - 1
+    assert summary["Repaired"] == 2
+
+    # Missing High is filled, the inverted bar is clipped to a valid range
+    assert clean[quality.OHLCV_COLUMNS].notna().all().all()
+    assert (clean["High"] >= clean["Low"]).all()
+    assert (clean[quality.PRICE_COLUMNS] > 0).all().all()
+
+
+def test_clean_universe_matches_per_ticker():
+    universe = {"AAPL": _dirty_bars(), "MSFT": _bars(seed=1)}
+    cleaned, report = quality.clean_universe(universe)
+
+    for name, data in universe.items():
+        expected, summary = quality.clean_bars(data, name)
+        pd.testing.assert_frame_equal(cleaned[name], expected[quality.OHLCV_COLUMNS], check_freq=False)
+        assert report.loc[name].to_dict() == summary
+    assert report.loc["MSFT", "Clean_Pct"] == 100.0
+
+
+def test_validate_append_rejects_bad_bar():
+    data = _bars()
+    new = data.iloc[100:103].copy()
+    new.iloc[1, 3] = 0
+
+    accepted, summary = quality.validate_append(data.iloc[:100], new, "AAPL")
+    assert list(accepted.index) == [new.index[0], new.index[2]]
+    assert summary["Rows"] == 3 and summary["non_positive_price"] == 1 and summary["Dropped"] == 1
+
+
+def test_validate_append_checks_new_bars_against_the_stored_tail():
+    # Integer volumes, as downloaded
+    data = _bars().astype({"Volume": "int64"})
+    history, new = data.iloc[:100], data.iloc[100:103]
+
+    # Each problem only shows against the existing bars, not within the new ones
+    stale = new.copy()
+    stale.iloc[0] = history.iloc[-1]
+    split = new.copy()
+    split.iloc[:, :4] = split.iloc[:, :4] / 2
+    spike = new.copy()
+    spike.iloc[0, 4] = 150_000
+
+    for bars, issue in ((stale, "stale_bar"), (split, "split_jump"), (spike, "volume_spike")):
+        # Out-of-order delivery is sorted before checking
+        accepted, summary = quality.validate_append(history, bars.iloc[::-1], "AAPL")
+        assert summary["Rows"] == 3 and summary[issue] == 1
+        assert sum(summary[name] for name in quality.ISSUES) == 1
+        # Flag-only issues keep the bars (and their dtypes)
+        assert list(accepted.index) == list(bars.index)
+        assert accepted["Volume"].dtype == data["Volume"].dtype
@@ -0,0 +1,147 @@
+import time
+
+import numpy as np
+import pandas as pd
+from app.components.replay import LivePipeline, ReplayEngine, bar_seconds
+from app.components.screener import SnapshotIndex
+from app.utils import store
+
+
+def _minute_bars(seed, n, start="2024-03-11 09:30"):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq="min", name="Date")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({"Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close,
+                         "Volume": rng.integers(1000, 5000, n).astype(float)}, index=index)
+
+
+def test_schedule_orders_bars_and_collapses_gaps():
+    # Two sessions a night apart; the overnight gap counts as one bar
+    day_one, day_two = _minute_bars(1, 5), _minute_bars(2, 5, start="2024-03-12 09:30")
+    data = {"A": pd.concat([day_one, day_two]), "B": day_one.iloc[2:]}
+    engine = ReplayEngine(["A", "B"], interval="1m", speedup=60, warmup=2, data=data)
+    schedule = engine.load()
+
+    assert bar_seconds("15m") == 900 and bar_seconds("1d") == 86400
+    assert len(schedule) == 8 + 1
+    assert schedule["Offset_s"].is_monotonic_increasing
+    # 60x: one market minute per replay second, the night is a single minute
+    # (8 distinct timestamps after the warm-up bars)
+    assert schedule["Offset_s"].iloc[-1] == 7.0
+    assert schedule["Ticker"].tolist()[:4] == ["A", "A", "A", "B"]
+
+
+def test_replay_matches_full_recompute(tmp_path):
+    root = str(tmp_path)
+    data = {ticker: _minute_bars(seed, 330) for seed, ticker in enumerate(["SCOM", "EQTY", "KCB"])}
+    for ticker, bars in data.items():
+        store.write_bars(ticker, "1m", bars, root=root)
+
+    pipeline = LivePipeline(interval="1m")
+    report = ReplayEngine(list(data), interval="1m", speedup=None, root=root, warmup=300,
+                          pipeline=pipeline).run()
+
+    assert report["Bars"] == 3 * 30 and report["Tickers"] == 3 and report["Rejected_Bars"] == 0
+    assert report["Latency_p50_ms"] <= report["Latency_p99_ms"] <= report["Latency_max_ms"]
+
+    # The incrementally maintained snapshot equals one built from the full history
+    expected = SnapshotIndex()
+    expected.update_many(data)
+    pd.testing.assert_frame_equal(pipeline.index.snapshot().loc[list(data)], expected.snapshot().loc[list(data)],
+                                  rtol=1e-9)
+
+
+def test_slow_pipeline_builds_backlog():
+    class SlowPipeline(LivePipeline):
+        def on_bars(self, ticker, bars):
+            time.sleep(0.01)
+            return []
+
+    data = {"A": _minute_bars(1, 45)}
+    # Offered 1 bar / 2 ms against 10 ms of work per bar
+    report = ReplayEngine(["A"], interval="1m", speedup=30000, warmup=5, data=data,
+                          pipeline=SlowPipeline()).run()
+
+    assert report["Bars"] == 40
+    assert report["Offered_Bars_s"] > 4 * report["Throughput_Bars_s"]
+    assert report["Backlog_Max"] > 20 and report["Backlog_Growth_Bars_s"] > 0
+    assert report["Latency_max_ms"] > 200
+
+    # Failing bars are reported, not counted as processed
+    class FailingPipeline(LivePipeline):
+        def on_bars(self, ticker, bars):
+            if bars.index[0].minute % 2:
+                raise ValueError("boom")
+            return []
+
+    report = ReplayEngine(["A"], interval="1m", speedup=30000, warmup=5, data=data,
+                          pipeline=FailingPipeline()).run()
+    assert report["Bars"] + report["Failed_Bars"] == 40 and report["Failed_Bars"] == 20
+    # The offered load is the whole schedule: 40 bars over 39 minutes of market time
+    assert report["Scheduled_Bars"] == 40
+    assert np.isclose(report["Offered_Bars_s"], 40 / (39 * 60 / 30000))
+
+
+def test_persisted_bars_are_batched_and_latency_stays_flat(tmp_path, monkeypatch):
+    bars = _minute_bars(3, 420, start="2024-03-01 00:00")
+    writes = []
+    append_bars = store.append_bars
+
+    def counted(ticker, interval, data, root=None):
+        writes.append(len(data))
+        return append_bars(ticker, interval, data, root=root)
+
+    monkeypatch.setattr(store, "append_bars", counted)
+
+    def per_bar_ms(root, history):
+        if history is not None:
+            store.write_bars("A", "1m", history, root=root)
+        pipeline = LivePipeline(interval="1m", store_root=root, alerts=False, flush_bars=50)
+        pipeline.seed("A", bars.iloc[:300])
+        timings = []
+        for i in range(300, len(bars)):
+            started = time.perf_counter()
+            pipeline.on_bars("A", bars.iloc[i:i + 1])
+            timings.append(time.perf_counter() - started)
+        pipeline.flush()
+        return np.median(timings) * 1000
+
+    fresh = per_bar_ms(str(tmp_path / "fresh"), None)
+    # Five months of minute bars already stored
+    grown = per_bar_ms(str(tmp_path / "grown"), _minute_bars(4, 200_000, start="2023-10-01 00:00"))
+
+    assert writes == [50, 50, 20] * 2
+    assert grown < 2 * fresh
+    stored = store.read_bars("A", "1m", start="2024-03-01", root=str(tmp_path / "grown"))
+    pd.testing.assert_frame_equal(stored, bars.iloc[300:], check_freq=False)
+
+
+def test_failed_store_write_keeps_bars_for_the_next_flush(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    bars = {ticker: _minute_bars(seed, 310) for seed, ticker in enumerate(["A", "B"])}
+    append_bars = store.append_bars
+    failing = {"A"}
+
+    def flaky(ticker, interval, data, root=None):
+        if ticker in failing:
+            raise OSError("disk full")
+        return append_bars(ticker, interval, data, root=root)
+
+    monkeypatch.setattr(store, "append_bars", flaky)
+    pipeline = LivePipeline(interval="1m", store_root=root, alerts=False, flush_bars=4)
+    for ticker, data in bars.items():
+        pipeline.seed(ticker, data.iloc[:300])
+    for i in range(300, 305):
+        for ticker, data in bars.items():
+            # The failing write does not reject the bar that triggered it
+            pipeline.on_bars(ticker, data.iloc[i:i + 1])
+    assert pipeline.rejected == 0
+
+    # B was written; A is still buffered, in arrival order
+    pd.testing.assert_frame_equal(store.read_bars("B", "1m", root=root), bars["B"].iloc[300:305],
+                                  check_freq=False, check_names=False)
+    assert pipeline.flush() == 0
+    failing.clear()
+    assert pipeline.flush() == 5
+    pd.testing.assert_frame_equal(store.read_bars("A", "1m", root=root), bars["A"].iloc[300:305],
+                                  check_freq=False, check_names=False)
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from app.components.screener import SnapshotIndex, parse_filters
+from app.utils.indicators import add_technical_indicators
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2023-01-02", periods=n, freq="B", name="Date")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=index)
+    return pd.DataFrame({
+        "Open": close.shift(1).fillna(close.iloc[0]),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, n)
+    })
+
+
+def test_appended_bars_match_full_recompute():
+    data = _bars(400, seed=1)
+    index = SnapshotIndex()
+    index.update("AAA", data.iloc[:300])
+    for i in range(300, 400):
+        index.append_bars("AAA", data.iloc[i:i + 1])
+
+    full = data.copy()
+    full["Daily_Return"] = full["Close"].pct_change()
+    full = add_technical_indicators(full)
+    row = index.snapshot().loc["AAA"]
+
+    for field in ["Close", "Daily_Return", "MA_200", "RSI", "ATR", "Stochastic_D", "BB_Upper"]:
+        assert row[field] == pytest.approx(full[field].iloc[-1], rel=1e-12)
+    # EMA-based fields are warmed up on the trailing window only
+    assert row["MACD"] == pytest.approx(full["MACD"].iloc[-1], rel=1e-6)
+    assert row["Cumulative_Return"] == pytest.approx(full["Close"].iloc[-1] / full["Close"].iloc[0] - 1)
+
+    # Sessions sharing the index append concurrently without losing bars
+    shared = SnapshotIndex()
+    shared.update("AAA", data.iloc[:300])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: shared.append_bars("AAA", data.iloc[i:i + 1]), range(300, 340)))
+    assert list(shared.window("AAA").index[-40:]) == list(data.index[300:340])
+
+
+def test_revised_bar_replaces_the_one_it_corrects():
+    data = _bars(300, seed=2)
+    index = SnapshotIndex()
+    index.update("AAA", data.iloc[:-1])
+    index.append_bars("AAA", data.iloc[-1:])
+
+    # A re-sent bar for the same session (e.g. the final print of a partial bar)
+    revised = data.iloc[-1:].copy()
+    revised[["High", "Close"]] = revised[["High", "Close"]] * 1.02
+    assert index.append_bars("AAA", revised)
+
+    window = index.window("AAA")
+    assert window.index.is_unique and window.index[-1] == data.index[-1]
+    assert len(window) == min(len(data), index.tail)
+
+    full = data.copy()
+    full.iloc[-1:] = revised
+    full["Daily_Return"] = full["Close"].pct_change()
+    full = add_technical_indicators(full)
+    row = index.snapshot().loc["AAA"]
+    for field in ["Close", "Daily_Return", "RSI", "BB_Upper"]:
+        assert row[field] == pytest.approx(full[field].iloc[-1], rel=1e-12)
+
+
+def test_query_filters_and_sorts():
+    index = SnapshotIndex()
+    assert index.update_many({f"T{i}": _bars(260, seed=i) for i in range(40)}) == 40
+    assert index.update("T0", _bars(260, seed=0)) is False
+    index.update("SHORT", _bars(30, seed=99))
+
+    matches = index.query("RSI < 50 and Close > MA_50", sort_by="RSI", ascending=False)
+    table = index.snapshot()
+    expected = table[(table["RSI"] < 50) & (table["Close"] > table["MA_50"])]
+
+    assert set(matches.index) == set(expected.index)
+    assert list(matches["RSI"]) == sorted(matches["RSI"], reverse=True)
+    # No MA_200 on a 30-bar history, so the short series never matches
+    assert "SHORT" not in index.query([("Close", ">", "MA_200")]).index
+
+    index.remove("T3")
+    assert len(index) == 40 and "T3" not in index.snapshot().index
+
+
+def test_parse_filters():
+    assert parse_filters("RSI < 30 and Close >= MA_200") == [("RSI", "<", 30.0), ("Close", ">=", "MA_200")]
+    with pytest.raises(ValueError):
+        parse_filters("RSI below 30")
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from app.components import metrics
+from app.utils.sketches import ReturnSketches, TDigest
+
+
+def _daily_returns(n, seed=0, start="2024-01-01"):
+    # Every calendar day (weekends included) and fat-tailed, unlike the shared business-day factory
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.standard_t(3, n) * 0.01, index=pd.date_range(start, periods=n, freq="D"))
+
+
+def test_digest_tracks_exact_quantiles_and_tails():
+    values = np.random.default_rng(1).standard_t(3, 200_000) * 0.01
+    digest = TDigest.from_values(values)
+    assert digest.count == len(values)
+    assert len(digest) < 1000 and digest.nbytes < values.nbytes / 100
+
+    ordered = np.sort(values)
+    for q in (0.001, 0.01, 0.05, 0.5, 0.95, 0.999):
+        # Rank error, the quantity the digest bounds
+        rank = np.searchsorted(ordered, digest.quantile(q)) / len(values)
+        assert abs(rank - q) < 2e-3
+    assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+    assert abs(digest.cdf(0.0) - (values <= 0).mean()) < 2e-3
+
+    exact_cvar = ordered[:int(0.05 * len(values))].mean()
+    assert abs(metrics.calculate_cvar(digest) - exact_cvar) < 0.01 * abs(exact_cvar)
+    assert abs(metrics.calculate_var(digest) - np.percentile(values, 5)) < 1e-3
+
+    counts, edges = digest.histogram(bins=20, range=(-0.05, 0.05))
+    exact, _ = np.histogram(values, bins=edges)
+    assert np.abs(counts - exact).max() < 0.01 * len(values)
+
+
+def test_merged_digests_match_a_single_pass():
+    values = np.random.default_rng(2).normal(0, 0.02, 100_000)
+    parts = [TDigest.from_values(part) for part in np.array_split(values, 25)]
+    merged = TDigest.merged(parts)
+    single = TDigest.from_values(values)
+    assert merged.count == single.count
+    for q in (0.01, 0.05, 0.5, 0.99):
+        assert abs(merged.quantile(q) - single.quantile(q)) < 2e-3 * values.std() * 10
+
+    restored = TDigest.from_dict(merged.to_dict())
+    assert restored.quantile(0.05) == merged.quantile(0.05)
+    assert restored.count == merged.count
+
+
+def test_return_sketches_by_ticker_sector_and_period():
+    sketches = ReturnSketches(bucket="M", sectors={"AAA": "Banking", "BBB": "Banking", "CCC": "Energy"})
+    aaa, bbb, ccc = _daily_returns(90, 3), _daily_returns(90, 4), _daily_returns(90, 5) * 3
+    assert sketches.update_many({"AAA": aaa, "BBB": bbb.to_frame("Daily_Return"), "CCC": ccc}) == 270
+
+    # Re-sending an overlapping window only adds the new returns
+    extended = pd.concat([aaa, _daily_returns(10, 6, start="2024-03-31")])
+    assert sketches.update("AAA", extended) == 10
+    assert sketches.sketch(tickers=["AAA"]).count == 100
+
+    assert sketches.sketch(sector="Banking").count == 190
+    assert sketches.sketch(sector="Energy").count == 90
+    # February 2024 is a leap month: its bucket holds 29 days
+    assert sketches.sketch(tickers=["CCC"], start="2024-02", end="2024-02").count == 29
+    assert sketches.var(sector="Energy") < sketches.var(sector="Banking")
+
+    # Small sketches keep singleton centroids, so the VaR lands between adjacent order statistics
+    banking = pd.concat([extended, bbb])
+    ordered = np.sort(banking)
+    var = metrics.calculate_var(sketches.sketch(sector="Banking"))
+    assert ordered[8] <= var <= ordered[10]
+
+    ranks = sketches.percentile_ranks({"AAA": banking.min(), "BBB": banking.max()}, sector="Banking")
+    assert ranks["AAA"] < 1 and ranks["BBB"] == 100
+    assert set(sketches.summary(by="sector").index) == {"Banking", "Energy"}
@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from app.utils import store
+
+
+def _minute_bars(start, n, value=1.0):
+    index = pd.date_range(start, periods=n, freq="min", tz="UTC", name="Datetime")
+    close = pd.Series(value + np.arange(n, dtype=float), index=index)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10})
+
+
+def _append_slice(args):
+    root, offset = args
+    bars = _minute_bars("2024-03-04 09:00", 200)
+    for i in range(offset, 200, 4):
+        store.append_bars("AAPL", "1m", bars.iloc[i:i + 1], root=root)
+
+
+def test_appends_only_rewrite_their_partitions(tmp_path):
+    root = str(tmp_path)
+    store.append_bars("AAPL", "1m", _minute_bars("2024-01-31 23:00", 120), root=root)
+    directory = store.store_path("AAPL", "1m", root)
+    assert sorted(os.listdir(directory)) == [".lock", "2024-01.parquet", "2024-02.parquet"]
+
+    january = os.path.join(directory, "2024-01.parquet")
+    before = os.stat(january).st_mtime_ns
+    # A re-sent bar wins over the stored one
+    store.append_bars("AAPL", "1m", _minute_bars("2024-02-01 00:30", 60, value=500.0), root=root)
+    assert os.stat(january).st_mtime_ns == before
+
+    stored = store.read_bars("AAPL", "1m", root=root)
+    assert len(stored) == 150 and stored.index.is_monotonic_increasing
+    assert stored.loc["2024-02-01 00:30", "Close"] == 500.0
+
+    # Range reads skip partitions outside [start, end)
+    february = store.read_bars("AAPL", "1m", start=pd.Timestamp("2024-02-01 00:00"), root=root)
+    assert len(february) == 90 and february.index[0] == pd.Timestamp("2024-02-01", tz="UTC")
+    assert store.list_stored("1m", root=root) == ["AAPL"]
+
+
+def test_concurrent_processes_do_not_lose_appends(tmp_path):
+    root = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_append_slice, [(root, offset) for offset in range(4)]))
+
+    stored = store.read_bars("AAPL", "1m", root=root)
+    pd.testing.assert_frame_equal(stored, _minute_bars("2024-03-04 09:00", 200), check_freq=False)
+    assert [name for name in os.listdir(store.store_path("AAPL", "1m", root)) if name.endswith(".tmp")] == []
+
+
+def test_read_tail_reads_only_the_partitions_it_needs(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    # Four monthly partitions; March and April hold five bars each
+    history = pd.concat([_minute_bars("2024-01-10", 100), _minute_bars("2024-02-10", 100),
+                         _minute_bars("2024-03-31 23:55", 10)])
+    store.write_bars("AAPL", "1m", history, root=root)
+
+    reads = []
+    read_parquet = pd.read_parquet
+    monkeypatch.setattr(store.pd, "read_parquet", lambda path, *args, **kwargs: reads.append(path)
+                        or read_parquet(path, *args, **kwargs))
+
+    tail = store.read_tail("AAPL", "1m", 20, end=pd.Timestamp("2024-04-01 00:02", tz="UTC"), root=root)
+    pd.testing.assert_frame_equal(tail, history.loc[:"2024-04-01 00:01"].iloc[-20:], check_freq=False)
+    # January is never read
+    assert [os.path.basename(path) for path in reads] == ["2024-04.parquet", "2024-03.parquet", "2024-02.parquet"]
+    assert store.read_tail("MSFT", "1m", 20, root=root) is None
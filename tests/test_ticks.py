@@ -0,0 +1,114 @@
+import socket
+import threading
+
+import numpy as np
+import pandas as pd
+from app.components.ticks import FileTickSource, SocketTickSource, TickAggregator, TickBatch, live_sink, \
+    write_tick_file
+from app.utils import store
+
+
+def _ticks(n=3000, symbols=("SCOM", "EQTY", "KCB"), seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-03-11 06:00", tz="UTC").value
+    stamps = start + np.sort(rng.integers(0, 3 * 3600 * 10 ** 9, n))
+    return pd.DataFrame({"Symbol": rng.choice(symbols, n), "Timestamp": stamps,
+                         "Price": 100 + rng.normal(0, 1, n).cumsum(), "Size": rng.integers(1, 500, n).astype(float)})
+
+
+def _reference(ticks, interval):
+    frame = ticks.assign(Timestamp=pd.to_datetime(ticks["Timestamp"], unit="ns", utc=True))
+    frame = frame.sort_values("Timestamp", kind="stable")
+    bars = (frame.groupby(["Symbol", pd.Grouper(key="Timestamp", freq=interval.replace("m", "min"))])
+            .agg(Open=("Price", "first"), High=("Price", "max"), Low=("Price", "min"), Close=("Price", "last"),
+                 Volume=("Size", "sum"), Ticks=("Price", "size")))
+    return bars[bars["Ticks"] > 0].reset_index(level=0).rename(columns={"Symbol": "Ticker"})
+
+
+def _collect(aggregator, batches):
+    out = {interval: [] for interval in aggregator.intervals}
+    for batch in batches:
+        for interval, bars in aggregator.process(batch).items():
+            out[interval].append(bars)
+    for interval, bars in aggregator.flush().items():
+        out[interval].append(bars)
+    return {interval: pd.concat(frames).sort_values(["Ticker"], kind="stable").sort_index(kind="stable")
+            for interval, frames in out.items()}
+
+
+def _same_bars(result, expected):
+    key = ["Ticker", result.index.name]
+    result = result.reset_index().sort_values(key).reset_index(drop=True)
+    expected = expected.rename_axis(result.columns[0]).reset_index().sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False)
+
+
+def test_bars_match_resample_with_out_of_order_ticks():
+    ticks = _ticks()
+    # Shuffle arrival order by up to ~2 seconds of event time, within the grace window
+    rng = np.random.default_rng(1)
+    arrival = ticks.assign(_key=ticks["Timestamp"] + rng.integers(0, 2 * 10 ** 9, len(ticks)))
+    arrival = arrival.sort_values("_key").drop(columns="_key")
+
+    aggregator = TickAggregator(["1m", "5m", "15m", "1h"], grace=5)
+    bounds = np.linspace(0, len(arrival), 18).astype(int)
+    batches = [TickBatch.from_frame(arrival.iloc[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+    bars = _collect(aggregator, batches)
+
+    for interval in aggregator.intervals:
+        _same_bars(bars[interval], _reference(ticks, interval))
+    assert aggregator.ticks == len(ticks) and sum(aggregator.late.values()) == 0
+    assert aggregator.open_bars == {"1m": 0, "5m": 0, "15m": 0, "1h": 0}
+
+
+def test_late_ticks_beyond_grace_are_dropped():
+    base = pd.Timestamp("2024-03-11 06:00", tz="UTC")
+    frame = lambda rows: TickBatch.from_frame(pd.DataFrame(rows, columns=["Symbol", "Timestamp", "Price", "Size"]))
+    aggregator = TickAggregator(["1m"], grace=10)
+
+    closed = aggregator.process(frame([("SCOM", base + pd.Timedelta("10s"), 10.0, 1),
+                                       ("SCOM", base + pd.Timedelta("65s"), 11.0, 1)]))
+    assert closed == {}  # 06:00 bar is still within the grace window
+    # Late but within grace: becomes the bar's open (earlier tick time)
+    closed = aggregator.process(frame([("SCOM", base + pd.Timedelta("5s"), 9.0, 2),
+                                       ("SCOM", base + pd.Timedelta("80s"), 12.0, 1)]))
+    bar = closed["1m"].iloc[0]
+    assert closed["1m"].index[0] == base and (bar["Open"], bar["Close"], bar["Volume"]) == (9.0, 10.0, 3.0)
+
+    # The 06:00 bar is emitted, so another tick for it is dropped
+    aggregator.process(frame([("SCOM", base + pd.Timedelta("30s"), 50.0, 1)]))
+    assert aggregator.late["1m"] == 1
+    assert aggregator.flush()["1m"]["High"].max() == 12.0
+
+
+def test_file_and_socket_sources_feed_the_store(tmp_path):
+    ticks = _ticks(2000)
+    path = write_tick_file(str(tmp_path / "ticks.parquet"), ticks)
+
+    sink = live_sink(["5m"], store_root=str(tmp_path / "store"), alerts=False)
+    from_file = TickAggregator(["5m"], sinks=[sink])
+    report = from_file.run(FileTickSource(path, batch_size=300))
+    assert report["Ticks"] == len(ticks)
+
+    stored = store.read_bars("SCOM", "5m", root=str(tmp_path / "store"))
+    expected = _reference(ticks, "5m")
+    expected = expected[expected["Ticker"] == "SCOM"]
+    np.testing.assert_allclose(stored["Close"], expected["Close"])
+    assert "SCOM" in sink.pipelines["5m"].index
+
+    server = socket.create_server(("127.0.0.1", 0))
+    lines = "".join(f"{s},{t},{p},{z}\n" for s, t, p, z in ticks.itertuples(index=False)).encode()
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            for start in range(0, len(lines), 4096):  # split mid-line
+                conn.sendall(lines[start:start + 4096])
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    from_socket = TickAggregator(["5m"])
+    bars = _collect(from_socket, SocketTickSource(*server.getsockname(), chunk_bytes=1000))["5m"]
+    thread.join()
+    server.close()
+    _same_bars(bars, _reference(ticks, "5m"))